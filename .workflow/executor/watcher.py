@@ -6,6 +6,7 @@ Claude Enhancer 事件监听器
 """
 
 import os
+import re
 import sys
 import time
 import json
@@ -14,7 +15,7 @@ import subprocess
 import threading
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Set, Optional, Tuple
 from dataclasses import dataclass
 from collections import deque, defaultdict
 
@@ -61,6 +62,7 @@ IGNORE_PATTERNS = [
     ".swp",
     ".tmp",
 ]
+IGNORE_RE = re.compile("|".join(re.escape(pattern) for pattern in IGNORE_PATTERNS))
 
 
 @dataclass
@@ -81,42 +83,82 @@ class FileEvent:
         }
 
 
-class EventDebouncer:
-    """事件防抖器"""
-
-    def __init__(self, window_ms: int = 100):
-        self.window_ms = window_ms
-        self.pending = {}
-        self.lock = threading.Lock()
-
-    def add(self, path: Path, event_type: str) -> bool:
-        """添加事件，返回是否应该处理"""
-        with self.lock:
-            key = (str(path), event_type)
-            now = time.time() * 1000
-
-            if key in self.pending:
-                last_time = self.pending[key]
-                if now - last_time < self.window_ms:
-                    pass  # Auto-fixed empty block
-                    # 在防抖窗口内，更新时间但不处理
-                    self.pending[key] = now
-                    return False
-
-            self.pending[key] = now
-            return True
-
-    def cleanup(self):
-        """清理过期的防抖记录"""
-        with self.lock:
-            now = time.time() * 1000
-            expired = []
-            for key, timestamp in self.pending.items():
-                if now - timestamp > self.window_ms * 10:
-                    expired.append(key)
+def _glob_to_regex(pattern: str) -> "re.Pattern":
+    """把glob模式转换为正则（**跨目录，*和?不跨目录）"""
+    regex = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            regex.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            regex.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            regex.append("[^/]")
+            i += 1
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(regex))
+
+
+class PhasePathIndex:
+    """阶段路径前缀索引
+
+    把path_whitelist中每个模式的字面前缀（第一个通配符之前的目录）放入trie，
+    查找时只需沿路径逐级下降并匹配沿途节点上的剩余通配部分；
+    多个模式命中时取配置中靠前的阶段。
+    """
+
+    def __init__(self, whitelist: Dict[str, List[str]]):
+        self.root = self._node()
+        order = 0
+        for phase, patterns in (whitelist or {}).items():
+            for pattern in patterns or []:
+                parts = pattern.strip("/").split("/")
+                prefix = []
+                for part in parts:
+                    if any(char in part for char in "*?["):
+                        break
+                    prefix.append(part)
+
+                node = self.root
+                for part in prefix:
+                    node = node["children"].setdefault(part, self._node())
+
+                remainder = "/".join(parts[len(prefix) :])
+                regex = _glob_to_regex(remainder) if remainder else None
+                node["rules"].append((order, phase, regex))
+                order += 1
+
+    @staticmethod
+    def _node() -> dict:
+        return {"children": {}, "rules": []}
+
+    def lookup(self, relative_path: str) -> Optional[str]:
+        """返回路径所属阶段，未命中返回None"""
+        parts = relative_path.split("/")
+        node = self.root
+        best: Optional[Tuple[int, str]] = None
+
+        for depth in range(len(parts) + 1):
+            rest = "/".join(parts[depth:])
+            for order, phase, regex in node["rules"]:
+                matched = rest == "" if regex is None else regex.fullmatch(rest)
+                if matched and (best is None or order < best[0]):
+                    best = (order, phase)
+
+            if depth == len(parts):
+                break
+            node = node["children"].get(parts[depth])
+            if node is None:
+                break
 
-            for key in expired:
-                del self.pending[key]
+        return best[1] if best else None
 
 
 class PhaseAwareWatcher:
@@ -124,20 +166,35 @@ class PhaseAwareWatcher:
 
     def __init__(self):
         self.config = self._load_config()
-        self.debouncer = EventDebouncer(
-            window_ms=self.config.get("watcher", {}).get("debounce_ms", 100)
-        )
+        watcher_config = self.config.get("watcher", {})
+        # 静默期：批次内最后一个事件之后等待多久无新事件才处理
+        self.quiet_period = watcher_config.get("debounce_ms", 100) / 1000
+        # 持续有事件时单个批次的最长等待时间
+        self.max_batch_delay = watcher_config.get("max_batch_delay_ms", 2000) / 1000
+        self.phase_index = PhasePathIndex(self.config.get("path_whitelist", {}))
         self.current_phase = self._get_current_phase()
         self.event_queue = deque(maxlen=1000)
         self.running = False
         self.executor_path = WORKFLOW_DIR / "executor" / "executor.py"
 
+        # 读取线程只把事件放入待处理批次（同一路径只保留最新事件）
+        self._pending: Dict[Path, Tuple[str, float]] = {}
+        self._last_event_at = 0.0
+        self._batch_cond = threading.Condition()
+
+        # 待验证阶段集合：验证运行期间的重复请求合并为一次
+        self._validation_pending: Set[str] = set()
+        self._validation_cond = threading.Condition()
+
         # 性能统计
         self.stats = {
             "events_total": 0,
             "events_processed": 0,
             "events_debounced": 0,
+            "batches": 0,
+            "max_batch_size": 0,
             "validations_triggered": 0,
+            "validations_coalesced": 0,
             "phase_advances": 0,
         }
 
@@ -156,24 +213,19 @@ class PhaseAwareWatcher:
 
     def _should_ignore(self, path: Path) -> bool:
         """检查是否应该忽略"""
-        path_str = str(path)
-        for pattern in IGNORE_PATTERNS:
-            if pattern in path_str:
-                return True
-        return False
+        return IGNORE_RE.search(str(path)) is not None
 
     def _get_phase_for_path(self, path: Path) -> Optional[str]:
         """根据文件路径判断所属阶段"""
-        path_str = str(path.relative_to(BASE_DIR))
+        try:
+            path_str = path.relative_to(BASE_DIR).as_posix()
+        except ValueError:
+            return None
 
-        # 根据路径白名单判断
-        whitelist = self.config.get("path_whitelist", {})
-        for phase, patterns in whitelist.items():
-            for pattern in patterns:
-                pass  # Auto-fixed empty block
-                # 简化的匹配逻辑
-                if pattern.replace("**", "").replace("*", "") in path_str:
-                    return phase
+        # 根据路径白名单判断（预编译的前缀索引）
+        phase = self.phase_index.lookup(path_str)
+        if phase:
+            return phase
 
         # 默认规则
         if "docs" in path_str:
@@ -192,17 +244,92 @@ class PhaseAwareWatcher:
 
         return None
 
-    def _process_event(self, event: FileEvent):
-        """处理文件事件"""
-        self.stats["events_processed"] += 1
+    def _enqueue_event(self, path: Path, event_type: str):
+        """读取线程调用：放入待处理批次后立即返回"""
+        with self._batch_cond:
+            if path in self._pending:
+                self.stats["events_debounced"] += 1
+            self._pending[path] = (event_type, time.time())
+            self._last_event_at = time.monotonic()
+            self._batch_cond.notify()
+
+    def _batch_loop(self):
+        """批处理线程：等到静默期结束后一次性处理积累的事件"""
+        while self.running:
+            with self._batch_cond:
+                while not self._pending and self.running:
+                    self._batch_cond.wait(timeout=1)
+                if not self.running:
+                    break
+
+                batch_started = time.monotonic()
+                while True:
+                    now = time.monotonic()
+                    remaining = self.quiet_period - (now - self._last_event_at)
+                    if remaining <= 0 or now - batch_started >= self.max_batch_delay:
+                        break
+                    self._batch_cond.wait(timeout=remaining)
+
+                batch = self._pending
+                self._pending = {}
+
+            self._process_batch(batch)
+
+    def _process_batch(self, batch: Dict[Path, Tuple[str, float]]):
+        """处理一个事件批次：过滤、查找阶段、批量写日志，每个阶段最多请求一次验证"""
+        self.stats["batches"] += 1
+        self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(batch))
+
+        events = []
+        for path, (event_type, timestamp) in batch.items():
+            if self._should_ignore(path):
+                continue
+            phase = self._get_phase_for_path(path)
+            if phase:
+                events.append(
+                    FileEvent(
+                        path=path,
+                        event_type=event_type,
+                        timestamp=timestamp,
+                        phase=phase,
+                    )
+                )
+
+        if not events:
+            return
+
+        self.stats["events_processed"] += len(events)
+        self.event_queue.extend(events)
 
         # 写入事件日志
         with open(EVENT_LOG, "a") as f:
-            f.write(orjson.dumps(event.to_dict()).decode() + "\n")
+            f.write(
+                "".join(orjson.dumps(event.to_dict()).decode() + "\n" for event in events)
+            )
 
         # 判断是否需要触发验证
-        if event.phase and event.phase == self.current_phase:
-            self._trigger_validation(event.phase)
+        if any(event.phase == self.current_phase for event in events):
+            self._request_validation(self.current_phase)
+
+    def _request_validation(self, phase: str):
+        """请求验证，交给验证线程执行"""
+        with self._validation_cond:
+            if phase in self._validation_pending:
+                self.stats["validations_coalesced"] += 1
+            self._validation_pending.add(phase)
+            self._validation_cond.notify()
+
+    def _validation_loop(self):
+        """验证线程：依次执行待验证阶段，不阻塞事件读取"""
+        while self.running:
+            with self._validation_cond:
+                while not self._validation_pending and self.running:
+                    self._validation_cond.wait(timeout=1)
+                if not self.running:
+                    break
+                phase = self._validation_pending.pop()
+
+            self._trigger_validation(phase)
 
     def _trigger_validation(self, phase: str):
         """触发阶段验证"""
@@ -266,9 +393,14 @@ class PhaseAwareWatcher:
 
         i = inotify.adapters.InotifyTree(str(path))
 
-        for event in i.event_gen(yield_nones=False):
+        # 读取循环只做最少的工作，过滤和阶段查找在批处理线程中进行。
+        # 不能传timeout_s：空闲超过该时长生成器就会结束，监听随之静默停止；
+        # yield_nones在空闲时每个轮询周期产出None，用于检查running
+        for event in i.event_gen(yield_nones=True):
             if not self.running:
                 break
+            if event is None:
+                continue
 
             (_, type_names, path_str, filename) = event
 
@@ -280,28 +412,8 @@ class PhaseAwareWatcher:
             # 统计
             self.stats["events_total"] += 1
 
-            # 忽略检查
-            if self._should_ignore(full_path):
-                continue
-
-            # 防抖
             event_type = type_names[0] if type_names else "UNKNOWN"
-            if not self.debouncer.add(full_path, event_type):
-                self.stats["events_debounced"] += 1
-                continue
-
-            # 创建事件
-            phase = self._get_phase_for_path(full_path)
-            if phase:
-                event = FileEvent(
-                    path=full_path,
-                    event_type=event_type,
-                    timestamp=time.time(),
-                    phase=phase,
-                )
-
-                self.event_queue.append(event)
-                self._process_event(event)
+            self._enqueue_event(full_path, event_type)
 
     def start(self):
         """启动监听器"""
@@ -310,8 +422,14 @@ class PhaseAwareWatcher:
         console.print(f"[dim]当前阶段: {self.current_phase}[/dim]")
         console.print(f"[dim]监听路径: {', '.join(WATCH_PATHS.keys())}[/dim]")
 
-        # 启动监听线程
+        # 启动批处理与验证线程
         threads = []
+        for target in (self._batch_loop, self._validation_loop):
+            t = threading.Thread(target=target, daemon=True)
+            t.start()
+            threads.append(t)
+
+        # 启动监听线程
         for label, path in WATCH_PATHS.items():
             if path.exists():
                 t = threading.Thread(
@@ -324,7 +442,6 @@ class PhaseAwareWatcher:
         try:
             while self.running:
                 time.sleep(10)
-                self.debouncer.cleanup()
 
                 # 每分钟报告一次统计
                 if (
@@ -340,6 +457,9 @@ class PhaseAwareWatcher:
     def stop(self):
         """停止监听器"""
         self.running = False
+        for cond in (self._batch_cond, self._validation_cond):
+            with cond:
+                cond.notify_all()
         self._report_stats()
 
     def _report_stats(self):
@@ -348,7 +468,11 @@ class PhaseAwareWatcher:
         console.print(f"  总事件: {self.stats['events_total']}")
         console.print(f"  已处理: {self.stats['events_processed']}")
         console.print(f"  防抖过滤: {self.stats['events_debounced']}")
+        console.print(
+            f"  批次: {self.stats['batches']} (最大 {self.stats['max_batch_size']})"
+        )
         console.print(f"  触发验证: {self.stats['validations_triggered']}")
+        console.print(f"  合并验证: {self.stats['validations_coalesced']}")
         console.print(f"  阶段推进: {self.stats['phase_advances']}")
 
         # 写入metrics
@@ -10,6 +10,7 @@ import logging
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, validator
 
+from app.core.hashing import HashingOverloadedError
 from app.core.security import SecurityMiddleware, JWTSecurityHandler
 from app.services.jwt_service import JWTTokenManager, get_jwt_manager
 from app.services.user_service import UserService, get_user_service
@@ -242,6 +243,13 @@ async def login(
 
     except HTTPException:
         raise
+    except HashingOverloadedError:
+        logger.warning(f"Login rejected for {request.email}: password hashing overloaded")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="登录请求过多，请稍后重试",
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         logger.error(f"Login error for {request.email}: {e}")
         raise HTTPException(
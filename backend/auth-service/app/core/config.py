@@ -62,6 +62,11 @@ class Settings(BaseSettings):
     JWT_KEY_ROTATION_INTERVAL: int = Field(
         default=86400, env="JWT_KEY_ROTATION_INTERVAL"
     )  # 24小时
+    # 已验证声明缓存（秒，0表示禁用），撤销通过pub/sub即时失效
+    JWT_VALIDATION_CACHE_TTL: int = Field(default=5, env="JWT_VALIDATION_CACHE_TTL", ge=0)
+    JWT_VALIDATION_CACHE_SIZE: int = Field(
+        default=10000, env="JWT_VALIDATION_CACHE_SIZE", gt=0
+    )
 
     # 密码配置
     PASSWORD_MIN_LENGTH: int = Field(default=12, env="PASSWORD_MIN_LENGTH")
@@ -82,6 +87,11 @@ class Settings(BaseSettings):
         ge=14,  # 最小14轮
         le=20   # 最大20轮
     )
+    # 密码哈希线程池（0表示按CPU核数/核数×16自动设置）
+    PASSWORD_HASH_WORKERS: int = Field(default=0, env="PASSWORD_HASH_WORKERS", ge=0)
+    PASSWORD_HASH_MAX_PENDING: int = Field(
+        default=0, env="PASSWORD_HASH_MAX_PENDING", ge=0
+    )
 
     # MFA配置
     MFA_TOTP_ISSUER: str = Field(default="Claude Enhancer", env="MFA_TOTP_ISSUER")
@@ -96,6 +106,13 @@ class Settings(BaseSettings):
     SESSION_CLEANUP_INTERVAL: int = Field(
         default=3600, env="SESSION_CLEANUP_INTERVAL"
     )  # 1小时
+    SESSION_ACTIVITY_UPDATE_INTERVAL: int = Field(
+        default=60, env="SESSION_ACTIVITY_UPDATE_INTERVAL"
+    )  # 同一会话最后活动时间的最小写入间隔（秒）
+    SESSION_HISTORY_FLUSH_INTERVAL: float = Field(
+        default=1.0, env="SESSION_HISTORY_FLUSH_INTERVAL"
+    )  # 会话历史批量写入间隔（秒）
+    SESSION_HISTORY_BATCH_SIZE: int = Field(default=100, env="SESSION_HISTORY_BATCH_SIZE")
 
     # 速率限制配置
     RATE_LIMIT_ENABLED: bool = Field(default=True, env="RATE_LIMIT_ENABLED")
@@ -402,6 +419,8 @@ class Settings(BaseSettings):
             "issuer": self.JWT_ISSUER,
             "audience": self.JWT_AUDIENCE,
             "key_rotation_interval": self.JWT_KEY_ROTATION_INTERVAL,
+            "validation_cache_ttl": self.JWT_VALIDATION_CACHE_TTL,
+            "validation_cache_size": self.JWT_VALIDATION_CACHE_SIZE,
         }
 
     @property
@@ -433,6 +452,8 @@ class Settings(BaseSettings):
             "password_history_count": self.PASSWORD_HISTORY_COUNT,
             "password_pepper": self.PASSWORD_PEPPER,
             "bcrypt_rounds": self.PASSWORD_BCRYPT_ROUNDS,
+            "password_hash_workers": self.PASSWORD_HASH_WORKERS,
+            "password_hash_max_pending": self.PASSWORD_HASH_MAX_PENDING,
             "account_lockout_enabled": self.ACCOUNT_LOCKOUT_ENABLED,
             "account_lockout_attempts": self.ACCOUNT_LOCKOUT_ATTEMPTS,
             "account_lockout_duration": self.ACCOUNT_LOCKOUT_DURATION,
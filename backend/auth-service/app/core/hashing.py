@@ -0,0 +1,122 @@
+"""
+Claude Enhancer 密码哈希执行器
+在事件循环之外执行bcrypt计算，提供准入控制和队列深度指标
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import bcrypt
+
+
+class HashingOverloadedError(RuntimeError):
+    """待处理的哈希任务已达上限，拒绝新请求"""
+
+
+class PasswordHashExecutor:
+    """
+    bcrypt专用线程池
+
+    bcrypt在计算期间释放GIL，线程池即可让多个哈希在多核上并行，
+    同时避免进程池的启动与序列化开销。待处理任务（排队+执行中）
+    超过max_pending时立即拒绝，而不是无限排队拖垮所有登录请求。
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 16
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # 指标
+        self.pending = 0
+        self.peak_pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="bcrypt"
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """在线程池中执行func，超过待处理上限时抛出HashingOverloadedError"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingOverloadedError(
+                    f"密码哈希队列已满（{self.pending}/{self.max_pending}）"
+                )
+            self.pending += 1
+            self.submitted += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+
+        enqueued_at = time.perf_counter()
+
+        def job():
+            started_at = time.perf_counter()
+            result = func(*args)
+            return result, started_at - enqueued_at, time.perf_counter() - started_at
+
+        future = self._pool().submit(job)
+        # 在任务结束或被取消时释放名额，即使等待它的协程已被取消
+        future.add_done_callback(self._release)
+
+        result, wait_seconds, run_seconds = await asyncio.wrap_future(future)
+
+        with self._lock:
+            self._wait_seconds += wait_seconds
+            self._run_seconds += run_seconds
+        return result
+
+    def _release(self, future: Future):
+        with self._lock:
+            self.pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    async def hashpw(self, password: bytes, rounds: int) -> bytes:
+        """生成盐并计算bcrypt哈希"""
+        return await self.run(
+            lambda: bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+        )
+
+    async def checkpw(self, password: bytes, hashed: bytes) -> bool:
+        """校验密码与bcrypt哈希是否匹配"""
+        return await self.run(bcrypt.checkpw, password, hashed)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取队列深度与耗时指标"""
+        with self._lock:
+            completed = self.completed
+            return {
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "queue_depth": max(self.pending - self.max_workers, 0),
+                "peak_pending": self.peak_pending,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "avg_wait_ms": self._wait_seconds / completed * 1000 if completed else 0.0,
+                "avg_run_ms": self._run_seconds / completed * 1000 if completed else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """关闭线程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -4,9 +4,12 @@ Claude Enhancer JWT Token管理服务
 """
 
 import asyncio
+import hashlib
 import secrets
 import json
+import logging
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Union
 from cryptography.hazmat.primitives import serialization, hashes
@@ -20,6 +23,8 @@ from app.core.config import settings
 from shared.messaging.publisher import MessagePublisher, MessageType
 from shared.metrics.metrics import monitor_function
 
+logger = logging.getLogger(__name__)
+
 
 class TokenClaims(BaseModel):
     """Token声明"""
@@ -45,8 +50,21 @@ class TokenValidationResult(BaseModel):
     risk_factors: List[str] = []
 
 
+class TokenRejectedError(jwt.InvalidTokenError):
+    """Token在签名校验前即被拒绝（原样返回错误信息）"""
+
+
 class JWTTokenManager:
-    """JWT Token管理器"""
+    """
+    JWT Token管理器
+
+    验证路径上的缓存：
+    - kid→已解析公钥（公钥按kid不可变），当前私钥在rotate_keys时刷新
+    - 短TTL的已验证声明缓存（按Token摘要），撤销事件通过Redis pub/sub
+      广播到所有实例并立即失效；订阅未连通时不使用该缓存
+    """
+
+    EVENTS_CHANNEL = "jwt_events"
 
     def __init__(self):
         self.redis_client = None
@@ -58,6 +76,20 @@ class JWTTokenManager:
         self.refresh_token_ttl = settings.JWT_REFRESH_TOKEN_TTL
         self.key_rotation_interval = settings.JWT_KEY_ROTATION_INTERVAL
 
+        # 密钥缓存
+        self._public_keys: Dict[str, Any] = {}
+        self._private_key: Optional[tuple] = None  # (kid, 私钥)
+
+        # 已验证声明缓存：Token摘要 -> (payload, 过期时间)
+        self.validation_cache_ttl = settings.JWT_VALIDATION_CACHE_TTL
+        self.validation_cache_size = settings.JWT_VALIDATION_CACHE_SIZE
+        self._claims_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._digests_by_jti: Dict[str, str] = {}
+        self._revocation_epoch = 0
+        self._events_live = False
+        self._events_task: Optional[asyncio.Task] = None
+        self.cache_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
         # 初始化组件
         self._initialize()
 
@@ -189,129 +221,187 @@ class JWTTokenManager:
         self, token: str, client_ip: str = None, user_agent: str = None
     ) -> TokenValidationResult:
         """验证Token有效性"""
-        try:
-            pass  # Auto-fixed empty block
-            # 解码Token头部获取密钥ID
-            unverified_header = jwt.get_unverified_header(token)
-            kid = unverified_header.get("kid")
+        return (await self._validate_many([token], client_ip, user_agent))[0]
 
-            if not kid:
-                return TokenValidationResult(
-                    valid=False, error="Missing key ID in token header"
+    async def _validate_many(
+        self, tokens: List[str], client_ip: str = None, user_agent: str = None
+    ) -> List[TokenValidationResult]:
+        """
+        验证一组Token
+
+        命中已验证声明缓存的Token跳过签名校验和Redis查询；其余Token
+        校验签名后，其黑名单与元数据查询合并为一次管道往返。
+        """
+        self._ensure_events_listener()
+
+        results: List[Optional[TokenValidationResult]] = [None] * len(tokens)
+        payloads: List[Optional[Dict[str, Any]]] = [None] * len(tokens)
+        digests = [self._token_digest(token) for token in tokens]
+        misses = []
+
+        for i, token in enumerate(tokens):
+            payload = self._get_cached_claims(digests[i])
+            if payload is not None:
+                payloads[i] = payload
+                continue
+            try:
+                payloads[i] = await self._decode_token(token)
+                misses.append(i)
+            except jwt.ExpiredSignatureError:
+                await self._cleanup_expired_token(token)
+                results[i] = TokenValidationResult(valid=False, error="Token has expired")
+            except TokenRejectedError as e:
+                results[i] = TokenValidationResult(valid=False, error=str(e))
+            except jwt.InvalidTokenError as e:
+                results[i] = TokenValidationResult(
+                    valid=False, error=f"Invalid token: {str(e)}"
                 )
-
-            # 获取对应公钥
-            public_key = await self._get_public_key(kid)
-            if not public_key:
-                return TokenValidationResult(valid=False, error="Invalid key ID")
-
-            # 验证Token
-            payload = jwt.decode(
-                token,
-                public_key,
-                algorithms=[self.algorithm],
-                audience=self.audience,
-                issuer=self.issuer,
-                options={
-                    "verify_signature": True,
-                    "verify_exp": True,
-                    "verify_iat": True,
-                    "verify_aud": True,
-                    "verify_iss": True,
-                },
-            )
-
-            jti = payload.get("jti")
-            user_id = payload.get("sub")
-
-            # 检查Token是否在黑名单
-            if await self._is_token_blacklisted(jti):
-                return TokenValidationResult(
-                    valid=False, error="Token has been revoked"
+            except Exception as e:
+                results[i] = TokenValidationResult(
+                    valid=False, error=f"Token validation error: {str(e)}"
                 )
 
-            # 检查Token元数据
-            token_metadata = await self._get_token_metadata(jti)
-            if not token_metadata or token_metadata.get("active") != "true":
-                return TokenValidationResult(
-                    valid=False, error="Token metadata invalid or inactive"
+        if misses:
+            epoch = self._revocation_epoch
+            try:
+                states = await self._get_revocation_states(
+                    [payloads[i].get("jti") for i in misses]
                 )
+            except Exception as e:
+                for i in misses:
+                    results[i] = TokenValidationResult(
+                        valid=False, error=f"Token validation error: {str(e)}"
+                    )
+                states = []
 
-            # 安全检查
-            warnings = []
-            risk_factors = []
+            for i, (blacklisted, token_metadata) in zip(misses, states):
+                # 检查Token是否在黑名单
+                if blacklisted:
+                    results[i] = TokenValidationResult(
+                        valid=False, error="Token has been revoked"
+                    )
+                # 检查Token元数据
+                elif not token_metadata or token_metadata.get("active") != "true":
+                    results[i] = TokenValidationResult(
+                        valid=False, error="Token metadata invalid or inactive"
+                    )
+                # 查询期间若有撤销事件，不缓存可能已过时的结果
+                elif epoch == self._revocation_epoch:
+                    self._cache_claims(digests[i], payloads[i])
+
+        for i, payload in enumerate(payloads):
+            if results[i] is None:
+                try:
+                    results[i] = await self._check_token_usage(
+                        payload, client_ip, user_agent
+                    )
+                except Exception as e:
+                    results[i] = TokenValidationResult(
+                        valid=False, error=f"Token validation error: {str(e)}"
+                    )
 
-            # IP地址检查
-            token_ip = payload.get("ip_address")
-            if client_ip and token_ip and client_ip != token_ip:
-                warnings.append("IP address changed")
-                risk_factors.append("ip_change")
+        return results
 
-            # 设备指纹检查
-            if user_agent:
-                current_fingerprint = self._generate_device_fingerprint(
-                    {"user_agent": user_agent}
-                )
-                token_fingerprint = payload.get("device_fingerprint")
-                if current_fingerprint != token_fingerprint:
-                    warnings.append("Device fingerprint mismatch")
-                    risk_factors.append("device_mismatch")
+    async def _decode_token(self, token: str) -> Dict[str, Any]:
+        """校验签名和标准声明，返回payload"""
+        # 解码Token头部获取密钥ID
+        unverified_header = jwt.get_unverified_header(token)
+        kid = unverified_header.get("kid")
 
-            # 创建Token声明对象
-            claims = TokenClaims(
-                user_id=user_id,
-                permissions=payload.get("scope", []),
-                roles=payload.get("roles", []),
-                device_fingerprint=payload.get("device_fingerprint", ""),
-                ip_address=payload.get("ip_address", ""),
-                issued_at=payload.get("iat", 0),
-                expires_at=payload.get("exp", 0),
-                jti=jti,
-                token_type=payload.get("token_type", "access"),
+        if not kid:
+            raise TokenRejectedError("Missing key ID in token header")
+
+        # 获取对应公钥
+        public_key = await self._get_public_key(kid)
+        if not public_key:
+            raise TokenRejectedError("Invalid key ID")
+
+        return jwt.decode(
+            token,
+            public_key,
+            algorithms=[self.algorithm],
+            audience=self.audience,
+            issuer=self.issuer,
+            options={
+                "verify_signature": True,
+                "verify_exp": True,
+                "verify_iat": True,
+                "verify_aud": True,
+                "verify_iss": True,
+            },
+        )
+
+    async def _check_token_usage(
+        self, payload: Dict[str, Any], client_ip: str = None, user_agent: str = None
+    ) -> TokenValidationResult:
+        """对已验证的payload执行请求相关的安全检查"""
+        jti = payload.get("jti")
+        user_id = payload.get("sub")
+
+        # 安全检查
+        warnings = []
+        risk_factors = []
+
+        # IP地址检查
+        token_ip = payload.get("ip_address")
+        if client_ip and token_ip and client_ip != token_ip:
+            warnings.append("IP address changed")
+            risk_factors.append("ip_change")
+
+        # 设备指纹检查
+        if user_agent:
+            current_fingerprint = self._generate_device_fingerprint(
+                {"user_agent": user_agent}
             )
+            token_fingerprint = payload.get("device_fingerprint")
+            if current_fingerprint != token_fingerprint:
+                warnings.append("Device fingerprint mismatch")
+                risk_factors.append("device_mismatch")
+
+        # 创建Token声明对象
+        claims = TokenClaims(
+            user_id=user_id,
+            permissions=payload.get("scope", []),
+            roles=payload.get("roles", []),
+            device_fingerprint=payload.get("device_fingerprint", ""),
+            ip_address=payload.get("ip_address", ""),
+            issued_at=payload.get("iat", 0),
+            expires_at=payload.get("exp", 0),
+            jti=jti,
+            token_type=payload.get("token_type", "access"),
+        )
 
-            # 高风险检查
-            if len(risk_factors) >= 2:
-                pass  # Auto-fixed empty block
-                # 自动撤销高风险Token
-                await self.revoke_token(jti, "high_risk_detected")
-
-                # 发送安全警告
-                if self.message_publisher:
-                    await self.message_publisher.publish_message(
-                        message_type=MessageType.SECURITY_ALERT,
-                        data={
-                            "user_id": user_id,
-                            "alert_type": "suspicious_token_usage",
-                            "severity": "high",
-                            "description": "High-risk token usage detected",
-                            "risk_factors": risk_factors,
-                            "ip_address": client_ip,
-                            "user_agent": user_agent,
-                        },
-                        user_id=user_id,
-                        priority=7,
-                    )
+        # 高风险检查
+        if len(risk_factors) >= 2:
+            # 自动撤销高风险Token
+            await self.revoke_token(jti, "high_risk_detected")
 
-                return TokenValidationResult(
-                    valid=False,
-                    error="Token usage flagged as high risk",
-                    risk_factors=risk_factors,
+            # 发送安全警告
+            if self.message_publisher:
+                await self.message_publisher.publish_message(
+                    message_type=MessageType.SECURITY_ALERT,
+                    data={
+                        "user_id": user_id,
+                        "alert_type": "suspicious_token_usage",
+                        "severity": "high",
+                        "description": "High-risk token usage detected",
+                        "risk_factors": risk_factors,
+                        "ip_address": client_ip,
+                        "user_agent": user_agent,
+                    },
+                    user_id=user_id,
+                    priority=7,
                 )
 
             return TokenValidationResult(
-                valid=True, claims=claims, warnings=warnings, risk_factors=risk_factors
+                valid=False,
+                error="Token usage flagged as high risk",
+                risk_factors=risk_factors,
             )
 
-        except jwt.ExpiredSignatureError:
-            await self._cleanup_expired_token(token)
-            return TokenValidationResult(valid=False, error="Token has expired")
-        except jwt.InvalidTokenError as e:
-            return TokenValidationResult(valid=False, error=f"Invalid token: {str(e)}")
-        except Exception as e:
-            return TokenValidationResult(
-                valid=False, error=f"Token validation error: {str(e)}"
-            )
+        return TokenValidationResult(
+            valid=True, claims=claims, warnings=warnings, risk_factors=risk_factors
+        )
 
     @monitor_function("token")
     async def refresh_token(
@@ -352,6 +442,9 @@ class JWTTokenManager:
         """撤销Token"""
         try:
             pass  # Auto-fixed empty block
+            # 先失效本地缓存，再通知其他实例
+            self._invalidate_jti(jti)
+
             # 添加到黑名单
             await self.redis_client.sadd("token_blacklist", jti)
             await self.redis_client.expire("token_blacklist", self.refresh_token_ttl)
@@ -366,6 +459,7 @@ class JWTTokenManager:
                     "revoke_reason": reason,
                 },
             )
+            await self._publish_event({"type": "revoked", "jti": jti})
 
             # 记录撤销事件
             await self._log_token_event(
@@ -450,6 +544,11 @@ class JWTTokenManager:
                 },
             )
 
+            # 刷新本实例的密钥缓存并通知其他实例
+            self._private_key = (kid, private_key)
+            self._public_keys[kid] = public_key
+            await self._publish_event({"type": "key_rotated", "kid": kid})
+
             # 设置旧密钥过期时间（24小时后）
             await self._schedule_key_cleanup(kid)
 
@@ -473,27 +572,14 @@ class JWTTokenManager:
     async def batch_validate_tokens(
         self, tokens: List[str]
     ) -> List[TokenValidationResult]:
-        """批量验证Token"""
-        results = []
-
-        # 并发验证所有Token
-        validation_tasks = [self.validate_token(token) for token in tokens]
-
-        validation_results = await asyncio.gather(
-            *validation_tasks, return_exceptions=True
-        )
-
-        for i, result in enumerate(validation_results):
-            if isinstance(result, Exception):
-                results.append(
-                    TokenValidationResult(
-                        valid=False, error=f"Validation error: {str(result)}"
-                    )
-                )
-            else:
-                results.append(result)
-
-        return results
+        """批量验证Token（所有未缓存Token的撤销状态在一次管道往返中查询）"""
+        try:
+            return await self._validate_many(tokens)
+        except Exception as e:
+            return [
+                TokenValidationResult(valid=False, error=f"Validation error: {str(e)}")
+                for _ in tokens
+            ]
 
     def _generate_device_fingerprint(self, device_info: Dict[str, Any]) -> str:
         """生成设备指纹"""
@@ -547,35 +633,162 @@ class JWTTokenManager:
         """检查Token是否在黑名单"""
         return await self.redis_client.sismember("token_blacklist", jti)
 
+    async def _get_revocation_states(self, jtis: List[str]) -> List[tuple]:
+        """一次管道往返查询多个Token的黑名单状态和元数据"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for jti in jtis:
+            pipe.sismember("token_blacklist", jti)
+            pipe.hgetall(f"token_metadata:{jti}")
+        replies = await pipe.execute()
+        return [
+            (bool(replies[2 * i]), replies[2 * i + 1] or None) for i in range(len(jtis))
+        ]
+
     async def _get_current_private_key(self) -> bytes:
-        """获取当前私钥"""
+        """获取当前私钥（缓存至下一次密钥轮换）"""
+        if self._private_key is not None:
+            return self._private_key[1]
+
         kid = await self._get_current_key_id()
         if not kid:
             await self.rotate_keys()
-            kid = await self._get_current_key_id()
+            return self._private_key[1]
 
         private_key_pem = await self.redis_client.hget("jwt_keys", f"private:{kid}")
         if not private_key_pem:
             raise RuntimeError("Private key not found")
 
-        return serialization.load_pem_private_key(
+        private_key = serialization.load_pem_private_key(
             private_key_pem.encode(), password=None, backend=default_backend()
         )
+        self._private_key = (kid, private_key)
+        return private_key
 
     async def _get_public_key(self, kid: str) -> Optional[bytes]:
-        """获取公钥"""
+        """获取公钥（按kid缓存已解析的密钥）"""
+        public_key = self._public_keys.get(kid)
+        if public_key is not None:
+            return public_key
+
         public_key_pem = await self.redis_client.hget("jwt_keys", f"public:{kid}")
         if not public_key_pem:
             return None
 
-        return serialization.load_pem_public_key(
+        public_key = serialization.load_pem_public_key(
             public_key_pem.encode(), backend=default_backend()
         )
+        self._public_keys[kid] = public_key
+        return public_key
 
     async def _get_current_key_id(self) -> Optional[str]:
         """获取当前密钥ID"""
+        if self._private_key is not None:
+            return self._private_key[0]
         return await self.redis_client.hget("jwt_keys", "current_kid")
 
+    @staticmethod
+    def _token_digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _get_cached_claims(self, digest: str) -> Optional[Dict[str, Any]]:
+        """读取已验证声明缓存；撤销订阅未连通时不使用缓存"""
+        if not self._events_live or self.validation_cache_ttl <= 0:
+            return None
+
+        entry = self._claims_cache.get(digest)
+        if entry is None:
+            self.cache_stats["misses"] += 1
+            return None
+
+        payload, expires_at = entry
+        if time.time() >= expires_at:
+            self._drop_cached(digest)
+            self.cache_stats["misses"] += 1
+            return None
+
+        self._claims_cache.move_to_end(digest)
+        self.cache_stats["hits"] += 1
+        return payload
+
+    def _cache_claims(self, digest: str, payload: Dict[str, Any]):
+        if not self._events_live or self.validation_cache_ttl <= 0:
+            return
+
+        # 不超过Token自身的过期时间
+        expires_at = min(time.time() + self.validation_cache_ttl, payload.get("exp", 0))
+        self._claims_cache[digest] = (payload, expires_at)
+        self._claims_cache.move_to_end(digest)
+        self._digests_by_jti[payload.get("jti")] = digest
+
+        while len(self._claims_cache) > self.validation_cache_size:
+            self._drop_cached(next(iter(self._claims_cache)))
+
+    def _drop_cached(self, digest: str):
+        entry = self._claims_cache.pop(digest, None)
+        if entry is not None:
+            self._digests_by_jti.pop(entry[0].get("jti"), None)
+
+    def _invalidate_jti(self, jti: str):
+        """撤销Token时失效其缓存的声明"""
+        self._revocation_epoch += 1
+        digest = self._digests_by_jti.pop(jti, None)
+        if digest is not None:
+            self._claims_cache.pop(digest, None)
+            self.cache_stats["invalidations"] += 1
+
+    def _clear_validation_cache(self):
+        self._revocation_epoch += 1
+        self._claims_cache.clear()
+        self._digests_by_jti.clear()
+
+    async def _publish_event(self, event: Dict[str, Any]):
+        """向其他实例广播撤销/密钥轮换事件"""
+        try:
+            await self.redis_client.publish(self.EVENTS_CHANNEL, json.dumps(event))
+        except Exception as e:
+            logger.warning(f"Failed to publish JWT event {event.get('type')}: {e}")
+
+    def _ensure_events_listener(self):
+        if self.validation_cache_ttl <= 0:
+            return
+        if self._events_task is None or self._events_task.done():
+            self._events_task = asyncio.get_running_loop().create_task(
+                self._listen_events()
+            )
+
+    async def _listen_events(self):
+        """订阅JWT事件；连接中断期间禁用声明缓存并在重连后清空"""
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(self.EVENTS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "subscribe":
+                        self._events_live = True
+                    elif message["type"] == "message":
+                        self._handle_event(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"JWT event subscription lost: {e}")
+            finally:
+                # 断线期间可能错过撤销事件
+                self._events_live = False
+                self._clear_validation_cache()
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+            await asyncio.sleep(1)
+
+    def _handle_event(self, event: Dict[str, Any]):
+        if event.get("type") == "revoked":
+            self._invalidate_jti(event.get("jti"))
+        elif event.get("type") == "key_rotated":
+            if self._private_key is None or self._private_key[0] != event.get("kid"):
+                self._private_key = None  # 下次签发时从Redis加载新私钥
+
     async def _schedule_key_cleanup(self, new_kid: str):
         """安排旧密钥清理"""
         # 这里可以使用Celery或其他任务队列来安排延迟清理
@@ -631,6 +844,14 @@ class JWTTokenManager:
 
     async def close(self):
         """关闭连接"""
+        if self._events_task is not None:
+            self._events_task.cancel()
+            try:
+                await self._events_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._events_task = None
+
         if self.redis_client:
             await self.redis_client.close()
 
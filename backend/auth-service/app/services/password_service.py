@@ -3,7 +3,7 @@ Claude Enhancer 密码加密服务
 企业级密码加密、验证和安全管理
 """
 
-import bcrypt
+import asyncio
 import secrets
 import hashlib
 import hmac
@@ -18,6 +18,7 @@ import redis.asyncio as redis
 from pydantic import BaseModel
 
 from app.core.config import settings
+from app.core.hashing import HashingOverloadedError, PasswordHashExecutor
 from shared.messaging.publisher import MessagePublisher, MessageType
 from shared.metrics.metrics import monitor_function
 
@@ -58,6 +59,12 @@ class PasswordService:
         self.require_special = settings.PASSWORD_REQUIRE_SPECIAL
         self.history_count = settings.PASSWORD_HISTORY_COUNT
 
+        # bcrypt在专用线程池中执行，不阻塞事件循环
+        self.hasher = PasswordHashExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS or None,
+            max_pending=settings.PASSWORD_HASH_MAX_PENDING or None,
+        )
+
         # 初始化加密器
         self._initialize_encryption()
         self._initialize_redis()
@@ -95,8 +102,9 @@ class PasswordService:
             seasoned_password = password.encode() + self.pepper
 
             # 生成盐并加密
-            salt = bcrypt.gensalt(rounds=self.bcrypt_rounds)
-            password_hash = bcrypt.hashpw(seasoned_password, salt)
+            password_hash = await self.hasher.hashpw(
+                seasoned_password, self.bcrypt_rounds
+            )
 
             # 记录密码创建事件（不包含密码内容）
             if self.message_publisher and user_id:
@@ -113,6 +121,8 @@ class PasswordService:
 
             return password_hash.decode("utf-8")
 
+        except HashingOverloadedError:
+            raise
         except Exception as e:
             raise RuntimeError(f"密码加密失败: {e}")
 
@@ -124,33 +134,33 @@ class PasswordService:
         user_id: str = None,
         ip_address: str = None,
     ) -> PasswordValidationResult:
-        """验证密码"""
+        """
+        验证密码
+
+        登录路径只做一次bcrypt校验；历史密码重用检查只在修改密码时
+        通过check_password_reuse进行。
+        """
         try:
-            pass  # Auto-fixed empty block
             # 预处理：添加pepper
             seasoned_password = password.encode() + self.pepper
 
             # 基本验证
-            is_valid = bcrypt.checkpw(seasoned_password, password_hash.encode("utf-8"))
+            is_valid = await self.hasher.checkpw(
+                seasoned_password, password_hash.encode("utf-8")
+            )
 
+            breach_detected = False
             warnings = []
             risk_factors = []
 
             # 如果密码正确，进行安全检查
             if is_valid and user_id:
-                pass  # Auto-fixed empty block
                 # 检查密码是否在已泄露数据库中
                 breach_detected = await self._check_password_breach(password)
                 if breach_detected:
                     warnings.append("密码存在于已知泄露数据库中")
                     risk_factors.append("password_breach")
 
-                # 检查密码重用
-                reuse_detected = await self._check_password_reuse(user_id, password)
-                if reuse_detected:
-                    warnings.append("密码与历史密码重复")
-                    risk_factors.append("password_reuse")
-
                 # 记录验证事件
                 await self._log_password_verification(
                     user_id, ip_address, is_valid, risk_factors
@@ -158,16 +168,13 @@ class PasswordService:
 
             return PasswordValidationResult(
                 is_valid=is_valid,
-                breach_detected=breach_detected
-                if "breach_detected" in locals()
-                else False,
-                reuse_detected=reuse_detected
-                if "reuse_detected" in locals()
-                else False,
+                breach_detected=breach_detected,
                 warnings=warnings,
                 risk_factors=risk_factors,
             )
 
+        except HashingOverloadedError:
+            raise
         except Exception as e:
             raise RuntimeError(f"密码验证失败: {e}")
 
@@ -395,35 +402,40 @@ class PasswordService:
             # 如果检查失败，为了安全起见返回False
             return False
 
-    async def _check_password_reuse(self, user_id: str, password: str) -> bool:
-        """检查密码重用"""
+    @monitor_function("password")
+    async def check_password_reuse(self, user_id: str, password: str) -> bool:
+        """检查新密码是否与历史密码重复（仅在修改/重置密码时调用）"""
         try:
             history_key = f"password_history:{user_id}"
             history = await self.redis_client.lrange(history_key, 0, -1)
 
-            # 生成新密码的哈希
             seasoned_password = password.encode() + self.pepper
 
+            hashes = []
             for encrypted_hash in history:
                 try:
-                    pass  # Auto-fixed empty block
                     # 解密历史密码哈希
-                    decrypted_hash = self.fernet.decrypt(
-                        encrypted_hash.encode()
-                    ).decode()
-
-                    # 比较密码
-                    if bcrypt.checkpw(seasoned_password, decrypted_hash.encode()):
-                        return True
+                    hashes.append(self.fernet.decrypt(encrypted_hash.encode()))
                 except Exception:
-                    pass  # Auto-fixed empty block
                     # 忽略解密失败的记录
                     continue
 
+            # 各条历史记录的比较在线程池中并行执行
+            matches = await asyncio.gather(
+                *(self.hasher.checkpw(seasoned_password, h) for h in hashes),
+                return_exceptions=True,
+            )
+            if any(match is True for match in matches):
+                return True
+            # 未命中时不能忽略失败的比较（如哈希队列已满），否则检查会被放行
+            for match in matches:
+                if isinstance(match, BaseException):
+                    raise match
             return False
 
+        except HashingOverloadedError:
+            raise
         except Exception:
-            pass  # Auto-fixed empty block
             # 如果检查失败，为了安全起见返回False
             return False
 
@@ -500,10 +512,15 @@ class PasswordService:
                 user_id=user_id,
             )
 
+    def get_hashing_metrics(self) -> Dict[str, Any]:
+        """获取密码哈希线程池的队列深度与耗时指标"""
+        return self.hasher.get_metrics()
+
     async def close(self):
         """关闭连接"""
         if self.redis_client:
             await self.redis_client.close()
+        self.hasher.shutdown(wait=False)
 
 
 # 全局密码服务实例
@@ -5,10 +5,12 @@ Claude Enhancer 会话管理服务
 
 import secrets
 import asyncio
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Optional, List, Set
 import json
-from dataclasses import dataclass, asdict
+import logging
+from dataclasses import dataclass
 from enum import Enum
 import redis.asyncio as redis
 from pydantic import BaseModel
@@ -17,6 +19,48 @@ from app.core.config import settings
 from shared.messaging.publisher import MessagePublisher, MessageType
 from shared.metrics.metrics import monitor_function
 
+logger = logging.getLogger(__name__)
+
+# 会话读取、校验与活动时间更新在一次服务端脚本中原子完成：
+# 仅当会话有效、IP（未提供时不比较）与User-Agent未变化且距上次写入超过最小间隔时才写入；
+# 同时返回最近窗口内的活动数量，供会话劫持检查使用
+VALIDATE_AND_TOUCH_SCRIPT = """
+local fields = redis.call('HGETALL', KEYS[1])
+if #fields == 0 then
+    return nil
+end
+local session = {}
+for i = 1, #fields, 2 do
+    session[fields[i]] = fields[i + 1]
+end
+local now = tonumber(ARGV[1])
+local touched = 0
+if session['status'] == 'active'
+    and tonumber(session['expires_ts'] or '0') > now
+    and (ARGV[4] == '' or ARGV[4] == session['ip_address'])
+    and (ARGV[5] == '' or ARGV[5] == session['user_agent'])
+    and now - tonumber(session['last_activity_ts'] or '0') >= tonumber(ARGV[2]) then
+    redis.call('HSET', KEYS[1], 'last_activity_at', ARGV[3], 'last_activity_ts', ARGV[1])
+    touched = 1
+end
+local recent = #redis.call('XRANGE', KEYS[2], ARGV[6], '+', 'COUNT', 21)
+return {touched, recent, fields}
+"""
+
+# 仅在会话仍存在时更新字段，避免为已删除的会话写入残缺数据；
+# 活跃会话同时登记到用户会话集合并延长集合TTL，保证"全部登出"能找到它
+TOUCH_SESSION_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+if redis.call('HGET', KEYS[1], 'status') == 'active' then
+    redis.call('SADD', KEYS[2], ARGV[1])
+    redis.call('EXPIRE', KEYS[2], ARGV[2])
+end
+return 1
+"""
+
 
 class SessionStatus(Enum):
     """会话状态"""
@@ -80,7 +124,15 @@ class SessionActivity(BaseModel):
 
 
 class SessionService:
-    """会话管理服务"""
+    """
+    会话管理服务
+
+    会话以Redis哈希存储（session:{id}），活动时间按字段更新且每个会话
+    每activity_update_interval秒最多写入一次；会话历史和活动记录先缓冲，
+    再批量写入Redis Stream。
+    """
+
+    HISTORY_MAXLEN = 1000  # 每个用户/会话Stream保留的近似条数
 
     def __init__(self):
         self.redis_client = None
@@ -88,6 +140,13 @@ class SessionService:
         self.session_ttl = settings.SESSION_TTL
         self.max_sessions_per_user = settings.SESSION_MAX_PER_USER
         self.cleanup_interval = settings.SESSION_CLEANUP_INTERVAL
+        self.activity_update_interval = settings.SESSION_ACTIVITY_UPDATE_INTERVAL
+        self.history_flush_interval = settings.SESSION_HISTORY_FLUSH_INTERVAL
+        self.history_batch_size = settings.SESSION_HISTORY_BATCH_SIZE
+
+        # 待写入的Stream条目：(stream_key, fields, 保留秒数)
+        self._history_buffer: List[tuple] = []
+        self._history_flush_task = None
 
         # 初始化Redis
         self._initialize_redis()
@@ -100,6 +159,10 @@ class SessionService:
         self.redis_client = redis.Redis.from_url(
             settings.REDIS_URL, decode_responses=True, health_check_interval=30
         )
+        self._validate_and_touch = self.redis_client.register_script(
+            VALIDATE_AND_TOUCH_SCRIPT
+        )
+        self._touch_session = self.redis_client.register_script(TOUCH_SESSION_SCRIPT)
 
     async def set_message_publisher(self, publisher: MessagePublisher):
         """设置消息发布者"""
@@ -185,11 +248,12 @@ class SessionService:
     async def validate_session(
         self, session_id: str, current_ip: str = None, user_agent: str = None
     ) -> SessionValidationResult:
-        """验证会话"""
+        """验证会话（读取、校验和活动时间更新为一次Redis往返）"""
         try:
-            pass  # Auto-fixed empty block
-            # 获取会话信息
-            session_info = await self._get_session(session_id)
+            # 获取会话信息，若IP/User-Agent未变化则同时更新活动时间
+            touched, recent_activity, session_info = await self._fetch_and_touch(
+                session_id, current_ip, user_agent
+            )
 
             if not session_info:
                 return SessionValidationResult(is_valid=False, warnings=["会话不存在"])
@@ -240,7 +304,7 @@ class SessionService:
 
             # 3. 会话劫持检查
             hijack_risk = await self._check_session_hijacking(
-                session_info, current_ip, user_agent
+                session_info, current_ip, user_agent, recent_activity
             )
             if hijack_risk["is_suspicious"]:
                 security_alerts.extend(hijack_risk["indicators"])
@@ -281,9 +345,14 @@ class SessionService:
                     should_terminate=True,
                 )
 
-            # 更新会话活动时间
-            if current_ip:
-                await self._update_session_activity(session_id, current_ip, user_agent)
+            # IP或User-Agent变化时脚本不会写入，校验通过后再更新
+            if not touched and (
+                (current_ip and current_ip != session_info.ip_address)
+                or (user_agent and user_agent != session_info.user_agent)
+            ):
+                await self._update_session_activity(
+                    session_id, session_info.user_id, current_ip, user_agent
+                )
 
             return SessionValidationResult(
                 is_valid=True,
@@ -312,8 +381,24 @@ class SessionService:
             session_info.expires_at = current_time + timedelta(seconds=self.session_ttl)
             session_info.last_activity_at = current_time
 
-            # 更新存储
-            await self._store_session(session_info)
+            # 只更新时间字段，同时续期用户会话集合，避免集合先于会话过期
+            session_key = f"session:{session_id}"
+            user_sessions_key = f"user_sessions:{session_info.user_id}"
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.hset(
+                    session_key,
+                    mapping={
+                        "expires_at": session_info.expires_at.isoformat(),
+                        "expires_ts": self._to_timestamp(session_info.expires_at),
+                        "last_activity_at": current_time.isoformat(),
+                        "last_activity_ts": self._to_timestamp(current_time),
+                    },
+                )
+                pipe.expire(session_key, self.session_ttl + 3600)
+                pipe.sadd(user_sessions_key, session_id)
+                pipe.expire(user_sessions_key, self.session_ttl + 3600)
+                await pipe.execute()
+            self._append_history(session_info)
 
             # 记录刷新事件
             await self._record_session_activity(
@@ -337,12 +422,15 @@ class SessionService:
             if not session_info:
                 return  # 会话不存在，认为已终止
 
-            # 更新会话状态
+            # 更新会话状态并从活跃会话列表中移除
             session_info.status = SessionStatus.TERMINATED
-            await self._store_session(session_info)
-
-            # 从活跃会话列表中移除
-            await self._remove_from_active_sessions(session_info.user_id, session_id)
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.hset(
+                    f"session:{session_id}", "status", SessionStatus.TERMINATED.value
+                )
+                pipe.srem(f"user_sessions:{session_info.user_id}", session_id)
+                await pipe.execute()
+            self._append_history(session_info)
 
             # 记录终止事件
             await self._record_session_activity(
@@ -416,19 +504,24 @@ class SessionService:
         try:
             if include_terminated:
                 pass  # Auto-fixed empty block
-                # 获取所有会话（包括已终止的）
-                session_keys = await self.redis_client.keys(
-                    f"session_history:{user_id}:*"
+                # 获取所有会话（包括已终止的）：取历史Stream中每个会话的最新快照
+                await self._flush_history()
+                entries = await self.redis_client.xrevrange(
+                    f"session_history:{user_id}", count=self.HISTORY_MAXLEN
                 )
-                sessions = []
-
-                for key in session_keys:
-                    session_data = await self.redis_client.get(key)
-                    if session_data:
-                        session_dict = json.loads(session_data)
-                        sessions.append(self._dict_to_session_info(session_dict))
 
-                return sorted(sessions, key=lambda s: s.last_activity_at, reverse=True)
+                latest: Dict[str, SessionInfo] = {}
+                for _, fields in entries:
+                    if fields.get("session_id") in latest:
+                        continue
+                    try:
+                        latest[fields["session_id"]] = self._hash_to_session_info(fields)
+                    except (KeyError, ValueError):
+                        continue
+
+                return sorted(
+                    latest.values(), key=lambda s: s.last_activity_at, reverse=True
+                )
             else:
                 pass  # Auto-fixed empty block
                 # 只获取活跃会话
@@ -449,14 +542,11 @@ class SessionService:
         """记录会话活动"""
         try:
             pass  # Auto-fixed empty block
-            # 验证会话存在且有效
-            session_info = await self._get_session(session_id)
+            # 验证会话存在且有效，同时按间隔更新最后活动时间
+            _, _, session_info = await self._fetch_and_touch(session_id, ip_address)
             if not session_info or session_info.status != SessionStatus.ACTIVE:
                 return
 
-            # 更新最后活动时间
-            await self._update_session_activity(session_id, ip_address)
-
             # 记录具体活动
             await self._record_session_activity(
                 session_id=session_id,
@@ -486,94 +576,171 @@ class SessionService:
         fingerprint_string = json.dumps(fingerprint_data, sort_keys=True)
         return hashlib.sha256(fingerprint_string.encode()).hexdigest()
 
+    @staticmethod
+    def _to_timestamp(value: datetime) -> str:
+        """UTC时间（naive）转为Unix时间戳字符串，供服务端脚本比较"""
+        return repr(value.replace(tzinfo=timezone.utc).timestamp())
+
+    def _session_to_hash(self, session_info: SessionInfo) -> Dict[str, str]:
+        """将SessionInfo转换为Redis哈希字段"""
+        return {
+            "session_id": session_info.session_id,
+            "user_id": session_info.user_id,
+            "device_fingerprint": session_info.device_fingerprint,
+            "ip_address": session_info.ip_address,
+            "user_agent": session_info.user_agent,
+            "session_type": session_info.session_type.value,
+            "created_at": session_info.created_at.isoformat(),
+            "last_activity_at": session_info.last_activity_at.isoformat(),
+            "last_activity_ts": self._to_timestamp(session_info.last_activity_at),
+            "expires_at": session_info.expires_at.isoformat(),
+            "expires_ts": self._to_timestamp(session_info.expires_at),
+            "status": session_info.status.value,
+            "location": json.dumps(session_info.location),
+            "security_flags": json.dumps(session_info.security_flags or []),
+            "metadata": json.dumps(session_info.metadata or {}),
+        }
+
+    def _hash_to_session_info(self, fields: Dict[str, str]) -> SessionInfo:
+        """将Redis哈希字段转换为SessionInfo对象"""
+        return SessionInfo(
+            session_id=fields["session_id"],
+            user_id=fields["user_id"],
+            device_fingerprint=fields["device_fingerprint"],
+            ip_address=fields["ip_address"],
+            user_agent=fields["user_agent"],
+            session_type=SessionType(fields["session_type"]),
+            created_at=datetime.fromisoformat(fields["created_at"]),
+            last_activity_at=datetime.fromisoformat(fields["last_activity_at"]),
+            expires_at=datetime.fromisoformat(fields["expires_at"]),
+            status=SessionStatus(fields["status"]),
+            location=json.loads(fields.get("location") or "null"),
+            security_flags=json.loads(fields.get("security_flags") or "[]"),
+            metadata=json.loads(fields.get("metadata") or "{}"),
+        )
+
     async def _store_session(self, session_info: SessionInfo):
-        """存储会话信息"""
-        # 转换为字典
-        session_dict = asdict(session_info)
-        session_dict["created_at"] = session_info.created_at.isoformat()
-        session_dict["last_activity_at"] = session_info.last_activity_at.isoformat()
-        session_dict["expires_at"] = session_info.expires_at.isoformat()
-        session_dict["status"] = session_info.status.value
-        session_dict["session_type"] = session_info.session_type.value
-
-        # 存储到Redis
+        """存储会话信息（一次事务往返）"""
         session_key = f"session:{session_info.session_id}"
-        await self.redis_client.setex(
-            session_key, self.session_ttl + 3600, json.dumps(session_dict)  # 额外1小时用于清理
-        )
 
-        # 添加到用户活跃会话集合
-        if session_info.status == SessionStatus.ACTIVE:
-            user_sessions_key = f"user_sessions:{session_info.user_id}"
-            await self.redis_client.sadd(user_sessions_key, session_info.session_id)
-            await self.redis_client.expire(user_sessions_key, self.session_ttl + 3600)
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(session_key)
+            pipe.hset(session_key, mapping=self._session_to_hash(session_info))
+            pipe.expire(session_key, self.session_ttl + 3600)  # 额外1小时用于清理
+
+            # 添加到用户活跃会话集合
+            if session_info.status == SessionStatus.ACTIVE:
+                user_sessions_key = f"user_sessions:{session_info.user_id}"
+                pipe.sadd(user_sessions_key, session_info.session_id)
+                pipe.expire(user_sessions_key, self.session_ttl + 3600)
+
+            await pipe.execute()
 
         # 存储会话历史（用于审计）
-        history_key = (
-            f"session_history:{session_info.user_id}:{session_info.session_id}"
-        )
-        await self.redis_client.setex(
-            history_key, 86400 * 30, json.dumps(session_dict)  # 保留30天
-        )
+        self._append_history(session_info)
 
     async def _get_session(self, session_id: str) -> Optional[SessionInfo]:
-        """获取会话信息"""
+        """获取会话信息（旧格式会话就地迁移）"""
         session_key = f"session:{session_id}"
-        session_data = await self.redis_client.get(session_key)
-
-        if not session_data:
-            return None
-
         try:
-            session_dict = json.loads(session_data)
-            return self._dict_to_session_info(session_dict)
-        except (json.JSONDecodeError, KeyError):
+            fields = await self.redis_client.hgetall(session_key)
+            return self._hash_to_session_info(fields) if fields else None
+        except redis.ResponseError as e:
+            if not self._is_wrong_type(e):
+                return None
+            return await self._migrate_legacy_session(session_key)
+        except (KeyError, ValueError):
             return None
 
-    def _dict_to_session_info(self, session_dict: Dict[str, Any]) -> SessionInfo:
-        """将字典转换为SessionInfo对象"""
-        return SessionInfo(
-            session_id=session_dict["session_id"],
-            user_id=session_dict["user_id"],
-            device_fingerprint=session_dict["device_fingerprint"],
-            ip_address=session_dict["ip_address"],
-            user_agent=session_dict["user_agent"],
-            session_type=SessionType(session_dict["session_type"]),
-            created_at=datetime.fromisoformat(session_dict["created_at"]),
-            last_activity_at=datetime.fromisoformat(session_dict["last_activity_at"]),
-            expires_at=datetime.fromisoformat(session_dict["expires_at"]),
-            status=SessionStatus(session_dict["status"]),
-            location=session_dict.get("location"),
-            security_flags=session_dict.get("security_flags", []),
-            metadata=session_dict.get("metadata", {}),
-        )
+    async def _fetch_and_touch(
+        self, session_id: str, current_ip: str = None, user_agent: str = None
+    ) -> tuple:
+        """
+        执行校验脚本
+
+        Returns:
+            (是否已更新活动时间, 最近5分钟活动数, SessionInfo或None)
+        """
+        session_key = f"session:{session_id}"
+        for attempt in range(2):
+            now = time.time()
+            try:
+                reply = await self._validate_and_touch(
+                    keys=[session_key, f"session_activity:{session_id}"],
+                    args=[
+                        repr(now),
+                        self.activity_update_interval,
+                        datetime.utcnow().isoformat(),
+                        current_ip or "",
+                        user_agent or "",
+                        int((now - 300) * 1000),
+                    ],
+                )
+                break
+            except redis.ResponseError as e:
+                if attempt or not self._is_wrong_type(e):
+                    return False, 0, None  # 损坏的会话数据
+                # 旧格式会话：就地迁移为哈希后重试，而不是等待定期清理
+                if await self._migrate_legacy_session(session_key) is None:
+                    return False, 0, None
+
+        if not reply:
+            return False, 0, None
+
+        touched, recent_activity, flat = reply
+        try:
+            session_info = self._hash_to_session_info(
+                dict(zip(flat[::2], flat[1::2]))
+            )
+        except (KeyError, ValueError):
+            return False, 0, None
+        return bool(touched), int(recent_activity), session_info
 
     async def _get_user_active_sessions(self, user_id: str) -> List[SessionInfo]:
-        """获取用户活跃会话"""
+        """获取用户活跃会话（一次管道往返读取所有会话）"""
         user_sessions_key = f"user_sessions:{user_id}"
         session_ids = await self.redis_client.smembers(user_sessions_key)
+        if not session_ids:
+            return []
 
-        sessions = []
+        pipe = self.redis_client.pipeline(transaction=False)
         for session_id in session_ids:
-            session_info = await self._get_session(session_id)
-            if session_info and session_info.status == SessionStatus.ACTIVE:
+            pipe.hgetall(f"session:{session_id}")
+        replies = await pipe.execute(raise_on_error=False)
+
+        sessions = []
+        for fields in replies:
+            if not fields or isinstance(fields, Exception):
+                continue
+            try:
+                session_info = self._hash_to_session_info(fields)
+            except (KeyError, ValueError):
+                continue
+            if session_info.status == SessionStatus.ACTIVE:
                 sessions.append(session_info)
 
         return sorted(sessions, key=lambda s: s.last_activity_at, reverse=True)
 
     async def _update_session_activity(
-        self, session_id: str, ip_address: str, user_agent: str = None
+        self, session_id: str, user_id: str, ip_address: str, user_agent: str = None
     ):
-        """更新会话活动时间"""
-        session_info = await self._get_session(session_id)
-        if session_info:
-            session_info.last_activity_at = datetime.utcnow()
-            if ip_address:
-                session_info.ip_address = ip_address
-            if user_agent:
-                session_info.user_agent = user_agent
-
-            await self._store_session(session_info)
+        """更新会话活动时间（字段级更新，并续期用户会话集合）"""
+        current_time = datetime.utcnow()
+        fields = [
+            "last_activity_at",
+            current_time.isoformat(),
+            "last_activity_ts",
+            self._to_timestamp(current_time),
+        ]
+        if ip_address:
+            fields += ["ip_address", ip_address]
+        if user_agent:
+            fields += ["user_agent", user_agent]
+
+        await self._touch_session(
+            keys=[f"session:{session_id}", f"user_sessions:{user_id}"],
+            args=[session_id, self.session_ttl + 3600, *fields],
+        )
 
     async def _remove_from_active_sessions(self, user_id: str, session_id: str):
         """从活跃会话集合中移除"""
@@ -591,22 +758,57 @@ class SessionService:
         metadata: Dict[str, Any] = None,
     ):
         """记录会话活动"""
-        activity = SessionActivity(
-            session_id=session_id,
-            activity_type=activity_type,
-            timestamp=datetime.utcnow(),
-            ip_address=ip_address,
-            endpoint=endpoint,
-            user_agent=user_agent,
-            request_id=request_id,
-            metadata=metadata or {},
-        )
+        fields = {
+            "activity_type": activity_type,
+            "timestamp": datetime.utcnow().isoformat(),
+            "ip_address": ip_address,
+            "endpoint": endpoint or "",
+            "user_agent": user_agent or "",
+            "request_id": request_id or "",
+            "metadata": json.dumps(metadata or {}),
+        }
 
         # 存储活动记录（保留7天）
-        activity_key = (
-            f"session_activity:{session_id}:{int(activity.timestamp.timestamp())}"
+        self._enqueue_stream_entry(
+            f"session_activity:{session_id}", fields, 86400 * 7
         )
-        await self.redis_client.setex(activity_key, 86400 * 7, activity.json())  # 7天
+
+    def _append_history(self, session_info: SessionInfo):
+        """追加会话快照到用户历史Stream（保留30天）"""
+        self._enqueue_stream_entry(
+            f"session_history:{session_info.user_id}",
+            self._session_to_hash(session_info),
+            86400 * 30,
+        )
+
+    def _enqueue_stream_entry(self, stream_key: str, fields: Dict[str, str], ttl: int):
+        """缓冲一条Stream记录，达到批量大小或定时器到期时写入"""
+        self._history_buffer.append((stream_key, fields, ttl))
+
+        if len(self._history_buffer) >= self.history_batch_size:
+            asyncio.create_task(self._flush_history())
+        elif self._history_flush_task is None or self._history_flush_task.done():
+            self._history_flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.history_flush_interval)
+        await self._flush_history()
+
+    async def _flush_history(self):
+        """将缓冲的Stream记录在一次管道往返中写入"""
+        if not self._history_buffer:
+            return
+
+        batch, self._history_buffer = self._history_buffer, []
+        pipe = self.redis_client.pipeline(transaction=False)
+        for stream_key, fields, ttl in batch:
+            pipe.xadd(stream_key, fields, maxlen=self.HISTORY_MAXLEN, approximate=True)
+            pipe.expire(stream_key, ttl)
+
+        try:
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"会话历史写入失败（{len(batch)}条）: {e}")
 
     async def _cleanup_user_sessions(self, user_id: str):
         """清理用户过期会话"""
@@ -645,7 +847,11 @@ class SessionService:
         return False
 
     async def _check_session_hijacking(
-        self, session_info: SessionInfo, current_ip: str, user_agent: str
+        self,
+        session_info: SessionInfo,
+        current_ip: str,
+        user_agent: str,
+        recent_activity: Optional[int] = None,
     ) -> Dict[str, Any]:
         """检查会话劫持风险"""
         indicators = []
@@ -665,7 +871,12 @@ class SessionService:
             risk_score += 20
 
         # 3. 异常活动模式（简化检查）
-        activity_pattern = await self._analyze_activity_pattern(session_info.session_id)
+        if recent_activity is not None:
+            activity_pattern = {"is_unusual": recent_activity > 20}
+        else:
+            activity_pattern = await self._analyze_activity_pattern(
+                session_info.session_id
+            )
         if activity_pattern["is_unusual"]:
             indicators.append("异常活动模式")
             risk_score += 25
@@ -694,23 +905,14 @@ class SessionService:
 
     async def _analyze_activity_pattern(self, session_id: str) -> Dict[str, Any]:
         """分析会话活动模式"""
-        # 简化的活动模式分析
-        activity_keys = await self.redis_client.keys(f"session_activity:{session_id}:*")
-
-        if len(activity_keys) < 3:
-            return {"is_unusual": False}
-
-        # 检查活动频率
-        recent_activities = len(
-            [
-                k
-                for k in activity_keys
-                if int(k.split(":")[-1]) > (datetime.utcnow().timestamp() - 300)
-            ]
+        # 简化的活动模式分析：统计活动Stream中最近5分钟的记录
+        window_start = int((time.time() - 300) * 1000)
+        recent = await self.redis_client.xrange(
+            f"session_activity:{session_id}", min=window_start, max="+", count=21
         )
 
         # 如果5分钟内有超过20个活动，认为异常
-        return {"is_unusual": recent_activities > 20}
+        return {"is_unusual": len(recent) > 20}
 
     async def _check_location_jump(
         self, old_ip: str, new_ip: str, last_activity: datetime
@@ -740,39 +942,113 @@ class SessionService:
             try:
                 await asyncio.sleep(self.cleanup_interval)
 
-                # 获取所有会话键
-                session_keys = await self.redis_client.keys("session:*")
-                current_time = datetime.utcnow()
-
+                # 增量扫描会话键，按批读取状态和过期时间
+                current_ts = time.time()
                 cleanup_count = 0
-                for key in session_keys:
-                    session_data = await self.redis_client.get(key)
-                    if session_data:
-                        try:
-                            session_dict = json.loads(session_data)
-                            expires_at = datetime.fromisoformat(
-                                session_dict["expires_at"]
-                            )
-
-                            if current_time > expires_at:
-                                session_id = session_dict["session_id"]
-                                await self.terminate_session(session_id, "expired")
-                                cleanup_count += 1
-                        except (json.JSONDecodeError, KeyError, ValueError):
-                            pass  # Auto-fixed empty block
-                            # 删除损坏的会话数据
-                            await self.redis_client.delete(key)
-                            cleanup_count += 1
+                batch: List[str] = []
+
+                async for key in self.redis_client.scan_iter(
+                    match="session:*", count=500
+                ):
+                    batch.append(key)
+                    if len(batch) >= 500:
+                        cleanup_count += await self._cleanup_batch(batch, current_ts)
+                        batch = []
+                if batch:
+                    cleanup_count += await self._cleanup_batch(batch, current_ts)
 
                 if cleanup_count > 0:
-                    print(f"清理了 {cleanup_count} 个过期会话")
+                    logger.info(f"清理了 {cleanup_count} 个过期会话")
 
             except Exception as e:
-                print(f"会话清理任务错误: {e}")
+                logger.error(f"会话清理任务错误: {e}")
                 await asyncio.sleep(60)  # 错误时等待1分钟后重试
 
+    async def _cleanup_batch(self, keys: List[str], current_ts: float) -> int:
+        """终止一批会话键中已过期的会话，迁移旧格式会话，删除损坏的数据"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hmget(key, "session_id", "status", "expires_ts")
+        replies = await pipe.execute(raise_on_error=False)
+
+        cleanup_count = 0
+        for key, reply in zip(keys, replies):
+            if isinstance(reply, redis.ResponseError) and self._is_wrong_type(reply):
+                session_info = await self._migrate_legacy_session(key)
+                if session_info is None:
+                    cleanup_count += 1
+                    continue
+                reply = [
+                    session_info.session_id,
+                    session_info.status.value,
+                    self._to_timestamp(session_info.expires_at),
+                ]
+            try:
+                if isinstance(reply, Exception):
+                    raise ValueError(reply)
+                session_id, status, expires_ts = reply
+                if status != SessionStatus.ACTIVE.value:
+                    continue
+                if current_ts > float(expires_ts):
+                    await self.terminate_session(session_id, "expired")
+                    cleanup_count += 1
+            except (TypeError, ValueError):
+                # 删除损坏的会话数据
+                await self.redis_client.delete(key)
+                cleanup_count += 1
+
+        return cleanup_count
+
+    @staticmethod
+    def _is_wrong_type(error: Exception) -> bool:
+        """是否为旧版字符串会话触发的WRONGTYPE错误"""
+        return "WRONGTYPE" in str(error)
+
+    async def _migrate_legacy_session(self, key: str) -> Optional[SessionInfo]:
+        """
+        将旧版JSON字符串会话迁移为哈希结构
+
+        保留剩余TTL，活跃会话重新登记到用户会话集合；无法解析的数据直接删除。
+
+        Returns:
+            迁移后的SessionInfo，已删除或不存在时返回None
+        """
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.ttl(key)
+            raw, ttl = await pipe.execute()
+        if raw is None:
+            return None
+
+        try:
+            fields = json.loads(raw)
+            for name in ("location", "security_flags", "metadata"):
+                fields[name] = json.dumps(fields.get(name))
+            session_info = self._hash_to_session_info(fields)
+        except (AttributeError, TypeError, KeyError, ValueError):
+            await self.redis_client.delete(key)
+            return None
+
+        if ttl is None or ttl <= 0:
+            ttl = self.session_ttl + 3600
+
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping=self._session_to_hash(session_info))
+            pipe.expire(key, ttl)
+            if session_info.status == SessionStatus.ACTIVE:
+                user_sessions_key = f"user_sessions:{session_info.user_id}"
+                pipe.sadd(user_sessions_key, session_info.session_id)
+                pipe.expire(user_sessions_key, self.session_ttl + 3600)
+            await pipe.execute()
+
+        logger.info(f"旧格式会话已迁移: {session_info.session_id}")
+        return session_info
+
     async def close(self):
         """关闭服务"""
+        await self._flush_history()
+
         if self._cleanup_task:
             self._cleanup_task.cancel()
             try:
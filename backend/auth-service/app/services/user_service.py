@@ -16,6 +16,7 @@ from email_validator import validate_email, EmailNotValidError
 
 from app.core.config import settings
 from app.core.database import get_async_session
+from app.core.hashing import HashingOverloadedError
 from app.models.user_models import User, UserProfile, LoginHistory, TrustedDevice
 from app.services.password_service import PasswordService, get_password_service
 from app.services.email_service import EmailService, get_email_service
@@ -254,6 +255,8 @@ class UserService:
 
                 return user
 
+            except HashingOverloadedError:
+                raise
             except Exception as e:
                 raise RuntimeError(f"用户认证失败: {e}")
 
@@ -423,11 +426,7 @@ class UserService:
                 raise ValueError(f"密码强度不足: {', '.join(strength_result.feedback)}")
 
             # 检查密码重用
-            verification_result = await self.password_service.verify_password(
-                password=new_password, password_hash="", user_id=user_id  # 空哈希，只检查重用
-            )
-
-            if verification_result.reuse_detected:
+            if await self.password_service.check_password_reuse(user_id, new_password):
                 raise ValueError("新密码不能与历史密码相同")
 
             # 加密新密码
@@ -510,13 +509,9 @@ class UserService:
                     raise ValueError(f"密码强度不足: {', '.join(strength_result.feedback)}")
 
                 # 检查密码重用
-                reuse_check = await self.password_service.verify_password(
-                    password=new_password,
-                    password_hash="",  # 空哈希，只检查重用
-                    user_id=user_id,
-                )
-
-                if reuse_check.reuse_detected:
+                if await self.password_service.check_password_reuse(
+                    user_id, new_password
+                ):
                     raise ValueError("新密码不能与历史密码相同")
 
                 # 加密新密码
@@ -94,6 +94,10 @@ class ProcessorConfig:
     api_retries: int = 3
 
 
+# backend.core 与 performance_manager 按此名称导入
+AsyncProcessorConfig = ProcessorConfig
+
+
 class AsyncProcessor:
     """异步后台处理器 - 企业级异步任务处理系统"""
 
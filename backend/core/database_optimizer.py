@@ -6,14 +6,29 @@ Performance Optimization: Database Query Optimizer
 import asyncio
 import asyncpg
 import logging
+import re
+import sys
 import time
-from typing import Any, Dict, List, Optional, Tuple, Union
+from collections import OrderedDict
+from typing import (
+    Any,
+    AsyncIterable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 from dataclasses import dataclass, field
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from functools import wraps
 import json
 import hashlib
+import uuid
 from enum import Enum
 
 logger = logging.getLogger(__name__)
@@ -58,10 +73,339 @@ class DatabaseConfig:
     slow_query_threshold: float = 1.0  # 1秒
     enable_query_cache: bool = True
     query_cache_ttl: int = 300  # 5分钟
+    query_cache_max_entries: int = 1000
+    query_cache_max_bytes: int = 64 * 1024 * 1024  # 64MB
     enable_prepared_statements: bool = True
     statement_cache_size: int = 100
 
 
+# SQL词法单元：注释、字符串、引号标识符、单词、数字和单个符号
+_SQL_TOKEN_PATTERN = re.compile(
+    r"(?P<skip>--[^\n]*|/\*.*?\*/|\s+)"
+    r"|(?P<string>'(?:[^']|'')*')"
+    r"|(?P<token>\"(?:[^\"]|\"\")+\"|[A-Za-z_][\w$]*|\d+(?:\.\d+)?|\S)",
+    re.DOTALL,
+)
+# 之后紧跟表名的关键字
+_TABLE_REF_KEYWORDS = {"from", "join", "into", "update", "truncate"}
+# FROM 列表在同一括号层级遇到这些关键字即结束
+_FROM_LIST_END_KEYWORDS = {
+    "where",
+    "group",
+    "having",
+    "window",
+    "order",
+    "limit",
+    "offset",
+    "fetch",
+    "for",
+    "union",
+    "intersect",
+    "except",
+    "returning",
+}
+# 写语句的目标表（包括 WITH ... INSERT/UPDATE/DELETE 形式）
+_WRITE_TARGET_PATTERN = re.compile(
+    r"\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|TRUNCATE(?:\s+TABLE)?)\s+(?:ONLY\s+)?"
+    r"((?:\"[^\"]+\"|[A-Za-z_][\w$]*)(?:\.(?:\"[^\"]+\"|[A-Za-z_][\w$]*))?)",
+    re.IGNORECASE,
+)
+
+
+# 可能被误认为表名的关键字（如 ON CONFLICT DO UPDATE SET、FOR UPDATE SKIP LOCKED）
+_NON_TABLE_KEYWORDS = {"select", "lateral", "set", "of", "skip", "nowait"}
+
+
+def _normalize_table_name(name: str) -> str:
+    """去掉schema前缀和引号，统一小写"""
+    return name.split(".")[-1].strip('"').lower()
+
+
+def _tokenize_sql(query: str) -> List[str]:
+    """拆分SQL词法单元，丢弃注释和空白，字符串字面量统一为 "'" """
+    tokens = []
+    for match in _SQL_TOKEN_PATTERN.finditer(query):
+        if match.group("string"):
+            tokens.append("'")
+        elif match.group("token"):
+            tokens.append(match.group("token"))
+    return tokens
+
+
+def _is_identifier(token: str) -> bool:
+    if token.startswith('"'):
+        return True
+    return (token[0].isalpha() or token[0] == "_") and (
+        token.lower() not in _NON_TABLE_KEYWORDS
+    )
+
+
+def _table_at(tokens: List[str], i: int) -> Optional[str]:
+    """读取位置 i 处的表名（可带schema前缀），不是表名（子查询、表函数等）时返回None"""
+    while i < len(tokens) and tokens[i].lower() in ("only", "table"):
+        i += 1
+    if i >= len(tokens) or not _is_identifier(tokens[i]):
+        return None
+    parts = [tokens[i]]
+    while (
+        i + 2 < len(tokens) and tokens[i + 1] == "." and _is_identifier(tokens[i + 2])
+    ):
+        i += 2
+        parts.append(tokens[i])
+    if i + 1 < len(tokens) and tokens[i + 1] == "(":
+        return None
+    return _normalize_table_name(".".join(parts))
+
+
+def _from_list_tables(tokens: List[str], start: int) -> Set[str]:
+    """FROM 列表中逗号之后的表（括号内的子查询由外层扫描处理）"""
+    tables = set()
+    depth = 0
+    for i in range(start, len(tokens)):
+        token = tokens[i]
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+            if depth < 0:
+                break
+        elif depth == 0:
+            if token == ";" or token.lower() in _FROM_LIST_END_KEYWORDS:
+                break
+            if token == ",":
+                table = _table_at(tokens, i + 1)
+                if table:
+                    tables.add(table)
+    return tables
+
+
+def extract_tables(query: str) -> Set[str]:
+    """
+    解析语句引用的所有表名
+
+    包括 FROM/JOIN/INTO/UPDATE/TRUNCATE 之后的表、FROM 列表中逗号分隔的表，
+    以及子查询中引用的表。
+    """
+    tokens = _tokenize_sql(query)
+    tables = set()
+    for i, token in enumerate(tokens):
+        keyword = token.lower()
+        if keyword not in _TABLE_REF_KEYWORDS:
+            continue
+        table = _table_at(tokens, i + 1)
+        if table:
+            tables.add(table)
+        if keyword == "from":
+            tables |= _from_list_tables(tokens, i + 1)
+    return tables
+
+
+def extract_write_targets(query: str) -> Set[str]:
+    """解析语句写入的表名（不是写语句时返回空集合）"""
+    targets = {_normalize_table_name(m) for m in _WRITE_TARGET_PATTERN.findall(query)}
+    return targets - _NON_TABLE_KEYWORDS
+
+
+def estimate_result_size(result: Any) -> int:
+    """估算查询结果占用的内存字节数"""
+    if isinstance(result, (list, tuple)):
+        return sys.getsizeof(result) + sum(estimate_result_size(r) for r in result)
+    if isinstance(result, dict):
+        return sys.getsizeof(result) + sum(
+            sys.getsizeof(v) for v in result.values()
+        )
+    if isinstance(result, asyncpg.Record):
+        return sys.getsizeof(result) + sum(sys.getsizeof(v) for v in result.values())
+    return sys.getsizeof(result)
+
+
+@dataclass
+class BulkLoadResult:
+    """批量导入结果"""
+
+    table: str
+    rows: int
+    duration: float
+    affected: int = 0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.duration if self.duration > 0 else 0.0
+
+
+class _CountingRecords:
+    """包装行迭代器并计数，逐行转发不缓冲数据（保持同步/异步迭代方式不变）"""
+
+    def __init__(self, records: Union[Iterable[Sequence], AsyncIterable[Sequence]]):
+        self.count = 0
+        if hasattr(records, "__aiter__"):
+            self.records = self._aiter(records)
+        else:
+            self.records = self._iter(records)
+
+    def _iter(self, records: Iterable[Sequence]):
+        for record in records:
+            self.count += 1
+            yield tuple(record)
+
+    async def _aiter(self, records: AsyncIterable[Sequence]):
+        async for record in records:
+            self.count += 1
+            yield tuple(record)
+
+
+@dataclass
+class _CacheEntry:
+    """结果缓存条目"""
+
+    value: Any
+    tables: Set[str]
+    size: int
+    expires_at: float
+
+
+class QueryResultCache:
+    """
+    有界查询结果缓存
+
+    - 按条目数和估算字节数双重限制，超出时按LRU淘汰
+    - 维护 表 -> 缓存键 的依赖映射，写入某表时只失效引用该表的结果
+    - 每张表维护失效代数；查询前取快照，写入时代数已变则拒绝，
+      避免执行期间被并发写失效的旧结果重新进入缓存
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._table_index: Dict[str, Set[str]] = {}
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self.bytes_held = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "rejected": 0,
+            "stale": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """读取缓存，返回 (是否命中, 值)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return False, None
+
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.stats["misses"] += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return True, entry.value
+
+    def generation(self, tables: Set[str]) -> Tuple[int, Tuple[int, ...]]:
+        """获取指定表当前的失效代数快照，在执行查询前调用"""
+        return self._epoch, tuple(self._generations.get(t, 0) for t in sorted(tables))
+
+    def put(
+        self,
+        key: str,
+        value: Any,
+        tables: Set[str],
+        generation: Optional[Tuple[int, Tuple[int, ...]]] = None,
+    ) -> bool:
+        """
+        写入缓存；单个结果超过容量上限时拒绝缓存
+
+        传入generation时，若查询执行期间相关表被失效过则拒绝写入。
+        """
+        if generation is not None and generation != self.generation(tables):
+            self.stats["stale"] += 1
+            return False
+
+        size = estimate_result_size(value)
+        if size > self.max_bytes or not tables:
+            self.stats["rejected"] += 1
+            return False
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = _CacheEntry(
+            value=value,
+            tables=tables,
+            size=size,
+            expires_at=time.monotonic() + self.ttl,
+        )
+        self.bytes_held += size
+        for table in tables:
+            self._table_index.setdefault(table, set()).add(key)
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or self.bytes_held > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+        return True
+
+    def invalidate_tables(self, tables: Set[str]) -> int:
+        """失效所有引用了指定表的缓存结果"""
+        removed = 0
+        for table in tables:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            for key in list(self._table_index.get(table, ())):
+                self._remove(key)
+                removed += 1
+        self.stats["invalidations"] += removed
+        return removed
+
+    def purge_expired(self) -> int:
+        """清理过期条目"""
+        now = time.monotonic()
+        expired = [k for k, e in self._entries.items() if e.expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        return len(expired)
+
+    def clear(self):
+        """清空缓存"""
+        self.stats["invalidations"] += len(self._entries)
+        self._epoch += 1
+        self._entries.clear()
+        self._table_index.clear()
+        self.bytes_held = 0
+
+    def hit_ratio(self) -> float:
+        """命中率（0-1）"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes_held -= entry.size
+        for table in entry.tables:
+            keys = self._table_index.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._table_index[table]
+
+
 class DatabaseOptimizer:
     """数据库性能优化器"""
 
@@ -69,7 +413,11 @@ class DatabaseOptimizer:
         self.config = config
         self.pool = None
         self.query_stats: Dict[str, QueryStats] = {}
-        self.query_cache: Dict[str, Tuple[Any, datetime]] = {}
+        self.query_cache = QueryResultCache(
+            max_entries=config.query_cache_max_entries,
+            max_bytes=config.query_cache_max_bytes,
+            ttl=config.query_cache_ttl,
+        )
         self.prepared_statements: Dict[str, str] = {}
         self._lock = asyncio.Lock()
 
@@ -140,24 +488,23 @@ class DatabaseOptimizer:
         query_hash = self._hash_query(query, args)
         query_type = self._detect_query_type(query)
 
-        # 检查查询缓存（仅对SELECT查询）
-        if (
+        write_targets = extract_write_targets(query)
+        cacheable = (
             self.config.enable_query_cache
             and query_type in [QueryType.SELECT, QueryType.AGGREGATE]
-            and query_hash in self.query_cache
-        ):
-            cached_result, cache_time = self.query_cache[query_hash]
-            if datetime.now() - cache_time < timedelta(
-                seconds=self.config.query_cache_ttl
-            ):
+            and not write_targets
+        )
+
+        # 检查查询缓存（仅对只读查询）
+        if cacheable:
+            hit, cached_result = self.query_cache.get(query_hash)
+            if hit:
                 # 更新统计
                 await self._update_stats(query_hash, query_type, 0.001, cached=True)
                 logger.debug(f"🎯 查询缓存命中: {query_hash}")
                 return cached_result
-            else:
-                pass  # Auto-fixed empty block
-                # 缓存过期，删除
-                del self.query_cache[query_hash]
+            read_tables = extract_tables(query)
+            generation = self.query_cache.generation(read_tables)
 
         try:
             pass  # Auto-fixed empty block
@@ -177,13 +524,16 @@ class DatabaseOptimizer:
             # 计算执行时间
             duration = time.time() - start_time
 
-            # 缓存SELECT查询结果
-            if (
-                self.config.enable_query_cache
-                and query_type in [QueryType.SELECT, QueryType.AGGREGATE]
-                and duration < self.config.slow_query_threshold
+            if write_targets or query_type not in [
+                QueryType.SELECT,
+                QueryType.AGGREGATE,
+            ]:
+                # 写操作：失效依赖被写表的缓存结果
+                self._invalidate_for_write(query, write_targets)
+            elif (
+                cacheable and duration < self.config.slow_query_threshold
             ):  # 只缓存快速查询
-                self.query_cache[query_hash] = (result, datetime.now())
+                self.query_cache.put(query_hash, result, read_tables, generation)
 
             # 更新统计
             await self._update_stats(query_hash, query_type, duration)
@@ -239,6 +589,35 @@ class DatabaseOptimizer:
             if duration > self.config.slow_query_threshold:
                 stats.slow_threshold_exceeded += 1
 
+    def invalidate_tables(self, *tables: str) -> int:
+        """
+        失效引用了指定表的缓存结果
+
+        用于绕过优化器直接写库（如其他服务、迁移脚本）后的手动失效。
+
+        Returns:
+            被清除的缓存条目数
+        """
+        return self.query_cache.invalidate_tables(
+            {_normalize_table_name(t) for t in tables}
+        )
+
+    def _invalidate_for_write(self, query: str, write_targets: Set[str]):
+        """写语句执行后失效相关缓存；无法解析目标表时清空全部缓存"""
+        if write_targets:
+            removed = self.query_cache.invalidate_tables(write_targets)
+        elif self._detect_query_type(query) in [
+            QueryType.SELECT,
+            QueryType.AGGREGATE,
+        ]:
+            return
+        else:
+            removed = len(self.query_cache)
+            self.query_cache.clear()
+
+        if removed:
+            logger.debug(f"🧹 写操作失效查询缓存: {removed}个 ({', '.join(write_targets)})")
+
     async def execute_batch_optimized(
         self, query: str, params_list: List[tuple]
     ) -> List[Any]:
@@ -267,6 +646,7 @@ class DatabaseOptimizer:
                             results.append(result)
 
             duration = time.time() - start_time
+            self._invalidate_for_write(query, extract_write_targets(query))
 
             logger.info(
                 f"📦 批量查询完成 - "
@@ -281,6 +661,119 @@ class DatabaseOptimizer:
             logger.error(f"❌ 批量查询失败: {e}")
             raise
 
+    async def copy_records(
+        self,
+        table: str,
+        columns: List[str],
+        records: Union[Iterable[Sequence], AsyncIterable[Sequence]],
+        schema: Optional[str] = None,
+    ) -> BulkLoadResult:
+        """
+        通过二进制COPY协议流式导入数据
+
+        records按需逐行消费并直接写入COPY流，内存占用与输入规模无关；
+        适用于审计日志、指标回填等百万级导入。
+
+        Args:
+            table: 目标表名
+            columns: 列名（与每行元组顺序一致）
+            records: 行元组的同步或异步迭代器
+            schema: schema名称
+
+        Returns:
+            导入结果（行数、耗时）
+        """
+        start_time = time.time()
+        counter = _CountingRecords(records)
+
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.copy_records_to_table(
+                    table,
+                    records=counter.records,
+                    columns=columns,
+                    schema_name=schema,
+                )
+        except Exception as e:
+            logger.error(f"❌ COPY导入失败: {table}, 已发送 {counter.count} 行, {e}")
+            raise
+
+        duration = time.time() - start_time
+        self.invalidate_tables(table)
+
+        result = BulkLoadResult(table=table, rows=counter.count, duration=duration)
+        logger.info(
+            f"📦 COPY导入完成 - 表: {table}, 行数: {result.rows}, "
+            f"耗时: {duration:.3f}s, 速率: {result.rows_per_second:.0f}行/秒"
+        )
+        return result
+
+    async def bulk_merge(
+        self,
+        table: str,
+        columns: List[str],
+        records: Union[Iterable[Sequence], AsyncIterable[Sequence]],
+        key_columns: List[str],
+        update_columns: Optional[List[str]] = None,
+        mode: str = "upsert",
+    ) -> BulkLoadResult:
+        """
+        通过临时表批量更新或插入更新
+
+        先用COPY把数据写入事务级临时表，再用一条语句合并：
+        - mode="update": UPDATE ... FROM 临时表
+        - mode="upsert": INSERT ... SELECT ... ON CONFLICT DO UPDATE
+
+        Args:
+            table: 目标表名
+            columns: 列名
+            records: 行元组的同步或异步迭代器
+            key_columns: 匹配键列（upsert时需有唯一约束）
+            update_columns: 需要更新的列，默认为除键列外的所有列
+            mode: update 或 upsert
+
+        Returns:
+            导入结果，affected为合并影响的行数
+        """
+        # 合并语句由db层生成；延迟导入，本模块导入时不加载数据库配置
+        from ..db.utils import merge_statements
+
+        staging = f"_bulk_merge_{uuid.uuid4().hex[:12]}"
+        create_sql, merge_sql, _ = merge_statements(
+            table, staging, columns, key_columns, update_columns, mode
+        )
+
+        start_time = time.time()
+        counter = _CountingRecords(records)
+
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(create_sql)
+                    await conn.copy_records_to_table(
+                        staging,
+                        records=counter.records,
+                        columns=columns,
+                    )
+                    status = await conn.execute(merge_sql)
+        except Exception as e:
+            logger.error(f"❌ 批量合并失败: {table}, {e}")
+            raise
+
+        duration = time.time() - start_time
+        self.invalidate_tables(table)
+
+        # 状态形如 "UPDATE 42" / "INSERT 0 42"
+        affected = int(status.split()[-1]) if status else 0
+        result = BulkLoadResult(
+            table=table, rows=counter.count, duration=duration, affected=affected
+        )
+        logger.info(
+            f"📦 批量{mode}完成 - 表: {table}, 输入: {result.rows}行, "
+            f"影响: {affected}行, 耗时: {duration:.3f}s"
+        )
+        return result
+
     async def execute_with_connection_optimization(
         self, queries: List[Tuple[str, tuple]]
     ) -> List[Any]:
@@ -295,6 +788,9 @@ class DatabaseOptimizer:
                         result = await conn.fetch(query, *params)
                         results.append(result)
 
+            for query, _ in queries:
+                self._invalidate_for_write(query, extract_write_targets(query))
+
             duration = time.time() - start_time
 
             logger.debug(
@@ -409,6 +905,15 @@ class DatabaseOptimizer:
             "slow_query_count": 0,
             "error_rate": 0.0,
             "cache_size": len(self.query_cache),
+            "cache_bytes": self.query_cache.bytes_held,
+            "result_cache": {
+                "entries": len(self.query_cache),
+                "bytes_held": self.query_cache.bytes_held,
+                "max_bytes": self.query_cache.max_bytes,
+                "max_entries": self.query_cache.max_entries,
+                "hit_ratio": self.query_cache.hit_ratio(),
+                **self.query_cache.stats,
+            },
         }
 
         if self.query_stats:
@@ -502,20 +1007,10 @@ class DatabaseOptimizer:
             try:
                 await asyncio.sleep(300)  # 每5分钟清理一次
 
-                now = datetime.now()
-                expired_keys = []
-
-                for key, (_, cache_time) in self.query_cache.items():
-                    if now - cache_time > timedelta(
-                        seconds=self.config.query_cache_ttl
-                    ):
-                        expired_keys.append(key)
-
-                for key in expired_keys:
-                    del self.query_cache[key]
+                expired = self.query_cache.purge_expired()
 
-                if expired_keys:
-                    logger.debug(f"🧹 清理过期查询缓存: {len(expired_keys)}个")
+                if expired:
+                    logger.debug(f"🧹 清理过期查询缓存: {expired}个")
 
             except Exception as e:
                 logger.error(f"❌ 缓存清理失败: {e}")
@@ -605,7 +1100,9 @@ async def get_user_by_id(user_id: int, optimizer: DatabaseOptimizer):
 
 @optimized_query(batch_size=100)
 async def bulk_insert_logs(logs: List[dict], optimizer: DatabaseOptimizer):
-    """批量插入日志（优化版本）"""
-    query = "INSERT INTO logs (level, message, timestamp) VALUES ($1, $2, $3)"
-    params_list = [(log["level"], log["message"], log["timestamp"]) for log in logs]
-    return await optimizer.execute_batch_optimized(query, params_list)
+    """批量插入日志（优化版本，COPY流式导入）"""
+    return await optimizer.copy_records(
+        "logs",
+        ["level", "message", "timestamp"],
+        ((log["level"], log["message"], log["timestamp"]) for log in logs),
+    )
@@ -5,18 +5,26 @@ Document Quality Performance Optimizer
 
 import asyncio
 import hashlib
+import heapq
+import io
+import os
+import pickle
+import re
 import time
 import logging
-from typing import Dict, List, Optional, Tuple, Set
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple, Set
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
 import json
 import sqlite3
+import threading
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 from functools import lru_cache
 import multiprocessing as mp
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 logger = logging.getLogger(__name__)
 
@@ -44,18 +52,397 @@ class PerformanceMetrics:
     cache_misses: int
     parallel_workers: int
     memory_usage_mb: float
+    straggler_time: float = 0.0
+    worker_stats: Dict[str, Dict] = field(default_factory=dict)
+
+
+@dataclass
+class DocumentContent:
+    """一次读取的文档内容，供所有检查共享"""
+
+    file_path: str
+    file_hash: str
+    text: str = ""
+    read_error: Optional[str] = None
+    _lines: Optional[List[str]] = field(default=None, repr=False)
+
+    @property
+    def lines(self) -> List[str]:
+        """按行拆分（保留换行符，与readlines一致），首次访问时计算"""
+        if self._lines is None:
+            self._lines = io.StringIO(self.text).readlines()
+        return self._lines
+
+
+# 检查函数签名：接收已读入内存的文档，返回问题列表（空列表表示通过）
+DocumentCheckFunc = Callable[[DocumentContent], List[str]]
+
+# 默认检查注册表：检查名 -> 检查函数
+DEFAULT_DOCUMENT_CHECKS: Dict[str, DocumentCheckFunc] = {}
+
+# 各检查层级默认运行的检查
+DEFAULT_CHECK_LEVELS: Dict[str, Tuple[str, ...]] = {
+    "pre_commit": ("syntax",),
+    "pre_push": ("syntax", "style", "content"),
+    "ci": ("syntax", "style", "content"),
+}
+
+_EMPTY_LINK_RE = re.compile(r"\[([^\]]*)\]\(\)")
+_COMMON_TYPOS = ("teh", "recieve", "seperate", "occurence")
+
+
+def register_document_check(name: str):
+    """注册默认文档检查的装饰器"""
+
+    def decorator(func: DocumentCheckFunc) -> DocumentCheckFunc:
+        DEFAULT_DOCUMENT_CHECKS[name] = func
+        return func
+
+    return decorator
+
+
+def load_document(file_path: str) -> DocumentContent:
+    """读取文件一次，同时计算哈希与解码文本"""
+    try:
+        with open(file_path, "rb") as f:
+            raw = f.read()
+    except Exception as e:
+        logger.error(f"Failed to read {file_path}: {e}")
+        return DocumentContent(file_path=file_path, file_hash="", read_error=str(e))
+
+    file_hash = hashlib.sha256(raw).hexdigest()
+    try:
+        # 与文本模式读取保持一致：统一换行符
+        text = raw.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+    except UnicodeDecodeError as e:
+        return DocumentContent(file_path=file_path, file_hash=file_hash, read_error=str(e))
+
+    return DocumentContent(file_path=file_path, file_hash=file_hash, text=text)
+
+
+@register_document_check("syntax")
+def check_syntax(doc: DocumentContent) -> List[str]:
+    """快速语法检查"""
+    issues = []
+
+    # 基本语法检查
+    if not doc.text.strip():
+        issues.append("Empty file")
+
+    # Markdown特定检查
+    if doc.file_path.endswith(".md"):
+        if doc.text.count("#") == 0:
+            issues.append("No headers found")
+
+        # 检查链接语法
+        broken_links = _EMPTY_LINK_RE.findall(doc.text)
+        if broken_links:
+            issues.append(f"Empty links: {len(broken_links)}")
+
+    return issues
+
+
+@register_document_check("style")
+def check_style(doc: DocumentContent) -> List[str]:
+    """样式检查"""
+    issues = []
+    lines = doc.lines
+
+    # 行长度检查
+    for i, line in enumerate(lines, 1):
+        if len(line) > 120:
+            issues.append(f"Line {i}: too long ({len(line)} chars)")
+
+    # 空行检查
+    empty_lines = sum(1 for line in lines if line.strip() == "")
+    if empty_lines > len(lines) * 0.3:
+        issues.append("Too many empty lines")
+
+    return issues
+
+
+@register_document_check("content")
+def check_content(doc: DocumentContent) -> List[str]:
+    """基本内容检查"""
+    issues = []
+
+    # 内容质量检查
+    word_count = len(doc.text.split())
+    if word_count < 10:
+        issues.append("Content too short")
+
+    # TODO字样检查
+    if "TODO" in doc.text.upper():
+        issues.append("Contains TODO items")
+
+    # 拼写检查（简化版）
+    lowered = doc.text.lower()
+    for typo in _COMMON_TYPOS:
+        if typo in lowered:
+            issues.append(f"Possible typo: {typo}")
+
+    return issues
+
+
+def _default_cache_dir() -> Path:
+    """默认缓存目录：用户缓存目录而非/tmp，避免被系统清理及跨用户共享"""
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "claude_doc_cache"
+
+
+class DocumentResultCache:
+    """文档检查结果缓存服务
+
+    每个进程持有一个长连接（WAL模式，读写互不阻塞），批量查询与写入，
+    访问时间延迟批量更新，内存层使用OrderedDict实现O(1)的LRU。
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        max_memory_entries: int = 1000,
+        batch_size: int = 500,
+    ):
+        self.db_path = Path(db_path)
+        self.max_memory_entries = max_memory_entries
+        self.batch_size = batch_size
+
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._pending_touches: Set[str] = set()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._lock = threading.RLock()
+
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "io_calls": 0,
+            "io_time": 0.0,
+        }
+
+        with self._lock:
+            self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        """获取本进程的长连接（fork后的子进程会重新建立连接）"""
+        pid = os.getpid()
+        if self._conn is not None and self._conn_pid == pid:
+            return self._conn
+
+        conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS file_cache (
+                file_path TEXT PRIMARY KEY,
+                file_hash TEXT NOT NULL,
+                check_results TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                accessed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_file_hash ON file_cache(file_hash)")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_accessed_at ON file_cache(accessed_at)"
+        )
+        conn.commit()
+
+        self._conn = conn
+        self._conn_pid = pid
+        return conn
+
+    def _remember(self, key: str, value: Dict):
+        """写入内存层（O(1) LRU淘汰）"""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _record_io(self, started: float):
+        self.stats["io_calls"] += 1
+        self.stats["io_time"] += time.perf_counter() - started
+
+    def get_many(self, items: Iterable[Tuple[str, str]]) -> Dict[str, Dict]:
+        """批量查询(file_path, file_hash)，返回命中的file_path -> 检查结果"""
+        found: Dict[str, Dict] = {}
+        with self._lock:
+            missing: Dict[str, str] = {}
+            for file_path, file_hash in items:
+                key = f"{file_path}:{file_hash}"
+                value = self._memory.get(key)
+                if value is not None:
+                    self._memory.move_to_end(key)
+                    self._pending_touches.add(file_path)
+                    self.stats["memory_hits"] += 1
+                    found[file_path] = value
+                else:
+                    missing[file_path] = file_hash
+
+            if missing:
+                started = time.perf_counter()
+                try:
+                    conn = self._connection()
+                    paths = list(missing)
+                    for i in range(0, len(paths), self.batch_size):
+                        part = paths[i : i + self.batch_size]
+                        placeholders = ",".join("?" * len(part))
+                        rows = conn.execute(
+                            "SELECT file_path, file_hash, check_results FROM file_cache "
+                            f"WHERE file_path IN ({placeholders})",
+                            part,
+                        )
+                        for file_path, file_hash, payload in rows:
+                            if missing.get(file_path) != file_hash:
+                                continue
+                            value = json.loads(payload)
+                            self._remember(f"{file_path}:{file_hash}", value)
+                            self._pending_touches.add(file_path)
+                            self.stats["disk_hits"] += 1
+                            found[file_path] = value
+                except Exception as e:
+                    logger.error(f"Cache read error: {e}")
+                finally:
+                    self._record_io(started)
+
+                self.stats["misses"] += sum(1 for path in missing if path not in found)
+
+            if len(self._pending_touches) >= self.batch_size:
+                self.flush()
+
+        return found
+
+    def put_many(self, entries: Iterable[Tuple[str, str, Dict]]):
+        """批量写入(file_path, file_hash, 检查结果)"""
+        rows = []
+        with self._lock:
+            for file_path, file_hash, results in entries:
+                self._remember(f"{file_path}:{file_hash}", results)
+                # 写入本身会刷新访问时间
+                self._pending_touches.discard(file_path)
+                rows.append((file_path, file_hash, json.dumps(results)))
+
+            if not rows:
+                return
+
+            started = time.perf_counter()
+            try:
+                conn = self._connection()
+                with conn:
+                    conn.executemany(
+                        """INSERT OR REPLACE INTO file_cache
+                           (file_path, file_hash, check_results, created_at, accessed_at)
+                           VALUES (?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)""",
+                        rows,
+                    )
+                self.stats["writes"] += len(rows)
+            except Exception as e:
+                logger.error(f"Cache save error: {e}")
+            finally:
+                self._record_io(started)
+
+    def flush(self):
+        """批量写回延迟的访问时间更新"""
+        with self._lock:
+            if not self._pending_touches:
+                return
+
+            paths = [(path,) for path in self._pending_touches]
+            self._pending_touches.clear()
+            started = time.perf_counter()
+            try:
+                conn = self._connection()
+                with conn:
+                    conn.executemany(
+                        "UPDATE file_cache SET accessed_at = CURRENT_TIMESTAMP "
+                        "WHERE file_path = ?",
+                        paths,
+                    )
+            except Exception as e:
+                logger.error(f"Cache touch error: {e}")
+            finally:
+                self._record_io(started)
+
+    def cleanup(self, max_age_hours: int) -> int:
+        """删除超过max_age_hours未访问的条目并压缩数据库"""
+        with self._lock:
+            self.flush()
+            conn = self._connection()
+            with conn:
+                cursor = conn.execute(
+                    "DELETE FROM file_cache WHERE accessed_at < datetime('now', ?)",
+                    (f"-{int(max_age_hours)} hours",),
+                )
+            conn.execute("VACUUM")
+            self._memory.clear()
+            return cursor.rowcount
+
+    def close(self):
+        """写回延迟更新并关闭连接"""
+        with self._lock:
+            self.flush()
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+            self._conn_pid = None
+
+    def get_stats(self) -> Dict:
+        """缓存命中率及I/O耗时统计"""
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "io_time_ms": self.stats["io_time"] * 1000,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "pending_touches": len(self._pending_touches),
+        }
+
+
+# 进程池工作进程内的常驻优化器（每个进程初始化一次，跨任务复用）
+_worker_optimizer: Optional["DocumentPerformanceOptimizer"] = None
+
+
+def _init_check_worker(cache_dir: str, checks: Dict[str, DocumentCheckFunc]):
+    """工作进程初始化：创建进程内优化器并加载检查注册表"""
+    global _worker_optimizer
+    _worker_optimizer = DocumentPerformanceOptimizer(cache_dir)
+    _worker_optimizer.checks = dict(checks)
+
+
+def _run_check_chunk(files: List[str], check_types: List[str]) -> Dict:
+    """在工作进程中同步检查一个文件块，返回结果及本块的统计"""
+    optimizer = _worker_optimizer
+    hits = optimizer.stats["cache_hits"]
+    misses = optimizer.stats["cache_misses"]
+    started = time.perf_counter()
+
+    results = optimizer.check_files(files, check_types)
+    optimizer.cache.flush()
+
+    return {
+        "worker": f"worker-{os.getpid()}",
+        "results": results,
+        "busy_time": time.perf_counter() - started,
+        "cache_hits": optimizer.stats["cache_hits"] - hits,
+        "cache_misses": optimizer.stats["cache_misses"] - misses,
+    }
 
 
 class DocumentPerformanceOptimizer:
     """文档质量性能优化器 - 高性能三层检查系统"""
 
-    def __init__(self, cache_dir: str = "/tmp/claude_doc_cache"):
-        self.cache_dir = Path(cache_dir)
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else _default_cache_dir()
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
-        # 缓存数据库
+        # 缓存数据库（进程内共享的长连接缓存服务，内存层LRU容量1000）
         self.cache_db = self.cache_dir / "doc_cache.db"
-        self._init_cache_db()
+        self.max_memory_cache_size = 1000
+        self.cache = DocumentResultCache(self.cache_db, self.max_memory_cache_size)
 
         # 性能配置
         self.max_workers = min(mp.cpu_count(), 8)
@@ -71,37 +458,37 @@ class DocumentPerformanceOptimizer:
             "files_per_second": 0.0,
         }
 
-        # 内存缓存 (LRU)
-        self._memory_cache = {}
-        self._cache_access_times = {}
-        self.max_memory_cache_size = 1000
-
-    def _init_cache_db(self):
-        """初始化缓存数据库"""
-        with sqlite3.connect(self.cache_db) as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS file_cache (
-                    file_path TEXT PRIMARY KEY,
-                    file_hash TEXT NOT NULL,
-                    check_results TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    accessed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """
-            )
-
-            conn.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_file_hash ON file_cache(file_hash)
-            """
-            )
+        # CI深度检查的常驻进程池（首次使用时创建，shutdown时关闭）
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self.chunks_per_worker = 4
+        self.min_files_for_processes = 64
+        self.ci_timeout = 120.0
+        self.last_worker_stats: Dict = {}
+
+        # 可插拔检查：检查名 -> 函数，以及各层级运行的检查
+        self.checks: Dict[str, DocumentCheckFunc] = dict(DEFAULT_DOCUMENT_CHECKS)
+        self.check_levels: Dict[str, List[str]] = {
+            level: list(names) for level, names in DEFAULT_CHECK_LEVELS.items()
+        }
 
-            conn.execute(
-                """
-                CREATE INDEX IF NOT EXISTS idx_accessed_at ON file_cache(accessed_at)
-            """
-            )
+    def register_check(
+        self,
+        name: str,
+        func: DocumentCheckFunc,
+        levels: Iterable[str] = ("pre_push", "ci"),
+    ):
+        """注册自定义检查，并加入指定层级
+
+        检查函数只接收已读入内存的DocumentContent，不应再访问文件系统；
+        结果与其他检查合并保存在同一缓存条目中。
+        """
+        self.checks[name] = func
+        # 工作进程持有检查注册表的副本，需要重建
+        self.shutdown()
+        for level in levels:
+            names = self.check_levels.setdefault(level, [])
+            if name not in names:
+                names.append(name)
 
     def _calculate_file_hash(self, file_path: str) -> str:
         """计算文件哈希值"""
@@ -114,75 +501,13 @@ class DocumentPerformanceOptimizer:
 
     def _get_from_cache(self, file_path: str, file_hash: str) -> Optional[Dict]:
         """从缓存获取结果"""
-        # 1. 内存缓存
-        cache_key = f"{file_path}:{file_hash}"
-        if cache_key in self._memory_cache:
-            self._cache_access_times[cache_key] = time.time()
-            self.stats["cache_hits"] += 1
-            return self._memory_cache[cache_key]
-
-        # 2. 磁盘缓存
-        try:
-            with sqlite3.connect(self.cache_db) as conn:
-                cursor = conn.execute(
-                    "SELECT check_results FROM file_cache WHERE file_path = ? AND file_hash = ?",
-                    (file_path, file_hash),
-                )
-                row = cursor.fetchone()
-
-                if row:
-                    pass  # Auto-fixed empty block
-                    # 更新访问时间
-                    conn.execute(
-                        "UPDATE file_cache SET accessed_at = CURRENT_TIMESTAMP WHERE file_path = ?",
-                        (file_path,),
-                    )
-
-                    result = json.loads(row[0])
-                    # 加入内存缓存
-                    self._add_to_memory_cache(cache_key, result)
-                    self.stats["cache_hits"] += 1
-                    return result
-
-        except Exception as e:
-            logger.error(f"Cache read error: {e}")
-
-        self.stats["cache_misses"] += 1
-        return None
+        result = self.cache.get_many([(file_path, file_hash)]).get(file_path)
+        self.stats["cache_hits" if result is not None else "cache_misses"] += 1
+        return result
 
     def _save_to_cache(self, file_path: str, file_hash: str, results: Dict):
         """保存结果到缓存"""
-        cache_key = f"{file_path}:{file_hash}"
-
-        # 1. 内存缓存
-        self._add_to_memory_cache(cache_key, results)
-
-        # 2. 磁盘缓存
-        try:
-            with sqlite3.connect(self.cache_db) as conn:
-                conn.execute(
-                    """INSERT OR REPLACE INTO file_cache
-                       (file_path, file_hash, check_results, created_at, accessed_at)
-                       VALUES (?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)""",
-                    (file_path, file_hash, json.dumps(results)),
-                )
-        except Exception as e:
-            logger.error(f"Cache save error: {e}")
-
-    def _add_to_memory_cache(self, key: str, value: Dict):
-        """添加到内存缓存（LRU策略）"""
-        if len(self._memory_cache) >= self.max_memory_cache_size:
-            pass  # Auto-fixed empty block
-            # 移除最少使用的项
-            oldest_key = min(
-                self._cache_access_times.keys(),
-                key=lambda k: self._cache_access_times[k],
-            )
-            del self._memory_cache[oldest_key]
-            del self._cache_access_times[oldest_key]
-
-        self._memory_cache[key] = value
-        self._cache_access_times[key] = time.time()
+        self.cache.put_many([(file_path, file_hash, results)])
 
     async def pre_commit_check(
         self, changed_files: List[str]
@@ -191,34 +516,28 @@ class DocumentPerformanceOptimizer:
         start_time = time.time()
 
         # 只检查基本语法和格式
-        tasks = []
-        for file_path in changed_files:
-            if self._should_check_file(file_path):
-                tasks.append(self._fast_syntax_check(file_path))
-
-        if not tasks:
+        files = [f for f in changed_files if self._should_check_file(f)]
+        if not files:
             return True, PerformanceMetrics(0, 0, 0, 0, 0, 0)
 
-        # 并行执行
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = self.check_files(files, self.check_levels["pre_commit"])
+        self.cache.flush()
 
         # 分析结果
-        all_passed = all(
-            r.passed for r in results if isinstance(r, DocumentCheckResult)
-        )
+        all_passed = all(r.passed for r in results)
 
         duration = time.time() - start_time
         metrics = PerformanceMetrics(
             check_duration=duration,
-            files_processed=len(tasks),
+            files_processed=len(files),
             cache_hits=self.stats["cache_hits"],
             cache_misses=self.stats["cache_misses"],
-            parallel_workers=min(len(tasks), self.max_workers),
+            parallel_workers=1,
             memory_usage_mb=self._get_memory_usage(),
         )
 
         logger.info(
-            f"Pre-commit check: {duration:.2f}s, {len(tasks)} files, passed: {all_passed}"
+            f"Pre-commit check: {duration:.2f}s, {len(files)} files, passed: {all_passed}"
         )
         return all_passed, metrics
 
@@ -228,35 +547,25 @@ class DocumentPerformanceOptimizer:
         """Pre-push增量检查 - 目标 < 5秒"""
         start_time = time.time()
 
-        # 增量检查：语法 + 样式 + 基本内容检查
-        tasks = []
-
-        # 分批处理，避免内存溢出
-        batch_size = 10
-        for i in range(0, len(changed_files), batch_size):
-            batch = changed_files[i : i + batch_size]
-            for file_path in batch:
-                if self._should_check_file(file_path):
-                    tasks.extend(
-                        [
-                            self._fast_syntax_check(file_path),
-                            self._style_check(file_path),
-                            self._basic_content_check(file_path),
-                        ]
-                    )
-
-        if not tasks:
+        # 增量检查：语法 + 样式 + 基本内容检查，每个文件只读取和哈希一次
+        files = [f for f in changed_files if self._should_check_file(f)]
+        if not files:
             return True, PerformanceMetrics(0, 0, 0, 0, 0, 0)
 
-        # 使用线程池并行执行
+        check_types = self.check_levels["pre_push"]
+
+        # 使用线程池并行处理文件批次，每批一次批量查询和写入缓存
+        workers = min(self.max_workers, len(files))
+        batches = [files[i::workers] for i in range(workers)]
         results = []
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = [executor.submit(self._run_async_check, task) for task in tasks]
-            results = [f.result() for f in futures]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for batch_results in executor.map(
+                lambda batch: self.check_files(batch, check_types), batches
+            ):
+                results.extend(batch_results)
+        self.cache.flush()
 
-        all_passed = all(
-            r.passed for r in results if isinstance(r, DocumentCheckResult)
-        )
+        all_passed = all(r.passed for r in results)
 
         duration = time.time() - start_time
         metrics = PerformanceMetrics(
@@ -264,7 +573,7 @@ class DocumentPerformanceOptimizer:
             files_processed=len(changed_files),
             cache_hits=self.stats["cache_hits"],
             cache_misses=self.stats["cache_misses"],
-            parallel_workers=self.max_workers,
+            parallel_workers=workers,
             memory_usage_mb=self._get_memory_usage(),
         )
 
@@ -283,42 +592,29 @@ class DocumentPerformanceOptimizer:
 
         # 1. 预过滤：只检查文档文件
         doc_files = [f for f in all_files if self._should_check_file(f)]
+        if not doc_files:
+            return True, PerformanceMetrics(0, 0, 0, 0, 0, 0)
 
-        # 2. 智能分组：相似文件一起处理，提高缓存命中率
-        file_groups = self._group_similar_files(doc_files)
-
-        # 3. 分布式并行处理
+        # 2. 常驻进程池处理按大小均衡的文件块，结果完成即流式返回
         all_results = []
-
-        # 使用进程池处理大量文件
-        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = []
-
-            for group in file_groups:
-                future = executor.submit(self._process_file_group, group)
-                futures.append(future)
-
-            # 收集结果
-            for future in futures:
-                try:
-                    group_results = future.result(timeout=30)  # 30秒超时
-                    all_results.extend(group_results)
-                except Exception as e:
-                    logger.error(f"File group processing failed: {e}")
-
-        # 4. 相似度检测（仅对通过基础检查的文件）
-        passed_files = [
-            r.file_path
-            for r in all_results
-            if isinstance(r, DocumentCheckResult) and r.passed
-        ]
-
-        similarity_results = await self._similarity_check_batch(passed_files)
+        async for result in self.stream_deep_check(doc_files):
+            all_results.append(result)
+
+        # 3. 相似度检测（仅对所有基础检查都通过的文件）
+        file_hashes = {}
+        failed_files = set()
+        for r in all_results:
+            file_hashes[r.file_path] = r.file_hash
+            if not r.passed:
+                failed_files.add(r.file_path)
+        passed_files = [f for f in file_hashes if f not in failed_files]
+
+        similarity_results = await self._similarity_check_batch(
+            passed_files, file_hashes
+        )
         all_results.extend(similarity_results)
 
-        all_passed = all(
-            r.passed for r in all_results if isinstance(r, DocumentCheckResult)
-        )
+        all_passed = all(r.passed for r in all_results)
 
         duration = time.time() - start_time
         metrics = PerformanceMetrics(
@@ -326,8 +622,10 @@ class DocumentPerformanceOptimizer:
             files_processed=len(doc_files),
             cache_hits=self.stats["cache_hits"],
             cache_misses=self.stats["cache_misses"],
-            parallel_workers=self.max_workers,
+            parallel_workers=len(self.last_worker_stats.get("workers", {})),
             memory_usage_mb=self._get_memory_usage(),
+            straggler_time=self.last_worker_stats.get("straggler_time", 0.0),
+            worker_stats=self.last_worker_stats.get("workers", {}),
         )
 
         logger.info(
@@ -340,210 +638,321 @@ class DocumentPerformanceOptimizer:
         doc_extensions = {".md", ".txt", ".rst", ".adoc", ".org"}
         return Path(file_path).suffix.lower() in doc_extensions
 
-    async def _fast_syntax_check(self, file_path: str) -> DocumentCheckResult:
-        """快速语法检查"""
-        start_time = time.time()
-        file_hash = self._calculate_file_hash(file_path)
-
-        # 检查缓存
-        cached = self._get_from_cache(file_path, file_hash)
-        if cached and "syntax" in cached:
-            return DocumentCheckResult(
-                file_path=file_path,
-                file_hash=file_hash,
-                check_type="syntax",
-                passed=cached["syntax"]["passed"],
-                issues=cached["syntax"]["issues"],
-                processing_time=0.001,  # 缓存命中
-            )
-
-        # 执行检查
-        issues = []
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
-                # 基本语法检查
-                if not content.strip():
-                    issues.append("Empty file")
-
-                # Markdown特定检查
-                if file_path.endswith(".md"):
-                    if content.count("#") == 0:
-                        issues.append("No headers found")
+    def check_file(
+        self, file_path: str, check_types: Optional[Iterable[str]] = None
+    ) -> List[DocumentCheckResult]:
+        """读取并哈希文件一次，在内存内容上运行所有指定检查"""
+        return self.check_files([file_path], check_types)
 
-                    # 检查链接语法
-                    import re
+    def check_files(
+        self, files: List[str], check_types: Optional[Iterable[str]] = None
+    ) -> List[DocumentCheckResult]:
+        """批量检查文件：每个文件只读取和哈希一次，缓存批量查询、批量写入
 
-                    broken_links = re.findall(r"\[([^\]]*)\]\(\)", content)
-                    if broken_links:
-                        issues.append(f"Empty links: {len(broken_links)}")
+        所有检查的结果合并为一个字典，以file_path:file_hash为键整体缓存；
+        缓存中已有的检查直接复用，只执行缺失的检查。
+        """
+        names = list(check_types) if check_types is not None else list(self.checks)
+        start_time = time.time()
+        docs = [load_document(file_path) for file_path in files]
+        self.stats["total_checks"] += len(names) * len(docs)
 
-        except Exception as e:
-            issues.append(f"Read error: {str(e)}")
-
-        result = DocumentCheckResult(
-            file_path=file_path,
-            file_hash=file_hash,
-            check_type="syntax",
-            passed=len(issues) == 0,
-            issues=issues,
-            processing_time=time.time() - start_time,
+        readable = [doc for doc in docs if doc.file_hash]
+        cached_map = self.cache.get_many(
+            (doc.file_path, doc.file_hash) for doc in readable
         )
+        self.stats["cache_hits"] += len(cached_map)
+        self.stats["cache_misses"] += len(readable) - len(cached_map)
 
-        # 保存到缓存
-        cache_data = {"syntax": {"passed": result.passed, "issues": result.issues}}
-        self._save_to_cache(file_path, file_hash, cache_data)
+        results = []
+        updates = []
+        for doc in docs:
+            # 无法读取的文件不缓存，每个检查都报告读取错误
+            if not doc.file_hash:
+                results.extend(
+                    DocumentCheckResult(
+                        file_path=doc.file_path,
+                        file_hash="",
+                        check_type=name,
+                        passed=False,
+                        issues=[f"Read error: {doc.read_error}"],
+                        processing_time=time.time() - start_time,
+                    )
+                    for name in names
+                )
+                continue
 
-        return result
+            cached = cached_map.get(doc.file_path) or {}
+            computed = {}
+            for name in names:
+                if name in cached:
+                    results.append(
+                        DocumentCheckResult(
+                            file_path=doc.file_path,
+                            file_hash=doc.file_hash,
+                            check_type=name,
+                            passed=cached[name]["passed"],
+                            issues=cached[name]["issues"],
+                            processing_time=0.001,  # 缓存命中
+                        )
+                    )
+                    continue
+
+                check_start = time.time()
+                issues = self._run_check(name, doc)
+                computed[name] = {"passed": len(issues) == 0, "issues": issues}
+                results.append(
+                    DocumentCheckResult(
+                        file_path=doc.file_path,
+                        file_hash=doc.file_hash,
+                        check_type=name,
+                        passed=len(issues) == 0,
+                        issues=issues,
+                        processing_time=time.time() - check_start,
+                    )
+                )
 
-    async def _style_check(self, file_path: str) -> DocumentCheckResult:
-        """样式检查"""
-        start_time = time.time()
-        file_hash = self._calculate_file_hash(file_path)
-
-        cached = self._get_from_cache(file_path, file_hash)
-        if cached and "style" in cached:
-            return DocumentCheckResult(
-                file_path=file_path,
-                file_hash=file_hash,
-                check_type="style",
-                passed=cached["style"]["passed"],
-                issues=cached["style"]["issues"],
-                processing_time=0.001,
-            )
+            # 合并后一次写入，避免各检查互相覆盖缓存
+            if computed:
+                updates.append((doc.file_path, doc.file_hash, {**cached, **computed}))
 
-        issues = []
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
+        if updates:
+            self.cache.put_many(updates)
+
+        return results
 
-                # 行长度检查
-                for i, line in enumerate(lines, 1):
-                    if len(line) > 120:
-                        issues.append(f"Line {i}: too long ({len(line)} chars)")
+    def _run_check(self, name: str, doc: DocumentContent) -> List[str]:
+        """执行单个检查，异常转换为问题条目"""
+        if doc.read_error is not None:
+            return [f"Read error: {doc.read_error}"]
 
-                # 空行检查
-                empty_lines = sum(1 for line in lines if line.strip() == "")
-                if empty_lines > len(lines) * 0.3:
-                    issues.append("Too many empty lines")
+        func = self.checks.get(name)
+        if func is None:
+            return [f"Unknown check: {name}"]
 
+        try:
+            return list(func(doc))
         except Exception as e:
-            issues.append(f"Style check error: {str(e)}")
-
-        result = DocumentCheckResult(
-            file_path=file_path,
-            file_hash=file_hash,
-            check_type="style",
-            passed=len(issues) == 0,
-            issues=issues,
-            processing_time=time.time() - start_time,
-        )
+            return [f"{name.capitalize()} check error: {str(e)}"]
 
-        # 更新缓存
-        cached = cached or {}
-        cached["style"] = {"passed": result.passed, "issues": result.issues}
-        self._save_to_cache(file_path, file_hash, cached)
+    async def _fast_syntax_check(self, file_path: str) -> DocumentCheckResult:
+        """快速语法检查"""
+        return self.check_file(file_path, ["syntax"])[0]
 
-        return result
+    async def _style_check(self, file_path: str) -> DocumentCheckResult:
+        """样式检查"""
+        return self.check_file(file_path, ["style"])[0]
 
     async def _basic_content_check(self, file_path: str) -> DocumentCheckResult:
         """基本内容检查"""
-        start_time = time.time()
-        file_hash = self._calculate_file_hash(file_path)
-
-        cached = self._get_from_cache(file_path, file_hash)
-        if cached and "content" in cached:
-            return DocumentCheckResult(
-                file_path=file_path,
-                file_hash=file_hash,
-                check_type="content",
-                passed=cached["content"]["passed"],
-                issues=cached["content"]["issues"],
-                processing_time=0.001,
-            )
+        return self.check_file(file_path, ["content"])[0]
+
+    async def stream_deep_check(
+        self, files: List[str], check_types: Optional[Iterable[str]] = None
+    ) -> AsyncIterator[DocumentCheckResult]:
+        """在常驻进程池上并行检查文件，每个文件块完成后立即产出其结果
+
+        文件按大小均衡切分为多于工作进程数的小块，空闲进程从队列中领取
+        下一块，避免单个大目录成为拖尾任务。统计信息写入last_worker_stats。
+        进程池崩溃、超时或块处理失败时，未检查的文件以失败结果产出，不会被丢弃。
+        """
+        check_types = list(
+            check_types if check_types is not None else self.check_levels["ci"]
+        )
+        chunks = self._balanced_chunks(files)
+        pool = (
+            self._get_process_pool()
+            if len(files) >= self.min_files_for_processes
+            else None
+        )
 
-        issues = []
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
+        start = time.perf_counter()
+        workers: Dict[str, Dict] = {}
 
-                # 内容质量检查
-                word_count = len(content.split())
-                if word_count < 10:
-                    issues.append("Content too short")
+        def record(payload: Dict, file_count: int, byte_count: int):
+            stats = workers.setdefault(
+                payload["worker"],
+                {"chunks": 0, "files": 0, "bytes": 0, "busy_time": 0.0},
+            )
+            stats["chunks"] += 1
+            stats["files"] += file_count
+            stats["bytes"] += byte_count
+            stats["busy_time"] += payload["busy_time"]
+            stats["finished_at"] = time.perf_counter() - start
+            self.stats["cache_hits"] += payload["cache_hits"]
+            self.stats["cache_misses"] += payload["cache_misses"]
 
-                # TODO字样检查
-                if "TODO" in content.upper():
-                    issues.append("Contains TODO items")
+        try:
+            if pool is None:
+                # 文件较少或进程池不可用：在当前进程中逐块执行
+                for chunk, chunk_bytes in chunks:
+                    started = time.perf_counter()
+                    results = self.check_files(chunk, check_types)
+                    record(
+                        {
+                            "worker": "main",
+                            "busy_time": time.perf_counter() - started,
+                            "cache_hits": 0,
+                            "cache_misses": 0,
+                        },
+                        len(chunk),
+                        chunk_bytes,
+                    )
+                    for result in results:
+                        yield result
+                    await asyncio.sleep(0)
+                return
 
-                # 拼写检查（简化版）
-                common_typos = ["teh", "recieve", "seperate", "occurence"]
-                for typo in common_typos:
-                    if typo in content.lower():
-                        issues.append(f"Possible typo: {typo}")
+            async def run_chunk(chunk: List[str], chunk_bytes: int):
+                try:
+                    payload = await asyncio.wrap_future(
+                        pool.submit(_run_check_chunk, chunk, check_types)
+                    )
+                except Exception as e:
+                    return chunk, chunk_bytes, None, e
+                return chunk, chunk_bytes, payload, None
+
+            tasks = [
+                asyncio.ensure_future(run_chunk(chunk, chunk_bytes))
+                for chunk, chunk_bytes in chunks
+            ]
+            # 未返回结果的文件（进程池崩溃、超时或块处理失败）最终都记为失败
+            unfinished = {path: None for chunk, _ in chunks for path in chunk}
+            reason = "worker pool stopped before the file was checked"
+            try:
+                for next_done in asyncio.as_completed(tasks, timeout=self.ci_timeout):
+                    chunk, byte_count, payload, error = await next_done
+                    if isinstance(error, BrokenProcessPool):
+                        logger.error(f"Worker pool crashed: {error}")
+                        reason = f"worker pool crashed: {error}"
+                        self.shutdown()
+                        break
+                    if error is not None:
+                        logger.error(f"File chunk processing failed: {error}")
+                        unfinished.update(
+                            dict.fromkeys(chunk, f"chunk processing failed: {error}")
+                        )
+                        continue
+
+                    record(payload, len(chunk), byte_count)
+                    for path in chunk:
+                        unfinished.pop(path, None)
+                    for result in payload["results"]:
+                        yield result
+            except asyncio.TimeoutError:
+                logger.error(f"CI deep check timed out after {self.ci_timeout}s")
+                reason = f"timed out after {self.ci_timeout}s"
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+            for path, error in unfinished.items():
+                for name in check_types:
+                    yield DocumentCheckResult(
+                        file_path=path,
+                        file_hash="",
+                        check_type=name,
+                        passed=False,
+                        issues=[f"Not checked: {error or reason}"],
+                        processing_time=0.0,
+                    )
+        finally:
+            self.cache.flush()
+            self.last_worker_stats = self._summarize_workers(
+                workers, time.perf_counter() - start
+            )
 
-        except Exception as e:
-            issues.append(f"Content check error: {str(e)}")
-
-        result = DocumentCheckResult(
-            file_path=file_path,
-            file_hash=file_hash,
-            check_type="content",
-            passed=len(issues) == 0,
-            issues=issues,
-            processing_time=time.time() - start_time,
-        )
+    def _balanced_chunks(self, files: List[str]) -> List[Tuple[List[str], int]]:
+        """按文件大小把文件分到若干负载均衡的块（最长处理时间优先的贪心分配）
 
-        # 更新缓存
-        cached = cached or {}
-        cached["content"] = {"passed": result.passed, "issues": result.issues}
-        self._save_to_cache(file_path, file_hash, cached)
+        返回按总字节数降序排列的(文件列表, 字节数)，大块先提交以缩短拖尾。
+        """
+        if not files:
+            return []
 
-        return result
+        sized = []
+        for file_path in files:
+            try:
+                size = os.path.getsize(file_path)
+            except OSError:
+                size = 0
+            sized.append((size, file_path))
+        sized.sort(reverse=True)
+
+        chunk_count = min(len(files), self.max_workers * self.chunks_per_worker)
+        heap = [(0, i) for i in range(chunk_count)]
+        chunks: List[List[str]] = [[] for _ in range(chunk_count)]
+        loads = [0] * chunk_count
+
+        for size, file_path in sized:
+            load, index = heapq.heappop(heap)
+            chunks[index].append(file_path)
+            # 每个文件计入固定开销，避免大量空文件挤在同一块
+            loads[index] = load + size + 4096
+            heapq.heappush(heap, (loads[index], index))
+
+        ordered = sorted(range(chunk_count), key=lambda i: loads[i], reverse=True)
+        return [
+            (chunks[i], loads[i] - 4096 * len(chunks[i])) for i in ordered if chunks[i]
+        ]
 
-    def _group_similar_files(self, files: List[str]) -> List[List[str]]:
-        """将相似文件分组以提高缓存命中率"""
-        groups = {}
+    @staticmethod
+    def _summarize_workers(workers: Dict[str, Dict], wall_time: float) -> Dict:
+        """计算每个工作进程的吞吐量以及拖尾时间"""
+        for stats in workers.values():
+            busy = stats["busy_time"]
+            stats["files_per_second"] = stats["files"] / busy if busy > 0 else 0.0
+            stats["mb_per_second"] = (
+                stats["bytes"] / 1024 / 1024 / busy if busy > 0 else 0.0
+            )
 
-        for file_path in files:
-            pass  # Auto-fixed empty block
-            # 按目录和文件类型分组
-            path_obj = Path(file_path)
-            group_key = f"{path_obj.parent}:{path_obj.suffix}"
+        finish_times = [stats["finished_at"] for stats in workers.values()]
+        # 拖尾时间：最早空闲的进程到最后一个进程完成之间的间隔
+        straggler_time = (
+            max(finish_times) - min(finish_times) if len(finish_times) > 1 else 0.0
+        )
+        return {
+            "workers": workers,
+            "straggler_time": straggler_time,
+            "wall_time": wall_time,
+        }
 
-            if group_key not in groups:
-                groups[group_key] = []
-            groups[group_key].append(file_path)
+    def _get_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        """获取（必要时创建）常驻进程池；检查函数无法序列化时返回None"""
+        if self._process_pool is not None:
+            return self._process_pool
 
-        return list(groups.values())
+        try:
+            pickle.dumps(self.checks)
+        except Exception as e:
+            logger.warning(f"Checks are not picklable, running in-process: {e}")
+            return None
 
-    def _process_file_group(self, files: List[str]) -> List[DocumentCheckResult]:
-        """处理文件组"""
-        results = []
-        for file_path in files:
-            pass  # Auto-fixed empty block
-            # 在进程中运行异步检查
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+        try:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_check_worker,
+                initargs=(str(self.cache_dir), self.checks),
+            )
+        except (OSError, NotImplementedError) as e:
+            logger.warning(f"Process pool unavailable, running in-process: {e}")
+            return None
 
-            try:
-                syntax_result = loop.run_until_complete(
-                    self._fast_syntax_check(file_path)
-                )
-                style_result = loop.run_until_complete(self._style_check(file_path))
-                content_result = loop.run_until_complete(
-                    self._basic_content_check(file_path)
-                )
+        return self._process_pool
 
-                results.extend([syntax_result, style_result, content_result])
-            finally:
-                loop.close()
+    def shutdown(self):
+        """关闭常驻进程池（缓存连接保持打开，由close关闭）"""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True, cancel_futures=True)
+            self._process_pool = None
 
-        return results
+    def close(self):
+        """关闭进程池并写回缓存"""
+        self.shutdown()
+        self.cache.close()
 
     async def _similarity_check_batch(
-        self, files: List[str]
+        self, files: List[str], file_hashes: Optional[Dict[str, str]] = None
     ) -> List[DocumentCheckResult]:
         """批量相似度检测"""
         results = []
@@ -570,7 +979,8 @@ class DocumentPerformanceOptimizer:
             results.append(
                 DocumentCheckResult(
                     file_path=file1,
-                    file_hash=self._calculate_file_hash(file1),
+                    file_hash=(file_hashes or {}).get(file1)
+                    or self._calculate_file_hash(file1),
                     check_type="similarity",
                     passed=len(issues) == 0,
                     issues=issues,
@@ -594,15 +1004,6 @@ class DocumentPerformanceOptimizer:
 
         return intersection / union if union > 0 else 0.0
 
-    def _run_async_check(self, coro):
-        """在线程中运行异步函数"""
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(coro)
-        finally:
-            loop.close()
-
     def _get_memory_usage(self) -> float:
         """获取内存使用量（MB）"""
         import psutil
@@ -613,25 +1014,16 @@ class DocumentPerformanceOptimizer:
     async def cleanup_cache(self, max_age_hours: int = 72):
         """清理过期缓存"""
         try:
-            with sqlite3.connect(self.cache_db) as conn:
-                cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
-                cursor = conn.execute(
-                    "DELETE FROM file_cache WHERE accessed_at < ?", (cutoff_time,)
-                )
-                deleted_count = cursor.rowcount
-
-                # 压缩数据库
-                conn.execute("VACUUM")
-
-                logger.info(
-                    f"Cleaned {deleted_count} cache entries older than {max_age_hours}h"
-                )
-
+            deleted_count = self.cache.cleanup(max_age_hours)
+            logger.info(
+                f"Cleaned {deleted_count} cache entries older than {max_age_hours}h"
+            )
         except Exception as e:
             logger.error(f"Cache cleanup failed: {e}")
 
     def get_performance_stats(self) -> Dict:
         """获取性能统计"""
+        cache_stats = self.cache.get_stats()
         cache_hit_rate = 0
         if self.stats["cache_hits"] + self.stats["cache_misses"] > 0:
             cache_hit_rate = (
@@ -643,8 +1035,10 @@ class DocumentPerformanceOptimizer:
         return {
             **self.stats,
             "cache_hit_rate": f"{cache_hit_rate:.1f}%",
-            "memory_cache_size": len(self._memory_cache),
+            "memory_cache_size": cache_stats["memory_entries"],
+            "result_cache": cache_stats,
             "max_workers": self.max_workers,
+            "last_ci_straggler_time": self.last_worker_stats.get("straggler_time", 0.0),
             "cache_db_size_mb": self.cache_db.stat().st_size / 1024 / 1024
             if self.cache_db.exists()
             else 0,
@@ -692,6 +1086,8 @@ async def performance_test():
     stats = optimizer.get_performance_stats()
     print(f"性能统计: {stats}")
 
+    optimizer.close()
+
 
 if __name__ == "__main__":
     asyncio.run(performance_test())
@@ -4,10 +4,11 @@ Performance Optimization: Metrics Collector
 """
 
 import asyncio
+import bisect
 import time
 import psutil
 import logging
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
@@ -83,6 +84,22 @@ class MetricsConfig:
     export_interval: float = 60.0  # 1分钟
     export_format: str = "prometheus"  # prometheus, json
     export_file: Optional[str] = "/tmp/metrics.txt"
+    # 直方图/计时器的桶上界（秒），最后隐含一个+Inf桶
+    histogram_buckets: Tuple[float, ...] = (
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.2,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        3.0,
+        5.0,
+        10.0,
+    )
 
 
 class MetricsCollector:
@@ -98,6 +115,10 @@ class MetricsCollector:
         self.histograms: Dict[str, List[float]] = defaultdict(list)
         self.timers: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
 
+        # 直方图/计时器的分桶累计计数（自启动以来，只增不减），供SLI等增量读取
+        self.histogram_bounds: List[float] = sorted(self.config.histogram_buckets)
+        self.bucket_counts: Dict[str, List[int]] = {}
+
         # 历史数据存储
         self.metrics_history: Dict[str, deque] = defaultdict(
             lambda: deque(
@@ -202,6 +223,7 @@ class MetricsCollector:
         if len(self.histograms[key]) > 1000:
             self.histograms[key] = self.histograms[key][-1000:]
 
+        self._observe_bucket(key, value)
         self._record_metric(name, value, MetricType.HISTOGRAM, labels)
 
     def time_function(self, name: str, labels: Dict[str, str] = None):
@@ -239,8 +261,16 @@ class MetricsCollector:
         """记录计时器"""
         key = self._make_key(name, labels)
         self.timers[key].append(duration)
+        self._observe_bucket(key, duration)
         self._record_metric(name, duration, MetricType.TIMER, labels)
 
+    def _observe_bucket(self, key: str, value: float):
+        """累加分桶计数（value <= 上界的第一个桶）"""
+        counts = self.bucket_counts.get(key)
+        if counts is None:
+            counts = self.bucket_counts[key] = [0] * (len(self.histogram_bounds) + 1)
+        counts[bisect.bisect_left(self.histogram_bounds, value)] += 1
+
     @asynccontextmanager
     async def timer_context(self, name: str, labels: Dict[str, str] = None):
         """计时器上下文管理器"""
@@ -66,6 +66,8 @@ class DatabaseConfig:
     slow_query_threshold: float = 1.0
     enable_query_cache: bool = True
     query_cache_ttl: int = 300
+    query_cache_max_entries: int = 1000
+    query_cache_max_bytes: int = 64 * 1024 * 1024
     enable_prepared_statements: bool = True
     statement_cache_size: int = 100
     connection_timeout: float = 10.0
@@ -420,6 +422,8 @@ class PerformanceConfigManager:
                 "slow_query_threshold": 1.0,
                 "enable_query_cache": True,
                 "query_cache_ttl": 300,
+                "query_cache_max_entries": 1000,
+                "query_cache_max_bytes": 64 * 1024 * 1024,
             },
             "async_processor": {
                 "max_workers": 10,
@@ -555,6 +559,8 @@ class PerformanceConfigManager:
                 "slow_query_threshold": self.config.database.slow_query_threshold,
                 "enable_query_cache": self.config.database.enable_query_cache,
                 "query_cache_ttl": self.config.database.query_cache_ttl,
+                "query_cache_max_entries": self.config.database.query_cache_max_entries,
+                "query_cache_max_bytes": self.config.database.query_cache_max_bytes,
             },
             "thresholds": {
                 "response_time_warning": self.config.thresholds.response_time_warning,
@@ -5,22 +5,197 @@ Performance Optimization: Monitoring Dashboard
 
 import asyncio
 import json
+import struct
 import time
 import logging
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 import aiofiles
 from contextlib import asynccontextmanager
 import psutil
 import weakref
+import numpy as np
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
 
+class DownsampledTier:
+    """降采样层：每resolution秒一个桶，记录min/max/sum/count/last，环形存储"""
+
+    def __init__(self, resolution: float, capacity: int):
+        self.resolution = resolution
+        self.capacity = capacity
+        self.starts = np.full(capacity, np.nan)
+        self.mins = np.empty(capacity)
+        self.maxs = np.empty(capacity)
+        self.sums = np.empty(capacity)
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.lasts = np.empty(capacity)
+        self._current = -1  # 当前桶的写入位置
+
+    def add(self, timestamp: float, value: float):
+        bucket = timestamp - timestamp % self.resolution
+        i = self._current
+        if i >= 0 and self.starts[i] == bucket:
+            self.mins[i] = min(self.mins[i], value)
+            self.maxs[i] = max(self.maxs[i], value)
+            self.sums[i] += value
+            self.counts[i] += 1
+            self.lasts[i] = value
+            return
+
+        i = self._current = (i + 1) % self.capacity
+        self.starts[i] = bucket
+        self.mins[i] = self.maxs[i] = self.sums[i] = self.lasts[i] = value
+        self.counts[i] = 1
+
+    def series(self, since: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """按时间顺序返回各列（mean由sum/count得出）"""
+        if self._current < 0:
+            order = np.empty(0, dtype=np.int64)
+        else:
+            order = np.roll(np.arange(self.capacity), -(self._current + 1))
+            order = order[~np.isnan(self.starts[order])]
+        if since is not None:
+            order = order[self.starts[order] >= since - self.resolution]
+        return {
+            "timestamps": self.starts[order],
+            "min": self.mins[order],
+            "max": self.maxs[order],
+            "mean": self.sums[order] / self.counts[order],
+            "last": self.lasts[order],
+        }
+
+
+class MetricHistory:
+    """
+    指标历史：预分配的NumPy环形缓冲区（float64时间戳 + 数值）
+
+    追加为O(1)且不复制数据；窗口统计基于切片视图做向量化计算；
+    同时写入若干降采样层，长时间范围的图表直接读取降采样数据。
+    """
+
+    def __init__(
+        self,
+        capacity: int = 1000,
+        tiers: Tuple[Tuple[float, int], ...] = ((60, 1440), (3600, 720)),
+    ):
+        self.capacity = capacity
+        self.timestamps = np.empty(capacity)
+        self.values = np.empty(capacity)
+        self._next = 0
+        self._size = 0
+        # 默认: 1分钟粒度保留1天，1小时粒度保留30天
+        self.tiers = [DownsampledTier(resolution, size) for resolution, size in tiers]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, value: float):
+        self.timestamps[self._next] = timestamp
+        self.values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        for tier in self.tiers:
+            tier.add(timestamp, value)
+
+    def _segments(self, last: Optional[int] = None) -> List[slice]:
+        """最近last个点（默认全部）在缓冲区中的切片，按时间顺序，最多两段"""
+        count = self._size if last is None else min(last, self._size)
+        start = (self._next - count) % self.capacity
+        if count == 0:
+            return []
+        if start + count <= self.capacity:
+            return [slice(start, start + count)]
+        return [slice(start, self.capacity), slice(0, self._next)]
+
+    def window(
+        self, last: Optional[int] = None, since: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        按时间顺序返回 (timestamps, values)
+
+        Args:
+            last: 只取最近last个点
+            since: 只取时间戳不早于since的点
+        """
+        segments = self._segments(last)
+        if len(segments) == 1:
+            timestamps, values = self.timestamps[segments[0]], self.values[segments[0]]
+        elif segments:
+            timestamps = np.concatenate([self.timestamps[s] for s in segments])
+            values = np.concatenate([self.values[s] for s in segments])
+        else:
+            timestamps, values = self.timestamps[:0], self.values[:0]
+
+        if since is not None:
+            start = np.searchsorted(timestamps, since)
+            timestamps, values = timestamps[start:], values[start:]
+        return timestamps, values
+
+    def expire(self, cutoff: float):
+        """丢弃早于cutoff的点（只移动计数，不搬移数据）"""
+        expired = 0
+        for segment in self._segments():
+            timestamps = self.timestamps[segment]
+            count = int(np.searchsorted(timestamps, cutoff))
+            expired += count
+            if count < len(timestamps):
+                break
+        self._size -= expired
+
+    def trend(self, last: int = 10) -> float:
+        """最近last个点的平均变化量"""
+        _, values = self.window(last=last)
+        if len(values) < 2:
+            return 0.0
+        return float(values[-1] - values[0]) / len(values)
+
+    def stats(self, since: Optional[float] = None) -> Dict[str, Any]:
+        """窗口统计（向量化）"""
+        timestamps, values = self.window(since=since)
+        if not len(values):
+            return {"count": 0}
+
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        slope = 0.0
+        if len(values) >= 2 and timestamps[-1] > timestamps[0]:
+            slope = float(np.polyfit(timestamps - timestamps[0], values, 1)[0])
+        return {
+            "count": int(len(values)),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+            "slope_per_second": slope,
+        }
+
+    def series(
+        self, since: Optional[float] = None, resolution: float = 0
+    ) -> Dict[str, np.ndarray]:
+        """
+        图表数据列
+
+        resolution为0时返回原始点，否则返回粒度不小于resolution的最细降采样层
+        """
+        if resolution > 0:
+            for tier in self.tiers:
+                if tier.resolution >= resolution:
+                    return tier.series(since)
+            return self.tiers[-1].series(since) if self.tiers else {}
+
+        timestamps, values = self.window(since=since)
+        return {"timestamps": timestamps, "values": values}
+
+
 @dataclass
 class DashboardMetric:
     """仪表板指标"""
@@ -32,7 +207,7 @@ class DashboardMetric:
     trend: float = 0.0  # 变化趋势 (正数上升，负数下降)
     status: str = "normal"  # normal, warning, critical
     timestamp: datetime = field(default_factory=datetime.now)
-    history: List[Tuple[datetime, float]] = field(default_factory=list)
+    history: MetricHistory = field(default_factory=MetricHistory)
 
 
 @dataclass
@@ -49,42 +224,92 @@ class SystemStatus:
     queue_size: int = 0
 
 
+@dataclass
+class DashboardClient:
+    """仪表板WebSocket客户端状态"""
+
+    websocket: WebSocket
+    categories: Optional[frozenset] = None  # None表示订阅全部分类
+    acked_seq: int = 0  # 客户端确认的最新快照序号
+    keyframe_seq: int = 0  # 最近一次发送关键帧的快照序号，0表示尚未发送
+    sent_seq: int = 0  # 最近一次发送的快照序号，即客户端当前状态对应的快照
+
+
 class WebSocketManager:
     """WebSocket连接管理器"""
 
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(self, send_timeout: float = 5.0):
+        self.clients: Dict[WebSocket, DashboardClient] = {}
+        self.send_timeout = send_timeout
+        self.stats = {"messages_sent": 0, "bytes_sent": 0, "send_failures": 0}
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.clients)
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, categories: Optional[List[str]] = None):
         """建立WebSocket连接"""
         await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"🔌 WebSocket连接建立，当前连接数: {len(self.active_connections)}")
+        self.clients[websocket] = DashboardClient(websocket)
+        self.subscribe(websocket, categories)
+        logger.info(f"🔌 WebSocket连接建立，当前连接数: {len(self.clients)}")
 
     def disconnect(self, websocket: WebSocket):
         """断开WebSocket连接"""
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        logger.info(f"🔌 WebSocket连接断开，当前连接数: {len(self.active_connections)}")
+        self.clients.pop(websocket, None)
+        logger.info(f"🔌 WebSocket连接断开，当前连接数: {len(self.clients)}")
+
+    def subscribe(self, websocket: WebSocket, categories: Optional[List[str]]):
+        """设置订阅的指标分类（空表示全部），下一次广播发送关键帧"""
+        client = self.clients.get(websocket)
+        if client:
+            client.categories = frozenset(categories) if categories else None
+            client.keyframe_seq = 0
+
+    def resync(self, websocket: WebSocket):
+        """客户端状态与服务端记录不一致，下一次广播发送关键帧"""
+        client = self.clients.get(websocket)
+        if client:
+            client.keyframe_seq = 0
+
+    def ack(self, websocket: WebSocket, seq: int):
+        """记录客户端已应用的快照序号"""
+        client = self.clients.get(websocket)
+        if client and seq > client.acked_seq:
+            client.acked_seq = seq
+
+    async def send_batches(self, batches: List[Tuple[str, List[WebSocket]]]):
+        """并发发送已序列化的消息（每条消息对应一组连接），超时未完成的连接视为断开"""
+        sends = {
+            asyncio.ensure_future(websocket.send_text(message)): (websocket, message)
+            for message, websockets in batches
+            for websocket in websockets
+        }
+        if not sends:
+            return
+
+        done, pending = await asyncio.wait(sends, timeout=self.send_timeout)
+        for task in pending:
+            task.cancel()
+
+        for task, (websocket, message) in sends.items():
+            if task in done and not task.exception():
+                self.stats["messages_sent"] += 1
+                self.stats["bytes_sent"] += len(message)
+                continue
+
+            # 清理断开或过慢的连接
+            error = task.exception() if task in done else "发送超时"
+            logger.warning(f"⚠️ WebSocket发送失败: {error}")
+            self.stats["send_failures"] += 1
+            self.disconnect(websocket)
 
     async def send_to_all(self, data: dict):
         """向所有客户端发送数据"""
-        if not self.active_connections:
+        if not self.clients:
             return
 
-        message = json.dumps(data, default=str)
-        disconnected = []
-
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                logger.warning(f"⚠️ WebSocket发送失败: {e}")
-                disconnected.append(connection)
-
-        # 清理断开的连接
-        for connection in disconnected:
-            self.disconnect(connection)
+        await self.send_batches([(json.dumps(data, default=str), list(self.clients))])
 
 
 class PerformanceDashboard:
@@ -110,6 +335,13 @@ class PerformanceDashboard:
         self.metrics_cache = {}
         self.cache_ttl = 5  # 5秒缓存TTL
         self.start_time = time.time()
+        self.history_capacity = 1000  # 每个指标保留的原始数据点数
+
+        # 增量广播: 快照序号 -> 快照，超出关键帧间隔的快照不再作为增量基准
+        self.keyframe_interval = 30
+        self._snapshots: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._broadcast_seq = 0
+        self.broadcast_stats = {"ticks": 0, "skipped_ticks": 0, "serializations": 0}
 
         # 配置路由
         self._setup_routes()
@@ -128,13 +360,38 @@ class PerformanceDashboard:
             return JSONResponse(
                 content={
                     "status": self.system_status.__dict__,
+                    "broadcast": {
+                        **self.broadcast_stats,
+                        **self.websocket_manager.stats,
+                        "clients": len(self.websocket_manager.clients),
+                    },
                     "timestamp": datetime.now().isoformat(),
                 }
             )
 
         @self.app.get("/api/metrics")
-        async def get_metrics():
-            """获取所有指标"""
+        async def get_metrics(
+            format: str = "json",
+            points: int = 50,
+            since: Optional[float] = None,
+            resolution: float = 0,
+        ):
+            """
+            获取所有指标
+
+            Args:
+                format: json（默认，历史为 [时间, 值] 列表）、columnar（历史按列返回）
+                    或 binary（float64列的二进制载荷，见_binary_metrics）
+                points: json格式返回的最近数据点数
+                since: columnar/binary格式的起始时间戳（秒）
+                resolution: columnar/binary格式的降采样粒度（秒），0为原始数据
+            """
+            if format == "binary":
+                return Response(
+                    content=self._binary_metrics(since, resolution),
+                    media_type="application/octet-stream",
+                )
+
             metrics_data = {}
             for name, metric in self.metrics.items():
                 metrics_data[name] = {
@@ -145,12 +402,36 @@ class PerformanceDashboard:
                     "trend": metric.trend,
                     "status": metric.status,
                     "timestamp": metric.timestamp.isoformat(),
-                    "history": [
-                        (t.isoformat(), v) for t, v in metric.history[-50:]
-                    ],  # 最近50个数据点
                 }
+                if format == "columnar":
+                    metrics_data[name]["history"] = {
+                        column: array.tolist()
+                        for column, array in metric.history.series(
+                            since, resolution
+                        ).items()
+                    }
+                else:
+                    timestamps, values = metric.history.window(last=points)
+                    metrics_data[name]["history"] = [
+                        (datetime.fromtimestamp(t).isoformat(), v)
+                        for t, v in zip(timestamps.tolist(), values.tolist())
+                    ]
             return JSONResponse(content=metrics_data)
 
+        @self.app.get("/api/metrics/{name}/stats")
+        async def get_metric_stats(name: str, window: float = 300):
+            """指标最近window秒的统计（min/max/mean/分位数/斜率）"""
+            metric = self.metrics.get(name)
+            if metric is None:
+                return JSONResponse(content={"error": "Unknown metric"}, status_code=404)
+            return JSONResponse(
+                content={
+                    "name": name,
+                    "window": window,
+                    **metric.history.stats(since=time.time() - window),
+                }
+            )
+
         @self.app.get("/api/metrics/{category}")
         async def get_metrics_by_category(category: str):
             """按分类获取指标"""
@@ -187,13 +468,40 @@ class PerformanceDashboard:
 
         @self.app.websocket("/ws")
         async def websocket_endpoint(websocket: WebSocket):
-            """WebSocket端点"""
-            await self.websocket_manager.connect(websocket)
+            """
+            WebSocket端点
+
+            连接参数 ?categories=system,cache 订阅指定分类（默认全部）。
+            客户端消息:
+                {"type": "subscribe", "categories": [...]}  修改订阅
+                {"type": "ack", "seq": n}                   确认已应用快照n
+                {"type": "resync"}                          请求重新发送关键帧
+            """
+            categories = websocket.query_params.get("categories")
+            await self.websocket_manager.connect(
+                websocket, categories.split(",") if categories else None
+            )
             try:
                 while True:
-                    pass  # Auto-fixed empty block
-                    # 保持连接活跃
-                    await websocket.receive_text()
+                    try:
+                        message = json.loads(await websocket.receive_text())
+                    except ValueError:
+                        continue
+                    if not isinstance(message, dict):
+                        continue
+
+                    if message.get("type") == "ack":
+                        try:
+                            seq = int(message.get("seq", 0))
+                        except (TypeError, ValueError):
+                            continue
+                        self.websocket_manager.ack(websocket, seq)
+                    elif message.get("type") == "resync":
+                        self.websocket_manager.resync(websocket)
+                    elif message.get("type") == "subscribe":
+                        self.websocket_manager.subscribe(
+                            websocket, message.get("categories")
+                        )
             except WebSocketDisconnect:
                 self.websocket_manager.disconnect(websocket)
 
@@ -420,38 +728,30 @@ class PerformanceDashboard:
         """更新指标"""
         now = datetime.now()
 
-        if name not in self.metrics:
-            self.metrics[name] = DashboardMetric(
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = DashboardMetric(
                 name=name,
                 value=value,
                 unit=unit,
                 category=category,
                 status=status,
                 timestamp=now,
+                history=MetricHistory(self.history_capacity),
             )
         else:
-            metric = self.metrics[name]
             metric.value = value
             metric.status = status
             metric.timestamp = now
 
-            # 添加历史数据
-            metric.history.append((now, value))
-
-            # 限制历史数据数量
-            if len(metric.history) > 1000:
-                metric.history = metric.history[-1000:]
+        # 添加历史数据（环形缓冲区，超出容量时覆盖最旧的点）
+        metric.history.append(now.timestamp(), value)
 
     async def _calculate_trends(self):
         """计算指标趋势"""
         for metric in self.metrics.values():
-            if len(metric.history) >= 2:
-                pass  # Auto-fixed empty block
-                # 计算最近的变化趋势
-                recent_values = [v for _, v in metric.history[-10:]]  # 最近10个值
-                if len(recent_values) >= 2:
-                    trend = (recent_values[-1] - recent_values[0]) / len(recent_values)
-                    metric.trend = trend
+            # 最近10个值的平均变化量
+            metric.trend = metric.history.trend(10)
 
     async def _update_system_status_loop(self):
         """更新系统状态循环"""
@@ -503,45 +803,160 @@ class PerformanceDashboard:
         """广播更新循环"""
         while self.running:
             try:
-                pass  # Auto-fixed empty block
-                # 准备数据
-                update_data = {
-                    "type": "metrics_update",
-                    "timestamp": datetime.now().isoformat(),
-                    "system_status": self.system_status.__dict__,
-                    "metrics": {
-                        name: {
-                            "value": metric.value,
-                            "unit": metric.unit,
-                            "status": metric.status,
-                            "trend": metric.trend,
-                        }
-                        for name, metric in self.metrics.items()
-                    },
+                await self._broadcast_tick()
+            except Exception as e:
+                logger.error(f"❌ 广播更新失败: {e}")
+
+            await asyncio.sleep(1)  # 每秒检查一次变化
+
+    def _build_snapshot(self) -> Dict[str, Any]:
+        """当前广播快照（运行时间由客户端根据关键帧自行计时，不参与变化比较）"""
+        status = dict(self.system_status.__dict__)
+        status.pop("uptime", None)
+        return {
+            "status": status,
+            "metrics": {
+                name: {
+                    "value": metric.value,
+                    "unit": metric.unit,
+                    "category": metric.category,
+                    "status": metric.status,
+                    "trend": metric.trend,
                 }
+                for name, metric in self.metrics.items()
+            },
+        }
 
-                # 广播给所有WebSocket客户端
-                await self.websocket_manager.send_to_all(update_data)
+    @staticmethod
+    def _filter_metrics(metrics: Dict[str, Any], categories: Optional[frozenset]):
+        if categories is None:
+            return metrics
+        return {
+            name: entry for name, entry in metrics.items() if entry["category"] in categories
+        }
 
-            except Exception as e:
-                logger.error(f"❌ 广播更新失败: {e}")
+    def _keyframe_payload(self, seq: int, categories: Optional[frozenset]) -> Dict[str, Any]:
+        snapshot = self._snapshots[seq]
+        return {
+            "type": "metrics_update",
+            "keyframe": True,
+            "seq": seq,
+            "timestamp": datetime.now().isoformat(),
+            "system_status": {
+                **snapshot["status"],
+                "uptime": time.time() - self.start_time,
+            },
+            "metrics": self._filter_metrics(snapshot["metrics"], categories),
+        }
+
+    def _delta_payload(
+        self, seq: int, base_seq: int, categories: Optional[frozenset]
+    ) -> Optional[Dict[str, Any]]:
+        """相对基准快照的变化，订阅范围内没有变化时返回None"""
+        base, current = self._snapshots[base_seq], self._snapshots[seq]
+        base_metrics = self._filter_metrics(base["metrics"], categories)
+        current_metrics = self._filter_metrics(current["metrics"], categories)
+
+        metrics = {
+            name: entry
+            for name, entry in current_metrics.items()
+            if base_metrics.get(name) != entry
+        }
+        removed = [name for name in base_metrics if name not in current_metrics]
+        status = {
+            key: value
+            for key, value in current["status"].items()
+            if base["status"].get(key) != value
+        }
+        if not (metrics or removed or status):
+            return None
+
+        payload = {
+            "type": "metrics_delta",
+            "seq": seq,
+            "base": base_seq,
+            "timestamp": datetime.now().isoformat(),
+            "metrics": metrics,
+        }
+        if removed:
+            payload["removed"] = removed
+        if status:
+            payload["system_status"] = status
+        return payload
+
+    async def _broadcast_tick(self):
+        """
+        广播一次变化
+
+        - 快照与上一次相同时跳过（只给新连接/改订阅的客户端发送关键帧）
+        - 客户端把增量依次合并到当前状态，因此每个客户端以最近一次发送给它的
+          快照为基准发送增量（而不是已确认的快照，否则在确认到达前先变化又
+          恢复的值会被漏掉）；基准过期或距离上次关键帧超过keyframe_interval
+          时发送关键帧
+        - 按 (订阅分类, 类型, 基准) 分组，每组只序列化一次
+        """
+        clients = list(self.websocket_manager.clients.values())
+        if not clients:
+            return
+
+        self.broadcast_stats["ticks"] += 1
+        snapshot = self._build_snapshot()
+        latest = self._snapshots.get(self._broadcast_seq)
+        changed = latest is None or latest != snapshot
+
+        if changed:
+            self._broadcast_seq += 1
+            self._snapshots[self._broadcast_seq] = snapshot
+            while len(self._snapshots) > self.keyframe_interval:
+                self._snapshots.popitem(last=False)
+        seq = self._broadcast_seq
+
+        groups: Dict[Tuple[Optional[frozenset], int], List[DashboardClient]] = {}
+        for client in clients:
+            base_seq = client.sent_seq
+            needs_keyframe = (
+                client.keyframe_seq == 0
+                or base_seq not in self._snapshots
+                or seq - client.keyframe_seq >= self.keyframe_interval
+            )
+            if needs_keyframe:
+                groups.setdefault((client.categories, 0), []).append(client)
+            elif changed and base_seq != seq:
+                groups.setdefault((client.categories, base_seq), []).append(client)
+
+        if not groups:
+            self.broadcast_stats["skipped_ticks"] += 1
+            return
+
+        batches = []
+        for (categories, base_seq), members in groups.items():
+            if base_seq == 0:
+                payload = self._keyframe_payload(seq, categories)
+                for client in members:
+                    client.keyframe_seq = seq
+            else:
+                payload = self._delta_payload(seq, base_seq, categories)
+                if payload is None:
+                    continue
 
-            await asyncio.sleep(1)  # 每2秒广播一次
+            for client in members:
+                client.sent_seq = seq
+
+            self.broadcast_stats["serializations"] += 1
+            batches.append(
+                (json.dumps(payload, default=str), [client.websocket for client in members])
+            )
+
+        await self.websocket_manager.send_batches(batches)
 
     async def _cleanup_old_data_loop(self):
         """清理旧数据循环"""
         while self.running:
             try:
-                cutoff_time = datetime.now() - timedelta(hours=2)  # 保留2小时数据
+                cutoff_time = time.time() - 2 * 3600  # 原始数据保留2小时
 
                 for metric in self.metrics.values():
-                    pass  # Auto-fixed empty block
-                    # 清理历史数据
-                    metric.history = [
-                        (timestamp, value)
-                        for timestamp, value in metric.history
-                        if timestamp > cutoff_time
-                    ]
+                    metric.history.expire(cutoff_time)
 
             except Exception as e:
                 logger.error(f"❌ 数据清理失败: {e}")
@@ -629,14 +1044,21 @@ class PerformanceDashboard:
             constructor() {
                 this.ws = null;
                 this.metrics = {};
+                this.status = null;
+                this.seq = 0;
+                this.uptimeAt = Date.now();
                 this.categories = new Set();
                 this.connectWebSocket();
                 this.fetchInitialData();
+                // 运行时间只随关键帧下发，其间在本地计时
+                setInterval(() => this.status && this.updateSystemStatus(this.status), 1000);
             }
 
             connectWebSocket() {
                 const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-                const wsUrl = `${protocol}//${window.location.host}/ws`;
+                const categories = new URLSearchParams(window.location.search).get('categories');
+                const query = categories ? `?categories=${encodeURIComponent(categories)}` : '';
+                const wsUrl = `${protocol}//${window.location.host}/ws${query}`;
 
                 this.ws = new WebSocket(wsUrl);
 
@@ -651,9 +1073,27 @@ class PerformanceDashboard:
                 this.ws.onmessage = (event) => {
                     const data = JSON.parse(event.data);
                     if (data.type === 'metrics_update') {
+                        // 关键帧：整体替换
+                        this.status = data.system_status;
+                        this.uptimeAt = Date.now();
                         this.updateMetrics(data.metrics);
-                        this.updateSystemStatus(data.system_status);
+                    } else if (data.type === 'metrics_delta') {
+                        // 增量基于上一条消息的快照，不连续时请求关键帧
+                        if (data.base !== this.seq) {
+                            this.ws.send(JSON.stringify({type: 'resync'}));
+                            return;
+                        }
+                        // 增量：合并变化的指标和状态字段
+                        const metrics = Object.assign({}, this.metrics, data.metrics);
+                        (data.removed || []).forEach(name => delete metrics[name]);
+                        Object.assign(this.status, data.system_status || {});
+                        this.updateMetrics(metrics);
+                    } else {
+                        return;
                     }
+                    this.seq = data.seq;
+                    this.updateSystemStatus(this.status);
+                    this.ws.send(JSON.stringify({type: 'ack', seq: data.seq}));
                 };
 
                 this.ws.onclose = () => {
@@ -693,7 +1133,7 @@ class PerformanceDashboard:
                 }
 
                 if (uptimeText) {
-                    const uptime = Math.floor(status.uptime);
+                    const uptime = Math.floor(status.uptime + (Date.now() - this.uptimeAt) / 1000);
                     const hours = Math.floor(uptime / 3600);
                     const minutes = Math.floor((uptime % 3600) / 60);
                     const seconds = uptime % 60;
@@ -753,6 +1193,40 @@ class PerformanceDashboard:
         """
         return html_content
 
+    def _binary_metrics(self, since: Optional[float], resolution: float) -> bytes:
+        """
+        二进制历史载荷
+
+        格式: 4字节小端头部长度 + UTF-8 JSON头部 + 各列数据（小端float64，按头部顺序排列）。
+        头部: {"dtype": "<f8", "metrics": [{"name", "unit", "category", "value",
+        "status", "trend", "length", "columns": [...]}, ...]}
+        """
+        entries, chunks = [], []
+        for name, metric in self.metrics.items():
+            series = metric.history.series(since, resolution)
+            length = len(series["timestamps"]) if series else 0
+            entries.append(
+                {
+                    "name": name,
+                    "unit": metric.unit,
+                    "category": metric.category,
+                    "value": metric.value,
+                    "status": metric.status,
+                    "trend": metric.trend,
+                    "length": length,
+                    "columns": list(series),
+                }
+            )
+            chunks.extend(
+                np.ascontiguousarray(array, dtype="<f8").tobytes()
+                for array in series.values()
+            )
+
+        header = json.dumps(
+            {"dtype": "<f8", "resolution": resolution, "metrics": entries}, default=str
+        ).encode()
+        return b"".join([struct.pack("<I", len(header)), header, *chunks])
+
     async def _export_csv(self) -> str:
         """导出CSV格式"""
         lines = ["timestamp,metric_name,value,unit,category,status"]
@@ -177,6 +177,8 @@ class PerformanceManager:
                 slow_query_threshold=self.config.database.slow_query_threshold,
                 enable_query_cache=self.config.database.enable_query_cache,
                 query_cache_ttl=self.config.database.query_cache_ttl,
+                query_cache_max_entries=self.config.database.query_cache_max_entries,
+                query_cache_max_bytes=self.config.database.query_cache_max_bytes,
             )
 
             self.database_optimizer = DatabaseOptimizer(db_config)
@@ -14,8 +14,8 @@ from typing import Optional, Dict, Any
 from dataclasses import dataclass, field
 from urllib.parse import quote_plus
 
-from pydantic import BaseSettings, validator
-from pydantic_settings import SettingsConfigDict
+from pydantic import validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class DatabaseConfig(BaseSettings):
@@ -11,12 +11,37 @@
 """
 
 import asyncio
+import gzip
+import io
 import logging
-from typing import Any, Dict, List, Optional, Tuple, Type, Union
-from datetime import datetime, timedelta
+import os
+import sys
+import zlib
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+from datetime import date, datetime, timedelta
 import time
 import csv
+import itertools
 import json
+import uuid
+from dataclasses import dataclass
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 from sqlalchemy import (
     select,
@@ -33,14 +58,201 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, Query
 from sqlalchemy.sql import Select
 from sqlalchemy.engine import Result
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.types import ARRAY, JSON
 
 from ..models.base import BaseModel
+from ..pagination import (
+    CursorError,
+    KeysetColumn,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+    keyset_order_by,
+    keyset_page_info,
+)
 from .session import transaction, async_transaction, readonly_transaction
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
 
+def _quote_ident(name: str) -> str:
+    """引用SQL标识符"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_table(name: str) -> str:
+    """引用表名（支持 schema.table 形式）"""
+    return ".".join(_quote_ident(part) for part in name.split("."))
+
+
+def _copy_text(value: Any) -> str:
+    """标量值的COPY文本表示"""
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _pg_array_literal(values: Iterable[Any]) -> str:
+    """编码PostgreSQL数组字面量，如 {"a","b c",NULL}（支持嵌套列表）"""
+    items = []
+    for item in values:
+        if item is None:
+            items.append("NULL")
+        elif isinstance(item, (list, tuple)):
+            items.append(_pg_array_literal(item))
+        else:
+            escaped = _copy_text(item).replace("\\", "\\\\").replace('"', '\\"')
+            items.append(f'"{escaped}"')
+    return "{" + ",".join(items) + "}"
+
+
+def _copy_csv_field(value: Any, column_type: Any = None) -> str:
+    """
+    编码单个COPY CSV字段：NULL为空，其余一律加引号以区分空字符串
+
+    ARRAY列编码为数组字面量，JSON/JSONB列编码为JSON文本；
+    未知列类型时字典和列表按JSON处理。
+    """
+    if value is None:
+        return ""
+    if isinstance(column_type, ARRAY) and isinstance(value, (list, tuple)):
+        value = _pg_array_literal(value)
+    elif isinstance(column_type, JSON) or isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False, default=str)
+    else:
+        value = _copy_text(value)
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _copy_column_types(model: Type[BaseModel], columns: List[str]) -> List[Any]:
+    """COPY各列对应的SQLAlchemy类型，模型中不存在的列为None"""
+    table_columns = model.__table__.c
+    return [table_columns[c].type if c in table_columns else None for c in columns]
+
+
+class CopyStream:
+    """
+    按需生成COPY CSV数据的只读文件对象
+
+    psycopg2的copy_expert按块调用read()，行在读取时才编码，
+    因此内存只与块大小有关，与总行数无关。
+    """
+
+    def __init__(
+        self,
+        rows: Iterable[Tuple[Any, ...]],
+        column_types: Optional[List[Any]] = None,
+    ):
+        self._rows = iter(rows)
+        self._column_types = column_types
+        self._buffer = b""
+        self.rows_written = 0
+
+    def _next_line(self) -> Optional[bytes]:
+        row = next(self._rows, None)
+        if row is None:
+            return None
+        self.rows_written += 1
+        types = self._column_types or [None] * len(row)
+        fields = ",".join(_copy_csv_field(v, t) for v, t in zip(row, types))
+        return (fields + "\n").encode("utf-8")
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = [self._buffer]
+        buffered = len(self._buffer)
+        while size < 0 or buffered < size:
+            line = self._next_line()
+            if line is None:
+                break
+            chunks.append(line)
+            buffered += len(line)
+        self._buffer = b"".join(chunks)
+
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        if not self._buffer:
+            self._buffer = self._next_line() or b""
+        index = self._buffer.find(b"\n")
+        end = index + 1 if index >= 0 else len(self._buffer)
+        data, self._buffer = self._buffer[:end], self._buffer[end:]
+        return data
+
+
+def merge_statements(
+    table: str,
+    staging: str,
+    columns: List[str],
+    key_columns: List[str],
+    update_columns: Optional[List[str]] = None,
+    mode: str = "upsert",
+) -> Tuple[str, str, str]:
+    """
+    生成临时表合并所需的创建、合并、删除语句
+
+    临时表只按导入的列从目标表复制结构（不含数据和约束），
+    未导入列上的 NOT NULL 约束不会导致部分列COPY失败。
+
+    Args:
+        table: 目标表名
+        staging: 临时表名
+        columns: 导入的列名
+        key_columns: 匹配键列（upsert时需有唯一约束）
+        update_columns: 需要更新的列，默认为除键列外的所有导入列
+        mode: update 或 upsert
+
+    Returns:
+        (create_sql, merge_sql, drop_sql)
+    """
+    if mode not in ("update", "upsert"):
+        raise ValueError(f"不支持的合并模式: {mode}")
+
+    if update_columns is None:
+        update_columns = [c for c in columns if c not in key_columns]
+    target = _quote_table(table)
+    staging_table = _quote_table(staging)
+    column_list = ", ".join(_quote_ident(c) for c in columns)
+
+    create_sql = (
+        f"CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS "
+        f"SELECT {column_list} FROM {target} WITH NO DATA"
+    )
+
+    if mode == "update":
+        assignments = ", ".join(
+            f"{_quote_ident(c)} = s.{_quote_ident(c)}" for c in update_columns
+        )
+        match = " AND ".join(
+            f"t.{_quote_ident(c)} = s.{_quote_ident(c)}" for c in key_columns
+        )
+        merge_sql = (
+            f"UPDATE {target} AS t SET {assignments} "
+            f"FROM {staging_table} AS s WHERE {match}"
+        )
+    else:
+        conflict = ", ".join(_quote_ident(c) for c in key_columns)
+        assignments = ", ".join(
+            f"{_quote_ident(c)} = EXCLUDED.{_quote_ident(c)}" for c in update_columns
+        )
+        action = f"DO UPDATE SET {assignments}" if assignments else "DO NOTHING"
+        merge_sql = (
+            f"INSERT INTO {target} ({column_list}) "
+            f"SELECT {column_list} FROM {staging_table} "
+            f"ON CONFLICT ({conflict}) {action}"
+        )
+
+    drop_sql = f"DROP TABLE IF EXISTS {staging_table}"
+    return create_sql, merge_sql, drop_sql
+
+
 class QueryOptimizer:
     """
     查询优化器
@@ -270,6 +482,153 @@ class PaginationHelper:
 
         return items, pagination_info
 
+    # 键集谓词、排序与分页信息的构建见 backend.pagination
+    keyset_order_by = staticmethod(keyset_order_by)
+    keyset_filter = staticmethod(keyset_filter)
+    keyset_page_info = staticmethod(keyset_page_info)
+
+    @staticmethod
+    def keyset_paginate_query(
+        query: Query,
+        columns: List[KeysetColumn],
+        cursor: Optional[str] = None,
+        per_page: int = 20,
+        max_per_page: int = 100,
+        sort_name: str = "default",
+        total: str = "none",
+    ) -> Tuple[List[Any], Dict[str, Any]]:
+        """
+        键集（游标）分页查询
+
+        与OFFSET分页不同，任意深度的页都只扫描 per_page+1 行索引，
+        且默认不执行COUNT(*)。
+
+        Args:
+            query: 查询对象（不应包含ORDER BY）
+            columns: 排序列，最后一列必须唯一
+            cursor: 上一页返回的next_cursor，首页为None
+            per_page: 每页数量
+            max_per_page: 最大每页数量
+            sort_name: 排序方式名称，写入游标用于校验
+            total: 总数策略 none/estimate/exact
+
+        Returns:
+            (数据列表, 分页信息)
+        """
+        per_page = min(max(1, per_page), max_per_page)
+
+        total_count, is_estimate = None, False
+        if total == "exact":
+            total_count = query.order_by(None).count()
+        elif total == "estimate":
+            total_count = PaginationHelper.estimate_count(query.session, query)
+            is_estimate = True
+
+        if cursor:
+            values = decode_cursor(cursor, sort_name, len(columns))
+            query = query.filter(PaginationHelper.keyset_filter(columns, values))
+
+        items = (
+            query.order_by(*PaginationHelper.keyset_order_by(columns))
+            .limit(per_page + 1)
+            .all()
+        )
+
+        return PaginationHelper.keyset_page_info(
+            items, columns, sort_name, per_page, total_count, is_estimate
+        )
+
+    @staticmethod
+    async def async_keyset_paginate_query(
+        session: AsyncSession,
+        query: Select,
+        columns: List[KeysetColumn],
+        cursor: Optional[str] = None,
+        per_page: int = 20,
+        max_per_page: int = 100,
+        sort_name: str = "default",
+        total: str = "none",
+    ) -> Tuple[List[Any], Dict[str, Any]]:
+        """
+        异步键集（游标）分页查询
+
+        Args:
+            session: 异步会话
+            query: 查询对象（不应包含ORDER BY）
+            columns: 排序列，最后一列必须唯一
+            cursor: 上一页返回的next_cursor，首页为None
+            per_page: 每页数量
+            max_per_page: 最大每页数量
+            sort_name: 排序方式名称
+            total: 总数策略 none/estimate/exact
+
+        Returns:
+            (数据列表, 分页信息)
+        """
+        per_page = min(max(1, per_page), max_per_page)
+
+        total_count, is_estimate = None, False
+        if total == "exact":
+            count_query = select(func.count()).select_from(query.alias())
+            total_count = (await session.execute(count_query)).scalar()
+        elif total == "estimate":
+            total_count = await session.run_sync(
+                lambda sync_session: PaginationHelper.estimate_count(
+                    sync_session, query
+                )
+            )
+            is_estimate = True
+
+        if cursor:
+            values = decode_cursor(cursor, sort_name, len(columns))
+            query = query.where(PaginationHelper.keyset_filter(columns, values))
+
+        data_query = query.order_by(*PaginationHelper.keyset_order_by(columns)).limit(
+            per_page + 1
+        )
+        data_result = await session.execute(data_query)
+        items = list(data_result.scalars().all())
+
+        return PaginationHelper.keyset_page_info(
+            items, columns, sort_name, per_page, total_count, is_estimate
+        )
+
+    @staticmethod
+    def estimate_count(session: Session, query: Union[Query, Select]) -> Optional[int]:
+        """
+        使用查询计划的行数估算代替COUNT(*)
+
+        仅PostgreSQL有效，其他数据库返回None。
+
+        Args:
+            session: 数据库会话
+            query: 查询对象
+
+        Returns:
+            估算行数或None
+        """
+        bind = session.get_bind()
+        if bind.dialect.name != "postgresql":
+            return None
+
+        statement = query.statement if hasattr(query, "statement") else query
+        compiled = statement.compile(
+            dialect=bind.dialect, compile_kwargs={"literal_binds": True}
+        )
+        try:
+            # 在保存点中执行，EXPLAIN失败时不会中止外层事务
+            with session.begin_nested():
+                plan = session.execute(
+                    text(f"EXPLAIN (FORMAT JSON) {compiled}")
+                ).scalar()
+        except SQLAlchemyError as e:
+            logger.warning(f"行数估算失败: {e}")
+            return None
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
 
 class BulkOperator:
     """
@@ -307,12 +666,11 @@ class BulkOperator:
             for i in range(0, len(data_list), batch_size):
                 batch = data_list[i : i + batch_size]
 
-                # 添加默认字段
-                for item in batch:
-                    if "created_at" not in item:
-                        item["created_at"] = datetime.utcnow()
-                    if "updated_at" not in item:
-                        item["updated_at"] = datetime.utcnow()
+                # 添加默认字段（复制而不修改调用方的字典）
+                now = datetime.utcnow()
+                batch = [
+                    {"created_at": now, "updated_at": now, **item} for item in batch
+                ]
 
                 # 批量插入
                 result = session.execute(model.__table__.insert(), batch)
@@ -356,12 +714,11 @@ class BulkOperator:
             for i in range(0, len(data_list), batch_size):
                 batch = data_list[i : i + batch_size]
 
-                # 添加默认字段
-                for item in batch:
-                    if "created_at" not in item:
-                        item["created_at"] = datetime.utcnow()
-                    if "updated_at" not in item:
-                        item["updated_at"] = datetime.utcnow()
+                # 添加默认字段（复制而不修改调用方的字典）
+                now = datetime.utcnow()
+                batch = [
+                    {"created_at": now, "updated_at": now, **item} for item in batch
+                ]
 
                 # 批量插入
                 result = await session.execute(model.__table__.insert(), batch)
@@ -466,15 +823,546 @@ class BulkOperator:
             logger.error(f"批量删除失败: {e}")
             raise
 
+    @staticmethod
+    def _copy_columns_and_rows(
+        model: Type[BaseModel],
+        rows: Iterable[Dict[str, Any]],
+        columns: Optional[List[str]],
+    ) -> Tuple[List[str], Iterator[Tuple[Any, ...]]]:
+        """确定COPY列并把字典行惰性转换为元组，自动补齐时间戳"""
+        rows = iter(rows)
+        if columns is None:
+            first = next(rows, None)
+            if first is None:
+                return [], iter(())
+            columns = list(first.keys())
+            rows = itertools.chain([first], rows)
+
+        table_columns = model.__table__.c
+        defaults = {}
+        now = datetime.utcnow()
+        for stamp in ("created_at", "updated_at"):
+            if stamp in table_columns and stamp not in columns:
+                defaults[stamp] = now
+        all_columns = list(columns) + list(defaults)
+
+        def to_tuples():
+            for row in rows:
+                yield tuple(
+                    row[c] if c in row else defaults.get(c) for c in all_columns
+                )
+
+        return all_columns, to_tuples()
+
+    @staticmethod
+    async def _async_copy_columns_and_rows(
+        model: Type[BaseModel],
+        rows: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+        columns: Optional[List[str]],
+    ):
+        """异步版本：支持异步行迭代器"""
+        if not hasattr(rows, "__aiter__"):
+            return BulkOperator._copy_columns_and_rows(model, rows, columns)
+
+        iterator = rows.__aiter__()
+        first = None
+        if columns is None:
+            try:
+                first = await iterator.__anext__()
+            except StopAsyncIteration:
+                return [], iter(())
+            columns = list(first.keys())
+
+        table_columns = model.__table__.c
+        now = datetime.utcnow()
+        defaults = {
+            stamp: now
+            for stamp in ("created_at", "updated_at")
+            if stamp in table_columns and stamp not in columns
+        }
+        all_columns = list(columns) + list(defaults)
+
+        async def to_tuples():
+            if first is not None:
+                yield tuple(
+                    first[c] if c in first else defaults.get(c) for c in all_columns
+                )
+            async for row in iterator:
+                yield tuple(
+                    row[c] if c in row else defaults.get(c) for c in all_columns
+                )
+
+        return all_columns, to_tuples()
+
+    @staticmethod
+    def _copy_tuples(
+        session: Session,
+        table: str,
+        columns: List[str],
+        tuples: Iterable[Tuple],
+        column_types: Optional[List[Any]] = None,
+    ) -> int:
+        """把元组流通过CSV COPY写入表，返回行数"""
+        column_list = ", ".join(_quote_ident(c) for c in columns)
+        stream = CopyStream(tuples, column_types)
+        raw_connection = session.connection().connection
+        with raw_connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {_quote_ident(table)} ({column_list}) FROM STDIN WITH (FORMAT csv)",
+                stream,
+            )
+        return stream.rows_written
+
+    @staticmethod
+    async def _async_copy_tuples(
+        session: AsyncSession,
+        table: str,
+        columns: List[str],
+        tuples: Union[Iterable[Tuple], AsyncIterable[Tuple]],
+    ) -> int:
+        """把元组流通过asyncpg二进制COPY写入表，返回行数"""
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        status = await raw_connection.driver_connection.copy_records_to_table(
+            table, records=tuples, columns=columns
+        )
+        return int(status.split()[-1]) if status else 0
+
+    @staticmethod
+    def copy_from_iter(
+        session: Session,
+        model: Type[BaseModel],
+        rows: Iterable[Dict[str, Any]],
+        columns: Optional[List[str]] = None,
+    ) -> int:
+        """
+        通过COPY流式批量导入（psycopg2）
+
+        行从迭代器逐块编码进COPY流，内存占用不随行数增长；
+        在session当前事务内执行。
+
+        Args:
+            session: 数据库会话
+            model: 模型类
+            rows: 数据字典迭代器（可为生成器）
+            columns: 列名，默认取第一行的键
+
+        Returns:
+            导入的记录数
+        """
+        start_time = time.time()
+        columns, tuples = BulkOperator._copy_columns_and_rows(model, rows, columns)
+        if not columns:
+            return 0
+
+        try:
+            count = BulkOperator._copy_tuples(
+                session,
+                model.__tablename__,
+                columns,
+                tuples,
+                _copy_column_types(model, columns),
+            )
+        except Exception as e:
+            logger.error(f"COPY导入失败: {e}")
+            raise
+
+        logger.info(
+            f"COPY导入 {count} 条记录到 {model.__tablename__}, "
+            f"耗时 {time.time() - start_time:.3f}s"
+        )
+        return count
+
+    @staticmethod
+    async def async_copy_from_iter(
+        session: AsyncSession,
+        model: Type[BaseModel],
+        rows: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+        columns: Optional[List[str]] = None,
+    ) -> int:
+        """
+        异步COPY流式批量导入（asyncpg二进制COPY协议）
+
+        Args:
+            session: 异步数据库会话（asyncpg驱动）
+            model: 模型类
+            rows: 数据字典的同步或异步迭代器
+            columns: 列名，默认取第一行的键
+
+        Returns:
+            导入的记录数
+        """
+        start_time = time.time()
+        columns, tuples = await BulkOperator._async_copy_columns_and_rows(
+            model, rows, columns
+        )
+        if not columns:
+            return 0
+
+        try:
+            count = await BulkOperator._async_copy_tuples(
+                session, model.__tablename__, columns, tuples
+            )
+        except Exception as e:
+            logger.error(f"异步COPY导入失败: {e}")
+            raise
+
+        logger.info(
+            f"异步COPY导入 {count} 条记录到 {model.__tablename__}, "
+            f"耗时 {time.time() - start_time:.3f}s"
+        )
+        return count
+
+    @staticmethod
+    def _merge_statements(
+        model: Type[BaseModel],
+        staging: str,
+        columns: List[str],
+        key_columns: List[str],
+        update_columns: Optional[List[str]],
+        mode: str,
+    ) -> Tuple[str, str, str]:
+        """生成临时表创建、合并、删除语句（默认不覆盖created_at，显式更新时附带updated_at）"""
+        if update_columns is None:
+            update_columns = [
+                c for c in columns if c not in key_columns and c != "created_at"
+            ]
+        elif "updated_at" in columns and "updated_at" not in update_columns:
+            update_columns = update_columns + ["updated_at"]
+
+        return merge_statements(
+            model.__tablename__, staging, columns, key_columns, update_columns, mode
+        )
+
+    @staticmethod
+    def bulk_upsert(
+        session: Session,
+        model: Type[BaseModel],
+        rows: Iterable[Dict[str, Any]],
+        key_columns: List[str],
+        columns: Optional[List[str]] = None,
+        update_columns: Optional[List[str]] = None,
+        mode: str = "upsert",
+    ) -> int:
+        """
+        通过临时表批量更新/插入更新
+
+        数据先COPY进临时表，再用一条 UPDATE ... FROM 或
+        INSERT ... ON CONFLICT 合并，代替逐行UPDATE。
+
+        Args:
+            session: 数据库会话
+            model: 模型类
+            rows: 数据字典迭代器
+            key_columns: 匹配键列（upsert时需有唯一约束）
+            columns: 列名，默认取第一行的键
+            update_columns: 需要更新的列，默认为除键列和created_at外的所有列
+            mode: update 或 upsert
+
+        Returns:
+            受影响的记录数
+        """
+        columns, tuples = BulkOperator._copy_columns_and_rows(model, rows, columns)
+        if not columns:
+            return 0
+
+        staging = f"_bulk_{model.__tablename__}_{uuid.uuid4().hex[:8]}"
+        create_sql, merge_sql, drop_sql = BulkOperator._merge_statements(
+            model, staging, columns, key_columns, update_columns, mode
+        )
+
+        try:
+            session.execute(text(create_sql))
+            BulkOperator._copy_tuples(
+                session, staging, columns, tuples, _copy_column_types(model, columns)
+            )
+            result = session.execute(text(merge_sql))
+            session.execute(text(drop_sql))
+            return result.rowcount
+
+        except Exception as e:
+            logger.error(f"批量合并失败: {e}")
+            raise
+
+    @staticmethod
+    async def async_bulk_upsert(
+        session: AsyncSession,
+        model: Type[BaseModel],
+        rows: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+        key_columns: List[str],
+        columns: Optional[List[str]] = None,
+        update_columns: Optional[List[str]] = None,
+        mode: str = "upsert",
+    ) -> int:
+        """
+        异步临时表批量更新/插入更新
+
+        Args:
+            session: 异步数据库会话（asyncpg驱动）
+            model: 模型类
+            rows: 数据字典的同步或异步迭代器
+            key_columns: 匹配键列
+            columns: 列名，默认取第一行的键
+            update_columns: 需要更新的列
+            mode: update 或 upsert
+
+        Returns:
+            受影响的记录数
+        """
+        columns, tuples = await BulkOperator._async_copy_columns_and_rows(
+            model, rows, columns
+        )
+        if not columns:
+            return 0
+
+        staging = f"_bulk_{model.__tablename__}_{uuid.uuid4().hex[:8]}"
+        create_sql, merge_sql, drop_sql = BulkOperator._merge_statements(
+            model, staging, columns, key_columns, update_columns, mode
+        )
+
+        try:
+            await session.execute(text(create_sql))
+            await BulkOperator._async_copy_tuples(session, staging, columns, tuples)
+            result = await session.execute(text(merge_sql))
+            await session.execute(text(drop_sql))
+            return result.rowcount
+
+        except Exception as e:
+            logger.error(f"异步批量合并失败: {e}")
+            raise
+
+
+@dataclass
+class ExportStats:
+    """导出统计"""
+
+    rows: int = 0
+    bytes_written: int = 0
+    duration: float = 0.0
+    peak_rss_kb: Optional[int] = None
+    filename: Optional[str] = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.duration if self.duration > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "bytes_written": self.bytes_written,
+            "duration": self.duration,
+            "rows_per_second": self.rows_per_second,
+            "peak_rss_kb": self.peak_rss_kb,
+            "filename": self.filename,
+        }
+
+
+def _peak_rss_kb() -> Optional[int]:
+    """进程峰值RSS（KB），不支持的平台返回None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS以字节为单位，Linux以KB为单位
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class _RowEncoder:
+    """逐行编码为CSV或NDJSON文本，CSV列顺序取自第一行"""
+
+    def __init__(self, fmt: str, headers: Optional[List[str]] = None):
+        if fmt not in ("csv", "ndjson"):
+            raise ValueError(f"不支持的导出格式: {fmt}")
+        self.fmt = fmt
+        self.headers = headers
+        self.columns: Optional[List[str]] = None
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _csv_line(self, values: Iterable[Any]) -> str:
+        self._writer.writerow(
+            v.isoformat() if isinstance(v, (datetime, date)) else v for v in values
+        )
+        line = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return line
+
+    def encode(self, row: Dict[str, Any]) -> str:
+        if self.fmt == "ndjson":
+            return json.dumps(row, ensure_ascii=False, default=str) + "\n"
+
+        prefix = ""
+        if self.columns is None:
+            self.columns = list(row.keys())
+            prefix = self._csv_line(self.headers or self.columns)
+        return prefix + self._csv_line(row.get(c) for c in self.columns)
+
 
 class DataExporter:
     """
     数据导出器
     ==========
 
-    支持多种格式的数据导出
+    支持多种格式的数据导出。
+    所有导出都通过服务端游标按批读取并增量写出，内存占用只与batch_size有关。
     """
 
+    DEFAULT_BATCH_SIZE = 1000
+
+    @staticmethod
+    def _row_to_dict(row: Any) -> Dict[str, Any]:
+        """把查询结果行转换为字典"""
+        if hasattr(row, "_mapping") and len(row) == 1 and hasattr(row[0], "__table__"):
+            row = row[0]
+        if hasattr(row, "to_dict"):
+            return row.to_dict()
+        if hasattr(row, "_asdict"):
+            return row._asdict()
+        if hasattr(row, "__table__"):
+            return {c.key: getattr(row, c.key) for c in row.__table__.columns}
+        if hasattr(row, "__dict__"):
+            return {k: v for k, v in row.__dict__.items() if not k.startswith("_")}
+        return {"value": row}
+
+    @staticmethod
+    def stream_rows(
+        session: Session,
+        query: Union[Query, Select],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        使用服务端游标逐批读取查询结果
+
+        Args:
+            session: 数据库会话
+            query: 查询对象
+            batch_size: 每批从数据库读取的行数
+
+        Yields:
+            行字典
+        """
+        if hasattr(query, "yield_per"):
+            rows = query.execution_options(stream_results=True).yield_per(batch_size)
+            for row in rows:
+                yield DataExporter._row_to_dict(row)
+            return
+
+        result = session.execute(
+            query, execution_options={"stream_results": True, "yield_per": batch_size}
+        )
+        for partition in result.partitions():
+            for row in partition:
+                yield DataExporter._row_to_dict(row)
+
+    @staticmethod
+    def export_stream(
+        session: Session,
+        query: Union[Query, Select],
+        filename: str,
+        fmt: str = "csv",
+        headers: Optional[List[str]] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        compress: Optional[bool] = None,
+    ) -> ExportStats:
+        """
+        流式导出到文件
+
+        Args:
+            session: 数据库会话
+            query: 查询对象
+            filename: 文件名（以.gz结尾时默认gzip压缩）
+            fmt: csv 或 ndjson
+            headers: CSV列标题（按顺序对应查询列）
+            batch_size: 每批读取行数
+            compress: 是否gzip压缩，None时按扩展名判断
+
+        Returns:
+            导出统计（行数、字节数、行/秒、峰值RSS）
+        """
+        if compress is None:
+            compress = filename.endswith(".gz")
+
+        encoder = _RowEncoder(fmt, headers)
+        stats = ExportStats(filename=filename)
+        start_time = time.time()
+
+        try:
+            opener = gzip.open if compress else open
+            with opener(filename, "wt", newline="", encoding="utf-8") as output:
+                for row in DataExporter.stream_rows(session, query, batch_size):
+                    output.write(encoder.encode(row))
+                    stats.rows += 1
+
+            stats.duration = time.time() - start_time
+            stats.bytes_written = os.path.getsize(filename)
+            stats.peak_rss_kb = _peak_rss_kb()
+
+            logger.info(
+                f"成功导出 {stats.rows} 条记录到 {filename} "
+                f"({stats.rows_per_second:.0f}行/秒, 峰值RSS {stats.peak_rss_kb}KB)"
+            )
+            return stats
+
+        except Exception as e:
+            logger.error(f"流式导出失败: {e}")
+            raise
+
+    @staticmethod
+    async def async_stream_export(
+        session: AsyncSession,
+        query: Select,
+        fmt: str = "ndjson",
+        headers: Optional[List[str]] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        compress: bool = False,
+        stats: Optional[ExportStats] = None,
+    ) -> AsyncIterator[bytes]:
+        """
+        异步流式导出，逐批产出字节块，可直接用于StreamingResponse
+
+        Args:
+            session: 异步数据库会话
+            query: 查询对象
+            fmt: csv 或 ndjson
+            headers: CSV列标题
+            batch_size: 每批读取行数
+            compress: 是否输出gzip流
+            stats: 可选的统计对象，导出过程中持续更新
+
+        Yields:
+            编码后的字节块
+        """
+        encoder = _RowEncoder(fmt, headers)
+        stats = stats if stats is not None else ExportStats()
+        start_time = time.time()
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+
+        result = await session.stream(query, execution_options={"yield_per": batch_size})
+
+        async for partition in result.partitions():
+            data = "".join(
+                encoder.encode(DataExporter._row_to_dict(row)) for row in partition
+            ).encode("utf-8")
+            stats.rows += len(partition)
+
+            if compressor is not None:
+                data = compressor.compress(data)
+            if data:
+                stats.bytes_written += len(data)
+                yield data
+
+        if compressor is not None:
+            tail = compressor.flush()
+            stats.bytes_written += len(tail)
+            yield tail
+
+        stats.duration = time.time() - start_time
+        stats.peak_rss_kb = _peak_rss_kb()
+        logger.info(
+            f"异步流式导出 {stats.rows} 条记录 "
+            f"({stats.rows_per_second:.0f}行/秒, 峰值RSS {stats.peak_rss_kb}KB)"
+        )
+
     @staticmethod
     def export_to_csv(
         session: Session,
@@ -494,52 +1382,15 @@ class DataExporter:
         Returns:
             导出的文件路径
         """
-        try:
-            pass  # Auto-fixed empty block
-            # 执行查询
-            if hasattr(query, "all"):
-                results = query.all()
-            else:
-                results = session.execute(query).fetchall()
-
-            if not results:
-                logger.warning("查询结果为空，跳过导出")
-                return filename
-
-            # 写入CSV文件
-            with open(filename, "w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.writer(csvfile)
-
-                # 写入标题
-                if headers:
-                    writer.writerow(headers)
-                elif hasattr(results[0], "_fields"):
-                    writer.writerow(results[0]._fields)
-                elif hasattr(results[0], "__dict__"):
-                    writer.writerow(results[0].__dict__.keys())
-
-                # 写入数据
-                for row in results:
-                    if hasattr(row, "_asdict"):
-                        writer.writerow(row._asdict().values())
-                    elif hasattr(row, "__dict__"):
-                        writer.writerow(row.__dict__.values())
-                    else:
-                        writer.writerow(row)
-
-            logger.info(f"成功导出 {len(results)} 条记录到 {filename}")
-            return filename
-
-        except Exception as e:
-            logger.error(f"CSV导出失败: {e}")
-            raise
+        DataExporter.export_stream(session, query, filename, "csv", headers)
+        return filename
 
     @staticmethod
     def export_to_json(
         session: Session, query: Union[Query, Select], filename: str, indent: int = 2
     ) -> str:
         """
-        导出到JSON文件
+        导出到JSON文件（逐行写出数组元素，不在内存中构建完整列表）
 
         Args:
             session: 数据库会话
@@ -550,36 +1401,19 @@ class DataExporter:
         Returns:
             导出的文件路径
         """
+        count = 0
         try:
-            pass  # Auto-fixed empty block
-            # 执行查询
-            if hasattr(query, "all"):
-                results = query.all()
-            else:
-                results = session.execute(query).fetchall()
-
-            # 转换为字典列表
-            data = []
-            for row in results:
-                if hasattr(row, "to_dict"):
-                    data.append(row.to_dict())
-                elif hasattr(row, "_asdict"):
-                    data.append(row._asdict())
-                elif hasattr(row, "__dict__"):
-                    row_dict = {
-                        k: v for k, v in row.__dict__.items() if not k.startswith("_")
-                    }
-                    data.append(row_dict)
-                else:
-                    data.append(str(row))
-
-            # 写入JSON文件
             with open(filename, "w", encoding="utf-8") as jsonfile:
-                json.dump(
-                    data, jsonfile, indent=indent, ensure_ascii=False, default=str
-                )
+                jsonfile.write("[")
+                for row in DataExporter.stream_rows(session, query):
+                    jsonfile.write(",\n" if count else "\n")
+                    jsonfile.write(
+                        json.dumps(row, indent=indent, ensure_ascii=False, default=str)
+                    )
+                    count += 1
+                jsonfile.write("\n]\n" if count else "]\n")
 
-            logger.info(f"成功导出 {len(data)} 条记录到 {filename}")
+            logger.info(f"成功导出 {count} 条记录到 {filename}")
             return filename
 
         except Exception as e:
@@ -672,8 +1506,13 @@ performance_monitor = PerformanceMonitor()
 
 # 导出公共接口
 __all__ = [
+    "merge_statements",
     "QueryOptimizer",
     "PaginationHelper",
+    "KeysetColumn",
+    "CursorError",
+    "encode_cursor",
+    "decode_cursor",
     "BulkOperator",
     "DataExporter",
     "PerformanceMonitor",
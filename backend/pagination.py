@@ -0,0 +1,224 @@
+"""
+键集（游标）分页工具
+====================
+
+游标编解码与键集谓词、排序子句的构建，只依赖SQLAlchemy表达式，
+不引入数据库连接或配置，供db层和各任务Repository共同使用。
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, false, or_
+
+
+class KeysetColumn(NamedTuple):
+    """
+    键集分页排序列
+
+    Attributes:
+        expression: 排序表达式（列或SQL表达式，应有索引支持）
+        attr: 从结果行读取游标值的属性名
+        descending: 是否降序
+        nullable: 列是否可为空（空值统一排在最后）
+        extract: 自定义游标值提取函数（表达式不是简单列时使用）
+    """
+
+    expression: Any
+    attr: str
+    descending: bool = False
+    nullable: bool = False
+    extract: Optional[Callable[[Any], Any]] = None
+
+    def value_of(self, row: Any) -> Any:
+        """从结果行中提取该列的游标值"""
+        if self.extract is not None:
+            return self.extract(row)
+        return getattr(row, self.attr)
+
+
+class CursorError(ValueError):
+    """无效或与当前排序不匹配的分页游标"""
+
+    pass
+
+
+def _encode_cursor_value(value: Any) -> List[Any]:
+    """将游标值编码为带类型标记的JSON值"""
+    if value is None:
+        return ["n", None]
+    if isinstance(value, datetime):
+        return ["dt", value.isoformat()]
+    if isinstance(value, date):
+        return ["d", value.isoformat()]
+    if isinstance(value, UUID):
+        return ["u", str(value)]
+    if isinstance(value, Decimal):
+        return ["dec", str(value)]
+    if isinstance(value, (bool, int, float, str)):
+        return ["v", value]
+    return ["v", str(value)]
+
+
+def _decode_cursor_value(encoded: List[Any]) -> Any:
+    """解码带类型标记的游标值"""
+    kind, raw = encoded
+    if kind == "n":
+        return None
+    if kind == "dt":
+        return datetime.fromisoformat(raw)
+    if kind == "d":
+        return date.fromisoformat(raw)
+    if kind == "u":
+        return UUID(raw)
+    if kind == "dec":
+        return Decimal(raw)
+    return raw
+
+
+def encode_cursor(sort_name: str, values: List[Any]) -> str:
+    """
+    生成不透明的分页游标
+
+    Args:
+        sort_name: 排序方式名称（解码时用于校验）
+        values: 当前页最后一行的排序键值
+
+    Returns:
+        URL安全的base64游标字符串
+    """
+    payload = {"s": sort_name, "k": [_encode_cursor_value(v) for v in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_name: str, key_count: int) -> List[Any]:
+    """
+    解析分页游标
+
+    Args:
+        cursor: 游标字符串
+        sort_name: 期望的排序方式名称
+        key_count: 期望的排序键数量
+
+    Returns:
+        排序键值列表
+
+    Raises:
+        CursorError: 游标格式无效或排序方式不匹配
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = [_decode_cursor_value(item) for item in payload["k"]]
+    except Exception as e:
+        raise CursorError(f"无效的分页游标: {e}") from e
+
+    if payload.get("s") != sort_name or len(values) != key_count:
+        raise CursorError("分页游标与当前排序方式不匹配")
+    return values
+
+
+def keyset_order_by(columns: List[KeysetColumn]) -> List[Any]:
+    """
+    生成与键集谓词一致的排序子句（空值统一排在最后）
+
+    Args:
+        columns: 排序列，最后一列必须唯一（通常为主键）
+
+    Returns:
+        ORDER BY子句列表
+    """
+    clauses = []
+    for column in columns:
+        clause = (
+            column.expression.desc()
+            if column.descending
+            else column.expression.asc()
+        )
+        clauses.append(clause.nulls_last() if column.nullable else clause)
+    return clauses
+
+
+def keyset_filter(columns: List[KeysetColumn], values: List[Any]):
+    """
+    生成"排在游标之后"的谓词
+
+    展开为 (a > x) OR (a = x AND b > y) ...，支持各列方向不同及可空列；
+    首列非空时额外加 a >= x 约束，使 (a, b) 复合索引可以直接范围扫描。
+
+    Args:
+        columns: 排序列
+        values: 游标中的排序键值
+
+    Returns:
+        SQLAlchemy条件表达式
+    """
+    branches = []
+    equal_prefix = []
+
+    for column, value in zip(columns, values):
+        expr = column.expression
+
+        if value is None:
+            # 空值排在最后：该列上没有更"靠后"的非空值
+            after = None
+            equal = expr.is_(None)
+        else:
+            after = expr < value if column.descending else expr > value
+            if column.nullable:
+                after = or_(after, expr.is_(None))
+            equal = expr == value
+
+        if after is not None:
+            branches.append(and_(*equal_prefix, after))
+        equal_prefix.append(equal)
+
+    if not branches:
+        return false()
+
+    # 冗余的首列范围条件，让优化器直接在索引上定位起点而不是从头扫描
+    first, first_value = columns[0], values[0]
+    if not first.nullable and first_value is not None and len(branches) > 1:
+        bound = (
+            first.expression <= first_value
+            if first.descending
+            else first.expression >= first_value
+        )
+        return and_(bound, or_(*branches))
+
+    return or_(*branches)
+
+
+def keyset_page_info(
+    items: List[Any],
+    columns: List[KeysetColumn],
+    sort_name: str,
+    per_page: int,
+    total: Optional[int] = None,
+    total_is_estimate: bool = False,
+) -> Tuple[List[Any], Dict[str, Any]]:
+    """根据多取一行的结果计算游标分页信息"""
+    has_next = len(items) > per_page
+    items = items[:per_page]
+
+    next_cursor = None
+    if has_next and items:
+        last = items[-1]
+        next_cursor = encode_cursor(
+            sort_name, [column.value_of(last) for column in columns]
+        )
+
+    pagination_info = {
+        "per_page": per_page,
+        "has_next": has_next,
+        "next_cursor": next_cursor,
+        "sort": sort_name,
+        "total": total,
+        "total_is_estimate": total_is_estimate,
+    }
+    return items, pagination_info
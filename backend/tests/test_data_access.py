@@ -28,7 +28,12 @@ from backend.db import (
     get_async_redis_client,
 )
 from backend.models import User, UserProfile, Session, AuditLog
-from backend.db.utils import PaginationHelper, BulkOperator
+from backend.db.utils import (
+    PaginationHelper,
+    BulkOperator,
+    KeysetColumn,
+    CursorError,
+)
 from backend.db.cache import CacheOperations, CacheKeyManager
 from backend.db.config import get_database_config, get_cache_config
 
@@ -409,6 +414,46 @@ class TestQueryOperations:
             assert pagination3["has_next"] == False
             assert pagination3["has_prev"] == True
 
+    def test_keyset_pagination(self):
+        """测试游标分页"""
+        with transaction() as session:
+            for i in range(25):
+                user = User(username=f"cursor_user_{i}", email=f"cursor{i}@example.com")
+                user.set_password("test123")
+                session.add(user)
+
+        columns = [
+            KeysetColumn(User.created_at, "created_at", descending=True),
+            KeysetColumn(User.id, "id", descending=True),
+        ]
+
+        with readonly_transaction() as session:
+            query = session.session.query(User).filter(
+                User.username.like("cursor_user_%")
+            )
+
+            seen = []
+            cursor = None
+            while True:
+                items, info = PaginationHelper.keyset_paginate_query(
+                    query, columns, cursor=cursor, per_page=10, sort_name="recent"
+                )
+                seen.extend(user.id for user in items)
+                assert info["total"] is None
+                if not info["has_next"]:
+                    break
+                cursor = info["next_cursor"]
+
+            # 翻完所有页且没有重复或遗漏
+            assert len(seen) == 25
+            assert len(set(seen)) == 25
+
+            # 游标与排序方式不匹配时拒绝
+            with pytest.raises(CursorError):
+                PaginationHelper.keyset_paginate_query(
+                    query, columns, cursor=cursor, per_page=10, sort_name="other"
+                )
+
     def test_bulk_operations(self):
         """测试批量操作"""
         # 准备批量数据
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+数据库优化器测试
+================
+
+- 表名解析：逗号连接、子查询和带schema的表都要计入缓存依赖
+- 临时表合并：使用db层生成的合并语句，只COPY导入的列
+- 并发失效：查询执行期间相关表被失效时，旧结果不得写入缓存
+"""
+
+from contextlib import asynccontextmanager
+
+import pytest
+
+from backend.core.database_optimizer import (
+    DatabaseConfig,
+    DatabaseOptimizer,
+    QueryResultCache,
+    extract_tables,
+)
+
+
+class FakeConnection:
+    """记录执行的语句和COPY的行"""
+
+    def __init__(self):
+        self.statements = []
+        self.copied = []
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def execute(self, sql):
+        self.statements.append(sql)
+        return "INSERT 0 2" if sql.startswith("INSERT") else "CREATE TABLE"
+
+    async def copy_records_to_table(self, table, records, columns):
+        if hasattr(records, "__aiter__"):
+            self.copied.extend([record async for record in records])
+        else:
+            self.copied.extend(records)
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConnection()
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+class RacingConnection:
+    """fetch执行期间模拟另一个协程写入并失效指定表"""
+
+    def __init__(self, on_fetch):
+        self.on_fetch = on_fetch
+        self.fetches = 0
+
+    async def fetch(self, query, *args):
+        self.fetches += 1
+        self.on_fetch()
+        return [{"id": 1, "name": "before-write"}]
+
+
+class TestExtractTables:
+    """缓存依赖的表名解析"""
+
+    def test_comma_join(self):
+        query = "SELECT * FROM users u, orders AS o, items WHERE u.id = o.user_id"
+
+        assert extract_tables(query) == {"users", "orders", "items"}
+
+    def test_comma_join_mixed_with_join(self):
+        query = (
+            "SELECT * FROM users u JOIN orders o ON o.user_id = u.id, items i "
+            "LEFT JOIN tags t ON t.item_id = i.id ORDER BY u.id"
+        )
+
+        assert extract_tables(query) == {"users", "orders", "items", "tags"}
+
+    def test_subqueries(self):
+        query = (
+            "SELECT * FROM (SELECT id FROM users, roles) s, orders o "
+            "WHERE o.user_id IN (SELECT user_id FROM payments)"
+        )
+
+        assert extract_tables(query) == {"users", "roles", "orders", "payments"}
+
+    def test_schema_qualified_and_quoted(self):
+        query = 'SELECT * FROM app.users, "App"."Orders" o JOIN public.items i ON true'
+
+        assert extract_tables(query) == {"users", "orders", "items"}
+
+    def test_ignores_functions_strings_and_clauses(self):
+        query = (
+            "SELECT EXTRACT(YEAR FROM created_at), 'FROM fake, other' "
+            "FROM generate_series(1, 3) g, users -- FROM commented\n"
+            "WHERE id > 0 GROUP BY 1, 2 FOR UPDATE SKIP LOCKED"
+        )
+
+        assert extract_tables(query) == {"created_at", "users"}
+
+    def test_write_to_comma_joined_table_invalidates_cache(self):
+        cache = QueryResultCache(max_entries=10, max_bytes=1 << 20, ttl=60)
+        cache.put("k", [1], extract_tables("SELECT * FROM users u, orders o"))
+
+        assert cache.invalidate_tables({"orders"}) == 1
+        assert cache.get("k") == (False, None)
+
+
+class TestBulkMerge:
+    """DatabaseOptimizer.bulk_merge 使用db层的合并语句"""
+
+    @pytest.mark.asyncio
+    async def test_partial_columns_are_copied_into_staging(self):
+        optimizer = DatabaseOptimizer(DatabaseConfig(url="postgresql://test"))
+        optimizer.pool = FakePool()
+
+        result = await optimizer.bulk_merge(
+            "users", ["id", "email"], [(1, "a@x.io"), (2, "b@x.io")], ["id"]
+        )
+
+        create_sql, merge_sql = optimizer.pool.conn.statements
+        assert create_sql.endswith('SELECT "id", "email" FROM "users" WITH NO DATA')
+        assert merge_sql.startswith('INSERT INTO "users" ("id", "email")')
+        assert optimizer.pool.conn.copied == [(1, "a@x.io"), (2, "b@x.io")]
+        assert (result.rows, result.affected) == (2, 2)
+
+
+class TestCacheGeneration:
+    """查询期间的并发失效"""
+
+    def make_cache(self):
+        return QueryResultCache(max_entries=10, max_bytes=1 << 20, ttl=60)
+
+    def test_put_rejects_result_read_before_invalidation(self):
+        cache = self.make_cache()
+        generation = cache.generation({"users", "orders"})
+
+        cache.invalidate_tables({"orders"})
+
+        assert not cache.put("k", [1], {"users", "orders"}, generation)
+        assert "k" not in cache
+        assert cache.stats["stale"] == 1
+
+    def test_put_rejects_result_read_before_clear(self):
+        cache = self.make_cache()
+        generation = cache.generation({"users"})
+
+        cache.clear()
+
+        assert not cache.put("k", [1], {"users"}, generation)
+
+    def test_unrelated_invalidation_keeps_result(self):
+        cache = self.make_cache()
+        generation = cache.generation({"users"})
+
+        cache.invalidate_tables({"orders"})
+
+        assert cache.put("k", [1], {"users"}, generation)
+        assert cache.get("k") == (True, [1])
+
+    @pytest.mark.asyncio
+    async def test_execute_optimized_skips_stale_result(self):
+        optimizer = DatabaseOptimizer(DatabaseConfig(url="postgresql://test"))
+        pool = FakePool()
+        pool.conn = RacingConnection(lambda: optimizer.invalidate_tables("users"))
+        optimizer.pool = pool
+        query = "SELECT id, name FROM users"
+
+        await optimizer.execute_optimized(query)
+        await optimizer.execute_optimized(query)
+
+        assert pool.conn.fetches == 2
+        assert len(optimizer.query_cache) == 0
+
+        pool.conn.on_fetch = lambda: None
+        await optimizer.execute_optimized(query)
+        await optimizer.execute_optimized(query)
+
+        assert pool.conn.fetches == 3
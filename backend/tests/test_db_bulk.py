@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+批量操作工具测试
+================
+
+- 临时表合并语句：临时表只包含导入的列，部分列COPY不受目标表NOT NULL约束影响
+- BulkOperator合并默认值：不覆盖created_at，显式更新时附带updated_at
+- COPY CSV编码：ARRAY列为数组字面量，JSON/JSONB列为JSON文本
+- COPY流式导入：按块读取时才消费行，失败时向上抛出且不执行后续合并
+"""
+
+import csv
+import io
+from datetime import datetime
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.orm import declarative_base
+
+from backend.db.utils import (
+    BulkOperator,
+    CopyStream,
+    _copy_column_types,
+    _copy_csv_field,
+    merge_statements,
+)
+
+Base = declarative_base()
+
+
+class TaggedRow(Base):
+    __tablename__ = "tagged_rows"
+
+    id = Column(Integer, primary_key=True)
+    tags = Column(ARRAY(String))
+    attributes = Column(JSONB)
+
+
+class StampedRow(Base):
+    __tablename__ = "stamped_rows"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+
+
+class FakeCursor:
+    """像psycopg2的copy_expert一样按固定块大小读取COPY流"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def copy_expert(self, sql, stream, size=64):
+        self.connection.log.append(sql)
+        if self.connection.fail_copy:
+            stream.read(size)
+            raise RuntimeError("COPY failed")
+        data = b""
+        while True:
+            chunk = stream.read(size)
+            if not chunk:
+                break
+            self.connection.chunk_sizes.append(len(chunk))
+            data += chunk
+        self.connection.copied.append(
+            list(csv.reader(io.StringIO(data.decode("utf-8"))))
+        )
+
+
+class FakeRawConnection:
+    def __init__(self, fail_copy=False):
+        self.fail_copy = fail_copy
+        self.log = []
+        self.copied = []
+        self.chunk_sizes = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+class FakeSession:
+    """记录执行的SQL，connection().connection返回原始连接"""
+
+    def __init__(self, fail_copy=False):
+        self.raw = FakeRawConnection(fail_copy)
+
+    def connection(self):
+        return type("Connection", (), {"connection": self.raw})()
+
+    def execute(self, statement):
+        self.raw.log.append(str(statement))
+        return type("Result", (), {"rowcount": 2})()
+
+
+class TestMergeStatements:
+    """临时表合并语句"""
+
+    def test_staging_table_selects_only_loaded_columns(self):
+        create_sql, _, drop_sql = merge_statements(
+            "app.users", "_stage", ["id", "email"], ["id"]
+        )
+
+        assert create_sql == (
+            'CREATE TEMP TABLE "_stage" ON COMMIT DROP AS '
+            'SELECT "id", "email" FROM "app"."users" WITH NO DATA'
+        )
+        assert "LIKE" not in create_sql
+        assert drop_sql == 'DROP TABLE IF EXISTS "_stage"'
+
+    def test_upsert_updates_non_key_columns(self):
+        _, merge_sql, _ = merge_statements(
+            "users", "_stage", ["id", "email", "name"], ["id"]
+        )
+
+        assert merge_sql == (
+            'INSERT INTO "users" ("id", "email", "name") '
+            'SELECT "id", "email", "name" FROM "_stage" '
+            'ON CONFLICT ("id") DO UPDATE SET '
+            '"email" = EXCLUDED."email", "name" = EXCLUDED."name"'
+        )
+
+    def test_upsert_without_update_columns_does_nothing(self):
+        _, merge_sql, _ = merge_statements(
+            "users", "_stage", ["id", "email"], ["id"], update_columns=[]
+        )
+
+        assert merge_sql.endswith('ON CONFLICT ("id") DO NOTHING')
+
+    def test_update_mode_joins_on_keys(self):
+        _, merge_sql, _ = merge_statements(
+            "users",
+            "_stage",
+            ["tenant", "id", "email"],
+            ["tenant", "id"],
+            mode="update",
+        )
+
+        assert merge_sql == (
+            'UPDATE "users" AS t SET "email" = s."email" FROM "_stage" AS s '
+            'WHERE t."tenant" = s."tenant" AND t."id" = s."id"'
+        )
+
+    def test_unknown_mode_is_rejected(self):
+        with pytest.raises(ValueError):
+            merge_statements("users", "_stage", ["id"], ["id"], mode="delete")
+
+
+class TestBulkOperatorMergeDefaults:
+    """模型级合并语句的默认更新列"""
+
+    class Model:
+        __tablename__ = "tasks"
+
+    def test_created_at_is_not_overwritten(self):
+        _, merge_sql, _ = BulkOperator._merge_statements(
+            self.Model, "_stage", ["id", "title", "created_at"], ["id"], None, "upsert"
+        )
+
+        assert '"title" = EXCLUDED."title"' in merge_sql
+        assert '"created_at" = EXCLUDED' not in merge_sql
+
+    def test_explicit_update_columns_include_updated_at(self):
+        _, merge_sql, _ = BulkOperator._merge_statements(
+            self.Model,
+            "_stage",
+            ["id", "title", "updated_at"],
+            ["id"],
+            ["title"],
+            "update",
+        )
+
+        assert merge_sql.startswith(
+            'UPDATE "tasks" AS t SET "title" = s."title", "updated_at" = s."updated_at"'
+        )
+
+
+class TestCopyCsvField:
+    """COPY CSV字段编码按列类型区分数组和JSON"""
+
+    def test_array_column_uses_array_literal(self):
+        column_type = TaggedRow.__table__.c.tags.type
+
+        assert _copy_csv_field(["a", "b"], column_type) == '"{""a"",""b""}"'
+        assert _copy_csv_field([], column_type) == '"{}"'
+
+    def test_array_elements_are_escaped(self):
+        column_type = TaggedRow.__table__.c.tags.type
+        field = _copy_csv_field(['say "hi"', "back\\slash", None, "a,b"], column_type)
+
+        # CSV解码后才是PostgreSQL数组解析器看到的字面量
+        (literal,) = next(csv.reader(io.StringIO(field)))
+        assert literal == '{"say \\"hi\\"","back\\\\slash",NULL,"a,b"}'
+
+    def test_nested_array(self):
+        column_type = ARRAY(Integer, dimensions=2)
+
+        field = _copy_csv_field([[1, 2], [3, None]], column_type)
+
+        (literal,) = next(csv.reader(io.StringIO(field)))
+        assert literal == '{{"1","2"},{"3",NULL}}'
+
+    def test_json_column_encodes_json_text(self):
+        column_type = TaggedRow.__table__.c.attributes.type
+
+        (literal,) = next(
+            csv.reader(io.StringIO(_copy_csv_field({"labels": ["a"]}, column_type)))
+        )
+        assert literal == '{"labels": ["a"]}'
+        assert _copy_csv_field(["a", "b"], column_type) == '"[""a"", ""b""]"'
+        assert _copy_csv_field("plain", column_type) == '"""plain"""'
+
+    def test_copy_stream_uses_model_column_types(self):
+        columns = ["id", "tags", "attributes"]
+        rows = [(1, ["x", "y"], {"k": 1}), (2, None, ["x", "y"])]
+
+        stream = CopyStream(rows, _copy_column_types(TaggedRow, columns))
+        parsed = list(csv.reader(io.StringIO(stream.read().decode("utf-8"))))
+
+        assert parsed == [
+            ["1", '{"x","y"}', '{"k": 1}'],
+            ["2", "", '["x", "y"]'],
+        ]
+        assert stream.rows_written == 2
+
+    def test_scalars_without_column_type(self):
+        assert _copy_csv_field(True) == '"t"'
+        assert _copy_csv_field(datetime(2024, 1, 2, 3, 4)) == '"2024-01-02T03:04:00"'
+        assert _copy_csv_field("") == '""'
+        assert _copy_csv_field(None) == ""
+
+
+class TestCopyStream:
+    """按需编码的COPY流"""
+
+    def test_rows_are_consumed_lazily(self):
+        consumed = []
+
+        def rows():
+            for i in range(1000):
+                consumed.append(i)
+                yield (i, f"name-{i}")
+
+        stream = CopyStream(rows())
+        first = stream.read(32)
+
+        assert first.startswith(b'"0","name-0"\n')
+        assert len(consumed) < 10
+
+    def test_chunked_reads_reassemble_all_rows(self):
+        stream = CopyStream((i, "x" * (i % 7)) for i in range(200))
+
+        data = b"".join(iter(lambda: stream.read(50), b""))
+
+        assert len(data.splitlines()) == stream.rows_written == 200
+
+    def test_readline_returns_one_row(self):
+        stream = CopyStream([(1, "a"), (2, "b")])
+
+        assert stream.readline() == b'"1","a"\n'
+        assert stream.readline() == b'"2","b"\n'
+        assert stream.readline() == b""
+
+
+class TestCopyFromIter:
+    """COPY导入"""
+
+    def test_generator_rows_are_streamed_with_timestamps(self):
+        session = FakeSession()
+        rows = ({"id": i, "name": f"n{i}"} for i in range(50))
+
+        assert BulkOperator.copy_from_iter(session, StampedRow, rows) == 50
+
+        (sql,) = session.raw.log
+        assert sql.startswith(
+            'COPY "stamped_rows" ("id", "name", "created_at", "updated_at") FROM STDIN'
+        )
+        (copied,) = session.raw.copied
+        assert [row[:2] for row in copied[:2]] == [["0", "n0"], ["1", "n1"]]
+        assert all(row[2] and row[2] == row[3] for row in copied)
+        assert len(session.raw.chunk_sizes) > 1  # 按块读取，而不是一次性编码
+
+    def test_empty_input_does_not_touch_the_session(self):
+        session = FakeSession()
+
+        assert BulkOperator.copy_from_iter(session, StampedRow, iter(())) == 0
+        assert session.raw.log == []
+
+    def test_copy_failure_is_raised(self):
+        session = FakeSession(fail_copy=True)
+
+        with pytest.raises(RuntimeError, match="COPY failed"):
+            BulkOperator.copy_from_iter(session, StampedRow, [{"id": 1, "name": "a"}])
+
+
+class TestBulkUpsert:
+    """临时表合并"""
+
+    def test_statements_run_in_order(self):
+        session = FakeSession()
+        rows = [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+
+        assert BulkOperator.bulk_upsert(session, StampedRow, rows, ["id"]) == 2
+
+        create_sql, copy_sql, merge_sql, drop_sql = session.raw.log
+        staging = create_sql.split('"')[1]
+        assert create_sql.startswith(f'CREATE TEMP TABLE "{staging}"')
+        assert copy_sql.startswith(f'COPY "{staging}"')
+        assert merge_sql.startswith('INSERT INTO "stamped_rows"')
+        assert '"created_at" = EXCLUDED' not in merge_sql
+        assert drop_sql == f'DROP TABLE IF EXISTS "{staging}"'
+
+    def test_copy_failure_skips_merge(self):
+        session = FakeSession(fail_copy=True)
+
+        with pytest.raises(RuntimeError):
+            BulkOperator.bulk_upsert(session, StampedRow, [{"id": 1}], ["id"])
+
+        assert len(session.raw.log) == 2
+        assert not any("INSERT INTO" in sql for sql in session.raw.log)
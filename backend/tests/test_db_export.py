@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+流式导出测试
+============
+
+- CSV / NDJSON 逐行写出，.gz 文件自动压缩，统计行数与字节数
+- ORM查询与Core查询都通过服务端游标读取
+- 异步导出逐批产出字节块，gzip流可完整解压
+- 查询失败时异常向上抛出
+"""
+
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    select,
+)
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from backend.db.utils import DataExporter, ExportStats
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "export_items"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+    created_at = Column(DateTime)
+
+
+ROWS = [
+    {"id": i, "name": f"项目,{i}", "created_at": datetime(2024, 1, 1, i % 24)}
+    for i in range(1, 26)
+]
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(Item.__table__.insert(), ROWS)
+        session.commit()
+        yield session
+
+
+@pytest_asyncio.fixture
+async def async_session():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(Item.__table__.insert(), ROWS)
+    async with AsyncSession(engine) as session:
+        yield session
+    await engine.dispose()
+
+
+def core_query():
+    table = Item.__table__
+    return select(table.c.id, table.c.name, table.c.created_at).order_by(table.c.id)
+
+
+class TestExportStream:
+    """文件导出"""
+
+    def test_csv_with_headers(self, session, tmp_path):
+        path = tmp_path / "items.csv"
+
+        stats = DataExporter.export_stream(
+            session,
+            core_query(),
+            str(path),
+            headers=["编号", "名称", "创建时间"],
+            batch_size=4,
+        )
+
+        rows = list(csv.reader(path.open(encoding="utf-8")))
+        assert rows[0] == ["编号", "名称", "创建时间"]
+        assert rows[1] == ["1", "项目,1", "2024-01-01T01:00:00"]
+        assert len(rows) == 26
+        assert stats.rows == 25
+        assert stats.bytes_written == path.stat().st_size
+
+    def test_gz_extension_compresses(self, session, tmp_path):
+        path = tmp_path / "items.ndjson.gz"
+
+        stats = DataExporter.export_stream(session, core_query(), str(path), "ndjson")
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        assert [r["id"] for r in records] == list(range(1, 26))
+        assert records[0]["name"] == "项目,1"
+        assert stats.rows == 25
+
+    def test_orm_query_rows_are_converted(self, session, tmp_path):
+        path = tmp_path / "items.ndjson"
+        query = session.query(Item).order_by(Item.id)
+
+        DataExporter.export_stream(session, query, str(path), "ndjson", batch_size=3)
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert set(records[0]) == {"id", "name", "created_at"}
+        assert len(records) == 25
+
+    def test_unknown_format_is_rejected(self, session, tmp_path):
+        with pytest.raises(ValueError):
+            DataExporter.export_stream(session, core_query(), str(tmp_path / "x"), "xml")
+
+    def test_query_error_is_raised(self, session, tmp_path):
+        missing = Table("missing_items", MetaData(), Column("id", Integer))
+
+        with pytest.raises(OperationalError):
+            DataExporter.export_stream(session, select(missing), str(tmp_path / "x.csv"))
+
+
+class TestExportToJson:
+    """JSON数组导出"""
+
+    def test_rows_form_a_json_array(self, session, tmp_path):
+        path = tmp_path / "items.json"
+
+        DataExporter.export_to_json(session, core_query(), str(path))
+
+        records = json.loads(path.read_text(encoding="utf-8"))
+        assert len(records) == 25 and records[-1]["id"] == 25
+
+    def test_empty_result_is_an_empty_array(self, session, tmp_path):
+        path = tmp_path / "empty.json"
+
+        DataExporter.export_to_json(
+            session, core_query().where(Item.__table__.c.id < 0), str(path)
+        )
+
+        assert json.loads(path.read_text()) == []
+
+
+class TestAsyncStreamExport:
+    """异步字节流导出"""
+
+    @pytest.mark.asyncio
+    async def test_yields_one_chunk_per_batch(self, async_session):
+        chunks = [
+            chunk
+            async for chunk in DataExporter.async_stream_export(
+                async_session, core_query(), batch_size=10
+            )
+        ]
+
+        lines = b"".join(chunks).decode("utf-8").splitlines()
+        assert len(chunks) == 3
+        assert [json.loads(line)["id"] for line in lines] == list(range(1, 26))
+
+    @pytest.mark.asyncio
+    async def test_gzip_stream_and_stats(self, async_session):
+        stats = ExportStats()
+        chunks = [
+            chunk
+            async for chunk in DataExporter.async_stream_export(
+                async_session, core_query(), fmt="csv", compress=True, stats=stats
+            )
+        ]
+
+        data = b"".join(chunks)
+        rows = list(csv.reader(io.StringIO(gzip.decompress(data).decode("utf-8"))))
+        assert rows[0] == ["id", "name", "created_at"]
+        assert len(rows) == 26
+        assert stats.rows == 25 and stats.bytes_written == len(data)
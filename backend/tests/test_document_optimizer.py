@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+文档检查优化器测试
+==================
+
+- 单次读取：每个文件只读取一次，所有检查共享内容；读取失败时每项检查都失败
+- 结果缓存：结果按文件哈希整体缓存，只执行缺失的检查，文件变化后重新检查
+- SQLite缓存服务：跨实例从磁盘命中，内存层LRU有界，访问时间批量写回，
+  连接失效时按未命中处理
+- 常驻进程池：每个文件的每项检查都有结果，统计按工作进程汇总
+- 失败关闭：进程池崩溃、超时或块处理失败时，未返回结果的文件记为失败，
+  CI深度检查整体不通过
+"""
+
+import os
+from concurrent.futures import Future
+
+import pytest
+
+from backend.core import document_performance_optimizer as dpo
+from backend.core.document_performance_optimizer import (
+    DocumentPerformanceOptimizer,
+    DocumentResultCache,
+)
+
+CHECKS = ["syntax", "crash"]
+GOOD_DOC = "# 标题\n\n这是一段足够长的文档内容，用于通过全部基础检查，不含待办事项。\n"
+
+
+def crash_on_marker(doc):
+    """模拟处理某个文件时工作进程崩溃"""
+    if "CRASH-WORKER" in doc.text:
+        os._exit(1)
+    return []
+
+
+class HangingPool:
+    """提交的任务永远不会完成"""
+
+    def submit(self, fn, *args):
+        return Future()
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+class FailingChunkPool:
+    """包含指定文件的块抛出异常，其余块在当前进程中执行"""
+
+    def __init__(self, optimizer, bad_file):
+        self.optimizer = optimizer
+        self.bad_file = bad_file
+
+    def submit(self, fn, files, check_types):
+        future = Future()
+        if self.bad_file in files:
+            future.set_exception(RuntimeError("chunk exploded"))
+        else:
+            future.set_result(
+                {
+                    "worker": "fake",
+                    "results": self.optimizer.check_files(files, check_types),
+                    "busy_time": 0.0,
+                    "cache_hits": 0,
+                    "cache_misses": 0,
+                }
+            )
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+@pytest.fixture
+def optimizer(tmp_path):
+    optimizer = DocumentPerformanceOptimizer(cache_dir=str(tmp_path / "cache"))
+    optimizer.checks["crash"] = crash_on_marker
+    optimizer.max_workers = 2
+    optimizer.chunks_per_worker = 2
+    optimizer.min_files_for_processes = 1
+    yield optimizer
+    optimizer.close()
+
+
+@pytest.fixture
+def docs(tmp_path):
+    files = []
+    for i in range(8):
+        path = tmp_path / f"doc{i}.md"
+        path.write_text(GOOD_DOC)
+        files.append(str(path))
+    return files
+
+
+async def collect(optimizer, files):
+    return [result async for result in optimizer.stream_deep_check(files, CHECKS)]
+
+
+def by_file(results):
+    grouped = {}
+    for result in results:
+        grouped.setdefault(result.file_path, []).append(result)
+    return grouped
+
+
+class TestCheckFiles:
+    """单次读取的多检查流水线"""
+
+    def test_each_file_is_read_once_for_all_checks(self, optimizer, docs, monkeypatch):
+        loads, seen = [], []
+        original = dpo.load_document
+
+        def counting_load(file_path):
+            loads.append(file_path)
+            return original(file_path)
+
+        monkeypatch.setattr(dpo, "load_document", counting_load)
+        optimizer.checks["probe"] = lambda doc: seen.append(doc) or []
+
+        results = optimizer.check_files(docs[:2], ["syntax", "style", "probe"])
+
+        assert loads == docs[:2]
+        assert [r.check_type for r in results] == ["syntax", "style", "probe"] * 2
+        assert [doc.file_path for doc in seen] == docs[:2]
+
+    def test_unreadable_file_fails_every_check(self, optimizer, tmp_path):
+        missing = str(tmp_path / "missing.md")
+
+        results = optimizer.check_files([missing], ["syntax", "style"])
+
+        assert [r.check_type for r in results] == ["syntax", "style"]
+        assert not any(r.passed for r in results)
+        assert all(r.issues[0].startswith("Read error") for r in results)
+        assert optimizer.cache.stats["writes"] == 0
+
+    def test_check_exception_becomes_an_issue(self, optimizer, docs):
+        def broken(doc):
+            raise RuntimeError("boom")
+
+        optimizer.checks["broken"] = broken
+
+        (result,) = optimizer.check_file(docs[0], ["broken"])
+
+        assert not result.passed
+        assert result.issues == ["Broken check error: boom"]
+
+    def test_cached_checks_are_not_rerun(self, optimizer, docs):
+        calls = []
+        optimizer.checks["probe"] = lambda doc: calls.append(doc.file_path) or []
+
+        optimizer.check_files(docs[:3], ["syntax", "probe"])
+        optimizer.check_files(docs[:3], ["syntax", "probe"])
+
+        assert calls == docs[:3]
+        assert optimizer.stats["cache_hits"] == 3
+
+        optimizer.checks["extra"] = lambda doc: ["extra issue"]
+        results = optimizer.check_file(docs[0], ["probe", "extra"])
+
+        assert calls == docs[:3]
+        assert [r.passed for r in results] == [True, False]
+
+    def test_changed_file_is_checked_again(self, optimizer, docs):
+        calls = []
+        optimizer.checks["probe"] = lambda doc: calls.append(doc.text) or []
+
+        optimizer.check_file(docs[0], ["probe"])
+        with open(docs[0], "a") as f:
+            f.write("追加内容\n")
+        optimizer.check_file(docs[0], ["probe"])
+
+        assert len(calls) == 2 and calls[1].endswith("追加内容\n")
+
+
+class TestDocumentResultCache:
+    """批量读写的SQLite结果缓存"""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        return tmp_path / "results.db"
+
+    def test_results_persist_across_instances(self, db_path):
+        first = DocumentResultCache(db_path)
+        first.put_many([("a.md", "h1", {"syntax": {"passed": True, "issues": []}})])
+        first.close()
+
+        second = DocumentResultCache(db_path)
+        found = second.get_many([("a.md", "h1"), ("b.md", "h1")])
+        stale = second.get_many([("a.md", "h2")])
+        second.close()
+
+        assert found == {"a.md": {"syntax": {"passed": True, "issues": []}}}
+        assert stale == {}
+        assert second.stats["disk_hits"] == 1 and second.stats["misses"] == 2
+
+    def test_uses_wal_journal(self, db_path):
+        cache = DocumentResultCache(db_path)
+
+        mode = cache._connection().execute("PRAGMA journal_mode").fetchone()[0]
+        cache.close()
+
+        assert mode == "wal"
+
+    def test_memory_layer_is_bounded_lru(self, db_path):
+        cache = DocumentResultCache(db_path, max_memory_entries=2)
+        cache.put_many([(f"{n}.md", "h", {"n": n}) for n in range(3)])
+
+        cache.get_many([("1.md", "h")])
+        cache.put_many([("3.md", "h", {"n": 3})])
+
+        assert list(cache._memory) == ["1.md:h", "3.md:h"]
+        assert cache.get_many([("0.md", "h")]) == {"0.md": {"n": 0}}
+        assert cache.stats["disk_hits"] == 1
+        cache.close()
+
+    def test_access_times_are_flushed_in_batches(self, db_path):
+        cache = DocumentResultCache(db_path, batch_size=3)
+        cache.put_many([(f"{n}.md", "h", {}) for n in range(3)])
+        with cache._connection() as conn:
+            conn.execute("UPDATE file_cache SET accessed_at = '2000-01-01 00:00:00'")
+
+        cache.get_many([("0.md", "h"), ("1.md", "h")])
+        assert cache.get_stats()["pending_touches"] == 2
+
+        cache.get_many([("2.md", "h")])
+        rows = dict(
+            cache._connection().execute("SELECT file_path, accessed_at FROM file_cache")
+        )
+
+        assert cache.get_stats()["pending_touches"] == 0
+        assert all(not stamp.startswith("2000") for stamp in rows.values())
+        assert cache.cleanup(max_age_hours=1) == 0
+        cache.close()
+
+    def test_cleanup_removes_stale_entries(self, db_path):
+        cache = DocumentResultCache(db_path)
+        cache.put_many([("old.md", "h", {}), ("new.md", "h", {})])
+        with cache._connection() as conn:
+            conn.execute(
+                "UPDATE file_cache SET accessed_at = '2000-01-01 00:00:00' "
+                "WHERE file_path = 'old.md'"
+            )
+
+        assert cache.cleanup(max_age_hours=1) == 1
+        assert cache.get_many([("old.md", "h"), ("new.md", "h")]) == {"new.md": {}}
+        cache.close()
+
+    def test_broken_connection_reads_as_miss(self, db_path):
+        cache = DocumentResultCache(db_path)
+        cache.put_many([("a.md", "h", {})])
+        cache._memory.clear()
+        cache._conn.close()
+
+        assert cache.get_many([("a.md", "h")]) == {}
+        assert cache.stats["misses"] == 1
+
+        cache._conn = None
+        assert cache.get_many([("a.md", "h")]) == {"a.md": {}}
+        cache.close()
+
+
+class TestStreamDeepCheck:
+    """进程池流式检查"""
+
+    @pytest.mark.asyncio
+    async def test_every_file_gets_every_check(self, optimizer, docs):
+        results = by_file(await collect(optimizer, docs))
+
+        assert set(results) == set(docs)
+        assert all(len(checks) == len(CHECKS) for checks in results.values())
+        assert all(r.passed for checks in results.values() for r in checks)
+        worker_stats = optimizer.last_worker_stats["workers"]
+        assert sum(stats["files"] for stats in worker_stats.values()) == len(docs)
+
+    @pytest.mark.asyncio
+    async def test_pool_crash_fails_unfinished_files(self, optimizer, docs):
+        with open(docs[0], "a") as f:
+            f.write("CRASH-WORKER\n")
+
+        results = by_file(await collect(optimizer, docs))
+
+        assert set(results) == set(docs)
+        assert not any(r.passed for r in results[docs[0]])
+        assert "worker pool crashed" in results[docs[0]][0].issues[0]
+        assert optimizer._process_pool is None
+
+    @pytest.mark.asyncio
+    async def test_timeout_fails_all_pending_files(self, optimizer, docs, monkeypatch):
+        monkeypatch.setattr(optimizer, "_get_process_pool", lambda: HangingPool())
+        optimizer.ci_timeout = 0.05
+
+        results = await collect(optimizer, docs)
+
+        assert len(results) == len(docs) * len(CHECKS)
+        assert not any(r.passed for r in results)
+        assert all("timed out" in r.issues[0] for r in results)
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_only_fails_its_files(self, optimizer, docs, monkeypatch):
+        pool = FailingChunkPool(optimizer, docs[3])
+        monkeypatch.setattr(optimizer, "_get_process_pool", lambda: pool)
+
+        results = by_file(await collect(optimizer, docs))
+
+        failed = {path for path, checks in results.items() if not checks[0].passed}
+        assert set(results) == set(docs)
+        assert docs[3] in failed and len(failed) < len(docs)
+        assert "chunk exploded" in results[docs[3]][0].issues[0]
+
+
+class TestCiDeepCheck:
+    """CI深度检查结论"""
+
+    @pytest.mark.asyncio
+    async def test_unfinished_files_fail_the_run(self, optimizer, docs, monkeypatch):
+        monkeypatch.setattr(optimizer, "_get_process_pool", lambda: HangingPool())
+        optimizer.ci_timeout = 0.05
+
+        passed, metrics = await optimizer.ci_deep_check(docs)
+
+        assert not passed
+        assert metrics.files_processed == len(docs)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+JWT已验证声明缓存测试
+====================
+
+使用fakeredis验证auth-service JWTTokenManager的声明缓存：
+- 命中缓存时跳过Redis撤销查询
+- 本实例撤销、其他实例广播的撤销事件都会立即失效缓存
+- 撤销订阅未连通、查询期间发生撤销时不缓存
+"""
+
+import asyncio
+import secrets
+import time
+from unittest.mock import patch
+
+import jwt
+import pytest
+import pytest_asyncio
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.services import jwt_service as jwt_module
+from app.services.jwt_service import JWTTokenManager
+
+
+@pytest_asyncio.fixture
+async def redis_client():
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    yield client
+    await client.flushall()
+
+
+def make_manager(redis_client) -> JWTTokenManager:
+    with patch.object(jwt_module.redis.Redis, "from_url", return_value=redis_client):
+        manager = JWTTokenManager()
+    manager.algorithm = "RS256"
+    return manager
+
+
+@pytest_asyncio.fixture
+async def manager(redis_client):
+    manager = make_manager(redis_client)
+    await manager.rotate_keys()
+    # 默认不启动订阅，直接视为已连通；订阅本身由单独的用例覆盖
+    manager._events_task = asyncio.get_running_loop().create_future()
+    manager._events_live = True
+    yield manager
+    manager._events_task = None
+    await manager.close()
+
+
+async def issue_token(manager, redis_client, user_id="user-1") -> tuple:
+    """签发一个访问令牌并写入其元数据，返回 (token, jti)"""
+    jti = secrets.token_urlsafe(16)
+    now = int(time.time())
+    payload = {
+        "iss": manager.issuer,
+        "aud": manager.audience,
+        "sub": user_id,
+        "iat": now,
+        "exp": now + 600,
+        "jti": jti,
+        "token_type": "access",
+    }
+    token = jwt.encode(
+        payload,
+        await manager._get_current_private_key(),
+        algorithm=manager.algorithm,
+        headers={"kid": await manager._get_current_key_id()},
+    )
+    await redis_client.hset(f"token_metadata:{jti}", mapping={"active": "true"})
+    return token, jti
+
+
+class TestClaimsCache:
+    """声明缓存命中与失效"""
+
+    @pytest.mark.asyncio
+    async def test_second_validation_skips_redis(self, manager, redis_client):
+        token, jti = await issue_token(manager, redis_client)
+        assert (await manager.validate_token(token)).valid
+
+        await redis_client.delete(f"token_metadata:{jti}")
+        result = await manager.validate_token(token)
+
+        assert result.valid
+        assert manager.cache_stats["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_local_revoke_invalidates(self, manager, redis_client):
+        token, jti = await issue_token(manager, redis_client)
+        await manager.validate_token(token)
+
+        await manager.revoke_token(jti)
+        result = await manager.validate_token(token)
+
+        assert not result.valid
+        assert result.error == "Token has been revoked"
+        assert manager.cache_stats["invalidations"] == 1
+
+    @pytest.mark.asyncio
+    async def test_remote_revoke_event_invalidates(self, manager, redis_client):
+        token, jti = await issue_token(manager, redis_client)
+        await manager.validate_token(token)
+
+        # 其他实例写入黑名单并广播撤销事件
+        await redis_client.sadd("token_blacklist", jti)
+        manager._handle_event({"type": "revoked", "jti": jti})
+
+        assert not (await manager.validate_token(token)).valid
+
+    @pytest.mark.asyncio
+    async def test_not_cached_while_subscription_down(self, manager, redis_client):
+        manager._events_live = False
+        token, _ = await issue_token(manager, redis_client)
+
+        await manager.validate_token(token)
+        await manager.validate_token(token)
+
+        assert manager._claims_cache == {}
+        assert manager.cache_stats["hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_revocation_during_lookup_is_not_cached(self, manager, redis_client):
+        token, _ = await issue_token(manager, redis_client)
+        lookup = manager._get_revocation_states
+
+        async def racing_lookup(jtis):
+            states = await lookup(jtis)
+            manager._invalidate_jti("some-other-token")
+            return states
+
+        with patch.object(manager, "_get_revocation_states", racing_lookup):
+            assert (await manager.validate_token(token)).valid
+
+        assert manager._claims_cache == {}
+
+
+class TestRevocationEvents:
+    """通过Redis订阅接收其他实例的撤销事件"""
+
+    @pytest.mark.asyncio
+    async def test_published_revocation_reaches_other_instance(self, redis_client):
+        issuer = make_manager(redis_client)
+        await issuer.rotate_keys()
+        validator = make_manager(redis_client)
+        token, jti = await issue_token(issuer, redis_client)
+
+        await validator.validate_token(token)  # 启动订阅
+        for _ in range(100):
+            if validator._events_live:
+                break
+            await asyncio.sleep(0.01)
+        assert validator._events_live
+        await validator.validate_token(token)
+        assert validator._claims_cache
+
+        await issuer.revoke_token(jti)
+        for _ in range(100):
+            if not validator._claims_cache:
+                break
+            await asyncio.sleep(0.01)
+
+        assert not (await validator.validate_token(token)).valid
+        await validator.close()
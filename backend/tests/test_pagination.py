@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+键集分页工具测试
+================
+
+backend.pagination 不依赖数据库配置即可导入；
+在SQLite上验证游标翻页无重复、无遗漏，包括可空列和混合排序方向。
+"""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from backend.pagination import (
+    CursorError,
+    KeysetColumn,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+    keyset_order_by,
+    keyset_page_info,
+)
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "keyset_rows"
+
+    id = Column(Integer, primary_key=True)
+    updated_at = Column(DateTime, nullable=False)
+    due_date = Column(DateTime, nullable=True)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    start = datetime(2024, 1, 1)
+    with Session(engine) as session:
+        session.add_all(
+            Row(
+                id=i,
+                updated_at=start + timedelta(hours=i % 4),
+                due_date=None if i % 3 == 0 else start + timedelta(days=i % 5),
+            )
+            for i in range(1, 31)
+        )
+        session.commit()
+        yield session
+
+
+def collect_pages(session, columns, per_page=7):
+    """逐页翻到底，返回按页拼接的ID"""
+    seen, cursor = [], None
+    while True:
+        query = session.query(Row)
+        if cursor:
+            values = decode_cursor(cursor, "test", len(columns))
+            query = query.filter(keyset_filter(columns, values))
+        rows = query.order_by(*keyset_order_by(columns)).limit(per_page + 1).all()
+        items, info = keyset_page_info(rows, columns, "test", per_page)
+        seen.extend(row.id for row in items)
+        if not info["has_next"]:
+            return seen
+        cursor = info["next_cursor"]
+
+
+class TestCursor:
+    """游标编解码"""
+
+    def test_round_trip_preserves_types(self):
+        values = [datetime(2024, 5, 1, 12), uuid4(), Decimal("1.50"), None, 3]
+
+        cursor = encode_cursor("recent", values)
+
+        assert decode_cursor(cursor, "recent", len(values)) == values
+
+    def test_rejects_other_sort_and_garbage(self):
+        cursor = encode_cursor("recent", [1, 2])
+
+        with pytest.raises(CursorError):
+            decode_cursor(cursor, "due_date", 2)
+        with pytest.raises(CursorError):
+            decode_cursor(cursor, "recent", 3)
+        with pytest.raises(CursorError):
+            decode_cursor("not-a-cursor", "recent", 2)
+
+
+class TestKeysetPaging:
+    """翻页结果与一次性排序一致"""
+
+    @pytest.mark.parametrize("descending", [True, False])
+    def test_pages_cover_all_rows_in_order(self, session, descending):
+        columns = [
+            KeysetColumn(Row.updated_at, "updated_at", descending=descending),
+            KeysetColumn(Row.id, "id", descending=descending),
+        ]
+        expected = [
+            row.id
+            for row in session.query(Row).order_by(*keyset_order_by(columns)).all()
+        ]
+
+        assert collect_pages(session, columns) == expected
+        assert len(expected) == 30
+
+    def test_nullable_column_sorts_nulls_last(self, session):
+        columns = [
+            KeysetColumn(Row.due_date, "due_date", nullable=True),
+            KeysetColumn(Row.id, "id"),
+        ]
+
+        seen = collect_pages(session, columns, per_page=4)
+
+        assert sorted(seen) == list(range(1, 31))
+        nulls = [row_id for row_id in seen if row_id % 3 == 0]
+        assert seen[-len(nulls) :] == nulls
+
+    def test_mixed_directions(self, session):
+        columns = [
+            KeysetColumn(Row.updated_at, "updated_at", descending=True),
+            KeysetColumn(Row.id, "id"),
+        ]
+        expected = [
+            row.id
+            for row in session.query(Row).order_by(Row.updated_at.desc(), Row.id)
+        ]
+
+        assert collect_pages(session, columns, per_page=5) == expected
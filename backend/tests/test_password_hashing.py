@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+密码哈希执行器测试
+==================
+
+- PasswordHashExecutor：待处理任务达到上限时拒绝，完成或失败后释放名额
+- 历史密码复用检查：哈希队列过载时不能放行
+"""
+
+import asyncio
+import threading
+from unittest.mock import patch
+
+import bcrypt
+import pytest
+import pytest_asyncio
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.core.hashing import HashingOverloadedError, PasswordHashExecutor
+from app.services import password_service as password_module
+from app.services.password_service import PasswordService
+
+
+class TestPasswordHashExecutor:
+    """准入控制与指标"""
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_pending_limit_reached(self):
+        executor = PasswordHashExecutor(max_workers=1, max_pending=2)
+        release = threading.Event()
+
+        blocked = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(HashingOverloadedError):
+            await executor.run(lambda: None)
+
+        release.set()
+        assert await asyncio.gather(*blocked) == [True, True]
+        assert await executor.run(lambda: "ok") == "ok"
+
+        metrics = executor.get_metrics()
+        assert metrics["pending"] == 0
+        assert metrics["peak_pending"] == 2
+        assert metrics["rejected"] == 1
+        assert metrics["completed"] == 3
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_failed_job_releases_slot(self):
+        executor = PasswordHashExecutor(max_workers=1, max_pending=1)
+
+        def boom():
+            raise ValueError("bad hash")
+
+        with pytest.raises(ValueError):
+            await executor.run(boom)
+        assert await executor.run(lambda: 1) == 1
+
+        metrics = executor.get_metrics()
+        assert (metrics["pending"], metrics["failed"], metrics["completed"]) == (0, 1, 1)
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_hash_and_check_round_trip(self):
+        executor = PasswordHashExecutor(max_workers=2)
+
+        hashed = await executor.hashpw(b"secret", rounds=4)
+
+        assert await executor.checkpw(b"secret", hashed) is True
+        assert await executor.checkpw(b"other", hashed) is False
+        executor.shutdown()
+
+
+@pytest_asyncio.fixture
+async def password_service():
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    with patch.object(password_module.redis.Redis, "from_url", return_value=client):
+        service = PasswordService()
+    yield service
+    service.hasher.shutdown()
+    await client.flushall()
+
+
+async def store_history(service, user_id, *passwords):
+    for password in passwords:
+        hashed = bcrypt.hashpw(password.encode() + service.pepper, bcrypt.gensalt(4))
+        await service.store_password_history(user_id, hashed.decode())
+
+
+class TestPasswordReuse:
+    """历史密码复用检查"""
+
+    @pytest.mark.asyncio
+    async def test_detects_reused_password(self, password_service):
+        await store_history(password_service, "user-1", "Old#Pass1", "Old#Pass2")
+
+        assert await password_service.check_password_reuse("user-1", "Old#Pass2")
+        assert not await password_service.check_password_reuse("user-1", "New#Pass3")
+
+    @pytest.mark.asyncio
+    async def test_overload_is_not_treated_as_no_match(self, password_service):
+        await store_history(password_service, "user-1", "Old#Pass1", "Old#Pass2")
+        password_service.hasher.max_pending = 1
+
+        with pytest.raises(HashingOverloadedError):
+            await password_service.check_password_reuse("user-1", "New#Pass3")
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+性能仪表板测试
+==============
+
+- 指标历史：环形缓冲区窗口、过期和降采样层
+- 增量广播：客户端按消息顺序合并状态，必须始终与服务端快照一致
+- WebSocket消息解析：格式错误的ack不会断开连接
+"""
+
+import json
+import struct
+
+import numpy as np
+import pytest
+
+from backend.core.performance_dashboard import (
+    DashboardClient,
+    MetricHistory,
+    PerformanceDashboard,
+)
+
+
+class FakeWebSocket:
+    """记录发送的消息，并像仪表板前端一样合并关键帧和增量"""
+
+    def __init__(self):
+        self.messages = []
+        self.metrics = {}
+        self.seq = 0
+
+    async def send_text(self, message: str):
+        data = json.loads(message)
+        self.messages.append(data)
+        if data["type"] == "metrics_update":
+            self.metrics = dict(data["metrics"])
+        else:
+            assert data["base"] == self.seq, "增量基准必须是上一条消息的快照"
+            self.metrics.update(data["metrics"])
+            for name in data.get("removed", []):
+                self.metrics.pop(name, None)
+        self.seq = data["seq"]
+
+    def values(self):
+        return {name: entry["value"] for name, entry in self.metrics.items()}
+
+
+@pytest.fixture
+def dashboard():
+    return PerformanceDashboard("test")
+
+
+def connect(dashboard, categories=None) -> FakeWebSocket:
+    websocket = FakeWebSocket()
+    dashboard.websocket_manager.clients[websocket] = DashboardClient(websocket)
+    dashboard.websocket_manager.subscribe(websocket, categories)
+    return websocket
+
+
+class TestMetricHistory:
+    """环形缓冲区与降采样层"""
+
+    def test_window_wraps_in_time_order(self):
+        history = MetricHistory(capacity=5, tiers=())
+        for t in range(7):
+            history.append(float(t), t * 10.0)
+
+        timestamps, values = history.window()
+
+        assert len(history) == 5
+        assert timestamps.tolist() == [2, 3, 4, 5, 6]
+        assert values.tolist() == [20, 30, 40, 50, 60]
+        assert history.window(last=2)[1].tolist() == [50, 60]
+        assert history.window(since=4.5)[0].tolist() == [5, 6]
+
+    def test_expire_across_wrap(self):
+        history = MetricHistory(capacity=4, tiers=())
+        for t in range(6):
+            history.append(float(t), float(t))
+
+        history.expire(cutoff=4)
+
+        assert history.window()[0].tolist() == [4, 5]
+        history.append(6.0, 6.0)
+        assert history.window()[0].tolist() == [4, 5, 6]
+
+    def test_stats(self):
+        history = MetricHistory(tiers=())
+        for t in range(11):
+            history.append(100.0 + t, 2.0 * t)
+
+        stats = history.stats(since=105)
+
+        assert stats["count"] == 6
+        assert (stats["min"], stats["max"], stats["mean"]) == (10, 20, 15)
+        assert stats["slope_per_second"] == pytest.approx(2.0)
+        assert history.stats(since=1000) == {"count": 0}
+        assert history.trend(last=5) == pytest.approx((20 - 12) / 5)
+
+    def test_tier_aggregates_buckets(self):
+        history = MetricHistory(capacity=10, tiers=((60, 4),))
+        for timestamp, value in [(0, 1), (30, 5), (59, 3), (60, 7)]:
+            history.append(float(timestamp), float(value))
+
+        series = history.series(resolution=60)
+
+        assert series["timestamps"].tolist() == [0, 60]
+        assert series["min"].tolist() == [1, 7]
+        assert series["max"].tolist() == [5, 7]
+        assert series["mean"].tolist() == [3, 7]
+        assert series["last"].tolist() == [3, 7]
+        assert history.series(since=61, resolution=60)["timestamps"].tolist() == [60]
+
+    def test_tier_keeps_latest_buckets(self):
+        history = MetricHistory(capacity=10, tiers=((60, 2),))
+        for timestamp, value in [(0, 1), (30, 5), (60, 7), (150, 2)]:
+            history.append(float(timestamp), float(value))
+
+        series = history.series(resolution=60)
+
+        assert series["timestamps"].tolist() == [60, 120]
+        assert series["last"].tolist() == [7, 2]
+
+    def test_series_picks_finest_sufficient_tier(self):
+        history = MetricHistory(tiers=((60, 10), (3600, 10)))
+        history.append(0.0, 1.0)
+
+        assert "min" in history.series(resolution=30)
+        assert history.series(resolution=600)["timestamps"].tolist() == [0]
+        assert history.series(resolution=86400)["timestamps"].tolist() == [0]
+        assert set(history.series()) == {"timestamps", "values"}
+
+    def test_binary_payload_round_trip(self, dashboard):
+        dashboard._update_metric("cpu", 10, "%", "system")
+        dashboard._update_metric("cpu", 20, "%", "system")
+
+        payload = dashboard._binary_metrics(since=None, resolution=0)
+
+        (header_length,) = struct.unpack_from("<I", payload)
+        header = json.loads(payload[4 : 4 + header_length])
+        (entry,) = header["metrics"]
+        assert entry["columns"] == ["timestamps", "values"]
+        columns = np.frombuffer(payload[4 + header_length :], dtype="<f8")
+        assert columns.reshape(2, entry["length"])[1].tolist() == [10, 20]
+
+
+class TestDeltaBroadcast:
+    """增量广播协议"""
+
+    @pytest.mark.asyncio
+    async def test_first_message_is_keyframe(self, dashboard):
+        dashboard._update_metric("cpu", 10, "%", "system")
+        websocket = connect(dashboard)
+
+        await dashboard._broadcast_tick()
+
+        assert websocket.messages[0]["type"] == "metrics_update"
+        assert websocket.values() == {"cpu": 10}
+
+    @pytest.mark.asyncio
+    async def test_unchanged_snapshot_sends_nothing(self, dashboard):
+        dashboard._update_metric("cpu", 10, "%", "system")
+        websocket = connect(dashboard)
+        await dashboard._broadcast_tick()
+
+        await dashboard._broadcast_tick()
+
+        assert len(websocket.messages) == 1
+        assert dashboard.broadcast_stats["skipped_ticks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_value_reverting_before_ack_is_resent(self, dashboard):
+        dashboard._update_metric("cpu", 10, "%", "system")
+        websocket = connect(dashboard)
+        await dashboard._broadcast_tick()
+        dashboard.websocket_manager.ack(websocket, websocket.seq)
+
+        # 变化后在客户端确认之前恢复原值
+        dashboard._update_metric("cpu", 90, "%", "system")
+        await dashboard._broadcast_tick()
+        dashboard._update_metric("cpu", 10, "%", "system")
+        await dashboard._broadcast_tick()
+
+        assert [m["type"] for m in websocket.messages] == [
+            "metrics_update",
+            "metrics_delta",
+            "metrics_delta",
+        ]
+        assert websocket.values() == {"cpu": 10}
+
+    @pytest.mark.asyncio
+    async def test_delta_contains_only_changed_metrics(self, dashboard):
+        dashboard._update_metric("cpu", 10, "%", "system")
+        dashboard._update_metric("hit_rate", 80, "%", "cache")
+        websocket = connect(dashboard)
+        await dashboard._broadcast_tick()
+
+        dashboard._update_metric("cpu", 20, "%", "system")
+        await dashboard._broadcast_tick()
+
+        assert list(websocket.messages[-1]["metrics"]) == ["cpu"]
+        assert websocket.values() == {"cpu": 20, "hit_rate": 80}
+
+    @pytest.mark.asyncio
+    async def test_subscription_filters_metrics(self, dashboard):
+        dashboard._update_metric("cpu", 10, "%", "system")
+        dashboard._update_metric("hit_rate", 80, "%", "cache")
+        websocket = connect(dashboard, ["cache"])
+        await dashboard._broadcast_tick()
+
+        dashboard._update_metric("cpu", 20, "%", "system")
+        await dashboard._broadcast_tick()
+        dashboard._update_metric("hit_rate", 85, "%", "cache")
+        await dashboard._broadcast_tick()
+
+        assert len(websocket.messages) == 2
+        assert websocket.values() == {"hit_rate": 85}
+
+    @pytest.mark.asyncio
+    async def test_keyframe_after_interval_and_resync(self, dashboard):
+        dashboard.keyframe_interval = 3
+        websocket = connect(dashboard)
+        for value in range(5):
+            dashboard._update_metric("cpu", value, "%", "system")
+            await dashboard._broadcast_tick()
+
+        types = [m["type"] for m in websocket.messages]
+        assert types.count("metrics_update") == 2
+        assert websocket.values() == {"cpu": 4}
+
+        dashboard.websocket_manager.resync(websocket)
+        await dashboard._broadcast_tick()
+        assert websocket.messages[-1]["type"] == "metrics_update"
+
+
+class TestWebSocketMessages:
+    """客户端消息解析"""
+
+    def test_malformed_ack_is_ignored(self, dashboard):
+        from fastapi.testclient import TestClient
+
+        client = TestClient(dashboard.app)
+        with client.websocket_connect("/ws") as websocket:
+            websocket.send_text(json.dumps({"type": "ack", "seq": "abc"}))
+            websocket.send_text(json.dumps({"type": "ack", "seq": None}))
+            websocket.send_text(json.dumps({"type": "ack", "seq": [1]}))
+            websocket.send_text(json.dumps({"type": "ack", "seq": 7}))
+            websocket.send_text(json.dumps({"type": "subscribe", "categories": ["x"]}))
+            websocket.close()
+
+        assert not dashboard.websocket_manager.clients
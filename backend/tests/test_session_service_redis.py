@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+会话服务Redis存储测试
+====================
+
+使用fakeredis（含Lua支持）验证auth-service会话服务的存储行为：
+- 校验脚本的读取、校验与活动时间更新
+- 刷新与活动更新时续期用户会话集合（全部登出不能遗漏会话）
+- 旧版JSON字符串会话在读取或清理时迁移为哈希结构
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from app.services import session_service as session_module
+from app.services.session_service import (
+    SessionInfo,
+    SessionService,
+    SessionStatus,
+    SessionType,
+)
+
+
+def make_session(user_id="user-1", session_id="sess-1", **overrides) -> SessionInfo:
+    now = datetime.utcnow()
+    fields = dict(
+        session_id=session_id,
+        user_id=user_id,
+        device_fingerprint="fp",
+        ip_address="10.0.0.1",
+        user_agent="pytest",
+        session_type=SessionType.WEB,
+        created_at=now,
+        last_activity_at=now - timedelta(minutes=5),
+        expires_at=now + timedelta(minutes=30),
+        status=SessionStatus.ACTIVE,
+    )
+    fields.update(overrides)
+    return SessionInfo(**fields)
+
+
+@pytest_asyncio.fixture
+async def redis_client():
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    yield client
+    await client.flushall()
+
+
+@pytest_asyncio.fixture
+async def service(redis_client):
+    redis_cls = session_module.redis.Redis
+    with patch.object(redis_cls, "from_url", return_value=redis_client):
+        service = SessionService()
+    yield service
+    await service._flush_history()
+
+
+class TestValidateAndTouchScript:
+    """校验脚本：一次往返完成读取、校验和活动时间更新"""
+
+    @pytest.mark.asyncio
+    async def test_touches_when_interval_elapsed(self, service, redis_client):
+        await service._store_session(make_session())
+
+        touched, recent, info = await service._fetch_and_touch(
+            "sess-1", "10.0.0.1", "pytest"
+        )
+
+        assert touched is True
+        assert recent == 0
+        assert info.user_id == "user-1"
+        stored_ts = float(await redis_client.hget("session:sess-1", "last_activity_ts"))
+        assert stored_ts == pytest.approx(time.time(), abs=5)
+
+    @pytest.mark.asyncio
+    async def test_does_not_touch_on_ip_change(self, service, redis_client):
+        await service._store_session(make_session())
+        before = await redis_client.hget("session:sess-1", "last_activity_ts")
+
+        touched, _, info = await service._fetch_and_touch(
+            "sess-1", "10.9.9.9", "pytest"
+        )
+
+        assert touched is False
+        assert info is not None
+        assert await redis_client.hget("session:sess-1", "last_activity_ts") == before
+
+    @pytest.mark.asyncio
+    async def test_touches_without_ip(self, service, redis_client):
+        await service._store_session(make_session())
+
+        touched, _, _ = await service._fetch_and_touch("sess-1")
+
+        assert touched is True
+        stored_ts = float(await redis_client.hget("session:sess-1", "last_activity_ts"))
+        assert stored_ts == pytest.approx(time.time(), abs=5)
+
+    @pytest.mark.asyncio
+    async def test_missing_session_returns_none(self, service):
+        assert await service._fetch_and_touch("missing", "10.0.0.1") == (False, 0, None)
+
+
+class TestValidateSession:
+    """校验通过时总会更新活动时间"""
+
+    @pytest.mark.asyncio
+    async def test_validation_without_ip_updates_activity(self, service, redis_client):
+        await service._store_session(make_session())
+
+        result = await service.validate_session("sess-1")
+
+        assert result.is_valid
+        stored_ts = float(await redis_client.hget("session:sess-1", "last_activity_ts"))
+        assert stored_ts == pytest.approx(time.time(), abs=5)
+
+
+class TestUserSessionIndex:
+    """刷新和活动更新后，全部登出仍能找到会话"""
+
+    @pytest.mark.asyncio
+    async def test_refresh_reindexes_session(self, service, redis_client):
+        await service._store_session(make_session())
+        await redis_client.delete("user_sessions:user-1")  # 集合先于会话过期
+
+        await service.refresh_session("sess-1")
+
+        assert await redis_client.smembers("user_sessions:user-1") == {"sess-1"}
+        assert await redis_client.ttl("user_sessions:user-1") > 0
+        assert await service.terminate_all_user_sessions("user-1") == 1
+        assert await redis_client.hget("session:sess-1", "status") == "terminated"
+
+    @pytest.mark.asyncio
+    async def test_activity_update_reindexes_session(self, service, redis_client):
+        await service._store_session(make_session())
+        await redis_client.delete("user_sessions:user-1")
+
+        await service._update_session_activity("sess-1", "user-1", "10.0.0.2")
+
+        assert await redis_client.hget("session:sess-1", "ip_address") == "10.0.0.2"
+        assert await redis_client.smembers("user_sessions:user-1") == {"sess-1"}
+        assert await redis_client.ttl("user_sessions:user-1") > 0
+
+    @pytest.mark.asyncio
+    async def test_activity_update_skips_terminated_and_missing(
+        self, service, redis_client
+    ):
+        await service._store_session(make_session(status=SessionStatus.TERMINATED))
+
+        await service._update_session_activity("sess-1", "user-1", "10.0.0.2")
+        await service._update_session_activity("gone", "user-1", "10.0.0.2")
+
+        assert await redis_client.smembers("user_sessions:user-1") == set()
+        assert not await redis_client.exists("session:gone")
+
+
+class TestLegacySessionMigration:
+    """旧版JSON字符串会话在读取或清理时迁移，而不是被删除"""
+
+    @staticmethod
+    def legacy_payload(session_info: SessionInfo) -> str:
+        return json.dumps(
+            {
+                "session_id": session_info.session_id,
+                "user_id": session_info.user_id,
+                "device_fingerprint": session_info.device_fingerprint,
+                "ip_address": session_info.ip_address,
+                "user_agent": session_info.user_agent,
+                "session_type": session_info.session_type.value,
+                "created_at": session_info.created_at.isoformat(),
+                "last_activity_at": session_info.last_activity_at.isoformat(),
+                "expires_at": session_info.expires_at.isoformat(),
+                "status": session_info.status.value,
+                "location": {"country": "CN"},
+                "security_flags": [],
+                "metadata": {},
+            }
+        )
+
+    @pytest.mark.asyncio
+    async def test_active_legacy_session_is_migrated(self, service, redis_client):
+        await redis_client.set(
+            "session:sess-1", self.legacy_payload(make_session()), ex=1200
+        )
+
+        cleaned = await service._cleanup_batch(["session:sess-1"], time.time())
+
+        assert cleaned == 0
+        assert await redis_client.type("session:sess-1") == "hash"
+        assert 0 < await redis_client.ttl("session:sess-1") <= 1200
+        assert await redis_client.smembers("user_sessions:user-1") == {"sess-1"}
+        info = await service._get_session("sess-1")
+        assert info.location == {"country": "CN"}
+        assert info.status == SessionStatus.ACTIVE
+
+    @pytest.mark.asyncio
+    async def test_expired_legacy_session_is_migrated_then_terminated(
+        self, service, redis_client
+    ):
+        expired = make_session(expires_at=datetime.utcnow() - timedelta(minutes=1))
+        await redis_client.set("session:sess-1", self.legacy_payload(expired), ex=600)
+
+        cleaned = await service._cleanup_batch(["session:sess-1"], time.time())
+
+        assert cleaned == 1
+        assert await redis_client.hget("session:sess-1", "status") == "terminated"
+        assert await redis_client.smembers("user_sessions:user-1") == set()
+
+    @pytest.mark.asyncio
+    async def test_corrupt_legacy_session_is_deleted(self, service, redis_client):
+        await redis_client.set("session:bad", "not-json", ex=600)
+
+        cleaned = await service._cleanup_batch(["session:bad"], time.time())
+
+        assert cleaned == 1
+        assert not await redis_client.exists("session:bad")
+
+    @pytest.mark.asyncio
+    async def test_validation_migrates_legacy_session(self, service, redis_client):
+        await redis_client.set(
+            "session:sess-1", self.legacy_payload(make_session()), ex=1200
+        )
+
+        result = await service.validate_session("sess-1", "10.0.0.1")
+
+        assert result.is_valid
+        assert await redis_client.type("session:sess-1") == "hash"
+        assert await redis_client.smembers("user_sessions:user-1") == {"sess-1"}
+        stored_ts = float(await redis_client.hget("session:sess-1", "last_activity_ts"))
+        assert stored_ts == pytest.approx(time.time(), abs=5)
+
+    @pytest.mark.asyncio
+    async def test_get_session_migrates_legacy_session(self, service, redis_client):
+        await redis_client.set(
+            "session:sess-1", self.legacy_payload(make_session()), ex=1200
+        )
+
+        info = await service._get_session("sess-1")
+
+        assert info.session_id == "sess-1"
+        assert await redis_client.type("session:sess-1") == "hash"
+
+    @pytest.mark.asyncio
+    async def test_corrupt_legacy_session_reads_as_missing(self, service, redis_client):
+        await redis_client.set("session:bad", "not-json", ex=600)
+
+        assert await service._fetch_and_touch("bad", "10.0.0.1") == (False, 0, None)
+        assert not await redis_client.exists("session:bad")
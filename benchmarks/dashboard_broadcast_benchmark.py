@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+仪表板广播基准测试
+==================
+
+模拟500个性能仪表板WebSocket客户端，对比两种广播方式的带宽和CPU开销：
+
+- 全量广播（原实现）：每秒序列化完整的 system_status + 全部指标，逐个发送给所有客户端
+- 增量广播：按订阅分类过滤，只发送相对已确认快照的变化，定期发送关键帧，
+  每个订阅组只序列化一次，没有变化的tick直接跳过
+
+指标每 --collect-every 个tick采集一次（与仪表板3秒采集、1秒广播的节奏一致），
+每次采集只有部分指标发生变化。
+
+用法:
+    python benchmarks/dashboard_broadcast_benchmark.py
+    python benchmarks/dashboard_broadcast_benchmark.py --clients 500 --ticks 600 --change-ratio 0.3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.performance_dashboard import PerformanceDashboard
+
+CATEGORIES = ["system", "network", "process", "cache", "database", "async", "loadbalancer", "api"]
+
+
+class SimulatedClient:
+    """模拟的仪表板客户端：统计收到的字节数，按协议应用消息并确认快照"""
+
+    # 同一tick内相同的消息只解析一次，避免把客户端解析开销计入服务端CPU
+    parsed = {}
+
+    def __init__(self, manager, ack: bool):
+        self.manager = manager
+        self.ack = ack
+        self.bytes_received = 0
+        self.metrics = {}
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        self.bytes_received += len(message)
+        data = self.parsed.get(message)
+        if data is None:
+            data = self.parsed[message] = json.loads(message)
+        if data["type"] == "metrics_update":
+            self.metrics = dict(data["metrics"])
+        elif data["type"] == "metrics_delta":
+            self.metrics.update(data["metrics"])
+            for name in data.get("removed", []):
+                self.metrics.pop(name, None)
+        if self.ack and "seq" in data:
+            self.manager.ack(self, data["seq"])
+
+
+def populate(dashboard: PerformanceDashboard, per_category: int, rng: random.Random):
+    """每个分类生成per_category个指标"""
+    for category in CATEGORIES:
+        for i in range(per_category):
+            dashboard._update_metric(
+                f"{category}_metric_{i}", rng.uniform(0, 100), "percent", category
+            )
+
+
+def collect(dashboard: PerformanceDashboard, change_ratio: float, rng: random.Random):
+    """模拟一次采集：部分指标取得新值"""
+    for name, metric in dashboard.metrics.items():
+        if rng.random() < change_ratio:
+            dashboard._update_metric(
+                name, round(rng.uniform(0, 100), 2), metric.unit, metric.category
+            )
+
+
+def legacy_payload(dashboard: PerformanceDashboard) -> dict:
+    """原实现的全量广播数据"""
+    return {
+        "type": "metrics_update",
+        "timestamp": datetime.now().isoformat(),
+        "system_status": dashboard.system_status.__dict__,
+        "metrics": {
+            name: {
+                "value": metric.value,
+                "unit": metric.unit,
+                "status": metric.status,
+                "trend": metric.trend,
+            }
+            for name, metric in dashboard.metrics.items()
+        },
+    }
+
+
+async def run(mode: str, args) -> dict:
+    rng = random.Random(42)
+    dashboard = PerformanceDashboard("benchmark")
+    manager = dashboard.websocket_manager
+    populate(dashboard, args.metrics_per_category, rng)
+
+    clients = []
+    for i in range(args.clients):
+        client = SimulatedClient(manager, ack=rng.random() < args.ack_ratio)
+        # 一半客户端看全部分类，其余订阅1-2个分类
+        categories = None if i % 2 == 0 else rng.sample(CATEGORIES, rng.randint(1, 2))
+        await manager.connect(client, categories)
+        clients.append(client)
+
+    serializations = 0
+    started_cpu = time.process_time()
+    started = time.perf_counter()
+    for tick in range(args.ticks):
+        SimulatedClient.parsed.clear()
+        if tick % args.collect_every == 0:
+            collect(dashboard, args.change_ratio, rng)
+            dashboard.system_status.uptime = time.time() - dashboard.start_time
+
+        if mode == "legacy":
+            await manager.send_to_all(legacy_payload(dashboard))
+            serializations += 1
+        else:
+            await dashboard._broadcast_tick()
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - started_cpu
+
+    if mode == "delta":
+        serializations = dashboard.broadcast_stats["serializations"]
+        # 增量应用后客户端视图必须与服务端一致
+        expected = dashboard._snapshots[dashboard._broadcast_seq]["metrics"]
+        for client in clients:
+            categories = manager.clients[client].categories
+            assert client.metrics == dashboard._filter_metrics(expected, categories)
+
+    total_bytes = sum(client.bytes_received for client in clients)
+    return {
+        "bytes_per_tick": total_bytes / args.ticks,
+        "cpu_ms_per_tick": cpu * 1000 / args.ticks,
+        "wall_ms_per_tick": elapsed * 1000 / args.ticks,
+        "serializations_per_tick": serializations / args.ticks,
+        "messages": manager.stats["messages_sent"],
+        "skipped_ticks": dashboard.broadcast_stats["skipped_ticks"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="仪表板广播基准测试")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--ticks", type=int, default=300, help="广播tick数（每tick对应1秒）")
+    parser.add_argument("--metrics-per-category", type=int, default=8)
+    parser.add_argument("--collect-every", type=int, default=3, help="每隔几个tick采集一次指标")
+    parser.add_argument("--change-ratio", type=float, default=0.3, help="每次采集发生变化的指标比例")
+    parser.add_argument("--ack-ratio", type=float, default=0.9, help="发送确认的客户端比例")
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} 个客户端，{len(CATEGORIES) * args.metrics_per_category} 个指标，"
+        f"{args.ticks} 个tick，每 {args.collect_every} 个tick采集一次，变化比例 {args.change_ratio}"
+    )
+
+    results = [
+        ("全量广播", asyncio.run(run("legacy", args))),
+        ("增量广播", asyncio.run(run("delta", args))),
+    ]
+
+    print(
+        f"\n{'模式':<10} {'KB/tick':>10} {'CPU ms/tick':>12} {'耗时 ms/tick':>13} "
+        f"{'序列化/tick':>12} {'消息数':>9} {'跳过tick':>9}"
+    )
+    for name, r in results:
+        print(
+            f"{name:<10} {r['bytes_per_tick'] / 1024:>10.1f} {r['cpu_ms_per_tick']:>12.2f} "
+            f"{r['wall_ms_per_tick']:>13.2f} {r['serializations_per_tick']:>12.2f} "
+            f"{r['messages']:>9} {r['skipped_ticks']:>9}"
+        )
+
+    legacy, delta = results[0][1], results[1][1]
+    print(
+        f"\n带宽降低 {legacy['bytes_per_tick'] / max(delta['bytes_per_tick'], 1):.1f}x，"
+        f"CPU降低 {legacy['cpu_ms_per_tick'] / max(delta['cpu_ms_per_tick'], 1e-9):.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+全文搜索基准测试
+================
+
+对比原先逐词 ILIKE '%term%' 扫描与全文索引在大数据量（默认100万任务）下的查询耗时：
+
+- SQLite：ILIKE扫描 vs 本地倒排索引（TaskSearchIndex）
+- PostgreSQL：ILIKE扫描 vs search_vector（tsvector + GIN，触发器维护）
+
+用法:
+    python benchmarks/fulltext_search_benchmark.py
+    python benchmarks/fulltext_search_benchmark.py --rows 200000 --repeat 3
+    python benchmarks/fulltext_search_benchmark.py --database-url postgresql://...
+"""
+
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import (
+    DDL,
+    Column,
+    Index,
+    Integer,
+    String,
+    Text,
+    and_,
+    case,
+    create_engine,
+    desc,
+    func,
+    or_,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from sqlalchemy.orm import Session, declarative_base
+
+from src.repositories.task_search import SearchQuery, TaskSearchIndex
+from src.task_management.search_schema import SEARCH_VECTOR_DDL
+
+Base = declarative_base()
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "to", "vi", "zen", "dor", "pal", "qui"]
+CJK_CHARS = "开发测试部署登录页面接口数据库性能优化缓存用户权限配置日志监控告警"
+
+
+class BenchTask(Base):
+    """基准测试用任务表"""
+
+    __tablename__ = "bench_search_tasks"
+    __table_args__ = (
+        Index("idx_bench_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(200), nullable=False)
+    description = Column(Text)
+    tags = Column(ARRAY(String).with_variant(Text(), "sqlite"))
+    search_vector = Column(TSVECTOR().with_variant(Text(), "sqlite"))
+
+
+def build_vocabulary(size: int, rng: random.Random):
+    """生成拉丁词表和中文词表（按词频排名排列，排名与字母序无关）"""
+    latin = set()
+    while len(latin) < size:
+        latin.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    cjk = set()
+    while len(cjk) < size // 20:
+        cjk.add("".join(rng.choices(CJK_CHARS, k=rng.randint(2, 3))))
+    latin, cjk = sorted(latin), sorted(cjk)
+    rng.shuffle(latin)
+    rng.shuffle(cjk)
+    return latin, cjk
+
+
+def seed(session: Session, rows: int, latin, cjk, rng: random.Random, batch_size=20000):
+    """写入Zipf分布的标题/描述/标签"""
+    is_postgres = session.get_bind().dialect.name == "postgresql"
+    latin_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(latin))))
+    cjk_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(cjk))))
+
+    def words(count):
+        chosen = rng.choices(latin, cum_weights=latin_weights, k=count)
+        if rng.random() < 0.4:
+            chosen[rng.randrange(count)] = rng.choices(cjk, cum_weights=cjk_weights)[0]
+        return chosen
+
+    for offset in range(0, rows, batch_size):
+        batch = []
+        for i in range(offset, min(offset + batch_size, rows)):
+            tags = rng.sample(latin[:50], 2)
+            batch.append(
+                {
+                    "id": i + 1,
+                    "title": " ".join(words(rng.randint(4, 7))),
+                    "description": " ".join(words(rng.randint(12, 25))),
+                    "tags": tags if is_postgres else " ".join(tags),
+                }
+            )
+        session.execute(BenchTask.__table__.insert(), batch)
+        session.commit()
+
+
+def measure(fn, repeat: int) -> float:
+    """返回多次执行的中位耗时（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def ilike_search(session: Session, query_text: str, limit: int):
+    """原实现：每个词在标题和描述上做 ILIKE '%term%'，再用 CASE 计算相关度"""
+    query_text = query_text.replace("*", "")
+    conditions = [
+        or_(BenchTask.title.ilike(f"%{term}%"), BenchTask.description.ilike(f"%{term}%"))
+        for term in query_text.split()
+    ]
+    relevance = case((BenchTask.title.ilike(f"%{query_text}%"), 10), else_=0) + case(
+        (BenchTask.description.ilike(f"%{query_text}%"), 5), else_=0
+    )
+    return [
+        row.id
+        for row in session.query(BenchTask.id)
+        .filter(and_(*conditions))
+        .order_by(desc(relevance), desc(BenchTask.id))
+        .limit(limit)
+    ]
+
+
+def index_search(session: Session, index: TaskSearchIndex, query_text: str, limit: int):
+    """本地倒排索引：取相关度最高的候选再回表加载"""
+    ranked = itertools.islice(index.search(SearchQuery.parse(query_text)), limit)
+    ids = [int(task_id) for task_id, _ in ranked]
+    rows = session.query(BenchTask).filter(BenchTask.id.in_(ids)).all()
+    return [row.id for row in rows]
+
+
+def tsvector_search(session: Session, query_text: str, limit: int):
+    """PostgreSQL：search_vector @@ tsquery，ts_rank_cd 排序"""
+    tsquery = func.to_tsquery("simple", SearchQuery.parse(query_text).to_tsquery())
+    rank = func.ts_rank_cd(BenchTask.search_vector, tsquery)
+    return [
+        row.id
+        for row in session.query(BenchTask.id)
+        .filter(BenchTask.search_vector.op("@@")(tsquery))
+        .order_by(desc(rank), desc(BenchTask.id))
+        .limit(limit)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="全文搜索基准测试")
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    latin, cjk = build_vocabulary(args.vocabulary, rng)
+    queries = {
+        "高频词": latin[2],
+        "中频词": latin[500],
+        "低频词": latin[-1],
+        "两词AND": f"{latin[3]} {latin[200]}",
+        "前缀": latin[10][:5] + "*",
+        "短前缀": latin[10][:3] + "*",
+        "中文词": cjk[0],
+    }
+
+    engine = create_engine(args.database_url)
+    is_postgres = engine.dialect.name == "postgresql"
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    if is_postgres:
+        with engine.begin() as connection:
+            connection.execute(
+                DDL(SEARCH_VECTOR_DDL, context={"table": BenchTask.__tablename__})
+            )
+
+    with Session(engine) as session:
+        print(f"写入 {args.rows:,} 行测试数据...")
+        started = time.perf_counter()
+        seed(session, args.rows, latin, cjk, rng)
+        print(f"  写入耗时 {time.perf_counter() - started:.1f}s")
+
+        if is_postgres:
+            session.execute(text(f"ANALYZE {BenchTask.__tablename__}"))
+            index_name, search = "tsvector+GIN", lambda q: tsvector_search(
+                session, q, args.limit
+            )
+        else:
+            started = time.perf_counter()
+            index = TaskSearchIndex()
+            for row in session.query(
+                BenchTask.id, BenchTask.title, BenchTask.description, BenchTask.tags
+            ).yield_per(50000):
+                index.add(str(row.id), row.title, row.description, (row.tags or "").split())
+            print(f"  倒排索引构建耗时 {time.perf_counter() - started:.1f}s")
+            index_name, search = "倒排索引", lambda q: index_search(
+                session, index, q, args.limit
+            )
+
+        print(f"\n{'查询':<10} {'文本':<20} {'ILIKE扫描 (ms)':>16} {index_name + ' (ms)':>18} {'加速':>8}")
+        for label, query_text in queries.items():
+            scan_ms = measure(lambda: ilike_search(session, query_text, args.limit), args.repeat)
+            index_ms = measure(lambda: search(query_text), args.repeat)
+            print(
+                f"{label:<10} {query_text:<20} {scan_ms:>16.2f} {index_ms:>18.2f} "
+                f"{scan_ms / index_ms:>7.0f}x"
+            )
+
+    Base.metadata.drop_all(engine)
+
+
+if __name__ == "__main__":
+    main()
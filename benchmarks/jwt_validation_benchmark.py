@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+JWT验证基准测试
+================
+
+使用进程内的Redis替身（每次往返模拟固定网络延迟）测量JWTTokenManager的
+每秒验证次数，对比三种配置：
+
+- 无缓存：每次验证都读取并解析PEM公钥，不使用已验证声明缓存
+- 密钥缓存：kid→公钥缓存 + 黑名单/元数据管道查询
+- 密钥缓存 + 声明缓存：命中时不再访问Redis和校验签名
+
+用法:
+    python benchmarks/jwt_validation_benchmark.py
+    python benchmarks/jwt_validation_benchmark.py --tokens 50 --validations 5000 --rtt-ms 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import jwt
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend", "auth-service"),
+)
+
+from app.services.jwt_service import JWTTokenManager
+
+
+class LocalRedis:
+    """进程内Redis替身：实现JWTTokenManager用到的命令，每次往返等待rtt秒"""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.round_trips = 0
+        self.hashes = {}
+        self.sets = {}
+        self.subscribers = []
+
+    async def _round_trip(self):
+        self.round_trips += 1
+        await asyncio.sleep(self.rtt)
+
+    # 命令实现（同步），供单条命令和管道共用
+    def _hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def _hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def _hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update({k: str(v) for k, v in mapping.items()})
+
+    def _sismember(self, key, member):
+        return member in self.sets.get(key, set())
+
+    def _sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        command = getattr(self, f"_{name}", None)
+        if command is None:
+            # expire/delete等对基准结果无影响的命令
+            command = lambda *args, **kwargs: True
+
+        async def call(*args, **kwargs):
+            await self._round_trip()
+            return command(*args, **kwargs)
+
+        return call
+
+    async def hkeys(self, key):
+        await self._round_trip()
+        return list(self.hashes.get(key, {}))
+
+    async def publish(self, channel, message):
+        await self._round_trip()
+        for queue in self.subscribers:
+            queue.put_nowait({"type": "message", "data": message})
+
+    def pipeline(self, transaction=True):
+        return LocalPipeline(self)
+
+    def pubsub(self):
+        return LocalPubSub(self)
+
+
+class LocalPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.redis, f"_{name}"), args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        await self.redis._round_trip()
+        return [command(*args, **kwargs) for command, args, kwargs in self.commands]
+
+
+class LocalPubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.redis.subscribers.append(self.queue)
+        self.queue.put_nowait({"type": "subscribe", "data": 1})
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def close(self):
+        self.redis.subscribers.remove(self.queue)
+
+
+async def run(mode: str, args) -> tuple:
+    redis = LocalRedis(args.rtt_ms / 1000)
+    manager = JWTTokenManager()
+    manager.redis_client = redis
+    manager.validation_cache_ttl = 30 if mode == "claims" else 0
+
+    tokens = []
+    for i in range(args.tokens):
+        pair = await manager.generate_token_pair(
+            user_id=f"user-{i}", permissions=["read"], device_info={}, ip_address="127.0.0.1"
+        )
+        tokens.append(pair["access_token"])
+
+    # 让事件订阅完成
+    assert (await manager.validate_token(tokens[0])).valid
+    await asyncio.sleep(0)
+
+    redis.round_trips = 0
+    started = time.perf_counter()
+    for n in range(args.validations):
+        if mode == "uncached":
+            manager._public_keys.clear()
+        result = await manager.validate_token(tokens[n % len(tokens)])
+        assert result.valid, result.error
+    elapsed = time.perf_counter() - started
+
+    # 撤销后必须立即失效
+    revoked = tokens[0]
+    await manager.revoke_token(jwt.decode(revoked, options={"verify_signature": False})["jti"])
+    assert not (await manager.validate_token(revoked)).valid
+
+    await manager.close()
+    return args.validations / elapsed, redis.round_trips / args.validations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JWT验证基准测试")
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--validations", type=int, default=2000)
+    parser.add_argument("--rtt-ms", type=float, default=0.2, help="模拟的Redis往返延迟")
+    args = parser.parse_args()
+
+    print(f"{args.validations} 次验证，{args.tokens} 个Token，Redis往返 {args.rtt_ms}ms")
+    print(f"\n{'配置':<16} {'验证/秒':>10} {'往返/次':>10}")
+    for mode, label in (
+        ("uncached", "无缓存"),
+        ("keys", "密钥缓存"),
+        ("claims", "密钥+声明缓存"),
+    ):
+        per_sec, round_trips = asyncio.run(run(mode, args))
+        print(f"{label:<16} {per_sec:>10.0f} {round_trips:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+键集分页基准测试
+================
+
+对比OFFSET分页与键集（游标）分页在第1页和深页（默认第10,000页）的单页耗时。
+
+用法:
+    python benchmarks/keyset_pagination_benchmark.py
+    python benchmarks/keyset_pagination_benchmark.py --rows 500000 --deep-page 20000
+    python benchmarks/keyset_pagination_benchmark.py --database-url postgresql://...
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from backend.db.utils import KeysetColumn, PaginationHelper, encode_cursor
+
+Base = declarative_base()
+
+
+class BenchTask(Base):
+    """基准测试用任务表"""
+
+    __tablename__ = "bench_keyset_tasks"
+    __table_args__ = (Index("idx_bench_updated_at_id", "updated_at", "id"),)
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(200), nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+
+
+SORT = [
+    KeysetColumn(BenchTask.updated_at, "updated_at", descending=True),
+    KeysetColumn(BenchTask.id, "id", descending=True),
+]
+
+
+def seed(session: Session, rows: int, batch_size: int = 20000):
+    """写入测试数据（多个任务共享同一updated_at以覆盖id决胜）"""
+    start = datetime(2024, 1, 1)
+    for offset in range(0, rows, batch_size):
+        batch = [
+            {
+                "id": i + 1,
+                "title": f"task {i}",
+                "updated_at": start + timedelta(seconds=i // 3),
+            }
+            for i in range(offset, min(offset + batch_size, rows))
+        ]
+        session.execute(BenchTask.__table__.insert(), batch)
+    session.commit()
+
+
+def measure(fn, repeat: int) -> float:
+    """返回多次执行的中位耗时（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def offset_page(session: Session, page: int, per_page: int):
+    query = session.query(BenchTask).order_by(
+        BenchTask.updated_at.desc(), BenchTask.id.desc()
+    )
+    return PaginationHelper.paginate_query(
+        query, page=page, per_page=per_page, max_per_page=per_page
+    )
+
+
+def cursor_for_page(session: Session, page: int, per_page: int):
+    """定位到第page页之前的最后一行并生成游标（仅准备阶段使用一次）"""
+    if page == 1:
+        return None
+    last = (
+        session.query(BenchTask)
+        .order_by(BenchTask.updated_at.desc(), BenchTask.id.desc())
+        .offset((page - 1) * per_page - 1)
+        .limit(1)
+        .one()
+    )
+    return encode_cursor("updated_at", [column.value_of(last) for column in SORT])
+
+
+def keyset_page(session: Session, cursor, per_page: int):
+    return PaginationHelper.keyset_paginate_query(
+        session.query(BenchTask),
+        SORT,
+        cursor=cursor,
+        per_page=per_page,
+        max_per_page=per_page,
+        sort_name="updated_at",
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="键集分页基准测试")
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--rows", type=int, default=250000)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--deep-page", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    needed = args.deep_page * args.per_page
+    if args.rows < needed:
+        parser.error(f"--rows 至少需要 {needed} 才能到达第 {args.deep_page} 页")
+
+    engine = create_engine(args.database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        print(f"写入 {args.rows:,} 行测试数据...")
+        seed(session, args.rows)
+
+        results = []
+        for page in (1, args.deep_page):
+            offset_ms = measure(
+                lambda: offset_page(session, page, args.per_page), args.repeat
+            )
+            cursor = cursor_for_page(session, page, args.per_page)
+            keyset_ms = measure(
+                lambda: keyset_page(session, cursor, args.per_page), args.repeat
+            )
+
+            # 两种方式返回的数据必须一致
+            offset_items, _ = offset_page(session, page, args.per_page)
+            keyset_items, _ = keyset_page(session, cursor, args.per_page)
+            assert [t.id for t in offset_items] == [t.id for t in keyset_items]
+
+            results.append((page, offset_ms, keyset_ms))
+
+    Base.metadata.drop_all(engine)
+
+    print(f"\n{'页码':>8} {'OFFSET+COUNT (ms)':>20} {'键集 (ms)':>12}")
+    for page, offset_ms, keyset_ms in results:
+        print(f"{page:>8,} {offset_ms:>20.2f} {keyset_ms:>12.2f}")
+
+    (_, offset_first, keyset_first), (_, offset_deep, keyset_deep) = results
+    print(
+        f"\n深页/首页耗时比: OFFSET {offset_deep / offset_first:.1f}x, "
+        f"键集 {keyset_deep / keyset_first:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+密码哈希负载测试
+================
+
+模拟登录高峰：并发执行bcrypt校验，对比在协程内直接调用bcrypt（阻塞事件循环）
+与通过PasswordHashExecutor线程池执行时的登录吞吐量和事件循环延迟。
+
+用法:
+    python benchmarks/password_hashing_benchmark.py
+    python benchmarks/password_hashing_benchmark.py --logins 400 --concurrency 100 --rounds 12
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend", "auth-service"),
+)
+
+import bcrypt
+
+from app.core.hashing import HashingOverloadedError, PasswordHashExecutor
+
+PASSWORD = b"Correct-Horse-Battery-Staple-1" + b"benchmark-pepper"
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float, samples: list):
+    """周期性休眠并记录实际唤醒延迟（毫秒）"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - started - interval) * 1000)
+
+
+async def run_load(verify, logins: int, concurrency: int) -> dict:
+    """以固定并发执行logins次校验，返回吞吐量与事件循环延迟"""
+    semaphore = asyncio.Semaphore(concurrency)
+    lag_samples: list = []
+    stop = asyncio.Event()
+    rejected = 0
+
+    async def login():
+        nonlocal rejected
+        async with semaphore:
+            try:
+                assert await verify()
+            except HashingOverloadedError:
+                rejected += 1
+
+    lag_task = asyncio.create_task(measure_loop_lag(stop, 0.005, lag_samples))
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await lag_task
+
+    lag_samples.sort()
+    return {
+        "logins_per_sec": (logins - rejected) / elapsed,
+        "rejected": rejected,
+        "lag_p50_ms": statistics.median(lag_samples) if lag_samples else 0.0,
+        "lag_p99_ms": lag_samples[int(len(lag_samples) * 0.99) - 1] if lag_samples else 0.0,
+        "lag_max_ms": lag_samples[-1] if lag_samples else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="密码哈希负载测试")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt轮数（生产配置为14）")
+    parser.add_argument("--workers", type=int, default=0, help="线程池大小（0为CPU核数）")
+    parser.add_argument("--max-pending", type=int, default=0, help="准入上限（0为线程数×16）")
+    args = parser.parse_args()
+
+    password_hash = bcrypt.hashpw(PASSWORD, bcrypt.gensalt(rounds=args.rounds))
+    executor = PasswordHashExecutor(
+        max_workers=args.workers or None, max_pending=args.max_pending or None
+    )
+
+    async def inline_verify():
+        # 原实现：在协程内直接调用bcrypt
+        return bcrypt.checkpw(PASSWORD, password_hash)
+
+    async def executor_verify():
+        return await executor.checkpw(PASSWORD, password_hash)
+
+    print(
+        f"{args.logins} 次登录，并发 {args.concurrency}，bcrypt {args.rounds} 轮，"
+        f"线程池 {executor.max_workers} 线程"
+    )
+
+    results = [
+        ("事件循环内", asyncio.run(run_load(inline_verify, args.logins, args.concurrency))),
+        ("线程池", asyncio.run(run_load(executor_verify, args.logins, args.concurrency))),
+    ]
+    metrics = executor.get_metrics()
+    executor.shutdown()
+
+    print(f"\n{'模式':<10} {'登录/秒':>10} {'延迟p50(ms)':>12} {'延迟p99(ms)':>12} {'延迟max(ms)':>12} {'拒绝':>6}")
+    for name, r in results:
+        print(
+            f"{name:<10} {r['logins_per_sec']:>10.1f} {r['lag_p50_ms']:>12.2f} "
+            f"{r['lag_p99_ms']:>12.2f} {r['lag_max_ms']:>12.2f} {r['rejected']:>6}"
+        )
+
+    print(
+        f"\n线程池指标: 峰值待处理 {metrics['peak_pending']}, "
+        f"平均排队 {metrics['avg_wait_ms']:.1f}ms, 平均执行 {metrics['avg_run_ms']:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
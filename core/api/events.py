@@ -5,9 +5,14 @@ Claude Enhancer v2.0 - Event System
 Event bus and event handling for the core system.
 """
 
-from typing import Dict, Any, List, Callable
+from typing import Dict, Any, List, Callable, Deque, Optional, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+import asyncio
+import fnmatch
 import logging
+import threading
 from datetime import datetime
 
 
@@ -23,12 +28,108 @@ class Event:
     source: str = "core"
 
 
+class Subscriber:
+    """
+    A registered handler and its delivery mode
+
+    Modes:
+        sync: called on the emitter's thread (default)
+        thread: queued and run on the bus thread pool
+        async: coroutine handler scheduled on an asyncio event loop
+
+    Queued modes buffer events in a bounded per-subscriber queue that is
+    drained in order; when full, the oldest event is dropped so producers
+    never block on slow handlers.
+    """
+
+    def __init__(
+        self,
+        pattern: str,
+        handler: Callable,
+        mode: str = "sync",
+        max_queue: int = 1000,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        self.pattern = pattern
+        self.handler = handler
+        self.mode = mode
+        self.loop = loop
+        self.queue: Deque[Event] = deque(maxlen=max_queue)
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self._draining = False
+        self._lock = threading.Lock()
+
+    def enqueue(self, event: Event) -> bool:
+        """Buffer an event; returns True if a drain needs to be scheduled"""
+        with self._lock:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1
+            self.queue.append(event)
+            if self._draining:
+                return False
+            self._draining = True
+            return True
+
+    def _next(self) -> Optional[Event]:
+        with self._lock:
+            if not self.queue:
+                self._draining = False
+                return None
+            return self.queue.popleft()
+
+    def call(self, event: Event):
+        """Invoke a sync handler, logging failures"""
+        try:
+            self.handler(event)
+            self.delivered += 1
+        except Exception as e:
+            self.errors += 1
+            logger.exception("Error in event handler for %s: %s", event.name, e)
+
+    def drain(self):
+        """Deliver queued events in order (thread mode)"""
+        while True:
+            event = self._next()
+            if event is None:
+                return
+            self.call(event)
+
+    async def drain_async(self):
+        """Deliver queued events in order (async mode)"""
+        while True:
+            event = self._next()
+            if event is None:
+                return
+            try:
+                await self.handler(event)
+                self.delivered += 1
+            except Exception as e:
+                self.errors += 1
+                logger.exception("Error in event handler for %s: %s", event.name, e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pattern": self.pattern,
+            "handler": getattr(self.handler, "__qualname__", repr(self.handler)),
+            "mode": self.mode,
+            "queued": len(self.queue),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+
 class EventBus:
     """
     Event bus for inter-component communication
 
     Implements a publish-subscribe pattern for loose coupling
-    between components.
+    between components. History is kept in a ring buffer with a
+    per-event-name index; handlers may run synchronously, on a
+    thread pool or on an asyncio loop, and may subscribe to
+    wildcard patterns such as ``workflow.*``.
     """
 
     # Core events
@@ -49,11 +150,25 @@ class EventBus:
         'state.loaded',
     }
 
-    def __init__(self):
-        """Initialize event bus"""
-        self._handlers: Dict[str, List[Callable]] = {}
-        self._event_history: List[Event] = []
-        self._max_history = 1000
+    WILDCARD_CHARS = ("*", "?", "[")
+
+    def __init__(self, max_history: int = 1000, max_workers: int = 4):
+        """
+        Initialize event bus
+
+        Args:
+            max_history: Ring buffer size; per-event-name indexes only hold
+                events still in the buffer
+            max_workers: Thread pool size for thread-mode handlers
+        """
+        self._max_history = max_history
+        self._max_workers = max_workers
+        self._subscribers: Dict[str, List[Subscriber]] = {}
+        self._dispatch: Dict[str, Tuple[Subscriber, ...]] = {}
+        self._event_history: Deque[Event] = deque(maxlen=max_history)
+        self._history_index: Dict[str, Deque[Event]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
 
         logger.debug("EventBus initialized")
 
@@ -68,30 +183,98 @@ class EventBus:
         logger.debug("Emitting event: %s", event_name)
 
         # Store in history
-        self._event_history.append(event)
-        if len(self._event_history) > self._max_history:
-            self._event_history.pop(0)
+        self._record(event)
 
         # Call handlers
-        handlers = self._handlers.get(event_name, [])
-        for handler in handlers:
-            try:
-                handler(event)
-            except Exception as e:
-                logger.exception("Error in event handler for %s: %s", event_name, e)
+        for subscriber in self._resolve(event_name):
+            if subscriber.mode == "sync":
+                subscriber.call(event)
+            elif subscriber.enqueue(event):
+                self._schedule(subscriber)
+
+    def _record(self, event: Event):
+        """Append to the ring buffer, pruning the evicted event from its index"""
+        history = self._event_history
+        if history.maxlen == 0:
+            return
+        if len(history) == history.maxlen:
+            # Per-name indexes are subsequences of the ring buffer, so the
+            # evicted event is always the oldest entry of its own index
+            evicted = history[0]
+            stale = self._history_index.get(evicted.name)
+            if stale:
+                stale.popleft()
+                if not stale:
+                    del self._history_index[evicted.name]
+        history.append(event)
+        self._history_index.setdefault(event.name, deque()).append(event)
+
+    def _resolve(self, event_name: str) -> Tuple[Subscriber, ...]:
+        """Look up (and cache) exact plus wildcard subscribers for a name"""
+        subscribers = self._dispatch.get(event_name)
+        if subscribers is not None:
+            return subscribers
 
-    def on(self, event_name: str, handler: Callable):
+        with self._lock:
+            resolved = []
+            for pattern, pattern_subscribers in self._subscribers.items():
+                if pattern == event_name or (
+                    self._is_wildcard(pattern)
+                    and fnmatch.fnmatchcase(event_name, pattern)
+                ):
+                    resolved.extend(pattern_subscribers)
+            subscribers = tuple(resolved)
+            self._dispatch[event_name] = subscribers
+        return subscribers
+
+    def _schedule(self, subscriber: Subscriber):
+        """Start draining a subscriber queue on its executor"""
+        if subscriber.mode == "async":
+            subscriber.loop.call_soon_threadsafe(
+                lambda: subscriber.loop.create_task(subscriber.drain_async())
+            )
+            return
+
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._max_workers, thread_name_prefix="eventbus"
+                    )
+        self._executor.submit(subscriber.drain)
+
+    @classmethod
+    def _is_wildcard(cls, pattern: str) -> bool:
+        return any(char in pattern for char in cls.WILDCARD_CHARS)
+
+    def on(
+        self,
+        event_name: str,
+        handler: Callable,
+        mode: str = "sync",
+        max_queue: int = 1000,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
         """
         Register event handler
 
         Args:
-            event_name: Name of the event to listen for
-            handler: Callable to handle the event
+            event_name: Name of the event to listen for (wildcards allowed)
+            handler: Callable to handle the event (a coroutine function
+                for async mode)
+            mode: "sync", "thread" or "async"
+            max_queue: Queue bound for thread/async handlers
+            loop: Event loop for async handlers (defaults to the running loop)
         """
-        if event_name not in self._handlers:
-            self._handlers[event_name] = []
+        if mode not in ("sync", "thread", "async"):
+            raise ValueError(f"Unknown handler mode: {mode}")
+        if mode == "async" and loop is None:
+            loop = asyncio.get_running_loop()
 
-        self._handlers[event_name].append(handler)
+        subscriber = Subscriber(event_name, handler, mode, max_queue, loop)
+        with self._lock:
+            self._subscribers.setdefault(event_name, []).append(subscriber)
+            self._dispatch.clear()
         logger.debug("Registered handler for event: %s", event_name)
 
     def off(self, event_name: str, handler: Callable):
@@ -102,12 +285,17 @@ class EventBus:
             event_name: Name of the event
             handler: Handler to remove
         """
-        if event_name in self._handlers:
-            try:
-                self._handlers[event_name].remove(handler)
-                logger.debug("Unregistered handler for event: %s", event_name)
-            except ValueError:
-                logger.warning("Handler not found for event: %s", event_name)
+        with self._lock:
+            subscribers = self._subscribers.get(event_name, [])
+            for subscriber in subscribers:
+                if subscriber.handler == handler:
+                    subscribers.remove(subscriber)
+                    if not subscribers:
+                        del self._subscribers[event_name]
+                    self._dispatch.clear()
+                    logger.debug("Unregistered handler for event: %s", event_name)
+                    return
+        logger.warning("Handler not found for event: %s", event_name)
 
     def get_history(self, event_name: str = None, limit: int = 100) -> List[Event]:
         """
@@ -121,13 +309,33 @@ class EventBus:
             List of events
         """
         if event_name:
-            events = [e for e in self._event_history if e.name == event_name]
+            events = self._history_index.get(event_name, ())
         else:
             events = self._event_history
 
-        return events[-limit:]
+        if limit <= 0:
+            return []
+        # Only copy the tail instead of the whole buffer
+        start = max(len(events) - limit, 0)
+        return [events[i] for i in range(start, len(events))]
 
     def clear_history(self):
         """Clear event history"""
-        self._event_history = []
+        self._event_history.clear()
+        self._history_index.clear()
         logger.debug("Event history cleared")
+
+    def get_subscriber_stats(self) -> List[Dict[str, Any]]:
+        """Delivery, drop and error counters for every subscriber"""
+        with self._lock:
+            return [
+                subscriber.stats()
+                for subscribers in self._subscribers.values()
+                for subscriber in subscribers
+            ]
+
+    def shutdown(self, wait: bool = True):
+        """Stop the thread pool used by thread-mode handlers"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -5,31 +5,199 @@ Claude Enhancer v2.0 - Hook Manager
 Manages hook registration and execution.
 """
 
-from typing import Dict, Any, List, Callable, Optional
+from typing import Dict, Any, List, Callable, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import bisect
+import json
 import logging
+import select
 import subprocess
+import sys
+import threading
+import time
 import os
 
+from core.hooks import worker as worker_module
+from core.hooks.worker import call_hook, load_hook
+
 logger = logging.getLogger(__name__)
 
 
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram
+
+    Buckets are upper bounds in milliseconds; the last bucket is unbounded.
+    """
+
+    BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self.count = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, duration_ms: float, ok: bool = True):
+        """Record one execution"""
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BUCKETS_MS, duration_ms)] += 1
+            self.count += 1
+            self.total_ms += duration_ms
+            self.max_ms = max(self.max_ms, duration_ms)
+            if not ok:
+                self.failures += 1
+
+    def _percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket containing the given percentile"""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                if index < len(self.BUCKETS_MS):
+                    return float(self.BUCKETS_MS[index])
+                return self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return histogram data and summary statistics"""
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in self.BUCKETS_MS] + [
+                f">{self.BUCKETS_MS[-1]}ms"
+            ]
+            return {
+                "count": self.count,
+                "failures": self.failures,
+                "mean_ms": self.total_ms / self.count if self.count else 0.0,
+                "max_ms": self.max_ms,
+                "p50_ms": self._percentile(0.50),
+                "p95_ms": self._percentile(0.95),
+                "buckets": dict(zip(labels, self.counts)),
+            }
+
+
+class HookWorker:
+    """
+    Warm, long-lived Python process serving one hook
+
+    Speaks the line protocol of ``core/hooks/worker.py``; the process is started
+    lazily and restarted after a crash or timeout.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        # Run the worker module as a script so the worker does not import the
+        # whole core package on startup
+        self.process = subprocess.Popen(
+            [sys.executable, worker_module.__file__, self.path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            bufsize=0,
+        )
+
+    def call(self, payload: str, timeout: float) -> Tuple[bool, str]:
+        """Send one JSON context line and wait for the reply line"""
+        with self._lock:
+            if self.process is None or self.process.poll() is not None:
+                self._start()
+
+            try:
+                self.process.stdin.write(payload.encode() + b"\n")
+                self.process.stdin.flush()
+                reply = self._read_line(timeout)
+            except (OSError, TimeoutError) as e:
+                self.stop()
+                return False, f"Hook worker error: {e}"
+
+            if reply is None:
+                self.stop()
+                return False, "Hook worker exited"
+
+            response = json.loads(reply)
+            return bool(response.get("ok")), response.get("message", "")
+
+    def _read_line(self, timeout: float) -> Optional[bytes]:
+        """Read one reply line from the worker, honoring the timeout"""
+        deadline = time.monotonic() + timeout
+        fd = self.process.stdout.fileno()
+        buffer = b""
+        while not buffer.endswith(b"\n"):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"no reply within {timeout}s")
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                return None
+            buffer += chunk
+        return buffer
+
+    def stop(self):
+        """Terminate the worker process"""
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=1)
+        except Exception:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+
+@dataclass
+class HookSpec:
+    """A registered hook and how to run it"""
+
+    name: str
+    kind: str  # "script", "callable" or "worker"
+    target: Any
+    timeout: float = 30.0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "timeout": self.timeout,
+            "latency": self.latency.snapshot(),
+        }
+
+
 class HookManager:
     """
     Manages hooks for workflow events
 
     Handles registration and execution of hooks at various
-    points in the workflow lifecycle.
+    points in the workflow lifecycle. Hooks of one type run
+    concurrently and receive the context as JSON.
     """
 
-    def __init__(self, hooks_dir: str = ".claude/hooks"):
+    def __init__(self, hooks_dir: str = ".claude/hooks", max_concurrent: int = 4):
         """
         Initialize hook manager
 
         Args:
             hooks_dir: Directory containing hook scripts
+            max_concurrent: Maximum number of hooks executed in parallel
         """
         self.hooks_dir = hooks_dir
+        self.max_concurrent = max_concurrent
         self.hooks: Dict[str, List[str]] = {}
+        self._specs: Dict[str, HookSpec] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
         self._load_hooks()
 
     def _load_hooks(self):
@@ -55,12 +223,23 @@ class HookManager:
             full_path = os.path.join(self.hooks_dir, item)
             if os.path.isfile(full_path) and os.access(full_path, os.X_OK):
                 # Determine hook type from filename or register as generic
-                self.hooks.setdefault("Generic", []).append(full_path)
+                self.register_hook("Generic", full_path)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrent, thread_name_prefix="hook"
+            )
+        return self._executor
 
     def execute_hook(self, hook_type: str, context: Dict[str, Any]) -> bool:
         """
         Execute hooks of given type
 
+        Independent hooks run concurrently; each receives the context
+        serialized as JSON on stdin (scripts and workers) or as a dict
+        (in-process callables).
+
         Args:
             hook_type: Type of hook to execute
             context: Context data to pass to hooks
@@ -68,43 +247,143 @@ class HookManager:
         Returns:
             True if all hooks succeeded, False otherwise
         """
-        if hook_type not in self.hooks:
+        names = self.hooks.get(hook_type)
+        if not names:
             return True
 
-        for hook_path in self.hooks[hook_type]:
-            try:
+        payload = json.dumps(context, default=str)
+        specs = [self._specs[name] for name in names]
+
+        if len(specs) == 1:
+            outcomes = [self._run_spec(specs[0], context, payload)]
+        else:
+            outcomes = list(
+                self._pool().map(
+                    lambda spec: self._run_spec(spec, context, payload), specs
+                )
+            )
+
+        success = True
+        for spec, (ok, message) in zip(specs, outcomes):
+            if not ok:
+                logger.error(f"Hook failed: {spec.name}")
+                logger.error(f"Output: {message}")
+                success = False
+
+        return success
+
+    def _run_spec(
+        self, spec: HookSpec, context: Dict[str, Any], payload: str
+    ) -> Tuple[bool, str]:
+        """Run one hook and record its latency"""
+        started = time.perf_counter()
+        try:
+            if spec.kind == "callable":
+                ok, message = call_hook(spec.target, context)
+            elif spec.kind == "worker":
+                ok, message = spec.target.call(payload, spec.timeout)
+            else:
                 result = subprocess.run(
-                    [hook_path],
-                    input=str(context),
+                    [spec.target],
+                    input=payload,
                     capture_output=True,
                     text=True,
-                    timeout=30
+                    timeout=spec.timeout
                 )
+                ok, message = result.returncode == 0, result.stderr
+        except Exception as e:
+            ok, message = False, f"Failed to execute hook {spec.name}: {e}"
 
-                if result.returncode != 0:
-                    logger.error(f"Hook failed: {hook_path}")
-                    logger.error(f"Output: {result.stderr}")
-                    return False
+        spec.latency.record((time.perf_counter() - started) * 1000, ok)
+        return ok, message
 
-            except Exception as e:
-                logger.error(f"Failed to execute hook {hook_path}: {e}")
-                return False
+    def _add(self, hook_type: str, spec: HookSpec):
+        previous = self._specs.get(spec.name)
+        if previous is not None and previous.kind == "worker":
+            previous.target.stop()
+        self._specs[spec.name] = spec
 
-        return True
+        names = self.hooks.setdefault(hook_type, [])
+        if spec.name not in names:
+            names.append(spec.name)
 
-    def register_hook(self, hook_type: str, hook_path: str):
-        """Register a new hook"""
-        if hook_type not in self.hooks:
-            self.hooks[hook_type] = []
+    def register_hook(self, hook_type: str, hook_path: str, timeout: float = 30.0):
+        """Register a new hook script"""
+        if hook_path in self.hooks.get(hook_type, []):
+            return
+        self._add(hook_type, HookSpec(hook_path, "script", hook_path, timeout))
 
-        if hook_path not in self.hooks[hook_type]:
-            self.hooks[hook_type].append(hook_path)
+    def register_callable(
+        self,
+        hook_type: str,
+        func: Callable[[Dict[str, Any]], Any],
+        name: Optional[str] = None,
+    ):
+        """
+        Register an in-process hook
+
+        Args:
+            hook_type: Type of hook
+            func: Callable receiving the context dict; returning None or a
+                truthy value means success, ``(ok, message)`` is also accepted
+            name: Hook name (defaults to the callable's qualified name)
+        """
+        name = name or f"{func.__module__}.{func.__qualname__}"
+        self._add(hook_type, HookSpec(name, "callable", func))
+
+    def register_python_hook(
+        self,
+        hook_type: str,
+        hook_path: str,
+        mode: str = "worker",
+        timeout: float = 30.0,
+    ):
+        """
+        Register a Python hook module defining ``run(context)``
+
+        Args:
+            hook_type: Type of hook
+            hook_path: Path to the hook module
+            mode: "inprocess" to import and call it directly, or "worker"
+                to run it in a warm long-lived worker process
+            timeout: Per-call timeout in seconds (worker mode)
+        """
+        if mode == "inprocess":
+            self._add(hook_type, HookSpec(hook_path, "callable", load_hook(hook_path)))
+        elif mode == "worker":
+            self._add(
+                hook_type, HookSpec(hook_path, "worker", HookWorker(hook_path), timeout)
+            )
+        else:
+            raise ValueError(f"Unknown hook mode: {mode}")
+
+    def list_hooks(
+        self, hook_type: Optional[str] = None, include_stats: bool = False
+    ) -> Dict[str, List[Any]]:
+        """
+        List registered hooks
+
+        Args:
+            hook_type: Only list hooks of this type
+            include_stats: Return hook details with latency histograms
+                instead of plain hook names
+        """
+        hooks = {hook_type: self.hooks.get(hook_type, [])} if hook_type else self.hooks
+        if not include_stats:
+            return hooks
+        return {
+            kind: [self._specs[name].to_dict() for name in names]
+            for kind, names in hooks.items()
+        }
 
-    def list_hooks(self, hook_type: Optional[str] = None) -> Dict[str, List[str]]:
-        """List registered hooks"""
-        if hook_type:
-            return {hook_type: self.hooks.get(hook_type, [])}
-        return self.hooks
+    def shutdown(self):
+        """Stop warm workers and the execution pool"""
+        for spec in self._specs.values():
+            if spec.kind == "worker":
+                spec.target.stop()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
 
 
-__all__ = ["HookManager"]
+__all__ = ["HookManager", "HookSpec", "HookWorker", "LatencyHistogram"]
@@ -0,0 +1,95 @@
+"""
+Claude Enhancer v2.0 - Hook Worker
+==================================
+
+Warm worker process for Python hooks.
+
+A Python hook module defines ``run(context: dict) -> bool | None``. The worker
+imports it once and then serves a line protocol until stdin closes:
+
+- request: one JSON object per line (the hook context)
+- response: one JSON object per line, ``{"ok": bool, "message": str}``
+
+Usage:
+    python core/hooks/worker.py path/to/hook.py
+"""
+
+from typing import Any, Callable, Dict, Tuple
+import importlib.util
+import json
+import os
+import sys
+
+
+def load_hook(path: str) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Import a Python hook file and return its ``run`` callable
+
+    Args:
+        path: Path to the hook module
+
+    Returns:
+        The module's ``run`` function
+    """
+    module_name = "claude_hook_" + os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load hook module: {path}")
+
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    run = getattr(module, "run", None)
+    if not callable(run):
+        raise ImportError(f"Hook module has no run(context) function: {path}")
+    return run
+
+
+def call_hook(
+    hook: Callable[[Dict[str, Any]], Any], context: Dict[str, Any]
+) -> Tuple[bool, str]:
+    """
+    Call a hook and normalize its outcome
+
+    ``None`` and truthy return values count as success; exceptions are failures.
+    """
+    try:
+        result = hook(context)
+    except Exception as e:
+        return False, f"{type(e).__name__}: {e}"
+
+    if result is None or result is True:
+        return True, ""
+    if isinstance(result, tuple) and len(result) == 2:
+        return bool(result[0]), str(result[1])
+    return bool(result), ""
+
+
+def serve(path: str, stdin=None, stdout=None):
+    """Serve hook calls over the line protocol until stdin is closed"""
+    stdin = stdin or sys.stdin
+    protocol_out = stdout or sys.stdout
+    # Anything the hook prints must not corrupt the protocol stream
+    sys.stdout = sys.stderr
+
+    hook = load_hook(path)
+
+    for line in stdin:
+        if not line.strip():
+            continue
+        try:
+            context = json.loads(line)
+        except ValueError as e:
+            ok, message = False, f"Invalid context: {e}"
+        else:
+            ok, message = call_hook(hook, context)
+
+        protocol_out.write(json.dumps({"ok": ok, "message": message}) + "\n")
+        protocol_out.flush()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: worker.py <hook.py>", file=sys.stderr)
+        sys.exit(2)
+    serve(sys.argv[1])
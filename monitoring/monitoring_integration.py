@@ -4,15 +4,20 @@ Claude Enhancer 5.1 - 监控系统集成
 """
 
 import asyncio
+import fnmatch
 import logging
+import os
+import re
 import time
 import yaml
-from typing import Dict, List, Any, Optional, Callable
+from collections import deque
+from typing import Dict, List, Any, Optional, Callable, Sequence, Tuple
 from pathlib import Path
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import aiohttp
 import json
+import numpy as np
 
 # 导入现有的监控组件
 from backend.core.metrics_collector import MetricsCollector, MetricsConfig, AlertLevel
@@ -29,6 +34,7 @@ class MonitoringConfig:
     prometheus_config: str = "monitoring/prometheus_config.yml"
     grafana_dashboard: str = "monitoring/grafana_dashboard.json"
     alerting_rules: str = "monitoring/alerting_rules.yml"
+    slo_file: str = "observability/slo/slo.yml"
 
     # 服务配置
     service_name: str = "claude-enhancer-5.1"
@@ -48,74 +54,505 @@ class MonitoringConfig:
     alert_cooldown: int = 300  # 5分钟冷却期
     notification_timeout: int = 30
 
+    # 异常检测
+    anomaly_state_file: Optional[str] = None  # 默认 /tmp/{service_name}_anomaly_state.json
+    anomaly_state_save_interval: int = 300  # 5分钟保存一次检测状态
 
-class SLACalculator:
-    """SLA计算器"""
 
-    def __init__(self):
-        self.sla_targets = {
-            "availability": 99.9,  # 99.9%
-            "response_time": 200,  # 200ms P95
-            "error_rate": 0.1,  # 0.1%
-        }
-        self.measurements = {}
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400}
 
-    async def calculate_availability_sli(
-        self, metrics_collector: MetricsCollector
-    ) -> float:
-        """计算可用性SLI"""
-        try:
-            pass  # Auto-fixed empty block
-            # 获取最近24小时的up指标
-            up_time = 0
-            total_time = 24 * 60 * 60  # 24小时
 
-            # 这里应该从实际指标中计算
-            # 简化实现，假设从metrics_collector获取
-            availability = (up_time / total_time) * 100
-            return availability
+def _parse_duration(value, default_unit: str = "s") -> float:
+    """解析 "200ms" / "5m" / "30d" / 0.1 等时长，返回秒"""
+    if isinstance(value, (int, float)):
+        return float(value) * _DURATION_UNITS[default_unit]
+    match = re.fullmatch(r"\s*([\d.]+)\s*(ms|s|m|h|d)?\s*", str(value))
+    if not match:
+        raise ValueError(f"无法解析时长: {value}")
+    return float(match.group(1)) * _DURATION_UNITS[match.group(2) or default_unit]
 
-        except Exception as e:
-            logger.error(f"计算可用性SLI失败: {e}")
-            return 0.0
 
-    async def calculate_latency_sli(self, metrics_collector: MetricsCollector) -> float:
-        """计算延迟SLI"""
-        try:
-            pass  # Auto-fixed empty block
-            # 计算95%分位数延迟
-            # 这里应该从histogram数据计算
-            p95_latency = 150.0  # 示例值，单位毫秒
-            return p95_latency
+def _parse_target(value) -> float:
+    """"99.9%" -> 0.999；非百分比目标（阈值型SLO）按100%处理"""
+    text = str(value).strip()
+    if text.endswith("%"):
+        return float(text[:-1]) / 100
+    return 1.0
 
-        except Exception as e:
-            logger.error(f"计算延迟SLI失败: {e}")
-            return float("inf")
 
-    async def calculate_error_rate_sli(
-        self, metrics_collector: MetricsCollector
-    ) -> float:
-        """计算错误率SLI"""
-        try:
-            pass  # Auto-fixed empty block
-            # 计算错误率
-            total_requests = 1000  # 从指标获取
-            error_requests = 1  # 从指标获取
+def _parse_selector(text: str) -> Tuple[str, List[Tuple[str, str, str]]]:
+    """解析 metric{label="v",label=~"re"} 形式的选择器"""
+    match = re.fullmatch(r"\s*([A-Za-z_:][\w:]*)\s*(?:\{(.*)\})?\s*", text)
+    if not match:
+        raise ValueError(f"无法解析指标选择器: {text}")
+    matchers = [
+        (label, op, value)
+        for label, op, value in re.findall(
+            r'(\w+)\s*(=~|!~|!=|=)\s*"([^"]*)"', match.group(2) or ""
+        )
+    ]
+    return match.group(1), matchers
+
+
+def _label_matches(labels: Dict[str, str], matchers) -> bool:
+    for label, op, expected in matchers:
+        actual = labels.get(label, "")
+        if op == "=":
+            ok = actual == expected
+        elif op == "!=":
+            ok = actual != expected
+        elif op == "=~":
+            ok = re.fullmatch(expected, actual) is not None
+        elif op == "!~":
+            ok = re.fullmatch(expected, actual) is None
+        elif op == "glob":
+            ok = any(fnmatch.fnmatchcase(actual, pattern) for pattern in expected)
+        elif op == "<":
+            ok = actual.isdigit() and int(actual) < expected
+        elif op == ">=":
+            ok = actual.isdigit() and int(actual) >= expected
+        else:
+            ok = False
+        if not ok:
+            return False
+    return True
 
-            if total_requests == 0:
-                return 0.0
 
-            error_rate = (error_requests / total_requests) * 100
-            return error_rate
+@dataclass
+class SLODefinition:
+    """SLO定义（来自 observability/slo/slo.yml）"""
+
+    name: str
+    description: str
+    indicator_type: str
+    target: float  # 好事件比例目标，如0.999
+    window_minutes: int
+    # 事件来源: (角色, 指标名, 标签匹配条件, 延迟阈值秒)
+    # 角色: total/good/bad 取计数器增量；latency_total/latency_good/latency_bad 取分桶计数
+    sources: List[Tuple[str, str, list, Optional[float]]] = field(default_factory=list)
+    # 阈值型SLO（throughput/resource）: 每分钟的仪表均值满足条件即为一个好分钟
+    gauge: Optional[Tuple[str, str, float]] = None  # (指标名, "min"/"max", 阈值)
+    percentile: Optional[float] = None  # 延迟SLO报告的分位数，如0.95
+    # 多窗口燃烧率告警: (长窗口分钟, 短窗口分钟, 燃烧率, 严重级别)
+    burn_rate_alerts: List[Tuple[int, int, float, str]] = field(default_factory=list)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["SLODefinition"]:
+        """由YAML条目构建；指标无法从MetricsCollector获得的SLO返回None"""
+        indicator = config.get("indicator", {})
+        kind = indicator.get("type")
+        spec = indicator.get("spec", {}) or {}
+        slo = cls(
+            name=config["name"],
+            description=config.get("description", ""),
+            indicator_type=kind,
+            target=_parse_target(config.get("target", "100%")),
+            window_minutes=int(
+                _parse_duration(config.get("window", {}).get("rolling", "30d"), "m")
+                // 60
+            ),
+        )
+
+        if kind == "availability":
+            scope = []
+            if spec.get("endpoints"):
+                scope.append(("endpoint", "glob", tuple(spec["endpoints"])))
+            max_status, max_latency = 500, None
+            for criterion in spec.get("success_criteria", []):
+                subject, _, limit = str(criterion).partition("<")
+                if subject.strip() == "status_code":
+                    max_status = int(limit)
+                elif subject.strip() == "response_time":
+                    max_latency = _parse_duration(limit.strip())
+            slo.sources = [
+                ("total", "http_requests_total", scope, None),
+                (
+                    "bad",
+                    "http_requests_total",
+                    scope + [("status", ">=", max_status)],
+                    None,
+                ),
+            ]
+            if max_latency is not None:
+                # 状态码正常但超过响应时间上限的请求同样算失败
+                slo.sources.append(
+                    (
+                        "latency_bad",
+                        "http_request_duration",
+                        scope + [("status", "<", max_status)],
+                        max_latency,
+                    )
+                )
+
+        elif kind == "latency":
+            threshold = _parse_duration(spec["threshold"])
+            if spec.get("metric"):
+                metric, scope = spec["metric"], []
+            else:
+                metric = "http_request_duration"
+                scope = [("endpoint", "glob", (spec["endpoint"],))]
+                if spec.get("method"):
+                    scope.append(("method", "=", spec["method"]))
+            slo.sources = [
+                ("latency_total", metric, scope, None),
+                ("latency_good", metric, scope, threshold),
+            ]
+            if spec.get("percentile"):
+                slo.percentile = float(str(spec["percentile"]).lstrip("p")) / 100
+
+        elif kind == "error_rate":
+            slo.sources = [
+                ("total", *_parse_selector(spec["denominator"]), None),
+                ("bad", *_parse_selector(spec["numerator"]), None),
+            ]
+
+        elif kind == "custom":
+            match = re.fullmatch(
+                r"\s*sum\((.+)\)\s*/\s*sum\((.+)\)\s*", spec.get("query", ""), re.S
+            )
+            if not match:
+                return None
+            slo.sources = [
+                ("good", *_parse_selector(match.group(1)), None),
+                ("total", *_parse_selector(match.group(2)), None),
+            ]
+
+        elif kind == "throughput":
+            slo.gauge = (spec["metric"], "min", float(spec["min_threshold"]))
+
+        elif kind == "resource":
+            slo.gauge = (spec["metric"], "max", float(spec["max_threshold"]))
+
+        else:
+            return None
+
+        rules = config.get("burn_rate_alerts")
+        if rules:
+            for rule in rules:
+                long_window = int(_parse_duration(rule["window"], "m") // 60)
+                slo.burn_rate_alerts.append(
+                    (
+                        long_window,
+                        max(long_window // 12, 1),
+                        float(rule["burn_rate"]),
+                        rule.get("severity", "warning"),
+                    )
+                )
+        elif slo.target < 1:
+            slo.burn_rate_alerts = list(DEFAULT_BURN_RATE_ALERTS)
+        return slo
+
+
+# 默认多窗口多燃烧率告警（短窗口为长窗口的1/12，两个窗口都超过燃烧率才触发）
+DEFAULT_BURN_RATE_ALERTS = [
+    (60, 5, 14.4, "critical"),  # 1小时消耗30天预算的2%
+    (360, 30, 6.0, "critical"),  # 6小时消耗5%
+    (4320, 360, 1.0, "warning"),  # 3天消耗10%
+]
+
+# 报告中列出燃烧率的窗口
+REPORT_WINDOWS = {"5m": 5, "1h": 60, "6h": 360, "3d": 4320}
+
+
+class _SLOTracker:
+    """
+    单个SLO的分钟级预聚合
+
+    每分钟一个 (计数事件数, 总事件数) 槽位（延迟SLO另有分桶计数），环形存储；
+    计数事件是好事件还是坏事件取决于SLO的事件来源（如错误率SLO计的是5xx请求）。
+    每个统计窗口维护滑动和，分钟结束时加入新分钟、减去滑出窗口的分钟，
+    查询任意窗口都是O(1)，不需要重新扫描原始样本。
+    """
+
+    def __init__(self, slo: SLODefinition, bucket_count: int, minute: int):
+        self.slo = slo
+        self.counts_bad = any(role.endswith("bad") for role, *_ in slo.sources)
+        self.windows = sorted(
+            {slo.window_minutes, *REPORT_WINDOWS.values()}
+            | {w for rule in slo.burn_rate_alerts for w in rule[:2]}
+        )
+        self.size = self.windows[-1]
+        self.good = np.zeros(self.size)
+        self.total = np.zeros(self.size)
+        self.sums = {w: np.zeros(2) for w in self.windows}
+
+        # 延迟SLO在SLO窗口上维护分桶计数，用于估算分位数
+        self.hist = np.zeros((self.size, bucket_count)) if slo.percentile else None
+        self.hist_sum = np.zeros(bucket_count) if slo.percentile else None
+
+        self.minute = minute
+        self.started = minute  # 有数据的第一分钟（停顿超过最长窗口后重置）
+        self.current = np.zeros(2)
+        self.current_hist = np.zeros(bucket_count) if slo.percentile else None
+        self.gauge_sum = 0.0
+        self.gauge_samples = 0
+        self.firing = set()  # 正在触发的告警规则
+
+    def advance(self, minute: int):
+        """结束minute之前的所有分钟"""
+        if minute - self.minute >= self.size:
+            # 停顿超过最长窗口，所有窗口都已滑出
+            self._close_minute()
+            self.good[:] = self.total[:] = 0
+            for sums in self.sums.values():
+                sums[:] = 0
+            if self.hist is not None:
+                self.hist[:] = self.hist_sum[:] = 0
+            self.minute = self.started = minute
+            return
+        while self.minute < minute:
+            self._close_minute()
+            self.minute += 1
+
+    def _close_minute(self):
+        if self.slo.gauge is not None and self.gauge_samples:
+            metric, mode, threshold = self.slo.gauge
+            average = self.gauge_sum / self.gauge_samples
+            met = average >= threshold if mode == "min" else average <= threshold
+            self.current[:] = (1.0 if met else 0.0, 1.0)
+        self.gauge_sum, self.gauge_samples = 0.0, 0
+
+        slot = self.minute % self.size
+        for window, sums in self.sums.items():
+            expired = (self.minute - window) % self.size
+            sums[0] += self.current[0] - self.good[expired]
+            sums[1] += self.current[1] - self.total[expired]
+        if self.hist is not None:
+            expired = (self.minute - self.slo.window_minutes) % self.size
+            self.hist_sum += self.current_hist - self.hist[expired]
+            self.hist[slot] = self.current_hist
+            self.current_hist = np.zeros_like(self.current_hist)
+
+        self.good[slot], self.total[slot] = self.current
+        self.current = np.zeros(2)
+
+    def window(self, minutes: int) -> Tuple[float, float]:
+        """(好事件数, 总事件数)：最近minutes个完整分钟加当前分钟"""
+        counted, total = np.maximum(self.sums[minutes] + self.current, 0.0)
+        good = total - counted if self.counts_bad else counted
+        return max(float(good), 0.0), float(total)
+
+    def covered_minutes(self) -> int:
+        """已有数据的完整分钟数"""
+        return self.minute - self.started
+
+    def burn_rate(self, minutes: int) -> Optional[float]:
+        """错误预算燃烧率（1表示恰好在窗口结束时耗尽预算；没有数据或没有预算时为None）"""
+        good, total = self.window(minutes)
+        budget = 1 - self.slo.target
+        if total <= 0 or budget <= 0:
+            return None
+        return max(1 - good / total, 0.0) / budget
 
-        except Exception as e:
-            logger.error(f"计算错误率SLI失败: {e}")
-            return 100.0
+
+class SLACalculator:
+    """
+    SLI/SLO计算器
+
+    由 observability/slo/slo.yml 中的SLO定义驱动，从MetricsCollector的请求计数器
+    和延迟分桶计数中增量读取（每次只取与上次读取之间的差值），按分钟预聚合，
+    计算各窗口的SLI、错误预算和多窗口多燃烧率告警（5m/1h/6h/3d）。
+    """
+
+    def __init__(self, slo_file: Optional[str] = "observability/slo/slo.yml"):
+        self.slos: List[SLODefinition] = []
+        self.trackers: Dict[str, _SLOTracker] = {}
+        self._bounds: Optional[np.ndarray] = None
+
+        # 上次读取的累计值
+        self._last_counters: Dict[str, float] = {}
+        self._last_buckets: Dict[str, np.ndarray] = {}
+        self._baseline_taken = False
+        # 指标键 -> [(跟踪器, 角色, 分桶权重)]，新键首次出现时计算一次
+        self._routes: Dict[str, list] = {}
+
+        if slo_file:
+            self.load_slos(slo_file)
+
+    def load_slos(self, path: str):
+        """加载SLO定义"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                config = yaml.safe_load(f) or {}
+        except OSError as e:
+            logger.warning(f"SLO定义加载失败: {e}")
+            return
+
+        for entry in config.get("slos", []):
+            try:
+                slo = SLODefinition.from_config(entry)
+            except (KeyError, ValueError) as e:
+                logger.warning(f"跳过无效的SLO定义 {entry.get('name')}: {e}")
+                continue
+            if slo is None:
+                logger.info(f"SLO {entry.get('name')} 的指标类型暂不支持，跳过")
+                continue
+            self.slos.append(slo)
+        logger.info(f"加载了 {len(self.slos)} 个SLO定义")
+
+    # === 增量读取 ===
+
+    def _bucket_weights(self, threshold: Optional[float]) -> np.ndarray:
+        """
+        分桶权重：延迟 <= threshold 的桶权重为1，阈值所在的桶按线性插值取部分
+        threshold为None时全部为1（计数全部请求）
+        """
+        weights = np.ones(len(self._bounds) + 1)
+        if threshold is None:
+            return weights
+        lower = np.concatenate(([0.0], self._bounds))
+        upper = np.concatenate((self._bounds, [np.inf]))
+        return np.clip((threshold - lower) / (upper - lower), 0.0, 1.0)
+
+    def _route(self, key: str, name: str, labels: Dict[str, str], histogram: bool):
+        routes = []
+        for tracker in self.trackers.values():
+            for role, metric, matchers, threshold in tracker.slo.sources:
+                if (
+                    metric == name
+                    and role.startswith("latency_") == histogram
+                    and _label_matches(labels, matchers)
+                ):
+                    weights = None
+                    if histogram:
+                        weights = self._bucket_weights(threshold)
+                        if role == "latency_bad":
+                            weights = 1 - weights
+                    routes.append((tracker, role, weights))
+        self._routes[key] = routes
+        return routes
+
+    def poll(self, metrics_collector: MetricsCollector, now: Optional[float] = None):
+        """
+        读取MetricsCollector自上次调用以来的增量，计入当前分钟
+
+        首次调用只记录基线；之后新出现的指标键全部计为增量。计数器变小（进程重启）时
+        以当前值作为增量。
+        """
+        now = now if now is not None else time.time()
+        minute = int(now // 60)
+        if self._bounds is None:
+            self._bounds = np.asarray(metrics_collector.histogram_bounds, dtype=float)
+            self.trackers = {
+                slo.name: _SLOTracker(slo, len(self._bounds) + 1, minute)
+                for slo in self.slos
+            }
+        for tracker in self.trackers.values():
+            tracker.advance(minute)
+
+        baseline = not self._baseline_taken
+        self._baseline_taken = True
+
+        for key, value in metrics_collector.counters.items():
+            last = self._last_counters.get(key)
+            self._last_counters[key] = value
+            if baseline:
+                continue
+            delta = value if last is None or value < last else value - last
+            if not delta:
+                continue
+            routes = self._routes.get(key)
+            if routes is None:
+                routes = self._route(key, *metrics_collector._parse_key(key), False)
+            for tracker, role, _ in routes:
+                tracker.current[1 if role == "total" else 0] += delta
+
+        for key, counts in metrics_collector.bucket_counts.items():
+            counts = np.asarray(counts, dtype=float)
+            last = self._last_buckets.get(key)
+            self._last_buckets[key] = counts
+            if baseline:
+                continue
+            delta = counts if last is None or (counts < last).any() else counts - last
+            if not delta.any():
+                continue
+            routes = self._routes.get(key)
+            if routes is None:
+                routes = self._route(key, *metrics_collector._parse_key(key), True)
+            for tracker, role, weights in routes:
+                if role == "latency_total":
+                    tracker.current[1] += delta.sum()
+                    if tracker.current_hist is not None:
+                        tracker.current_hist += delta
+                else:
+                    tracker.current[0] += delta @ weights
+
+        for tracker in self.trackers.values():
+            slo = tracker.slo
+            if slo.gauge is not None:
+                metric = slo.gauge[0]
+                for key, value in metrics_collector.gauges.items():
+                    if key == metric or key.startswith(metric + "{"):
+                        tracker.gauge_sum += value
+                        tracker.gauge_samples += 1
+
+    # === 评估 ===
+
+    def _percentile(self, tracker: _SLOTracker) -> Optional[float]:
+        """由SLO窗口内的分桶计数估算延迟分位数（秒，桶内线性插值）"""
+        counts = np.maximum(tracker.hist_sum + tracker.current_hist, 0.0)
+        total = counts.sum()
+        if total <= 0:
+            return None
+        rank = tracker.slo.percentile * total
+        cumulative = np.cumsum(counts)
+        index = int(np.searchsorted(cumulative, rank))
+        if index >= len(self._bounds):
+            return float(self._bounds[-1])
+        lower = self._bounds[index - 1] if index else 0.0
+        below = cumulative[index - 1] if index else 0.0
+        fraction = (rank - below) / counts[index] if counts[index] else 1.0
+        return float(lower + (self._bounds[index] - lower) * fraction)
+
+    def evaluate_alerts(self) -> List[Dict[str, Any]]:
+        """
+        评估多窗口燃烧率告警，返回本次新触发的告警
+
+        长窗口和短窗口的燃烧率都超过阈值才触发；短窗口保证问题恢复后告警能很快解除。
+        启动后数据不足短窗口跨度时跳过该规则，否则长窗口只包含最初几分钟，
+        第一分钟的错误就会触发告警。
+        """
+        fired = []
+        for tracker in self.trackers.values():
+            slo = tracker.slo
+            for rule in slo.burn_rate_alerts:
+                long_window, short_window, threshold, severity = rule
+                long_burn = tracker.burn_rate(long_window)
+                short_burn = tracker.burn_rate(short_window)
+                active = (
+                    tracker.covered_minutes() >= short_window
+                    and long_burn is not None
+                    and short_burn is not None
+                    and long_burn >= threshold
+                    and short_burn >= threshold
+                )
+                if active and rule not in tracker.firing:
+                    fired.append(
+                        {
+                            "slo": slo.name,
+                            "severity": severity,
+                            "long_window": long_window,
+                            "short_window": short_window,
+                            "burn_rate": long_burn,
+                            "threshold": threshold,
+                            "message": (
+                                f"SLO {slo.name} 错误预算燃烧过快: "
+                                f"{long_window}分钟燃烧率{long_burn:.1f}, "
+                                f"{short_window}分钟燃烧率{short_burn:.1f}, "
+                                f"阈值{threshold}"
+                            ),
+                        }
+                    )
+                    tracker.firing.add(rule)
+                elif not active:
+                    tracker.firing.discard(rule)
+        return fired
 
     async def check_sla_compliance(
         self, metrics_collector: MetricsCollector
     ) -> Dict[str, Any]:
         """检查SLA合规性"""
+        self.poll(metrics_collector)
         compliance_report = {
             "timestamp": datetime.now(),
             "compliance": {},
@@ -123,62 +560,52 @@ class SLACalculator:
             "recommendations": [],
         }
 
-        # 检查可用性
-        availability = await self.calculate_availability_sli(metrics_collector)
-        availability_compliant = availability >= self.sla_targets["availability"]
-        compliance_report["compliance"]["availability"] = {
-            "target": self.sla_targets["availability"],
-            "actual": availability,
-            "compliant": availability_compliant,
-            "margin": availability - self.sla_targets["availability"],
-        }
-
-        if not availability_compliant:
-            compliance_report["violations"].append(
-                {
-                    "metric": "availability",
-                    "severity": "critical",
-                    "message": f"可用性{availability}%低于SLA要求{self.sla_targets['availability']}%",
-                }
-            )
-
-        # 检查响应时间
-        latency = await self.calculate_latency_sli(metrics_collector)
-        latency_compliant = latency <= self.sla_targets["response_time"]
-        compliance_report["compliance"]["response_time"] = {
-            "target": self.sla_targets["response_time"],
-            "actual": latency,
-            "compliant": latency_compliant,
-            "margin": self.sla_targets["response_time"] - latency,
-        }
-
-        if not latency_compliant:
-            compliance_report["violations"].append(
-                {
-                    "metric": "response_time",
-                    "severity": "warning",
-                    "message": f"P95响应时间{latency}ms超过SLA要求{self.sla_targets['response_time']}ms",
-                }
-            )
-
-        # 检查错误率
-        error_rate = await self.calculate_error_rate_sli(metrics_collector)
-        error_rate_compliant = error_rate <= self.sla_targets["error_rate"]
-        compliance_report["compliance"]["error_rate"] = {
-            "target": self.sla_targets["error_rate"],
-            "actual": error_rate,
-            "compliant": error_rate_compliant,
-            "margin": self.sla_targets["error_rate"] - error_rate,
-        }
+        for name, tracker in self.trackers.items():
+            slo = tracker.slo
+            good, total = tracker.window(slo.window_minutes)
+            if total <= 0:
+                continue  # 窗口内没有数据
+
+            actual = good / total * 100
+            target = slo.target * 100
+            compliant = actual >= target
+            budget = (1 - slo.target) * total
+            entry = {
+                "target": target,
+                "actual": actual,
+                "compliant": compliant,
+                "margin": actual - target,
+                "window_minutes": slo.window_minutes,
+                "events": total,
+                "error_budget_remaining": (
+                    1 - (total - good) / budget if budget > 0 else float(compliant)
+                ),
+                "burn_rates": {
+                    label: tracker.burn_rate(minutes)
+                    for label, minutes in REPORT_WINDOWS.items()
+                },
+            }
+            if slo.percentile:
+                latency = self._percentile(tracker)
+                entry[f"p{slo.percentile * 100:g}_ms"] = (
+                    latency * 1000 if latency is not None else None
+                )
+            compliance_report["compliance"][name] = entry
 
-        if not error_rate_compliant:
-            compliance_report["violations"].append(
-                {
-                    "metric": "error_rate",
-                    "severity": "error",
-                    "message": f"错误率{error_rate}%超过SLA要求{self.sla_targets['error_rate']}%",
-                }
-            )
+            if not compliant:
+                compliance_report["violations"].append(
+                    {
+                        "metric": name,
+                        "severity": "critical"
+                        if slo.indicator_type == "availability"
+                        else "warning",
+                        "message": f"{slo.description or name}: {actual:.3f}%低于SLO目标{target:g}%",
+                    }
+                )
+            if tracker.firing:
+                compliance_report["recommendations"].append(
+                    f"{name} 错误预算正在快速消耗，建议暂停发布并排查"
+                )
 
         return compliance_report
 
@@ -262,93 +689,536 @@ class HealthChecker:
         }
 
 
-class AnomalyDetector:
-    """异常检测器"""
+class SeriesState:
+    """单个序列的在线检测状态"""
+
+    __slots__ = (
+        "count",  # Welford: 样本数、均值、离差平方和
+        "mean",
+        "m2",
+        "ewma",  # 基线EWMA及其方差
+        "ewm_var",
+        "fast",  # 短窗口EWMA（趋势检测）
+        "cusum_pos",  # 双边CUSUM累积量
+        "cusum_neg",
+        "trend_active",
+        "last_timestamp",
+    )
 
     def __init__(self):
-        self.baseline_data = {}
-        self.anomalies = []
+        self.count = 0
+        self.mean = self.m2 = 0.0
+        self.ewma = self.ewm_var = self.fast = 0.0
+        self.cusum_pos = self.cusum_neg = 0.0
+        self.trend_active = False
+        self.last_timestamp = 0.0
+
+    @property
+    def std_dev(self) -> float:
+        return (self.m2 / self.count) ** 0.5 if self.count else 0.0
+
+    def to_list(self) -> List[float]:
+        return [getattr(self, name) for name in self.__slots__]
+
+    @classmethod
+    def from_list(cls, values: List[float]) -> "SeriesState":
+        state = cls()
+        for name, value in zip(cls.__slots__, values):
+            setattr(state, name, value)
+        state.count = int(state.count)
+        state.trend_active = bool(state.trend_active)
+        return state
+
+
+def _linear_recurrence(b: np.ndarray, decay: float, y0: float) -> np.ndarray:
+    """
+    向量化求解 y_t = decay * y_{t-1} + b_t
+
+    展开为 y_t = decay^t * (y0 + Σ b_i * decay^-i)，分块计算以免decay^-i溢出
+    """
+    if decay == 0:
+        return b.copy()
+
+    out = np.empty_like(b)
+    chunk = max(1, int(50 / -np.log10(decay)))  # 保证 decay^-chunk <= 1e50
+    for start in range(0, len(b), chunk):
+        segment = b[start : start + chunk]
+        powers = decay ** np.arange(1, len(segment) + 1)
+        out[start : start + len(segment)] = powers * (y0 + np.cumsum(segment / powers))
+        y0 = out[start + len(segment) - 1]
+    return out
+
+
+def _cusum(y: np.ndarray, s0: float) -> np.ndarray:
+    """向量化求解 s_t = max(0, s_{t-1} + y_t)（Lindley递推）"""
+    partial = s0 + np.cumsum(y)
+    return partial - np.minimum(np.minimum.accumulate(partial), 0)
 
-    async def detect_statistical_anomalies(
-        self, metric_name: str, values: List[float], threshold: float = 3.0
+
+class AnomalyDetector:
+    """
+    异常检测器（在线）
+
+    每个序列维护Welford均值/方差、EWMA基线、短窗口EWMA和双边CUSUM状态，
+    每个新数据点O(1)处理，不再每轮重新扫描完整历史：
+    - 统计异常: 相对EWMA基线的Z-Score超过阈值
+    - 水平偏移: 标准化偏差的双边CUSUM超过决策阈值（报警后重置）
+    - 趋势变化: 短窗口EWMA相对基线的变化比例超过阈值（只在进入时报告一次）
+
+    状态可保存到文件并在重启后恢复；大批量数据（回填）走NumPy向量化路径，
+    结果与逐点处理一致。
+    """
+
+    # 批处理时CUSUM每次求解的块大小（报警后只需重算报警点之后的一块）
+    CUSUM_BLOCK = 512
+
+    def __init__(
+        self,
+        alpha: float = 0.05,
+        trend_window: int = 10,
+        z_threshold: float = 3.0,
+        cusum_k: float = 0.5,
+        cusum_h: float = 5.0,
+        trend_threshold: float = 0.5,
+        min_samples: int = 10,
+        batch_threshold: int = 64,
+    ):
+        """
+        Args:
+            alpha: 基线EWMA平滑系数
+            trend_window: 短窗口EWMA的等效窗口大小
+            z_threshold: Z-Score阈值
+            cusum_k: CUSUM容许偏差（以标准差计）
+            cusum_h: CUSUM决策阈值（以标准差计）
+            trend_threshold: 趋势变化比例阈值
+            min_samples: 开始检测前的预热点数
+            batch_threshold: 单次数据点数达到该值时使用向量化批处理
+        """
+        self.alpha = alpha
+        self.fast_alpha = 2 / (trend_window + 1)
+        self.z_threshold = z_threshold
+        self.cusum_k = cusum_k
+        self.cusum_h = cusum_h
+        self.trend_threshold = trend_threshold
+        self.min_samples = min_samples
+        self.batch_threshold = batch_threshold
+
+        self.series: Dict[str, SeriesState] = {}
+        self.anomalies: deque = deque(maxlen=1000)  # 最近检测到的异常
+        self.stats = {"points_processed": 0, "anomalies_detected": 0}
+
+    def last_timestamp(self, metric_name: str) -> float:
+        """序列最后处理的数据点时间戳（未见过的序列为0）"""
+        state = self.series.get(metric_name)
+        return state.last_timestamp if state else 0.0
+
+    # === 逐点处理 ===
+
+    def update(
+        self, metric_name: str, value: float, timestamp: Optional[float] = None
     ) -> List[Dict]:
-        """基于统计的异常检测（Z-Score方法）"""
-        anomalies = []
+        """处理一个新数据点，返回检测到的异常"""
+        state = self.series.get(metric_name)
+        if state is None:
+            state = self.series[metric_name] = SeriesState()
+        timestamp = timestamp if timestamp is not None else time.time()
 
-        if len(values) < 10:  # 需要足够的数据点
-            return anomalies
+        anomalies = []
+        if state.count >= self.min_samples:
+            std_dev = state.ewm_var**0.5
+            if std_dev > 0:
+                deviation = (value - state.ewma) / std_dev
+                if abs(deviation) > self.z_threshold:
+                    anomalies.append(
+                        self._statistical_anomaly(
+                            metric_name,
+                            state.count,
+                            value,
+                            deviation,
+                            state.ewma,
+                            std_dev,
+                            timestamp,
+                        )
+                    )
 
-        # 计算均值和标准差
-        mean = sum(values) / len(values)
-        variance = sum((x - mean) ** 2 for x in values) / len(values)
-        std_dev = variance**0.5
+                state.cusum_pos = max(0.0, state.cusum_pos + deviation - self.cusum_k)
+                state.cusum_neg = max(0.0, state.cusum_neg - deviation - self.cusum_k)
+                if state.cusum_pos > self.cusum_h or state.cusum_neg > self.cusum_h:
+                    anomalies.append(
+                        self._level_shift_anomaly(
+                            metric_name,
+                            state.count,
+                            value,
+                            state.cusum_pos > self.cusum_h,
+                            max(state.cusum_pos, state.cusum_neg),
+                            state.ewma,
+                            timestamp,
+                        )
+                    )
+                    state.cusum_pos = state.cusum_neg = 0.0
 
-        if std_dev == 0:
-            return anomalies
+        # Welford
+        state.count += 1
+        delta = value - state.mean
+        state.mean += delta / state.count
+        state.m2 += delta * (value - state.mean)
 
-        # 检测异常值
-        for i, value in enumerate(values):
-            z_score = abs(value - mean) / std_dev
-            if z_score > threshold:
+        # EWMA基线
+        if state.count == 1:
+            state.ewma = state.fast = value
+        else:
+            diff = value - state.ewma
+            state.ewma += self.alpha * diff
+            state.ewm_var = (1 - self.alpha) * (
+                state.ewm_var + self.alpha * diff * diff
+            )
+            state.fast += self.fast_alpha * (value - state.fast)
+        if state.count == self.min_samples:
+            # 预热结束时用预热样本的方差初始化EWMA方差
+            state.ewm_var = state.m2 / state.count
+
+        if state.count > self.min_samples:
+            ratio = (
+                abs(state.fast - state.ewma) / state.ewma if state.ewma > 0 else 0.0
+            )
+            active = ratio > self.trend_threshold
+            if active and not state.trend_active:
                 anomalies.append(
-                    {
-                        "metric": metric_name,
-                        "index": i,
-                        "value": value,
-                        "z_score": z_score,
-                        "mean": mean,
-                        "std_dev": std_dev,
-                        "severity": "high" if z_score > threshold * 1.5 else "medium",
-                        "timestamp": datetime.now(),
-                    }
+                    self._trend_anomaly(
+                        metric_name,
+                        state.count - 1,
+                        state.ewma,
+                        state.fast,
+                        ratio,
+                        timestamp,
+                    )
                 )
+            state.trend_active = active
 
+        state.last_timestamp = timestamp
+        self._record(anomalies, 1)
         return anomalies
 
-    async def detect_trend_anomalies(
-        self, metric_name: str, values: List[float], window_size: int = 10
+    # === 批处理 ===
+
+    def backfill(
+        self,
+        metric_name: str,
+        values: Sequence[float],
+        timestamps: Optional[Sequence[float]] = None,
     ) -> List[Dict]:
-        """检测趋势异常"""
-        anomalies = []
+        """
+        批量处理一段数据（向量化），结果与逐点调用update一致
+
+        Args:
+            metric_name: 序列名
+            values: 按时间顺序的数据点
+            timestamps: 对应的时间戳（秒），默认为当前时间
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if timestamps is None:
+            timestamps = np.full(len(values), time.time())
+        else:
+            timestamps = np.asarray(timestamps, dtype=np.float64)
 
-        if len(values) < window_size * 2:
+        # 预热阶段逐点处理
+        anomalies = []
+        start = 0
+        while start < len(values) and (
+            metric_name not in self.series
+            or self.series[metric_name].count < self.min_samples
+        ):
+            anomalies.extend(
+                self.update(metric_name, float(values[start]), float(timestamps[start]))
+            )
+            start += 1
+        values, timestamps = values[start:], timestamps[start:]
+        if not len(values):
             return anomalies
 
-        # 计算移动平均和趋势
-        for i in range(window_size, len(values) - window_size):
-            before_window = values[i - window_size : i]
-            after_window = values[i : i + window_size]
+        state = self.series[metric_name]
+        first_index = state.count
+        batch = []
+
+        # 基线EWMA及其方差（取每个点处理前的值做检测）
+        decay = 1 - self.alpha
+        ewma = _linear_recurrence(self.alpha * values, decay, state.ewma)
+        ewma_before = np.concatenate(([state.ewma], ewma[:-1]))
+        diff = values - ewma_before
+        ewm_var = _linear_recurrence(
+            decay * self.alpha * diff * diff, decay, state.ewm_var
+        )
+        std_before = np.sqrt(np.concatenate(([state.ewm_var], ewm_var[:-1])))
+        valid = std_before > 0
+        deviation = np.divide(diff, std_before, out=np.zeros_like(diff), where=valid)
+
+        for i in np.flatnonzero(valid & (np.abs(deviation) > self.z_threshold)):
+            anomaly = self._statistical_anomaly(
+                metric_name,
+                first_index + i,
+                values[i],
+                deviation[i],
+                ewma_before[i],
+                std_before[i],
+                timestamps[i],
+            )
+            batch.append((i, anomaly))
+
+        # 双边CUSUM：分块求解，每次报警后从下一个点重新累积
+        pos_steps = np.where(valid, deviation - self.cusum_k, 0.0)
+        neg_steps = np.where(valid, -deviation - self.cusum_k, 0.0)
+        pos, neg, offset = state.cusum_pos, state.cusum_neg, 0
+        while offset < len(values):
+            block = slice(offset, offset + self.CUSUM_BLOCK)
+            pos_seq = _cusum(pos_steps[block], pos)
+            neg_seq = _cusum(neg_steps[block], neg)
+            alarms = np.flatnonzero(
+                (pos_seq > self.cusum_h) | (neg_seq > self.cusum_h)
+            )
+            if not len(alarms):
+                pos, neg = pos_seq[-1], neg_seq[-1]
+                offset += len(pos_seq)
+                continue
+            j = alarms[0]
+            i = offset + j
+            anomaly = self._level_shift_anomaly(
+                metric_name,
+                first_index + i,
+                values[i],
+                pos_seq[j] > self.cusum_h,
+                max(pos_seq[j], neg_seq[j]),
+                ewma_before[i],
+                timestamps[i],
+            )
+            batch.append((i, anomaly))
+            pos = neg = 0.0
+            offset = i + 1
 
-            before_avg = sum(before_window) / len(before_window)
-            after_avg = sum(after_window) / len(after_window)
+        # 趋势变化（进入时报告）
+        fast = _linear_recurrence(
+            self.fast_alpha * values, 1 - self.fast_alpha, state.fast
+        )
+        ratio = np.divide(
+            np.abs(fast - ewma), ewma, out=np.zeros_like(ewma), where=ewma > 0
+        )
+        active = ratio > self.trend_threshold
+        entered = active & ~np.concatenate(([state.trend_active], active[:-1]))
+        for i in np.flatnonzero(entered):
+            anomaly = self._trend_anomaly(
+                metric_name,
+                first_index + i,
+                ewma[i],
+                fast[i],
+                ratio[i],
+                timestamps[i],
+            )
+            batch.append((i, anomaly))
+
+        # 合并Welford统计（Chan并行公式）
+        n = len(values)
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        total = state.count + n
+        delta = batch_mean - state.mean
+        state.m2 += batch_m2 + delta * delta * state.count * n / total
+        state.mean += delta * n / total
+        state.count = total
+
+        state.ewma = float(ewma[-1])
+        state.ewm_var = float(ewm_var[-1])
+        state.fast = float(fast[-1])
+        state.cusum_pos, state.cusum_neg = float(pos), float(neg)
+        state.trend_active = bool(active[-1])
+        state.last_timestamp = float(timestamps[-1])
+
+        batch.sort(key=lambda item: item[0])
+        batch = [anomaly for _, anomaly in batch]
+        self._record(batch, n)
+        return anomalies + batch
+
+    def process(
+        self,
+        metric_name: str,
+        values: Sequence[float],
+        timestamps: Optional[Sequence[float]] = None,
+    ) -> List[Dict]:
+        """处理一段新数据：少量点逐点处理，大量点走批处理"""
+        if len(values) >= self.batch_threshold:
+            return self.backfill(metric_name, values, timestamps)
 
-            # 检测显著趋势变化
-            if before_avg > 0:  # 避免除零
-                change_ratio = abs(after_avg - before_avg) / before_avg
+        anomalies = []
+        for i, value in enumerate(values):
+            anomalies.extend(
+                self.update(
+                    metric_name, value, timestamps[i] if timestamps is not None else None
+                )
+            )
+        return anomalies
 
-                if change_ratio > 0.5:  # 50%变化阈值
-                    anomalies.append(
-                        {
-                            "metric": metric_name,
-                            "type": "trend_change",
-                            "index": i,
-                            "before_avg": before_avg,
-                            "after_avg": after_avg,
-                            "change_ratio": change_ratio,
-                            "direction": "increase"
-                            if after_avg > before_avg
-                            else "decrease",
-                            "severity": "high" if change_ratio > 1.0 else "medium",
-                            "timestamp": datetime.now(),
-                        }
-                    )
+    # === 异常记录 ===
 
-        return anomalies
+    def _statistical_anomaly(
+        self, metric_name, index, value, deviation, mean, std_dev, timestamp
+    ) -> Dict:
+        z_score = abs(float(deviation))
+        return {
+            "metric": metric_name,
+            "type": "statistical",
+            "index": int(index),
+            "value": float(value),
+            "z_score": z_score,
+            "mean": float(mean),
+            "std_dev": float(std_dev),
+            "severity": "high" if z_score > self.z_threshold * 1.5 else "medium",
+            "timestamp": datetime.fromtimestamp(timestamp),
+        }
+
+    def _level_shift_anomaly(
+        self, metric_name, index, value, upward, cusum, mean, timestamp
+    ) -> Dict:
+        return {
+            "metric": metric_name,
+            "type": "level_shift",
+            "index": int(index),
+            "value": float(value),
+            "cusum": float(cusum),
+            "mean": float(mean),
+            "direction": "increase" if upward else "decrease",
+            "severity": "medium",
+            "timestamp": datetime.fromtimestamp(timestamp),
+        }
+
+    def _trend_anomaly(
+        self, metric_name, index, before_avg, after_avg, change_ratio, timestamp
+    ) -> Dict:
+        change_ratio = float(change_ratio)
+        return {
+            "metric": metric_name,
+            "type": "trend_change",
+            "index": int(index),
+            "before_avg": float(before_avg),
+            "after_avg": float(after_avg),
+            "change_ratio": change_ratio,
+            "direction": "increase" if after_avg > before_avg else "decrease",
+            "severity": "high" if change_ratio > 1.0 else "medium",
+            "timestamp": datetime.fromtimestamp(timestamp),
+        }
+
+    def _record(self, anomalies: List[Dict], points: int):
+        self.stats["points_processed"] += points
+        self.stats["anomalies_detected"] += len(anomalies)
+        self.anomalies.extend(anomalies)
+
+    # === 状态持久化 ===
+
+    def save_state(self, path: str):
+        """保存所有序列状态（先写临时文件再替换，避免中途崩溃留下半个文件）"""
+        data = {
+            "version": 1,
+            "saved_at": time.time(),
+            "fields": list(SeriesState.__slots__),
+            "series": {name: state.to_list() for name, state in self.series.items()},
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def load_state(self, path: str) -> int:
+        """加载保存的序列状态，返回恢复的序列数（文件不存在或损坏时为0）"""
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("fields") != list(SeriesState.__slots__):
+                logger.warning(f"异常检测状态格式不匹配，忽略: {path}")
+                return 0
+            self.series.update(
+                (name, SeriesState.from_list(values))
+                for name, values in data["series"].items()
+            )
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"异常检测状态加载失败: {e}")
+            return 0
+        return len(data["series"])
+
+    # === 无状态分析 ===
+
+    async def detect_statistical_anomalies(
+        self, metric_name: str, values: List[float], threshold: float = 3.0
+    ) -> List[Dict]:
+        """基于统计的异常检测（Z-Score方法，对给定数据整体计算）"""
+        if len(values) < 10:  # 需要足够的数据点
+            return []
+
+        data = np.asarray(values, dtype=np.float64)
+        mean = float(data.mean())
+        std_dev = float(data.std())
+        if std_dev == 0:
+            return []
+
+        z_scores = np.abs(data - mean) / std_dev
+        now = datetime.now()
+        return [
+            {
+                "metric": metric_name,
+                "index": int(i),
+                "value": float(data[i]),
+                "z_score": float(z_scores[i]),
+                "mean": mean,
+                "std_dev": std_dev,
+                "severity": "high" if z_scores[i] > threshold * 1.5 else "medium",
+                "timestamp": now,
+            }
+            for i in np.flatnonzero(z_scores > threshold)
+        ]
+
+    async def detect_trend_anomalies(
+        self, metric_name: str, values: List[float], window_size: int = 10
+    ) -> List[Dict]:
+        """检测趋势异常（相邻前后窗口均值比较，滑动窗口和由前缀和得出）"""
+        if len(values) < window_size * 2:
+            return []
+
+        data = np.asarray(values, dtype=np.float64)
+        prefix = np.concatenate(([0.0], np.cumsum(data)))
+        window_avg = (prefix[window_size:] - prefix[:-window_size]) / window_size
+        # 位置i（window_size <= i < n - window_size）前后窗口的均值
+        before = window_avg[: len(data) - 2 * window_size]
+        after = window_avg[window_size : len(data) - window_size]
+        change_ratio = np.divide(
+            np.abs(after - before), before, out=np.zeros_like(before), where=before > 0
+        )
+
+        now = datetime.now()
+        return [
+            {
+                "metric": metric_name,
+                "type": "trend_change",
+                "index": int(j) + window_size,
+                "before_avg": float(before[j]),
+                "after_avg": float(after[j]),
+                "change_ratio": float(change_ratio[j]),
+                "direction": "increase" if after[j] > before[j] else "decrease",
+                "severity": "high" if change_ratio[j] > 1.0 else "medium",
+                "timestamp": now,
+            }
+            for j in np.flatnonzero(change_ratio > 0.5)
+        ]
 
     async def analyze_metrics(
-        self, metrics_data: Dict[str, List[float]]
+        self,
+        metrics_data: Dict[str, List[float]],
+        timestamps: Optional[Dict[str, List[float]]] = None,
     ) -> Dict[str, Any]:
-        """分析指标数据，检测异常"""
+        """
+        处理各序列的新数据点，检测异常
+
+        Args:
+            metrics_data: 序列名 -> 自上次调用以来的新数据点
+            timestamps: 序列名 -> 对应的时间戳（秒）
+        """
         analysis_report = {
             "timestamp": datetime.now(),
             "anomalies": {},
@@ -361,17 +1231,9 @@ class AnomalyDetector:
         }
 
         for metric_name, values in metrics_data.items():
-            metric_anomalies = []
-
-            # 统计异常检测
-            statistical_anomalies = await self.detect_statistical_anomalies(
-                metric_name, values
+            metric_anomalies = self.process(
+                metric_name, values, (timestamps or {}).get(metric_name)
             )
-            metric_anomalies.extend(statistical_anomalies)
-
-            # 趋势异常检测
-            trend_anomalies = await self.detect_trend_anomalies(metric_name, values)
-            metric_anomalies.extend(trend_anomalies)
 
             if metric_anomalies:
                 analysis_report["anomalies"][metric_name] = metric_anomalies
@@ -518,7 +1380,7 @@ class MonitoringIntegration:
         # 核心组件
         self.metrics_collector = None
         self.dashboard = None
-        self.sla_calculator = SLACalculator()
+        self.sla_calculator = SLACalculator(self.config.slo_file)
         self.health_checker = HealthChecker(self.config)
         self.anomaly_detector = AnomalyDetector()
         self.notification_manager = NotificationManager(self.config)
@@ -554,6 +1416,15 @@ class MonitoringIntegration:
                 "metrics_collector", self.metrics_collector
             )
 
+            # 恢复异常检测状态，重启后不必重新预热
+            if not self.config.anomaly_state_file:
+                self.config.anomaly_state_file = (
+                    f"/tmp/{self.config.service_name}_anomaly_state.json"
+                )
+            restored = self.anomaly_detector.load_state(self.config.anomaly_state_file)
+            if restored:
+                logger.info(f"恢复了 {restored} 个序列的异常检测状态")
+
             # 注册健康检查
             await self._register_health_checks()
 
@@ -624,61 +1495,83 @@ class MonitoringIntegration:
         logger.info(f"📋 启动了 {len(self.tasks)} 个后台监控任务")
 
     async def _sla_monitoring_loop(self):
-        """SLA监控循环"""
+        """SLA监控循环：按采集间隔增量读取指标，燃烧率告警即时发送，合规报告5分钟一次"""
+        last_report = 0.0
         while self.running:
             try:
-                pass  # Auto-fixed empty block
-                # 检查SLA合规性
-                compliance_report = await self.sla_calculator.check_sla_compliance(
-                    self.metrics_collector
-                )
+                self.sla_calculator.poll(self.metrics_collector)
 
-                # 如果有SLA违规，发送告警
-                for violation in compliance_report.get("violations", []):
+                # 新触发的燃烧率告警
+                for alert in self.sla_calculator.evaluate_alerts():
                     await self.notification_manager.send_notification(
                         {
-                            "name": f"SLA_VIOLATION_{violation['metric'].upper()}",
-                            "severity": violation["severity"],
-                            "message": violation["message"],
+                            "name": f"SLO_BURN_RATE_{alert['slo'].upper()}",
+                            "severity": alert["severity"],
+                            "message": alert["message"],
                             "timestamp": datetime.now(),
                         }
                     )
 
-                # 记录SLA指标
-                for metric, data in compliance_report["compliance"].items():
-                    self.metrics_collector.set_gauge(
-                        f"sla_{metric}_actual", data["actual"]
-                    )
-                    self.metrics_collector.set_gauge(
-                        f"sla_{metric}_compliant", 1 if data["compliant"] else 0
+                if time.time() - last_report >= 300:  # 5分钟检查一次合规性
+                    last_report = time.time()
+                    compliance_report = await self.sla_calculator.check_sla_compliance(
+                        self.metrics_collector
                     )
 
+                    # 如果有SLA违规，发送告警
+                    for violation in compliance_report.get("violations", []):
+                        await self.notification_manager.send_notification(
+                            {
+                                "name": f"SLA_VIOLATION_{violation['metric'].upper()}",
+                                "severity": violation["severity"],
+                                "message": violation["message"],
+                                "timestamp": datetime.now(),
+                            }
+                        )
+
+                    # 记录SLA指标
+                    for metric, data in compliance_report["compliance"].items():
+                        self.metrics_collector.set_gauge(
+                            f"sla_{metric}_actual", data["actual"]
+                        )
+                        self.metrics_collector.set_gauge(
+                            f"sla_{metric}_compliant", 1 if data["compliant"] else 0
+                        )
+                        self.metrics_collector.set_gauge(
+                            f"sla_{metric}_error_budget_remaining",
+                            data["error_budget_remaining"],
+                        )
+
             except Exception as e:
                 logger.error(f"❌ SLA监控任务失败: {e}")
 
-            await asyncio.sleep(300)  # 5分钟检查一次
+            await asyncio.sleep(self.metrics_collector.config.collection_interval)
 
     async def _anomaly_detection_loop(self):
-        """异常检测循环"""
+        """异常检测循环：只把上次检测之后的新数据点送入在线检测器"""
+        last_saved = time.time()
         while self.running:
             try:
-                pass  # Auto-fixed empty block
-                # 收集最近的指标数据
-                metrics_data = {}
-
-                # 从metrics_collector获取历史数据
-                for (
-                    metric_name,
-                    history,
-                ) in self.metrics_collector.metrics_history.items():
-                    if len(history) >= 10:  # 需要足够的数据点
-                        values = [metric.value for metric in list(history)]
-                        metrics_data[metric_name] = values
+                metrics_data, timestamps = {}, {}
+
+                # 从metrics_collector历史数据的末尾向前取新数据点
+                for key, history in list(self.metrics_collector.metrics_history.items()):
+                    since = self.anomaly_detector.last_timestamp(key)
+                    new_points = []
+                    for metric in reversed(history):
+                        timestamp = metric.timestamp.timestamp()
+                        if timestamp <= since:
+                            break
+                        new_points.append((timestamp, metric.value))
+                    if new_points:
+                        new_points.reverse()
+                        timestamps[key] = [t for t, _ in new_points]
+                        metrics_data[key] = [v for _, v in new_points]
 
                 # 执行异常检测
                 if metrics_data:
                     analysis_report = await self.anomaly_detector.analyze_metrics(
-                        metrics_data
+                        metrics_data, timestamps
                     )
 
                     # 处理检测到的异常
@@ -699,13 +1592,18 @@ class MonitoringIntegration:
                     # 记录异常检测指标
                     self.metrics_collector.set_gauge(
                         "anomalies_detected_total",
-                        analysis_report["summary"]["total_anomalies"],
+                        self.anomaly_detector.stats["anomalies_detected"],
                     )
 
+                if time.time() - last_saved >= self.config.anomaly_state_save_interval:
+                    self.anomaly_detector.save_state(self.config.anomaly_state_file)
+                    last_saved = time.time()
+
             except Exception as e:
                 logger.error(f"❌ 异常检测任务失败: {e}")
 
-            await asyncio.sleep(180)  # 3分钟检查一次
+            # 与指标采集同频
+            await asyncio.sleep(self.metrics_collector.config.collection_interval)
 
     async def _health_check_loop(self):
         """健康检查循环"""
@@ -874,6 +1772,13 @@ class MonitoringIntegration:
         for task in self.tasks:
             task.cancel()
 
+        # 保存异常检测状态
+        if self.config.anomaly_state_file:
+            try:
+                self.anomaly_detector.save_state(self.config.anomaly_state_file)
+            except OSError as e:
+                logger.warning(f"异常检测状态保存失败: {e}")
+
         # 关闭组件
         if self.metrics_collector:
             await self.metrics_collector.shutdown()
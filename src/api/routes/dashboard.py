@@ -13,13 +13,16 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 
 from src.core.database import get_db
-from src.core.dependencies import get_current_active_user
+from src.core.dependencies import get_current_active_user, get_rollup_service
 from src.api.models.common import BaseResponse
+from src.services.dashboard_rollups import DashboardRollupService
 from pydantic import BaseModel, Field
 from datetime import datetime
 
 router = APIRouter()
 
+PERIOD_DAYS = {"day": 1, "week": 7, "month": 30, "quarter": 90}
+
 
 # ===== 仪表板数据模型 =====
 
@@ -107,7 +110,8 @@ class ProductivityTrendResponse(BaseResponse):
     description="获取用户的仪表板统计概览",
 )
 async def get_dashboard_overview(
-    current_user=Depends(get_current_active_user), db: Session = Depends(get_db)
+    current_user=Depends(get_current_active_user),
+    rollups: DashboardRollupService = Depends(get_rollup_service),
 ):
     """
     获取仪表板概览
@@ -116,24 +120,8 @@ async def get_dashboard_overview(
     返回用户的核心统计数据，包括任务、项目、效率等指标
     """
     try:
-        pass  # Auto-fixed empty block
-        # 这里应该调用实际的服务层获取数据
-        # 示例数据结构
         stats = DashboardStatsResponse.DashboardStats(
-            total_tasks=25,
-            completed_tasks=18,
-            in_progress_tasks=5,
-            overdue_tasks=2,
-            today_due_tasks=3,
-            total_projects=6,
-            active_projects=4,
-            completed_projects=2,
-            completion_rate=72.0,
-            avg_completion_time=2.5,
-            productivity_score=85,
-            total_time_spent=120,
-            this_week_time=35,
-            today_time=6,
+            **await rollups.get_overview(str(current_user.id))
         )
 
         return DashboardStatsResponse(success=True, message="获取仪表板概览成功", data=stats)
@@ -227,7 +215,7 @@ async def get_upcoming_tasks(
 async def get_productivity_trend(
     period: str = Query("week", regex="^(week|month|quarter)$", description="时间周期"),
     current_user=Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    rollups: DashboardRollupService = Depends(get_rollup_service),
 ):
     """
     获取生产力趋势
@@ -236,18 +224,12 @@ async def get_productivity_trend(
     返回指定时间段的生产力趋势数据
     """
     try:
-        pass  # Auto-fixed empty block
-        # 根据周期计算日期范围
-        now = datetime.utcnow()
-        if period == "week":
-            start_date = now - timedelta(days=7)
-        elif period == "month":
-            start_date = now - timedelta(days=30)
-        else:  # quarter
-            start_date = now - timedelta(days=90)
-
-        # 这里应该调用实际的服务层获取数据
-        trend_data = []
+        trend_data = [
+            ProductivityTrendResponse.TrendData(**point)
+            for point in await rollups.get_productivity_trend(
+                str(current_user.id), PERIOD_DAYS[period]
+            )
+        ]
 
         return ProductivityTrendResponse(
             success=True, message="获取生产力趋势成功", data=trend_data
@@ -292,7 +274,8 @@ async def get_project_progress(
 
 @router.get("/task-distribution", summary="获取任务分布统计", description="获取任务按状态、优先级等维度的分布统计")
 async def get_task_distribution(
-    current_user=Depends(get_current_active_user), db: Session = Depends(get_db)
+    current_user=Depends(get_current_active_user),
+    rollups: DashboardRollupService = Depends(get_rollup_service),
 ):
     """
     获取任务分布统计
@@ -301,19 +284,7 @@ async def get_task_distribution(
     返回任务的各种分布统计数据
     """
     try:
-        pass  # Auto-fixed empty block
-        # 这里应该调用实际的服务层获取数据
-        distribution = {
-            "by_status": {
-                "todo": 5,
-                "in_progress": 8,
-                "in_review": 3,
-                "done": 18,
-                "blocked": 1,
-            },
-            "by_priority": {"low": 10, "medium": 15, "high": 8, "urgent": 2},
-            "by_project": {},
-        }
+        distribution = await rollups.get_task_distribution(str(current_user.id))
 
         return {"success": True, "message": "获取任务分布统计成功", "data": distribution}
 
@@ -331,7 +302,7 @@ async def get_task_distribution(
 async def get_time_tracking(
     period: str = Query("week", regex="^(day|week|month)$", description="统计周期"),
     current_user=Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    rollups: DashboardRollupService = Depends(get_rollup_service),
 ):
     """
     获取工时统计
@@ -340,15 +311,9 @@ async def get_time_tracking(
     返回指定周期的工时统计数据
     """
     try:
-        pass  # Auto-fixed empty block
-        # 这里应该调用实际的服务层获取数据
-        time_stats = {
-            "total_hours": 40,
-            "billable_hours": 35,
-            "break_down": {"project_1": 15, "project_2": 20, "project_3": 5},
-            "daily_average": 8,
-            "efficiency_rate": 0.875,
-        }
+        time_stats = await rollups.get_time_tracking(
+            str(current_user.id), PERIOD_DAYS[period]
+        )
 
         return {"success": True, "message": "获取工时统计成功", "data": time_stats}
 
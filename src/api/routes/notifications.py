@@ -9,18 +9,25 @@ from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 
-from src.core.database import get_db
+from src.core.database import get_db, get_async_db
 from src.core.dependencies import get_current_active_user, get_notification_service
 from src.api.models.common import BaseResponse, PaginationParams
+from src.services.notification_inbox import NotificationInbox
 from datetime import datetime
 from typing import Dict, Any
 
 router = APIRouter()
 
 
+def get_notification_inbox(db: AsyncSession = Depends(get_async_db)) -> NotificationInbox:
+    """获取通知收件箱（维护未读计数并推送变化）"""
+    return NotificationInbox(db)
+
+
 # ===== 通知数据模型 =====
 
 
@@ -205,7 +212,7 @@ async def get_notification(
 async def mark_notification_as_read(
     notification_id: UUID,
     current_user=Depends(get_current_active_user),
-    notification_service=Depends(get_notification_service),
+    inbox: NotificationInbox = Depends(get_notification_inbox),
 ):
     """
     标记通知为已读
@@ -214,7 +221,7 @@ async def mark_notification_as_read(
     将指定通知标记为已读状态
     """
     try:
-        await notification_service.mark_as_read(
+        await inbox.mark_as_read(
             notification_id=notification_id, user_id=current_user.id
         )
 
@@ -238,7 +245,7 @@ async def mark_notification_as_read(
 async def mark_notification_as_unread(
     notification_id: UUID,
     current_user=Depends(get_current_active_user),
-    notification_service=Depends(get_notification_service),
+    inbox: NotificationInbox = Depends(get_notification_inbox),
 ):
     """
     标记通知为未读
@@ -247,7 +254,7 @@ async def mark_notification_as_unread(
     将指定通知标记为未读状态
     """
     try:
-        await notification_service.mark_as_unread(
+        await inbox.mark_as_unread(
             notification_id=notification_id, user_id=current_user.id
         )
 
@@ -270,7 +277,7 @@ async def mark_notification_as_unread(
 )
 async def mark_all_notifications_as_read(
     current_user=Depends(get_current_active_user),
-    notification_service=Depends(get_notification_service),
+    inbox: NotificationInbox = Depends(get_notification_inbox),
 ):
     """
     标记所有通知为已读
@@ -279,7 +286,7 @@ async def mark_all_notifications_as_read(
     将用户的所有未读通知批量标记为已读
     """
     try:
-        count = await notification_service.mark_all_as_read(user_id=current_user.id)
+        count = await inbox.mark_all_as_read(user_id=current_user.id)
 
         return BaseResponse(success=True, message=f"已标记{count}条通知为已读")
 
@@ -302,7 +309,7 @@ async def mark_all_notifications_as_read(
 async def delete_notification(
     notification_id: UUID,
     current_user=Depends(get_current_active_user),
-    notification_service=Depends(get_notification_service),
+    inbox: NotificationInbox = Depends(get_notification_inbox),
 ):
     """
     删除通知
@@ -311,7 +318,7 @@ async def delete_notification(
     删除指定的通知记录
     """
     try:
-        await notification_service.delete_notification(
+        await inbox.delete_notification(
             notification_id=notification_id, user_id=current_user.id
         )
 
@@ -334,7 +341,7 @@ async def delete_notification(
 )
 async def clear_read_notifications(
     current_user=Depends(get_current_active_user),
-    notification_service=Depends(get_notification_service),
+    inbox: NotificationInbox = Depends(get_notification_inbox),
 ):
     """
     清除已读通知
@@ -343,7 +350,7 @@ async def clear_read_notifications(
     删除用户所有已读的通知
     """
     try:
-        count = await notification_service.clear_read_notifications(
+        count = await inbox.clear_read_notifications(
             user_id=current_user.id
         )
 
@@ -465,16 +472,17 @@ async def update_notification_settings(
 )
 async def get_unread_count(
     current_user=Depends(get_current_active_user),
-    notification_service=Depends(get_notification_service),
+    inbox: NotificationInbox = Depends(get_notification_inbox),
 ):
     """
     获取未读通知数量
     ================
 
-    返回用户当前的未读通知数量，用于实时显示
+    返回用户当前的未读通知数量（读取计数表），用于页面初始化和重连；
+    之后的变化通过WebSocket推送，无需轮询
     """
     try:
-        count = await notification_service.get_unread_count(user_id=current_user.id)
+        count = await inbox.get_unread_count(user_id=current_user.id)
 
         return {"success": True, "data": {"unread_count": count}}
 
@@ -495,16 +503,16 @@ async def get_latest_notifications(
     limit: int = Query(5, ge=1, le=20, description="返回数量"),
     since: Optional[datetime] = Query(None, description="起始时间"),
     current_user=Depends(get_current_active_user),
-    notification_service=Depends(get_notification_service),
+    inbox: NotificationInbox = Depends(get_notification_inbox),
 ):
     """
     获取最新通知
     ============
 
-    返回用户的最新通知，用于实时推送更新
+    返回用户的最新通知，用于WebSocket重连后补齐断开期间的通知
     """
     try:
-        notifications = await notification_service.get_latest_notifications(
+        notifications = await inbox.get_latest_notifications(
             user_id=current_user.id, limit=limit, since=since
         )
 
@@ -16,6 +16,7 @@ from typing import List, Optional, Dict, Any
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Body
+from fastapi import status as http_status  # 供带status查询参数的路由使用
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
@@ -24,6 +25,9 @@ from backend.auth.dependencies import get_current_user
 from backend.models.user import User
 from backend.core.cache import get_cache_manager, CacheManager
 
+from src.core.dependencies import get_rollup_service
+from src.services.dashboard_rollups import DashboardRollupService
+
 from src.services.task_service import (
     TaskService,
     TaskServiceConfig,
@@ -44,7 +48,9 @@ router = APIRouter(prefix="/api/v1/tasks", tags=["tasks"])
 
 # 依赖注入
 def get_task_service(
-    db: Session = Depends(get_db), cache: CacheManager = Depends(get_cache_manager)
+    db: Session = Depends(get_db),
+    cache: CacheManager = Depends(get_cache_manager),
+    rollups: DashboardRollupService = Depends(get_rollup_service),
 ) -> TaskService:
     """获取任务服务实例"""
     repository = TaskRepository(db)
@@ -55,7 +61,7 @@ def get_task_service(
         enable_activity_logging=True,
         enable_notifications=True,
     )
-    return TaskService(db, repository, cache, config)
+    return TaskService(db, repository, cache, config, rollups=rollups)
 
 
 def get_task_query_builder(
@@ -206,6 +212,11 @@ async def search_tasks(
     sort_order: str = Query("desc", description="排序方向", regex="^(asc|desc)$"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页大小"),
+    pagination: str = Query(
+        "offset", description="分页方式", regex="^(offset|cursor)$"
+    ),
+    cursor: Optional[str] = Query(None, description="上一页返回的next_cursor"),
+    include_total: bool = Query(False, description="游标分页时是否计算总数"),
     task_service: TaskService = Depends(get_task_service),
     current_user: User = Depends(get_current_user),
 ) -> TaskListResponse:
@@ -222,6 +233,8 @@ async def search_tasks(
     - **标签筛选**: 按标签筛选
 
     返回结果包含分页信息和搜索摘要。
+    `pagination=cursor` 时按 updated_at/due_date/priority 键集翻页（方向由sort_order决定），
+    用返回的 `next_cursor` 请求下一页，深度翻页耗时不变。
     """
     search_request = TaskSearchRequest(
         query=query,
@@ -237,9 +250,17 @@ async def search_tasks(
         sort_order=sort_order,
         page=page,
         page_size=page_size,
+        pagination=pagination,
+        cursor=cursor,
+        include_total=include_total,
     )
 
-    return await task_service.search_tasks(search_request, str(current_user.id))
+    try:
+        return await task_service.search_tasks(search_request, str(current_user.id))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e)
+        )
 
 
 @router.get("/builder/query", summary="查询构建器", description="使用流畅接口查询任务")
@@ -254,6 +275,11 @@ async def query_tasks_with_builder(
     include_project: bool = Query(False),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="游标分页的上一页next_cursor"),
+    sort: Optional[str] = Query(
+        None, description="游标分页排序", regex="^(updated_at|due_date|priority)$"
+    ),
+    include_total: bool = Query(False, description="游标分页时是否计算总数"),
     builder: TaskQueryBuilder = Depends(get_task_query_builder),
 ):
     """
@@ -287,6 +313,20 @@ async def query_tasks_with_builder(
     if include_project:
         builder = builder.include_project()
 
+    # 游标分页（指定sort或cursor时启用）
+    if sort or cursor:
+        try:
+            return await builder.paginate_keyset(
+                cursor=cursor,
+                page_size=page_size,
+                sort=sort or "updated_at",
+                include_total=include_total,
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=http_status.HTTP_400_BAD_REQUEST, detail=str(e)
+            )
+
     # 排序
     builder = builder.order_by_priority().order_by_due_date().order_by_updated_at()
 
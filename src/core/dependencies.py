@@ -11,17 +11,19 @@
 from typing import Optional, Generator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
 
 from src.core.config import get_settings
-from src.core.database import get_db
+from src.core.database import get_db, get_async_db
 from src.auth.auth import get_current_user_from_token
 from src.task_management.services import (
     TaskService,
     ProjectService,
     NotificationService,
 )
+from src.services.dashboard_rollups import DashboardRollupService
 
 # 配置
 settings = get_settings()
@@ -86,9 +88,17 @@ async def get_current_active_user(current_user=Depends(get_current_user)):
     return current_user
 
 
-def get_task_service(db: Session = Depends(get_db)) -> TaskService:
-    """获取任务服务实例"""
-    return TaskService(db)
+def get_rollup_service(db: AsyncSession = Depends(get_async_db)) -> DashboardRollupService:
+    """获取仪表板汇总服务"""
+    return DashboardRollupService(db)
+
+
+def get_task_service(
+    db: Session = Depends(get_db),
+    rollups: DashboardRollupService = Depends(get_rollup_service),
+) -> TaskService:
+    """获取任务服务实例（任务写入时增量维护仪表板汇总）"""
+    return TaskService(db, rollups=rollups)
 
 
 def get_project_service(db: Session = Depends(get_db)) -> ProjectService:
@@ -10,6 +10,7 @@
 - 安全认证
 """
 
+import asyncio
 import logging
 import time
 from contextlib import asynccontextmanager
@@ -25,7 +26,7 @@ from fastapi.openapi.utils import get_openapi
 
 # 配置导入
 from src.core.config import get_settings
-from src.core.database import engine, create_all_tables
+from src.core.database import engine, create_all_tables, get_db_manager
 from src.core.dependencies import setup_dependencies
 
 # API路由导入
@@ -34,6 +35,11 @@ from src.api.routes.tasks import router as tasks_router
 from src.api.routes.projects import router as projects_router
 from src.api.routes.dashboard import router as dashboard_router
 from src.api.routes.notifications import router as notifications_router
+from src.services.dashboard_rollups import (
+    DashboardRollupService,
+    run_periodic_reconciliation,
+)
+from src.services.notification_inbox import run_unread_counter_reconciliation
 
 # 设置日志
 logging.basicConfig(
@@ -63,10 +69,28 @@ async def lifespan(app: FastAPI):
     setup_dependencies()
     logger.info("✅ 依赖注入配置完成")
 
+    # 仪表板汇总、未读通知计数定期校准
+    session_factory = get_db_manager().async_session_factory
+
+    # 启动时先全量重建一次汇总表，避免首个校准周期内仪表板读到空表或过期数据
+    try:
+        async with session_factory() as session:
+            await DashboardRollupService(session).reconcile()
+        logger.info("✅ 仪表板汇总表已重建")
+    except Exception as e:
+        logger.error(f"❌ 仪表板汇总表重建失败: {e}")
+
+    reconciliation_tasks = [
+        asyncio.create_task(run_periodic_reconciliation(session_factory)),
+        asyncio.create_task(run_unread_counter_reconciliation(session_factory)),
+    ]
+
     yield
 
     # 关闭时执行
     logger.info("🔄 正在关闭任务管理系统...")
+    for task in reconciliation_tasks:
+        task.cancel()
     logger.info("✅ 系统关闭完成")
 
 
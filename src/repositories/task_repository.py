@@ -12,17 +12,33 @@
 """
 
 from datetime import datetime, timedelta
+from itertools import islice
 from typing import List, Optional, Dict, Any, Tuple, Union
 from uuid import UUID
 import json
+import weakref
 
 from sqlalchemy import and_, or_, func, text, desc, asc, exists
 from sqlalchemy.orm import Session, joinedload, selectinload, contains_eager
 from sqlalchemy.sql import Select
 from sqlalchemy.exc import IntegrityError
 
+from backend.pagination import (
+    KeysetColumn,
+    decode_cursor,
+    keyset_filter,
+    keyset_order_by,
+    keyset_page_info,
+)
 from src.repositories.base_repository import BaseRepository
+from src.repositories.task_search import (
+    SearchQuery,
+    TaskSearchIndex,
+    highlight as highlight_matches,
+)
 from src.task_management.models import (
+    TASK_PRIORITY_RANK,
+    task_priority_rank,
     Task,
     TaskStatus,
     TaskPriority,
@@ -38,6 +54,55 @@ from src.task_management.models import (
 )
 
 
+# 键集分页支持的排序方式，每种都由 (排序列, id) 索引支撑
+TASK_KEYSET_SORTS: Dict[str, List[KeysetColumn]] = {
+    "updated_at": [
+        KeysetColumn(Task.updated_at, "updated_at", descending=True),
+        KeysetColumn(Task.id, "id", descending=True),
+    ],
+    "due_date": [
+        KeysetColumn(Task.due_date, "due_date", nullable=True),
+        KeysetColumn(Task.id, "id"),
+    ],
+    "priority": [
+        KeysetColumn(
+            task_priority_rank,
+            "priority",
+            descending=True,
+            extract=lambda task: TASK_PRIORITY_RANK.get(task.priority, 0),
+        ),
+        KeysetColumn(Task.id, "id", descending=True),
+    ],
+}
+
+
+# 非PostgreSQL数据库（SQLite测试库）的本地全文索引，按数据库引擎共享
+_local_search_indexes: "weakref.WeakKeyDictionary[Any, TaskSearchIndex]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_keyset_sort(sort: str, sort_order: Optional[str] = None) -> List[KeysetColumn]:
+    """
+    获取键集排序定义，不支持的排序方式抛出ValueError
+
+    指定sort_order时所有排序列（包括id）统一为该方向，
+    否则使用TASK_KEYSET_SORTS中的默认方向。
+    """
+    if sort not in TASK_KEYSET_SORTS:
+        raise ValueError(
+            f"游标分页不支持排序字段: {sort}，可选: {', '.join(TASK_KEYSET_SORTS)}"
+        )
+    columns = TASK_KEYSET_SORTS[sort]
+    if sort_order is None:
+        return columns
+
+    order = sort_order.lower()
+    if order not in ("asc", "desc"):
+        raise ValueError(f"不支持的排序方向: {sort_order}")
+    return [column._replace(descending=order == "desc") for column in columns]
+
+
 class TaskRepository(BaseRepository[Task]):
     """
     任务数据访问类
@@ -74,6 +139,7 @@ class TaskRepository(BaseRepository[Task]):
             self.db.add(task)
             await self.db.commit()
             await self.db.refresh(task)
+            self._sync_search_index(task)
             return task
         except IntegrityError as e:
             await self.db.rollback()
@@ -175,6 +241,7 @@ class TaskRepository(BaseRepository[Task]):
             task.updated_at = datetime.utcnow()
             await self.db.commit()
             await self.db.refresh(task)
+            self._sync_search_index(task)
             return task
         except IntegrityError as e:
             await self.db.rollback()
@@ -197,6 +264,7 @@ class TaskRepository(BaseRepository[Task]):
         task.is_deleted = True
         task.deleted_at = datetime.utcnow()
         await self.db.commit()
+        self._sync_search_index(task)
         return True
 
     async def hard_delete(self, task_id: str) -> bool:
@@ -215,6 +283,7 @@ class TaskRepository(BaseRepository[Task]):
 
         await self.db.delete(task)
         await self.db.commit()
+        self._sync_search_index(task, removed=True)
         return True
 
     # === 搜索和筛选 ===
@@ -225,57 +294,123 @@ class TaskRepository(BaseRepository[Task]):
         user_id: str,
         filters: Optional[Dict[str, Any]] = None,
         limit: int = 50,
+        highlight: bool = False,
     ) -> List[Task]:
         """
         全文搜索任务
 
+        PostgreSQL使用search_vector列的GIN索引并按ts_rank_cd排序，
+        其他数据库使用本地倒排索引。空格分隔的词需全部命中，
+        以 * 结尾的词和最后一个词按前缀匹配。
+
         Args:
             query_text: 搜索文本
             user_id: 用户ID（用于权限过滤）
             filters: 额外筛选条件
             limit: 结果数量限制
+            highlight: 是否生成高亮片段（写入task.search_highlight）
 
         Returns:
-            匹配的任务列表
+            按相关度降序排列的任务列表，相关度写入task.search_rank
         """
-        # 构建基础查询
-        base_query = self.db.query(Task).filter(
-            and_(Task.is_deleted == False, self._build_user_access_filter(user_id))
-        )
+        search_query = SearchQuery.parse(query_text)
+        base_query = self._build_search_query(user_id, filters)
 
-        # 全文搜索条件
-        search_conditions = []
-        if query_text:
-            search_terms = query_text.split()
-            for term in search_terms:
-                term_filter = or_(
-                    Task.title.ilike(f"%{term}%"),
-                    Task.description.ilike(f"%{term}%"),
-                    Task.tags.op("&&")(func.array([term])),
-                )
-                search_conditions.append(term_filter)
+        if not search_query:
+            return await base_query.order_by(desc(Task.updated_at)).limit(limit).all()
 
-        if search_conditions:
-            base_query = base_query.filter(and_(*search_conditions))
-
-        # 应用额外筛选
-        if filters:
-            base_query = self._apply_filters(base_query, filters)
+        if self._uses_tsvector():
+            tasks = await self._search_tsvector(base_query, search_query, limit)
+        else:
+            tasks = await self._search_local_index(base_query, search_query, limit)
+
+        if highlight:
+            for task in tasks:
+                task.search_highlight = {
+                    "title": highlight_matches(task.title, search_query),
+                    "description": highlight_matches(
+                        task.description, search_query, max_length=200
+                    ),
+                }
 
-        # 添加相关性排序（标题匹配优先级更高）
-        relevance_score = func.coalesce(
-            func.case([(Task.title.ilike(f"%{query_text}%"), 10)], else_=0)
-            + func.case([(Task.description.ilike(f"%{query_text}%"), 5)], else_=0),
-            0,
-        ).label("relevance")
+        return tasks
 
-        return (
-            await base_query.add_columns(relevance_score)
-            .order_by(desc("relevance"), desc(Task.updated_at))
+    async def _search_tsvector(
+        self, base_query, search_query: SearchQuery, limit: int
+    ) -> List[Task]:
+        """PostgreSQL：search_vector @@ tsquery，按加权相关度排序"""
+        tsquery = func.to_tsquery("simple", search_query.to_tsquery())
+        rank = func.ts_rank_cd(Task.search_vector, tsquery).label("search_rank")
+
+        rows = await (
+            base_query.filter(Task.search_vector.op("@@")(tsquery))
+            .add_columns(rank)
+            .order_by(desc("search_rank"), desc(Task.updated_at))
             .limit(limit)
             .all()
         )
 
+        tasks = []
+        for task, score in rows:
+            task.search_rank = float(score)
+            tasks.append(task)
+        return tasks
+
+    async def _search_local_index(
+        self, base_query, search_query: SearchQuery, limit: int
+    ) -> List[Task]:
+        """本地倒排索引：按相关度分批加载候选，跳过无权限或被筛选掉的任务"""
+        index = await self._get_local_search_index()
+        ranked = index.search(search_query)
+
+        tasks: List[Task] = []
+        batch_size = max(limit * 4, 200)
+        while len(tasks) < limit:
+            scores = dict(islice(ranked, batch_size))
+            if not scores:
+                break
+            rows = await base_query.filter(Task.id.in_(list(scores))).all()
+            for task in rows:
+                task.search_rank = scores[str(task.id)]
+            rows.sort(
+                key=lambda task: (task.search_rank, task.updated_at or datetime.min),
+                reverse=True,
+            )
+            tasks.extend(rows)
+
+        return tasks[:limit]
+
+    def _uses_tsvector(self) -> bool:
+        """当前数据库是否使用search_vector列搜索"""
+        return self.db.get_bind().dialect.name == "postgresql"
+
+    async def _get_local_search_index(self) -> TaskSearchIndex:
+        """获取当前数据库的本地倒排索引，首次使用时从任务表构建"""
+        bind = self.db.get_bind()
+        index = _local_search_indexes.get(bind)
+        if index is None:
+            index = TaskSearchIndex()
+            rows = await (
+                self.db.query(Task.id, Task.title, Task.description, Task.tags)
+                .filter(Task.is_deleted == False)
+                .all()
+            )
+            for row in rows:
+                index.add(str(row.id), row.title, row.description, row.tags)
+            _local_search_indexes[bind] = index
+        return index
+
+    def _sync_search_index(self, task: Task, removed: bool = False):
+        """写入后同步本地倒排索引（PostgreSQL由触发器维护search_vector）"""
+        index = _local_search_indexes.get(self.db.get_bind())
+        if index is None:
+            return
+
+        if removed or task.is_deleted:
+            index.remove(str(task.id))
+        else:
+            index.add(str(task.id), task.title, task.description, task.tags)
+
     async def search_tasks(
         self,
         user_id: str,
@@ -299,14 +434,7 @@ class TaskRepository(BaseRepository[Task]):
         Returns:
             包含任务列表和分页信息的字典
         """
-        # 构建基础查询
-        base_query = self.db.query(Task).filter(
-            and_(Task.is_deleted == False, self._build_user_access_filter(user_id))
-        )
-
-        # 应用筛选条件
-        if filters:
-            base_query = self._apply_filters(base_query, filters)
+        base_query = self._build_search_query(user_id, filters)
 
         # 计算总数
         total_count = await base_query.count()
@@ -330,6 +458,73 @@ class TaskRepository(BaseRepository[Task]):
             "total_pages": (total_count + page_size - 1) // page_size,
         }
 
+    async def search_tasks_keyset(
+        self,
+        user_id: str,
+        filters: Optional[Dict[str, Any]] = None,
+        sort_by: str = "updated_at",
+        sort_order: str = "desc",
+        cursor: Optional[str] = None,
+        page_size: int = 20,
+        include_total: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        搜索和筛选任务（游标分页）
+
+        每页耗时与页深度无关；总数默认不计算。
+
+        Args:
+            user_id: 用户ID
+            filters: 筛选条件
+            sort_by: 排序方式（updated_at/due_date/priority）
+            sort_order: 排序方向（asc/desc），写入游标，换方向需从首页重新开始
+            cursor: 上一页返回的next_cursor
+            page_size: 每页大小
+            include_total: 是否计算精确总数
+
+        Returns:
+            包含任务列表和游标信息的字典
+        """
+        columns = get_keyset_sort(sort_by, sort_order)
+        sort_name = f"{sort_by}:{sort_order.lower()}"
+        base_query = self._build_search_query(user_id, filters)
+
+        total_count = await base_query.count() if include_total else None
+
+        if cursor:
+            values = decode_cursor(cursor, sort_name, len(columns))
+            base_query = base_query.filter(keyset_filter(columns, values))
+
+        rows = await (
+            base_query.order_by(*keyset_order_by(columns))
+            .limit(page_size + 1)
+            .all()
+        )
+        tasks, pagination = keyset_page_info(
+            rows, columns, sort_name, page_size, total_count
+        )
+
+        return {
+            "tasks": tasks,
+            "total_count": total_count,
+            "page_size": page_size,
+            "next_cursor": pagination["next_cursor"],
+            "has_next": pagination["has_next"],
+        }
+
+    def _build_search_query(
+        self, user_id: str, filters: Optional[Dict[str, Any]] = None
+    ):
+        """构建带权限和筛选条件的搜索查询"""
+        base_query = self.db.query(Task).filter(
+            and_(Task.is_deleted == False, self._build_user_access_filter(user_id))
+        )
+
+        if filters:
+            base_query = self._apply_filters(base_query, filters)
+
+        return base_query
+
     # === 专门查询方法 ===
 
     async def get_tasks_by_project(
@@ -1084,18 +1279,71 @@ class TaskQueryBuilder:
             "pages": (total + page_size - 1) // page_size,
         }
 
-    def _build_final_query(self):
-        """构建最终查询"""
+    async def paginate_keyset(
+        self,
+        cursor: Optional[str] = None,
+        page_size: int = 20,
+        sort: str = "updated_at",
+        include_total: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        执行游标分页查询
+
+        使用 (排序列, id) 键集代替OFFSET，深度翻页不再线性变慢；
+        排序由sort决定，忽略order_by_*设置。
+
+        Args:
+            cursor: 上一页返回的next_cursor，首页为None
+            page_size: 每页大小
+            sort: 排序方式（updated_at/due_date/priority）
+            include_total: 是否额外执行COUNT获取总数
+
+        Returns:
+            包含items、next_cursor、has_next的字典
+        """
+        columns = get_keyset_sort(sort)
+
+        total = None
+        if include_total:
+            total = await self._build_count_query().scalar()
+
+        query = self._build_filtered_query()
+        if cursor:
+            values = decode_cursor(cursor, sort, len(columns))
+            query = query.filter(keyset_filter(columns, values))
+
+        rows = await (
+            query.order_by(*keyset_order_by(columns))
+            .limit(page_size + 1)
+            .all()
+        )
+        items, pagination = keyset_page_info(rows, columns, sort, page_size, total)
+
+        return {
+            "items": items,
+            "total": total,
+            "page_size": page_size,
+            "sort": sort,
+            "next_cursor": pagination["next_cursor"],
+            "has_next": pagination["has_next"],
+        }
+
+    def _build_filtered_query(self):
+        """构建不含排序的查询（筛选 + 预加载）"""
         query = self.query
 
-        # 应用筛选条件
         if self._filters:
             query = query.filter(and_(*self._filters))
 
-        # 应用预加载
         if self._includes:
             query = query.options(*self._includes)
 
+        return query
+
+    def _build_final_query(self):
+        """构建最终查询"""
+        query = self._build_filtered_query()
+
         # 应用排序
         if self._orders:
             query = query.order_by(*self._orders)
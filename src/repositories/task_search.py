@@ -0,0 +1,353 @@
+"""
+任务全文搜索
+============
+
+为任务标题、标签和描述提供全文检索：
+- PostgreSQL：tasks.search_vector（tsvector）列 + GIN索引，由触发器维护
+- 其他数据库（SQLite测试库）：进程内倒排索引，由仓储层在写入时维护
+- 查询语法：空格分隔的词全部匹配（AND），以 * 结尾的词按前缀匹配
+- 排序：标题 > 标签 > 描述 的加权相关度
+- 高亮：在原文中标记命中的词
+
+两种实现共用同一套分词规则：拉丁字母/数字按词切分并转小写，
+中日韩文字切为重叠的二元组（末字单独成词），使 "开发" 这类
+无空格文本也能被索引和前缀匹配。PostgreSQL端的分词函数和触发器
+定义在 src/task_management/search_schema.py。
+"""
+
+import math
+import re
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from src.task_management.search_schema import CJK_RANGE
+
+_CJK_RUN = re.compile(f"[{CJK_RANGE}]+")
+_WORD = re.compile(r"[^\W_]+")
+
+# 字段权重，与PostgreSQL setweight的A/B/C一致（ts_rank默认权重）
+FIELD_WEIGHTS = {"title": 1.0, "tags": 0.4, "description": 0.2}
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+
+
+def segment(text: Optional[str]) -> List[str]:
+    """
+    将文本切分为索引词
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        索引词列表（拉丁词在前，中日韩二元组在后）
+    """
+    if not text:
+        return []
+
+    text = text.lower()
+    tokens = _WORD.findall(_CJK_RUN.sub(" ", text))
+    for run in _CJK_RUN.findall(text):
+        tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+        tokens.append(run[-1])
+    return tokens
+
+
+@dataclass(frozen=True)
+class QueryTerm:
+    """查询中的一个词：所有tokens都需命中，prefix时最后一个token按前缀匹配"""
+
+    text: str
+    tokens: Tuple[str, ...]
+    prefix: bool = False
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    """解析后的搜索查询"""
+
+    terms: Tuple[QueryTerm, ...]
+
+    @classmethod
+    def parse(cls, query_text: str, prefix_last: bool = True) -> "SearchQuery":
+        """
+        解析搜索文本
+
+        Args:
+            query_text: 用户输入，空格分隔；以 * 结尾的词按前缀匹配
+            prefix_last: 最后一个词是否总按前缀匹配（输入即搜索）
+
+        Returns:
+            SearchQuery，没有可检索词时terms为空
+        """
+        words = (query_text or "").split()
+        terms = []
+        for index, word in enumerate(words):
+            prefix = word.endswith("*") or (prefix_last and index == len(words) - 1)
+            tokens = segment(word.rstrip("*"))
+            if tokens:
+                # 纯中日韩词的末字单独成词仅用于单字查询，多字时由二元组覆盖
+                if len(tokens) > 1 and _CJK_RUN.fullmatch(tokens[-1]):
+                    tokens = tokens[:-1]
+                # 单字只作为词尾被索引，需按前缀匹配以命中以它开头的二元组
+                elif len(tokens[-1]) == 1 and _CJK_RUN.fullmatch(tokens[-1]):
+                    prefix = True
+                terms.append(QueryTerm(word.rstrip("*"), tuple(tokens), prefix))
+        return cls(tuple(terms))
+
+    def __bool__(self) -> bool:
+        return bool(self.terms)
+
+    def to_tsquery(self) -> str:
+        """
+        生成PostgreSQL to_tsquery('simple', ...) 表达式
+
+        tokens只包含单词字符，无需额外转义。
+        """
+        parts = []
+        for term in self.terms:
+            tokens = list(term.tokens)
+            if term.prefix:
+                tokens[-1] += ":*"
+            parts.extend(tokens)
+        return " & ".join(parts)
+
+
+# === 高亮 ===
+
+
+def _term_pattern(term: QueryTerm) -> str:
+    """单个查询词在原文中的匹配模式"""
+    text = re.escape(term.text.lower())
+    if _CJK_RUN.fullmatch(term.text):
+        return text
+    return rf"(?<![^\W_]){text}" + ("" if term.prefix else r"(?![^\W_])")
+
+
+def highlight(
+    text: Optional[str],
+    query: SearchQuery,
+    max_length: int = 0,
+    start: str = HIGHLIGHT_START,
+    stop: str = HIGHLIGHT_STOP,
+) -> Optional[str]:
+    """
+    标记文本中命中查询的片段
+
+    Args:
+        text: 原文
+        query: 搜索查询
+        max_length: 大于0时截取首个命中附近的片段
+        start: 命中前插入的标记
+        stop: 命中后插入的标记
+
+    Returns:
+        带标记的文本；原文为空时返回原值
+    """
+    if not text or not query:
+        return text
+
+    pattern = re.compile(
+        "|".join(_term_pattern(term) for term in query.terms), re.IGNORECASE
+    )
+    matches = list(pattern.finditer(text))
+
+    begin, end = 0, len(text)
+    if max_length and len(text) > max_length:
+        first = matches[0].start() if matches else 0
+        begin = max(0, min(first - max_length // 4, len(text) - max_length))
+        end = begin + max_length
+
+    parts = ["…" if begin else ""]
+    cursor = begin
+    for match in matches:
+        if match.start() < cursor or match.end() > end:
+            continue
+        parts.extend((text[cursor : match.start()], start, match.group(), stop))
+        cursor = match.end()
+    parts.append(text[cursor:end])
+    if end < len(text):
+        parts.append("…")
+    return "".join(parts)
+
+
+# === 本地倒排索引 ===
+
+
+class TaskSearchIndex:
+    """
+    进程内倒排索引（非PostgreSQL数据库的搜索后端）
+
+    每个词按命中字段的最高权重分为标题/标签/描述三组倒排表（紧凑数组），
+    查询时的交集、并集和按权重分层都由集合运算完成。更新或删除只将旧序号
+    标记为失效，失效条目超过一定比例时整体压缩。
+    """
+
+    _WEIGHTS = (FIELD_WEIGHTS["title"], FIELD_WEIGHTS["tags"], FIELD_WEIGHTS["description"])
+
+    def __init__(self):
+        self._postings: Dict[str, Tuple[array, array, array]] = {}
+        self._doc_ids: List[Optional[str]] = []  # 序号 -> 任务ID（失效为None）
+        self._slots: Dict[str, int] = {}  # 任务ID -> 当前序号
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._slots
+
+    def add(
+        self,
+        task_id: str,
+        title: Optional[str],
+        description: Optional[str] = None,
+        tags: Optional[Sequence[str]] = None,
+    ):
+        """添加或替换一个任务的索引"""
+        self.remove(task_id)
+
+        # 0=标题 1=标签 2=描述；按描述、标签、标题顺序覆盖，保留最高权重
+        groups: Dict[str, int] = {}
+        for group, text in ((2, description), (1, " ".join(tags or ())), (0, title)):
+            for token in segment(text):
+                groups[token] = group
+
+        slot = len(self._doc_ids)
+        self._doc_ids.append(task_id)
+        self._slots[task_id] = slot
+
+        for token, group in groups.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = (array("l"), array("l"), array("l"))
+                self._vocabulary_dirty = True
+            posting[group].append(slot)
+
+    def remove(self, task_id: str):
+        """移除任务的索引（不存在时忽略）"""
+        slot = self._slots.pop(task_id, None)
+        if slot is None:
+            return
+        self._doc_ids[slot] = None
+        self._dead += 1
+        if self._dead > 1000 and self._dead > len(self._slots) // 4:
+            self._compact()
+
+    def _compact(self):
+        """重排序号，丢弃失效条目"""
+        remap = {}
+        doc_ids = []
+        for slot, task_id in enumerate(self._doc_ids):
+            if task_id is not None:
+                remap[slot] = len(doc_ids)
+                doc_ids.append(task_id)
+
+        postings = {}
+        for token, posting in self._postings.items():
+            kept = tuple(
+                array("l", (remap[slot] for slot in slots if slot in remap))
+                for slots in posting
+            )
+            if any(kept):
+                postings[token] = kept
+
+        self._postings = postings
+        self._doc_ids = doc_ids
+        self._slots = {task_id: slot for slot, task_id in enumerate(doc_ids)}
+        self._vocabulary_dirty = True
+        self._dead = 0
+
+    def _expand(self, token: str, prefix: bool) -> List[str]:
+        """返回token本身或以其为前缀的全部索引词"""
+        if not prefix:
+            return [token] if token in self._postings else []
+
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+
+        matches = []
+        index = bisect_left(self._vocabulary, token)
+        while index < len(self._vocabulary) and self._vocabulary[index].startswith(
+            token
+        ):
+            matches.append(self._vocabulary[index])
+            index += 1
+        return matches
+
+    def _groups(self, terms: List[str]) -> Tuple[Set[int], Set[int], Set[int]]:
+        """多个索引词（前缀展开结果）的并集，按各文档的最高权重分组"""
+        title, tags, description = set(), set(), set()
+        for term in terms:
+            posting = self._postings[term]
+            title.update(posting[0])
+            tags.update(posting[1])
+            description.update(posting[2])
+        tags -= title
+        description -= title
+        description -= tags
+        return title, tags, description
+
+    def search(self, query: SearchQuery) -> Iterator[Tuple[str, float]]:
+        """
+        执行查询
+
+        相关度为各词 字段权重 × IDF 之和。候选按分数分层，
+        只有被消费到的层才会排序，取前N条时无需对全部命中排序。
+
+        Args:
+            query: 搜索查询
+
+        Returns:
+            按相关度降序（同分时新写入的在前）产出 (任务ID, 分数) 的迭代器
+        """
+        if not query:
+            return
+
+        token_groups = []
+        for term in query.terms:
+            for index, token in enumerate(term.tokens):
+                prefix = term.prefix and index == len(term.tokens) - 1
+                expanded = self._expand(token, prefix)
+                if not expanded:
+                    return
+                token_groups.append(self._groups(expanded))
+
+        # 从最稀有的词开始求交集，尽早缩小候选集
+        token_groups.sort(key=lambda groups: sum(map(len, groups)))
+        total = max(len(self._slots), 1)
+
+        layers: List[Tuple[float, Optional[Set[int]]]] = [(0.0, None)]
+        for groups in token_groups:
+            idf = math.log(1 + total / sum(map(len, groups)))
+            next_layers = []
+            for score, slots in layers:
+                for weight, members in zip(self._WEIGHTS, groups):
+                    subset = members if slots is None else slots & members
+                    if subset:
+                        next_layers.append((score + weight * idf, subset))
+            layers = next_layers
+            if not layers:
+                return
+
+        layers.sort(key=lambda layer: layer[0], reverse=True)
+        for score, slots in layers:
+            for slot in sorted(slots, reverse=True):
+                task_id = self._doc_ids[slot]
+                if task_id is not None:
+                    yield task_id, score
+
+
+__all__ = [
+    "FIELD_WEIGHTS",
+    "QueryTerm",
+    "SearchQuery",
+    "TaskSearchIndex",
+    "highlight",
+    "segment",
+]
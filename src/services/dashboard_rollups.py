@@ -0,0 +1,547 @@
+"""
+仪表板汇总服务
+==============
+
+维护按 (负责人, 项目) 划分的任务汇总计数器，供仪表板读取：
+- 每日计数：创建数、完成数、完成耗时、到期未完成数、登记工时
+- 当前分布：按状态、优先级的任务数
+- 由TaskService在任务创建、更新、状态变更和删除时增量更新
+- 定期校准任务从任务表重新计算，修正漂移
+
+每个任务对汇总表的"贡献"由 _contributions 定义，增量更新写入变更前后
+贡献之差，校准按同一定义全量重算，两条路径的口径因此保持一致。
+仪表板读取只访问汇总表和缓存。
+"""
+
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from backend.core.cache import CacheManager
+from src.task_management.models import (
+    NO_PROJECT_ID,
+    Project,
+    ProjectStatus,
+    Task,
+    TaskCountRollup,
+    TaskDailyRollup,
+    TaskStatus,
+)
+
+logger = logging.getLogger(__name__)
+
+DAILY_FIELDS = (
+    "created_count",
+    "completed_count",
+    "completion_seconds",
+    "open_due_count",
+    "time_spent_hours",
+)
+
+CLOSED_STATUSES = (TaskStatus.DONE.value, TaskStatus.CANCELLED.value)
+
+CACHE_NAMESPACE = "dashboard"
+
+DailyKey = Tuple[UUID, UUID, date]
+CountKey = Tuple[UUID, UUID, str, str]
+
+
+def _as_uuid(value: Any) -> Optional[UUID]:
+    if value is None or isinstance(value, UUID):
+        return value
+    return UUID(str(value))
+
+
+def _as_date(value: Optional[datetime]) -> Optional[date]:
+    if value is None:
+        return None
+    return value.date() if isinstance(value, datetime) else value
+
+
+@dataclass(frozen=True)
+class TaskFacts:
+    """任务中与汇总相关的字段快照（在变更前获取）"""
+
+    owner_id: UUID
+    project_id: UUID
+    status: str
+    priority: str
+    created_day: date
+    completed_at: Optional[datetime]
+    created_at: datetime
+    due_day: Optional[date]
+    actual_hours: int
+
+    @classmethod
+    def from_task(cls, task: Any) -> Optional["TaskFacts"]:
+        """从任务对象（或同名字段的查询行）构建快照，已删除的任务返回None"""
+        if getattr(task, "is_deleted", False):
+            return None
+        owner = task.assignee_id or task.created_by
+        if owner is None:
+            return None
+
+        created_at = task.created_at or datetime.utcnow()
+        return cls(
+            owner_id=_as_uuid(owner),
+            project_id=_as_uuid(task.project_id) or NO_PROJECT_ID,
+            status=str(getattr(task.status, "value", task.status)),
+            priority=str(getattr(task.priority, "value", task.priority)),
+            created_day=_as_date(created_at),
+            completed_at=task.completed_at,
+            created_at=created_at,
+            due_day=_as_date(task.due_date),
+            actual_hours=task.actual_hours or 0,
+        )
+
+
+def _contributions(
+    facts: Optional[TaskFacts], sign: int, daily: Dict[DailyKey, Counter], counts: Counter
+):
+    """将一个任务对汇总表的贡献（乘以sign）累加到daily/counts"""
+    if facts is None:
+        return
+
+    scope = (facts.owner_id, facts.project_id)
+    daily[scope + (facts.created_day,)]["created_count"] += sign
+
+    if facts.status == TaskStatus.DONE.value and facts.completed_at:
+        row = daily[scope + (_as_date(facts.completed_at),)]
+        row["completed_count"] += sign
+        seconds = (facts.completed_at - facts.created_at).total_seconds()
+        row["completion_seconds"] += sign * max(int(seconds), 0)
+
+    if facts.status not in CLOSED_STATUSES and facts.due_day:
+        daily[scope + (facts.due_day,)]["open_due_count"] += sign
+
+    counts[scope + ("status", facts.status)] += sign
+    counts[scope + ("priority", facts.priority)] += sign
+
+
+def _productivity_score(completed: int, overdue: int, created: int) -> int:
+    """生产力评分（0-100）：完成数相对新增与逾期的比例"""
+    demand = max(created, 1) + overdue
+    return min(100, round(100 * completed / demand))
+
+
+class DashboardRollupService:
+    """
+    仪表板汇总服务
+
+    db应为AsyncSession；写入汇总后由本服务提交。
+    """
+
+    def __init__(
+        self,
+        db,
+        cache: Optional[CacheManager] = None,
+        cache_ttl: int = 60,
+    ):
+        self.db = db
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+
+    # === 增量更新 ===
+
+    async def record_change(
+        self, before: Optional[TaskFacts], task: Optional[Any]
+    ):
+        """
+        按任务变更前后的快照更新汇总
+
+        Args:
+            before: 变更前快照（创建时为None）
+            task: 变更后的任务对象（硬删除时为None）
+        """
+        after = TaskFacts.from_task(task) if task is not None else None
+        if before == after:
+            return
+
+        daily: Dict[DailyKey, Counter] = defaultdict(Counter)
+        counts: Counter = Counter()
+        _contributions(before, -1, daily, counts)
+        _contributions(after, 1, daily, counts)
+
+        # 工时没有逐日明细，变化量记在变更当天
+        hours = (after.actual_hours if after else 0) - (
+            before.actual_hours if before else 0
+        )
+        if hours:
+            facts = after or before
+            daily[(facts.owner_id, facts.project_id, datetime.utcnow().date())][
+                "time_spent_hours"
+            ] += hours
+
+        await self._apply_deltas(daily, counts)
+        await self._invalidate(
+            {facts.owner_id for facts in (before, after) if facts is not None}
+        )
+
+    def _insert(self, table):
+        dialect = self.db.get_bind().dialect.name
+        return (sqlite_insert if dialect == "sqlite" else pg_insert)(table)
+
+    async def _apply_deltas(self, daily: Dict[DailyKey, Counter], counts: Counter):
+        """以 INSERT ... ON CONFLICT DO UPDATE 原子累加计数"""
+        daily_rows = [
+            dict(
+                zip(("user_id", "project_id", "day"), key),
+                **{field: values.get(field, 0) for field in DAILY_FIELDS},
+            )
+            for key, values in daily.items()
+            if any(values.values())
+        ]
+        if daily_rows:
+            table = TaskDailyRollup.__table__
+            stmt = self._insert(table)
+            await self.db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["user_id", "project_id", "day"],
+                    set_={
+                        field: table.c[field] + stmt.excluded[field]
+                        for field in DAILY_FIELDS
+                    },
+                ),
+                daily_rows,
+            )
+
+        count_rows = [
+            dict(
+                zip(("user_id", "project_id", "dimension", "bucket"), key), count=delta
+            )
+            for key, delta in counts.items()
+            if delta
+        ]
+        if count_rows:
+            table = TaskCountRollup.__table__
+            stmt = self._insert(table)
+            await self.db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["user_id", "project_id", "dimension", "bucket"],
+                    set_={"count": table.c.count + stmt.excluded.count},
+                ),
+                count_rows,
+            )
+
+        await self.db.commit()
+
+    # === 校准 ===
+
+    async def reconcile(self, user_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        从任务表重新计算汇总并修正差异
+
+        先以 FOR UPDATE 锁定范围内的汇总行，再在同一事务内统计任务表并写入差额：
+        锁定期间的增量更新需等待本事务提交后再累加，差额不会与其重复或被其覆盖。
+
+        Args:
+            user_id: 只校准该负责人的汇总；为None时校准全部
+
+        Returns:
+            修正的行数统计
+        """
+        user_id = _as_uuid(user_id)
+        daily_table = TaskDailyRollup.__table__
+        count_table = TaskCountRollup.__table__
+        daily_query = select(daily_table).with_for_update()
+        count_query = select(count_table).with_for_update()
+        if user_id:
+            daily_query = daily_query.where(daily_table.c.user_id == user_id)
+            count_query = count_query.where(count_table.c.user_id == user_id)
+        daily_rollups = (await self.db.execute(daily_query)).all()
+        count_rollups = (await self.db.execute(count_query)).all()
+
+        tasks = Task.__table__
+        owner = func.coalesce(tasks.c.assignee_id, tasks.c.created_by)
+        query = select(
+            tasks.c.assignee_id,
+            tasks.c.created_by,
+            tasks.c.project_id,
+            tasks.c.status,
+            tasks.c.priority,
+            tasks.c.created_at,
+            tasks.c.completed_at,
+            tasks.c.due_date,
+            tasks.c.actual_hours,
+        ).where(tasks.c.is_deleted == False)
+        if user_id:
+            query = query.where(owner == user_id)
+
+        expected_daily: Dict[DailyKey, Counter] = defaultdict(Counter)
+        expected_counts: Counter = Counter()
+        expected_hours: Counter = Counter()
+        for row in (await self.db.execute(query)).all():
+            facts = TaskFacts.from_task(row)
+            _contributions(facts, 1, expected_daily, expected_counts)
+            if facts is not None:
+                expected_hours[(facts.owner_id, facts.project_id)] += facts.actual_hours
+
+        daily_deltas: Dict[DailyKey, Counter] = defaultdict(Counter)
+        actual_hours: Counter = Counter()
+        for rollup in daily_rollups:
+            key = (rollup.user_id, rollup.project_id, rollup.day)
+            expected = expected_daily.pop(key, Counter())
+            for field in DAILY_FIELDS[:-1]:
+                delta = expected[field] - getattr(rollup, field)
+                if delta:
+                    daily_deltas[key][field] = delta
+            actual_hours[key[:2]] += rollup.time_spent_hours
+        for key, expected in expected_daily.items():
+            daily_deltas[key].update(expected)
+
+        # 工时只校准每个 (负责人, 项目) 的总量，差额记在当天
+        today = datetime.utcnow().date()
+        for scope in set(expected_hours) | set(actual_hours):
+            delta = expected_hours[scope] - actual_hours[scope]
+            if delta:
+                daily_deltas[scope + (today,)]["time_spent_hours"] += delta
+
+        count_deltas: Counter = Counter()
+        for rollup in count_rollups:
+            key = (rollup.user_id, rollup.project_id, rollup.dimension, rollup.bucket)
+            delta = expected_counts.pop(key, 0) - rollup.count
+            if delta:
+                count_deltas[key] = delta
+        count_deltas.update(expected_counts)
+
+        await self._apply_deltas(daily_deltas, count_deltas)
+
+        owners = {key[0] for key in daily_deltas} | {key[0] for key in count_deltas}
+        await self._invalidate(owners)
+
+        fixed = {
+            "daily_rows": len(daily_deltas),
+            "count_rows": sum(1 for delta in count_deltas.values() if delta),
+        }
+        if fixed["daily_rows"] or fixed["count_rows"]:
+            logger.warning(f"仪表板汇总校准修正: {fixed}")
+        return fixed
+
+    # === 读取 ===
+
+    async def _cached(self, key: str, compute):
+        if self.cache:
+            cached = await self.cache.get(CACHE_NAMESPACE, key)
+            if cached is not None:
+                return cached
+
+        value = await compute()
+
+        if self.cache:
+            await self.cache.set(CACHE_NAMESPACE, key, value, ttl=self.cache_ttl)
+        return value
+
+    async def _invalidate(self, user_ids: Iterable[UUID]):
+        if not self.cache:
+            return
+        for user_id in user_ids:
+            await self.cache.delete_pattern(CACHE_NAMESPACE, f"{user_id}:*")
+
+    async def _distribution(self, user_id: str) -> Dict[str, Dict[str, int]]:
+        user_id = _as_uuid(user_id)
+        rows = (
+            await self.db.execute(
+                select(
+                    TaskCountRollup.project_id,
+                    TaskCountRollup.dimension,
+                    TaskCountRollup.bucket,
+                    TaskCountRollup.count,
+                ).where(
+                    and_(TaskCountRollup.user_id == user_id, TaskCountRollup.count != 0)
+                )
+            )
+        ).all()
+
+        distribution = {"by_status": Counter(), "by_priority": Counter(), "by_project": Counter()}
+        for project_id, dimension, bucket, count in rows:
+            distribution[f"by_{dimension}"][bucket] += count
+            if dimension == "status" and project_id != NO_PROJECT_ID:
+                distribution["by_project"][str(project_id)] += count
+        return {name: dict(values) for name, values in distribution.items()}
+
+    async def get_task_distribution(self, user_id: str) -> Dict[str, Dict[str, int]]:
+        """按状态、优先级和项目的任务分布"""
+        return await self._cached(
+            f"{user_id}:distribution", lambda: self._distribution(user_id)
+        )
+
+    async def get_overview(self, user_id: str) -> Dict[str, Any]:
+        """仪表板概览统计"""
+        return await self._cached(f"{user_id}:overview", lambda: self._overview(user_id))
+
+    async def _overview(self, user_id: str) -> Dict[str, Any]:
+        user_id = _as_uuid(user_id)
+        today = datetime.utcnow().date()
+        week_start = today - timedelta(days=today.weekday())
+        recent_start = today - timedelta(days=6)
+        rollup = TaskDailyRollup
+
+        def total(column, condition=None):
+            value = column if condition is None else case((condition, column), else_=0)
+            return func.coalesce(func.sum(value), 0)
+
+        sums = (
+            await self.db.execute(
+                select(
+                    total(rollup.completed_count),
+                    total(rollup.completion_seconds),
+                    total(rollup.open_due_count, rollup.day < today),
+                    total(rollup.open_due_count, rollup.day == today),
+                    total(rollup.time_spent_hours),
+                    total(rollup.time_spent_hours, rollup.day >= week_start),
+                    total(rollup.time_spent_hours, rollup.day == today),
+                    total(rollup.created_count, rollup.day >= recent_start),
+                    total(rollup.completed_count, rollup.day >= recent_start),
+                ).where(rollup.user_id == user_id)
+            )
+        ).one()
+        (
+            completed_total,
+            completion_seconds,
+            overdue,
+            today_due,
+            time_total,
+            time_week,
+            time_today,
+            recent_created,
+            recent_completed,
+        ) = (int(value) for value in sums)
+
+        distribution = await self._distribution(user_id)
+        by_status = distribution["by_status"]
+        total_tasks = sum(by_status.values())
+        done = by_status.get(TaskStatus.DONE.value, 0)
+
+        project_statuses = await self._project_statuses(
+            [_as_uuid(project_id) for project_id in distribution["by_project"]]
+        )
+
+        return {
+            "total_tasks": total_tasks,
+            "completed_tasks": done,
+            "in_progress_tasks": by_status.get(TaskStatus.IN_PROGRESS.value, 0),
+            "overdue_tasks": overdue,
+            "today_due_tasks": today_due,
+            "total_projects": len(project_statuses),
+            "active_projects": project_statuses.count(ProjectStatus.ACTIVE.value),
+            "completed_projects": project_statuses.count(ProjectStatus.COMPLETED.value),
+            "completion_rate": round(100 * done / total_tasks, 1) if total_tasks else 0.0,
+            "avg_completion_time": round(completion_seconds / completed_total / 86400, 2)
+            if completed_total
+            else None,
+            "productivity_score": _productivity_score(
+                recent_completed, overdue, recent_created
+            ),
+            "total_time_spent": time_total,
+            "this_week_time": time_week,
+            "today_time": time_today,
+        }
+
+    async def _project_statuses(self, project_ids: List[UUID]) -> List[str]:
+        """项目状态（按主键读取，结果随概览一起缓存）"""
+        if not project_ids:
+            return []
+        rows = await self.db.execute(
+            select(Project.status).where(Project.id.in_(project_ids))
+        )
+        return [str(getattr(status, "value", status)) for status in rows.scalars()]
+
+    async def get_productivity_trend(self, user_id: str, days: int) -> List[Dict[str, Any]]:
+        """最近days天的逐日完成数、工时和评分"""
+        return await self._cached(
+            f"{user_id}:trend:{days}", lambda: self._productivity_trend(user_id, days)
+        )
+
+    async def _productivity_trend(self, user_id: str, days: int) -> List[Dict[str, Any]]:
+        user_id = _as_uuid(user_id)
+        today = datetime.utcnow().date()
+        start = today - timedelta(days=days - 1)
+        rollup = TaskDailyRollup
+
+        rows = (
+            await self.db.execute(
+                select(
+                    rollup.day,
+                    func.sum(rollup.created_count),
+                    func.sum(rollup.completed_count),
+                    func.sum(rollup.time_spent_hours),
+                )
+                .where(and_(rollup.user_id == user_id, rollup.day >= start, rollup.day <= today))
+                .group_by(rollup.day)
+            )
+        ).all()
+        by_day = {_as_date(day): (created, completed, hours) for day, created, completed, hours in rows}
+
+        trend = []
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            created, completed, hours = by_day.get(day, (0, 0, 0))
+            trend.append(
+                {
+                    "date": day.isoformat(),
+                    "completed_tasks": int(completed),
+                    "time_spent": int(hours),
+                    "productivity_score": float(
+                        _productivity_score(int(completed), 0, int(created))
+                    ),
+                }
+            )
+        return trend
+
+    async def get_time_tracking(self, user_id: str, days: int) -> Dict[str, Any]:
+        """最近days天的工时总计和按项目拆分"""
+        return await self._cached(
+            f"{user_id}:time:{days}", lambda: self._time_tracking(user_id, days)
+        )
+
+    async def _time_tracking(self, user_id: str, days: int) -> Dict[str, Any]:
+        user_id = _as_uuid(user_id)
+        start = datetime.utcnow().date() - timedelta(days=days - 1)
+        rollup = TaskDailyRollup
+
+        rows = (
+            await self.db.execute(
+                select(rollup.project_id, func.sum(rollup.time_spent_hours))
+                .where(and_(rollup.user_id == user_id, rollup.day >= start))
+                .group_by(rollup.project_id)
+            )
+        ).all()
+
+        break_down = {
+            ("none" if project_id == NO_PROJECT_ID else str(project_id)): int(hours)
+            for project_id, hours in rows
+            if hours
+        }
+        total_hours = sum(break_down.values())
+        return {
+            "total_hours": total_hours,
+            "break_down": break_down,
+            "daily_average": round(total_hours / days, 2),
+        }
+
+
+async def run_periodic_reconciliation(session_factory, interval: float = 3600):
+    """
+    定期校准仪表板汇总
+
+    Args:
+        session_factory: 返回AsyncSession的工厂（支持async with）
+        interval: 校准间隔（秒）
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory() as session:
+                await DashboardRollupService(session).reconcile()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"仪表板汇总校准失败: {e}")
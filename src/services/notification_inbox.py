@@ -0,0 +1,374 @@
+"""
+通知收件箱服务
+==============
+
+维护每个用户的未读通知计数，并通过WebSocket推送变化：
+- 创建、标记已读/未读、全部已读、删除通知时，在同一事务内原子增减计数
+- 新通知和计数变化提交后推送给在线用户，客户端无需轮询
+- 读取未读数只查询计数表的一行
+- 校准任务重新统计通知表，修正计数漂移
+
+计数变化量取自条件UPDATE/DELETE实际影响的行数，重复请求和并发请求不会重复计数。
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, case, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from src.task_management.models import Notification, NotificationUnreadCounter
+from src.websocket import push_unread_count, send_notification_to_user
+
+logger = logging.getLogger(__name__)
+
+# 计数与状态变更直接使用Core表，不依赖ORM映射配置
+notification_table = Notification.__table__
+counter_table = NotificationUnreadCounter.__table__
+
+
+def _as_uuid(value) -> UUID:
+    return value if isinstance(value, UUID) else UUID(str(value))
+
+
+class NotificationInbox:
+    """
+    通知收件箱
+
+    db应为AsyncSession；每个写操作自行提交，并在提交后推送。
+    """
+
+    def __init__(self, db, push: bool = True):
+        self.db = db
+        self.push = push
+
+    # === 计数 ===
+
+    def _insert(self):
+        dialect = self.db.get_bind().dialect.name
+        return (sqlite_insert if dialect == "sqlite" else pg_insert)(counter_table)
+
+    async def _adjust(self, user_id: UUID, delta: int) -> int:
+        """
+        原子增减计数并返回新值（不低于0）
+
+        计数行不存在时以通知表的实际未读数初始化：调用方的通知变更已在本事务中
+        生效，统计结果即为变更后的值；不能以delta初始化，否则首次操作为已读或
+        删除时会写入负数。
+        """
+        adjusted = counter_table.c.unread_count + delta
+        clamped = case((adjusted < 0, 0), else_=adjusted)
+
+        count = (
+            await self.db.execute(
+                update(counter_table)
+                .where(counter_table.c.user_id == user_id)
+                .values(unread_count=clamped)
+                .returning(counter_table.c.unread_count)
+            )
+        ).scalar_one_or_none()
+        if count is not None:
+            return count
+
+        # 并发事务先创建了计数行时，退回为在其基础上增减
+        stmt = self._insert().values(
+            user_id=user_id, unread_count=await self._count_unread(user_id)
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id"], set_={"unread_count": clamped}
+        ).returning(counter_table.c.unread_count)
+        return (await self.db.execute(stmt)).scalar_one()
+
+    async def _count_unread(self, user_id: UUID) -> int:
+        return (
+            await self.db.execute(
+                select(func.count()).where(
+                    and_(
+                        notification_table.c.user_id == user_id,
+                        notification_table.c.is_read == False,
+                    )
+                )
+            )
+        ).scalar_one()
+
+    async def get_unread_count(self, user_id) -> int:
+        """未读通知数（计数行不存在时从通知表统计并初始化）"""
+        user_id = _as_uuid(user_id)
+        count = (
+            await self.db.execute(
+                select(counter_table.c.unread_count).where(
+                    counter_table.c.user_id == user_id
+                )
+            )
+        ).scalar_one_or_none()
+        if count is not None:
+            return max(count, 0)
+
+        count = await self._count_unread(user_id)
+        await self.db.execute(
+            self._insert()
+            .values(user_id=user_id, unread_count=count)
+            .on_conflict_do_nothing(index_elements=["user_id"])
+        )
+        await self.db.commit()
+        return count
+
+    # === 写操作 ===
+
+    async def deliver(self, notifications: Iterable[Notification]) -> Dict[UUID, int]:
+        """
+        保存新通知并推送
+
+        Args:
+            notifications: 未保存的通知对象
+
+        Returns:
+            各接收用户的最新未读数
+        """
+        notifications = list(notifications)
+        if not notifications:
+            return {}
+
+        self.db.add_all(notifications)
+        await self.db.flush()
+
+        counts = {}
+        for user_id, added in Counter(
+            _as_uuid(notification.user_id) for notification in notifications
+        ).items():
+            counts[user_id] = await self._adjust(user_id, added)
+
+        # 提交前取出推送内容，避免提交后访问过期属性
+        messages = [
+            (
+                _as_uuid(notification.user_id),
+                notification.title,
+                notification.content,
+                notification.type,
+                str(notification.id),
+                notification.action_url,
+            )
+            for notification in notifications
+        ]
+        await self.db.commit()
+
+        if self.push:
+            for user_id, title, content, type_, notification_id, action_url in messages:
+                await send_notification_to_user(
+                    str(user_id),
+                    title,
+                    content,
+                    type_,
+                    notification_id=notification_id,
+                    action_url=action_url,
+                    unread_count=counts[user_id],
+                )
+        return counts
+
+    async def _set_read(self, notification_id, user_id, is_read: bool):
+        user_id = _as_uuid(user_id)
+        result = await self.db.execute(
+            update(notification_table)
+            .where(
+                and_(
+                    notification_table.c.id == _as_uuid(notification_id),
+                    notification_table.c.user_id == user_id,
+                    notification_table.c.is_read == (not is_read),
+                )
+            )
+            .values(is_read=is_read, read_at=datetime.utcnow() if is_read else None)
+        )
+        if not result.rowcount:
+            # 已经是目标状态时不改变计数
+            exists = (
+                await self.db.execute(
+                    select(notification_table.c.id).where(
+                        and_(
+                            notification_table.c.id == _as_uuid(notification_id),
+                            notification_table.c.user_id == user_id,
+                        )
+                    )
+                )
+            ).first()
+            await self.db.rollback()
+            if not exists:
+                raise ValueError("通知不存在")
+            return
+
+        count = await self._adjust(user_id, -1 if is_read else 1)
+        await self.db.commit()
+        await self._push_count(user_id, count)
+
+    async def mark_as_read(self, notification_id, user_id):
+        """标记通知为已读"""
+        await self._set_read(notification_id, user_id, True)
+
+    async def mark_as_unread(self, notification_id, user_id):
+        """标记通知为未读"""
+        await self._set_read(notification_id, user_id, False)
+
+    async def mark_all_as_read(self, user_id) -> int:
+        """标记全部通知为已读，返回标记数量"""
+        user_id = _as_uuid(user_id)
+        result = await self.db.execute(
+            update(notification_table)
+            .where(
+                and_(
+                    notification_table.c.user_id == user_id,
+                    notification_table.c.is_read == False,
+                )
+            )
+            .values(is_read=True, read_at=datetime.utcnow())
+        )
+        marked = result.rowcount
+        if not marked:
+            await self.db.rollback()
+            return 0
+
+        # 按实际更新行数递减，而不是直接置零，以免覆盖并发新增的计数
+        count = await self._adjust(user_id, -marked)
+        await self.db.commit()
+        await self._push_count(user_id, count)
+        return marked
+
+    async def delete_notification(self, notification_id, user_id):
+        """删除通知"""
+        user_id = _as_uuid(user_id)
+        was_read = (
+            await self.db.execute(
+                delete(notification_table)
+                .where(
+                    and_(
+                        notification_table.c.id == _as_uuid(notification_id),
+                        notification_table.c.user_id == user_id,
+                    )
+                )
+                .returning(notification_table.c.is_read)
+            )
+        ).scalar_one_or_none()
+        if was_read is None:
+            await self.db.rollback()
+            raise ValueError("通知不存在")
+
+        if was_read:
+            await self.db.commit()
+            return
+
+        count = await self._adjust(user_id, -1)
+        await self.db.commit()
+        await self._push_count(user_id, count)
+
+    async def clear_read_notifications(self, user_id) -> int:
+        """删除全部已读通知（不影响未读数）"""
+        result = await self.db.execute(
+            delete(notification_table)
+            .where(
+                and_(
+                    notification_table.c.user_id == _as_uuid(user_id),
+                    notification_table.c.is_read == True,
+                )
+            )
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def get_latest_notifications(
+        self, user_id, limit: int = 5, since: Optional[datetime] = None
+    ) -> List[Notification]:
+        """最新通知（供重连后补齐推送期间错过的通知）"""
+        query = select(Notification).where(Notification.user_id == _as_uuid(user_id))
+        if since:
+            query = query.where(Notification.created_at > since)
+        rows = await self.db.execute(
+            query.order_by(Notification.created_at.desc()).limit(limit)
+        )
+        return list(rows.scalars())
+
+    async def _push_count(self, user_id: UUID, count: int):
+        if self.push:
+            await push_unread_count(str(user_id), count)
+
+    # === 校准 ===
+
+    async def reconcile(self, user_id=None) -> Dict[UUID, int]:
+        """
+        校准未读计数
+
+        先用一次分组统计找出计数与通知表不一致的用户，再逐个锁定计数行后重新统计并写入，
+        锁定期间完成的并发增减会被统计包含，不会被覆盖。
+
+        Args:
+            user_id: 只校准该用户；为None时校准全部
+
+        Returns:
+            被修正用户的新未读数
+        """
+        unread = (
+            select(notification_table.c.user_id, func.count().label("unread_count"))
+            .where(notification_table.c.is_read == False)
+            .group_by(notification_table.c.user_id)
+        )
+        counters = select(counter_table.c.user_id, counter_table.c.unread_count)
+        if user_id is not None:
+            unread = unread.where(notification_table.c.user_id == _as_uuid(user_id))
+            counters = counters.where(counter_table.c.user_id == _as_uuid(user_id))
+
+        expected = dict((await self.db.execute(unread)).all())
+        actual = dict((await self.db.execute(counters)).all())
+        await self.db.rollback()
+
+        drifted = [
+            uid
+            for uid in set(expected) | set(actual)
+            if expected.get(uid, 0) != actual.get(uid, 0)
+        ]
+
+        fixed = {}
+        for uid in drifted:
+            await self.db.execute(
+                self._insert()
+                .values(user_id=uid, unread_count=0)
+                .on_conflict_do_nothing(index_elements=["user_id"])
+            )
+            await self.db.execute(
+                select(counter_table.c.unread_count)
+                .where(counter_table.c.user_id == uid)
+                .with_for_update()
+            )
+            count = await self._count_unread(uid)
+            await self.db.execute(
+                update(counter_table)
+                .where(counter_table.c.user_id == uid)
+                .values(unread_count=count)
+            )
+            await self.db.commit()
+            await self._push_count(uid, count)
+            fixed[uid] = count
+
+        if fixed:
+            logger.warning(f"未读通知计数校准修正 {len(fixed)} 个用户")
+        return fixed
+
+
+async def run_unread_counter_reconciliation(session_factory, interval: float = 900):
+    """
+    定期校准未读通知计数
+
+    Args:
+        session_factory: 返回AsyncSession的工厂（支持async with）
+        interval: 校准间隔（秒）
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory() as session:
+                await NotificationInbox(session).reconcile()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"未读通知计数校准失败: {e}")
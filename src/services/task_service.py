@@ -15,6 +15,7 @@ from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID, uuid4
 import asyncio
+import logging
 from dataclasses import dataclass
 
 from sqlalchemy.orm import Session
@@ -32,8 +33,11 @@ from src.task_management.models import (
     TaskActivity,
 )
 from src.repositories.task_repository import TaskRepository
+from src.services.dashboard_rollups import DashboardRollupService, TaskFacts
 from backend.core.cache import CacheManager
 
+logger = logging.getLogger(__name__)
+
 
 # === Pydantic 数据模型 ===
 
@@ -122,9 +126,12 @@ class TaskSearchRequest(BaseModel):
     due_date_to: Optional[datetime] = Field(None, description="截止日期结束")
     created_by: Optional[str] = Field(None, description="创建者筛选")
     sort_by: str = Field("updated_at", description="排序字段")
-    sort_order: str = Field("desc", description="排序方向", regex="^(asc|desc)$")
+    sort_order: str = Field("desc", description="排序方向", pattern="^(asc|desc)$")
     page: int = Field(1, ge=1, description="页码")
     page_size: int = Field(20, ge=1, le=100, description="每页大小")
+    pagination: str = Field("offset", description="分页方式", pattern="^(offset|cursor)$")
+    cursor: Optional[str] = Field(None, description="游标分页的上一页next_cursor")
+    include_total: bool = Field(False, description="游标分页时是否计算总数")
 
     @validator("due_date_to")
     def validate_date_range(cls, v, values):
@@ -179,9 +186,9 @@ class TaskListResponse(BaseModel):
 class BulkOperationRequest(BaseModel):
     """批量操作请求模型"""
 
-    task_ids: List[str] = Field(..., min_items=1, max_items=100, description="任务ID列表")
+    task_ids: List[str] = Field(..., min_length=1, max_length=100, description="任务ID列表")
     operation: str = Field(
-        ..., description="操作类型", regex="^(update|delete|assign|change_status)$"
+        ..., description="操作类型", pattern="^(update|delete|assign|change_status)$"
     )
     data: Dict[str, Any] = Field(default_factory=dict, description="操作数据")
 
@@ -226,11 +233,13 @@ class TaskService:
         task_repository: TaskRepository,
         cache_manager: Optional[CacheManager] = None,
         config: Optional[TaskServiceConfig] = None,
+        rollups: Optional[DashboardRollupService] = None,
     ):
         self.db = db
         self.repository = task_repository
         self.cache = cache_manager
         self.config = config or TaskServiceConfig()
+        self.rollups = rollups
 
     # === 基础CRUD操作 ===
 
@@ -287,6 +296,7 @@ class TaskService:
 
         # 5. 保存到数据库
         task = await self.repository.create(task_data)
+        await self._record_rollup_change(None, task)
 
         # 6. 记录活动日志
         if self.config.enable_activity_logging:
@@ -402,7 +412,8 @@ class TaskService:
         if not update_data:
             return await self._build_task_response(task)
 
-        # 4. 特殊字段处理
+        # 4. 特殊字段处理（副作用会修改task，先保存汇总快照）
+        before = TaskFacts.from_task(task)
         if "status" in update_data:
             await self._validate_status_transition(task, update_data["status"])
             await self._handle_status_change(task, update_data["status"], user_id)
@@ -414,6 +425,7 @@ class TaskService:
 
         # 5. 更新数据库
         updated_task = await self.repository.update(task_id, update_data)
+        await self._record_rollup_change(before, updated_task)
 
         # 6. 记录活动日志
         if self.config.enable_activity_logging:
@@ -465,13 +477,15 @@ class TaskService:
             )
 
         # 4. 执行删除
+        before = TaskFacts.from_task(task)
         if hard_delete:
             success = await self.repository.hard_delete(task_id)
         else:
             success = await self.repository.soft_delete(task_id)
 
         if success:
-            pass  # Auto-fixed empty block
+            await self._record_rollup_change(before, None)
+
             # 5. 记录活动日志
             if self.config.enable_activity_logging:
                 await self._log_task_activity(
@@ -531,6 +545,19 @@ class TaskService:
                 limit=request.page_size,
             )
             total_count = len(tasks)  # 简化处理，实际应该单独查询总数
+        elif request.pagination == "cursor":
+            # 游标分页：按 (排序列, id) 键集翻页
+            result = await self.repository.search_tasks_keyset(
+                user_id=user_id,
+                filters=filters,
+                sort_by=request.sort_by,
+                sort_order=request.sort_order,
+                cursor=request.cursor,
+                page_size=request.page_size,
+                include_total=request.include_total,
+            )
+            tasks = result["tasks"]
+            total_count = result["total_count"]
         else:
             pass  # Auto-fixed empty block
             # 普通筛选
@@ -551,12 +578,21 @@ class TaskService:
             task_responses.append(await self._build_task_response(task))
 
         # 4. 构建分页信息
-        pagination = {
-            "page": request.page,
-            "page_size": request.page_size,
-            "total_count": total_count,
-            "total_pages": (total_count + request.page_size - 1) // request.page_size,
-        }
+        if request.pagination == "cursor" and not request.query:
+            pagination = {
+                "page_size": request.page_size,
+                "total_count": total_count,
+                "next_cursor": result["next_cursor"],
+                "has_next": result["has_next"],
+            }
+        else:
+            pagination = {
+                "page": request.page,
+                "page_size": request.page_size,
+                "total_count": total_count,
+                "total_pages": (total_count + request.page_size - 1)
+                // request.page_size,
+            }
 
         # 5. 构建摘要信息
         summary = await self._build_search_summary(tasks)
@@ -619,16 +655,19 @@ class TaskService:
         }
 
         for task in tasks:
+            before = TaskFacts.from_task(task)
             try:
                 if request.operation == "update":
                     updated_task = await self.repository.update(
                         str(task.id), request.data
                     )
                     results["updated_tasks"].append(str(updated_task.id))
+                    await self._record_rollup_change(before, updated_task)
                     results["success_count"] += 1
                 elif request.operation == "delete":
                     success = await self.repository.soft_delete(str(task.id))
                     if success:
+                        await self._record_rollup_change(before, None)
                         results["success_count"] += 1
                     else:
                         results["failed_count"] += 1
@@ -643,6 +682,7 @@ class TaskService:
                             str(task.id), update_data
                         )
                         results["updated_tasks"].append(str(updated_task.id))
+                        await self._record_rollup_change(before, updated_task)
                         results["success_count"] += 1
                 elif request.operation == "change_status":
                     if "status" in request.data:
@@ -650,6 +690,7 @@ class TaskService:
                             str(task.id), {"status": request.data["status"]}
                         )
                         results["updated_tasks"].append(str(updated_task.id))
+                        await self._record_rollup_change(before, updated_task)
                         results["success_count"] += 1
 
                 # 记录活动日志
@@ -716,7 +757,9 @@ class TaskService:
             update_data["progress_percentage"] = 100
 
         # 5. 更新任务
+        before = TaskFacts.from_task(task)
         updated_task = await self.repository.update(task_id, update_data)
+        await self._record_rollup_change(before, updated_task)
 
         # 6. 记录活动日志
         if self.config.enable_activity_logging:
@@ -992,6 +1035,17 @@ class TaskService:
         # 这里应该集成通知服务
         pass
 
+    async def _record_rollup_change(
+        self, before: Optional[TaskFacts], task: Optional[Task]
+    ):
+        """更新仪表板汇总（失败不影响任务操作，由定期校准修正）"""
+        if not self.rollups:
+            return
+        try:
+            await self.rollups.record_change(before, task)
+        except Exception as e:
+            logger.warning(f"仪表板汇总更新失败: {e}")
+
     async def _invalidate_caches(self, task: Task):
         """清除任务相关缓存"""
         if not self.cache:
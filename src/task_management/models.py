@@ -14,23 +14,31 @@
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from enum import Enum
+import uuid
 
 from sqlalchemy import (
     Column,
     String,
     Text,
+    Date,
     DateTime,
     Integer,
+    BigInteger,
     Boolean,
     ForeignKey,
     func,
     Index,
+    DDL,
+    case,
+    event,
+    literal_column,
 )
-from sqlalchemy.orm import relationship, validates
-from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
+from sqlalchemy.orm import relationship, validates, deferred
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY, TSVECTOR
 from sqlalchemy.ext.hybrid import hybrid_property
 
-from backend.models.base import BaseModel, AuditMixin
+from backend.models.base import Base, BaseModel, AuditMixin
+from src.task_management.search_schema import SEARCH_VECTOR_DDL
 
 
 # 枚举定义
@@ -54,6 +62,15 @@ class TaskPriority(str, Enum):
     URGENT = "urgent"
 
 
+# 优先级排序权重（数值越大越紧急），用于可走索引的优先级排序
+TASK_PRIORITY_RANK = {
+    TaskPriority.LOW.value: 1,
+    TaskPriority.MEDIUM.value: 2,
+    TaskPriority.HIGH.value: 3,
+    TaskPriority.URGENT.value: 4,
+}
+
+
 class ProjectStatus(str, Enum):
     """项目状态枚举"""
 
@@ -95,6 +112,11 @@ class Task(BaseModel, AuditMixin):
         Index("idx_task_project_status", "project_id", "status"),
         Index("idx_task_due_date", "due_date"),
         Index("idx_task_created_at", "created_at"),
+        # 键集分页排序索引（排序列 + 主键唯一决胜）
+        Index("idx_task_updated_at_id", "updated_at", "id"),
+        Index("idx_task_due_date_id", "due_date", "id"),
+        # 全文搜索索引
+        Index("idx_task_search_vector", "search_vector", postgresql_using="gin"),
         {"comment": "任务表 - 存储所有任务信息"},
     )
 
@@ -154,6 +176,16 @@ class Task(BaseModel, AuditMixin):
 
     custom_fields = Column(JSONB, nullable=True, comment="自定义字段数据")
 
+    # === 全文搜索 ===
+    # 由数据库触发器根据标题/标签/描述维护，见 src/task_management/search_schema.py
+    search_vector = deferred(
+        Column(
+            TSVECTOR().with_variant(Text(), "sqlite"),
+            nullable=True,
+            comment="全文搜索向量（标题A/标签B/描述C加权）",
+        )
+    )
+
     # === 进度和质量 ===
     progress_percentage = Column(Integer, default=0, comment="完成百分比 (0-100)")
 
@@ -289,6 +321,25 @@ class Task(BaseModel, AuditMixin):
             self.progress_percentage = new_progress
 
 
+# 优先级权重表达式及其函数索引，支撑按 (优先级, id) 的键集分页
+# 使用字面量而非绑定参数，保证查询表达式与索引表达式一致
+task_priority_rank = case(
+    *[
+        (Task.priority == literal_column(f"'{name}'"), literal_column(str(rank)))
+        for name, rank in TASK_PRIORITY_RANK.items()
+    ],
+    else_=literal_column("0"),
+)
+Index("idx_task_priority_rank_id", task_priority_rank, Task.id)
+
+# search_vector维护触发器（仅PostgreSQL；其他数据库使用仓储层的本地倒排索引）
+event.listen(
+    Task.__table__,
+    "after_create",
+    DDL(SEARCH_VECTOR_DDL).execute_if(dialect="postgresql"),
+)
+
+
 class TaskDependency(BaseModel):
     """
     任务依赖关系模型
@@ -646,6 +697,7 @@ class Notification(BaseModel):
     __table_args__ = (
         Index("idx_notification_user", "user_id"),
         Index("idx_notification_read", "is_read"),
+        Index("idx_notification_user_unread", "user_id", "is_read"),
         {"comment": "通知表"},
     )
 
@@ -685,3 +737,86 @@ class Notification(BaseModel):
         """标记为已读"""
         self.is_read = True
         self.read_at = datetime.utcnow()
+
+
+class NotificationUnreadCounter(Base):
+    """
+    未读通知计数
+    ============
+
+    每个用户一行，与通知的创建、已读/未读、删除在同一事务内增减，
+    读取未读数无需统计通知表；由通知收件箱服务定期校准。
+    """
+
+    __tablename__ = "notification_unread_counters"
+    __table_args__ = ({"comment": "未读通知计数表"},)
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True, comment="用户ID")
+
+    unread_count = Column(Integer, nullable=False, default=0, comment="未读通知数")
+
+
+# 仪表板汇总表：按 (用户, 项目) 维护的计数器，由仪表板汇总服务增量更新并定期校准
+# 无项目的任务归入 NO_PROJECT_ID
+NO_PROJECT_ID = uuid.UUID(int=0)
+
+
+class TaskDailyRollup(Base):
+    """
+    任务每日汇总
+    ============
+
+    每个 (负责人, 项目, 日期) 一行；负责人为任务的分配者，未分配时为创建者。
+    用户维度的统计对该用户的所有项目求和，项目维度的统计对所有用户求和。
+    """
+
+    __tablename__ = "task_daily_rollups"
+    __table_args__ = (
+        Index("idx_task_daily_rollup_project_day", "project_id", "day"),
+        {"comment": "任务每日汇总表（仪表板）"},
+    )
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True, comment="负责人ID")
+
+    project_id = Column(UUID(as_uuid=True), primary_key=True, comment="项目ID")
+
+    day = Column(Date, primary_key=True, comment="日期（UTC）")
+
+    created_count = Column(Integer, nullable=False, default=0, comment="当日创建任务数")
+
+    completed_count = Column(Integer, nullable=False, default=0, comment="当日完成任务数")
+
+    completion_seconds = Column(
+        BigInteger, nullable=False, default=0, comment="当日完成任务的创建到完成总耗时（秒）"
+    )
+
+    open_due_count = Column(
+        Integer, nullable=False, default=0, comment="截止日期为当日且未完成的任务数"
+    )
+
+    time_spent_hours = Column(Integer, nullable=False, default=0, comment="当日登记工时")
+
+
+class TaskCountRollup(Base):
+    """
+    任务分布汇总
+    ============
+
+    每个 (负责人, 项目, 维度, 取值) 一行，记录当前任务数，维度为status或priority。
+    """
+
+    __tablename__ = "task_count_rollups"
+    __table_args__ = (
+        Index("idx_task_count_rollup_project", "project_id", "dimension"),
+        {"comment": "任务分布汇总表（仪表板）"},
+    )
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True, comment="负责人ID")
+
+    project_id = Column(UUID(as_uuid=True), primary_key=True, comment="项目ID")
+
+    dimension = Column(String(20), primary_key=True, comment="统计维度")
+
+    bucket = Column(String(50), primary_key=True, comment="维度取值")
+
+    count = Column(Integer, nullable=False, default=0, comment="任务数")
@@ -12,6 +12,7 @@
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any, Tuple, Union
 from uuid import UUID
+import hashlib
 import json
 
 from sqlalchemy import and_, or_, func, text, desc, asc
@@ -19,7 +20,14 @@ from sqlalchemy.orm import Session, joinedload, selectinload, contains_eager
 from sqlalchemy.sql import Select
 from redis import Redis
 
-from backend.repositories.base_repository import BaseRepository
+from backend.pagination import (
+    KeysetColumn,
+    decode_cursor,
+    keyset_filter,
+    keyset_order_by,
+    keyset_page_info,
+)
+from src.repositories.base_repository import BaseRepository
 from src.task_management.models import (
     Task,
     TaskStatus,
@@ -870,17 +878,75 @@ class ProjectRepository(BaseRepository[Project]):
         return True
 
 
+# 取出全部标签集合的并集，删除其中的缓存键和标签集合本身；
+# 在服务端原子执行，避免SUNION与DEL之间新登记的缓存键残留在已删除的标签之外。
+# 分批DEL以免unpack超出Lua栈限制
+INVALIDATE_TAGS_SCRIPT = """
+local keys = redis.call('SUNION', unpack(KEYS))
+for i = 1, #keys, 500 do
+    redis.call('DEL', unpack(keys, i, math.min(i + 499, #keys)))
+end
+redis.call('DEL', unpack(KEYS))
+return #keys
+"""
+
+
+class CacheTagIndex:
+    """
+    缓存标签索引
+    ============
+
+    为每个缓存条目登记其依赖的任务、用户和项目标签，
+    失效时通过Lua脚本一次性取出并删除依赖键，避免KEYS全库扫描
+    """
+
+    TAG_PREFIX = "cache_tag"
+
+    def __init__(self, redis_client: Redis, tag_ttl: int = 3600):
+        self.redis = redis_client
+        self.tag_ttl = tag_ttl
+        self._invalidate_tags = redis_client.register_script(INVALIDATE_TAGS_SCRIPT)
+
+    def tag_key(self, kind: str, value: Any) -> str:
+        """生成标签集合键，如 cache_tag:task:<id>"""
+        return f"{self.TAG_PREFIX}:{kind}:{value}"
+
+    async def set(self, cache_key: str, ttl: int, payload: str, tags: List[str]):
+        """写入缓存并登记标签（单次pipeline）"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.setex(cache_key, ttl, payload)
+        for tag in tags:
+            pipe.sadd(tag, cache_key)
+            # 标签集合的存活时间至少覆盖其成员
+            pipe.expire(tag, max(ttl, self.tag_ttl))
+        await pipe.execute()
+
+    async def invalidate(self, tags: List[str]) -> int:
+        """删除依赖任一标签的全部缓存键及标签集合本身"""
+        tags = [tag for tag in dict.fromkeys(tags) if tag]
+        if not tags:
+            return 0
+
+        return int(await self._invalidate_tags(keys=tags))
+
+
 class CachedTaskRepository(TaskRepository):
     """
     带缓存的任务Repository
     ======================
 
-    在TaskRepository基础上添加Redis缓存支持
+    在TaskRepository基础上添加Redis缓存支持。
+    每个缓存条目通过CacheTagIndex登记其依赖（任务/用户/项目），
+    创建、更新或删除任务时只清除真正依赖该任务的缓存。
     """
 
+    # 未按项目限定的搜索依赖全部项目，任何任务变更都会使其失效
+    GLOBAL_SEARCH_SCOPE = "all"
+
     def __init__(self, db: Session, redis_client: Redis):
         super().__init__(db)
         self.redis = redis_client
+        self.tags = CacheTagIndex(redis_client)
         self.cache_ttl = {
             "task": 300,  # 任务缓存5分钟
             "search": 60,  # 搜索结果缓存1分钟
@@ -909,12 +975,12 @@ class CachedTaskRepository(TaskRepository):
         )
 
         if task:
-            pass  # Auto-fixed empty block
-            # 存储到缓存
-            await self.redis.setex(
+            # 存储到缓存，依赖该任务本身
+            await self.tags.set(
                 cache_key,
                 self.cache_ttl["task"],
                 json.dumps(self._serialize_task(task)),
+                [self.tags.tag_key("task", task_id)],
             )
 
         return task
@@ -926,9 +992,12 @@ class CachedTaskRepository(TaskRepository):
         filters: Optional[Dict[str, Any]] = None,
         limit: int = 50,
     ) -> List[Task]:
-        """缓存搜索结果"""
-        # 生成缓存键
-        cache_key = f"search:{hash(query_text)}:{user_id}:{hash(str(filters))}:{limit}"
+        """缓存搜索结果（按项目划分作用域）"""
+        scope = self._search_scope(filters)
+        cache_key = (
+            f"search:{scope}:{self._digest(query_text)}:{user_id}:"
+            f"{self._digest(filters)}:{limit}"
+        )
 
         # 尝试从缓存获取
         cached_results = await self.redis.get(cache_key)
@@ -940,11 +1009,15 @@ class CachedTaskRepository(TaskRepository):
         tasks = await super().search_with_fulltext(query_text, user_id, filters, limit)
 
         if tasks:
-            pass  # Auto-fixed empty block
-            # 序列化并缓存结果
+            # 序列化并缓存结果；依赖搜索作用域和结果中的每个任务
             serialized_tasks = [self._serialize_task(task) for task in tasks]
-            await self.redis.setex(
-                cache_key, self.cache_ttl["search"], json.dumps(serialized_tasks)
+            tags = [self.tags.tag_key("search", scope)]
+            tags.extend(self.tags.tag_key("task", task.id) for task in tasks)
+            await self.tags.set(
+                cache_key,
+                self.cache_ttl["search"],
+                json.dumps(serialized_tasks),
+                tags,
             )
 
         return tasks
@@ -958,7 +1031,10 @@ class CachedTaskRepository(TaskRepository):
         priority_filter: Optional[List[str]] = None,
     ) -> List[Task]:
         """缓存用户任务"""
-        cache_key = f"user_tasks:{user_id}:{hash(str(status_filter))}:{project_filter}:{hash(str(due_date_range))}:{hash(str(priority_filter))}"
+        cache_key = (
+            f"user_tasks:{user_id}:{self._digest(status_filter)}:{project_filter}:"
+            f"{self._digest(due_date_range)}:{self._digest(priority_filter)}"
+        )
 
         # 尝试从缓存获取
         cached_tasks = await self.redis.get(cache_key)
@@ -972,19 +1048,27 @@ class CachedTaskRepository(TaskRepository):
         )
 
         if tasks:
-            pass  # Auto-fixed empty block
-            # 缓存结果
+            # 缓存结果；新分配给该用户的任务通过user标签使其失效
             serialized_tasks = [self._serialize_task(task) for task in tasks]
-            await self.redis.setex(
-                cache_key, self.cache_ttl["user_tasks"], json.dumps(serialized_tasks)
+            await self.tags.set(
+                cache_key,
+                self.cache_ttl["user_tasks"],
+                json.dumps(serialized_tasks),
+                [self.tags.tag_key("user", user_id)],
             )
 
         return tasks
 
+    async def create(self, data: Dict[str, Any]) -> Task:
+        """创建任务并清除其分配者、创建者和项目的列表与搜索缓存"""
+        task = await super().create(data)
+        await self.tags.invalidate(self._task_tags(task))
+        return task
+
     async def update(self, entity_id: str, data: Dict[str, Any]) -> Task:
         """更新任务并清除相关缓存"""
-        # 先清除相关缓存
-        await self._invalidate_task_caches(entity_id)
+        # 先清除旧状态相关缓存
+        await self._invalidate_task_caches(entity_id, data)
 
         # 更新数据库
         task = await super().update(entity_id, data)
@@ -997,6 +1081,29 @@ class CachedTaskRepository(TaskRepository):
         return await super().delete(entity_id)
 
     # === 缓存相关私有方法 ===
+    def _search_scope(self, filters: Optional[Dict[str, Any]]) -> str:
+        """搜索缓存作用域：限定项目时为项目ID，否则为全局"""
+        if filters and filters.get("project_id"):
+            return str(filters["project_id"])
+        return self.GLOBAL_SEARCH_SCOPE
+
+    @staticmethod
+    def _digest(value: Any) -> str:
+        """稳定的缓存键摘要（内置hash()在进程间随机化，不能用于共享缓存）"""
+        raw = json.dumps(value, sort_keys=True, default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    def _task_tags(self, task: Any) -> List[str]:
+        """任务变更时需要失效的标签"""
+        tags = [self.tags.tag_key("task", task.id)]
+        for user_id in (task.assignee_id, task.created_by):
+            if user_id:
+                tags.append(self.tags.tag_key("user", user_id))
+        if task.project_id:
+            tags.append(self.tags.tag_key("search", task.project_id))
+        tags.append(self.tags.tag_key("search", self.GLOBAL_SEARCH_SCOPE))
+        return tags
+
     def _serialize_task(self, task: Task) -> Dict[str, Any]:
         """序列化任务对象为字典"""
         return {
@@ -1033,26 +1140,28 @@ class CachedTaskRepository(TaskRepository):
 
         return task
 
-    async def _invalidate_task_caches(self, task_id: str):
-        """清除任务相关的所有缓存"""
-        # 获取任务信息
+    async def _invalidate_task_caches(
+        self, task_id: str, changes: Optional[Dict[str, Any]] = None
+    ):
+        """
+        清除依赖该任务的缓存
+
+        Args:
+            task_id: 任务ID
+            changes: 更新数据；分配者或项目变更时同时失效新归属的缓存
+        """
         task = await self.get_by_id(task_id)
         if not task:
             return
 
-        # 清除任务详情缓存
-        patterns = [
-            f"task:{task_id}:*",
-            f"user_tasks:{task.assignee_id}:*" if task.assignee_id else None,
-            f"user_tasks:{task.created_by}:*" if task.created_by else None,
-            "search:*",  # 清除所有搜索缓存（简化处理）
-        ]
+        tags = self._task_tags(task)
+        if changes:
+            if changes.get("assignee_id"):
+                tags.append(self.tags.tag_key("user", changes["assignee_id"]))
+            if changes.get("project_id"):
+                tags.append(self.tags.tag_key("search", changes["project_id"]))
 
-        for pattern in patterns:
-            if pattern:
-                keys = await self.redis.keys(pattern)
-                if keys:
-                    await self.redis.delete(*keys)
+        await self.tags.invalidate(tags)
 
 
 class QueryBuilder:
@@ -1162,3 +1271,58 @@ class QueryBuilder:
             "page_size": page_size,
             "pages": (total + page_size - 1) // page_size,
         }
+
+    async def paginate_keyset(
+        self,
+        sort_field: str = "updated_at",
+        descending: bool = True,
+        cursor: Optional[str] = None,
+        page_size: int = 20,
+        include_total: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        执行游标分页查询
+
+        按 (sort_field, id) 键集翻页，需要该组合上有索引；
+        忽略order_by设置，总数仅在include_total时计算。
+        """
+        if not hasattr(self.model_class, sort_field):
+            raise ValueError(f"未知排序字段: {sort_field}")
+
+        sort_column = getattr(self.model_class, sort_field)
+        columns = [
+            KeysetColumn(
+                sort_column,
+                sort_field,
+                descending=descending,
+                nullable=bool(getattr(sort_column, "nullable", False)),
+            ),
+            KeysetColumn(self.model_class.id, "id", descending=descending),
+        ]
+        sort_name = f"{sort_field}:{'desc' if descending else 'asc'}"
+
+        # 在副本上构建，构建器可以重复用于其他页或查询
+        query = self.query
+        if self._filters:
+            query = query.filter(and_(*self._filters))
+
+        total = await query.count() if include_total else None
+
+        if cursor:
+            values = decode_cursor(cursor, sort_name, len(columns))
+            query = query.filter(keyset_filter(columns, values))
+
+        rows = await (
+            query.order_by(*keyset_order_by(columns))
+            .limit(page_size + 1)
+            .all()
+        )
+        items, pagination = keyset_page_info(rows, columns, sort_name, page_size, total)
+
+        return {
+            "items": items,
+            "total": total,
+            "page_size": page_size,
+            "next_cursor": pagination["next_cursor"],
+            "has_next": pagination["has_next"],
+        }
@@ -0,0 +1,59 @@
+"""
+任务全文搜索数据库结构
+======================
+
+tasks.search_vector 的PostgreSQL分词函数和维护触发器，由模型在建表后执行。
+
+分词规则与 src/repositories/task_search.py 的 segment 保持一致：
+所有非字母数字字符都是分隔符，拉丁字母/数字按词切分并转小写，
+中日韩文字切为重叠的二元组（末字单独成词）。
+"""
+
+# 中日韩文字范围（平假名/片假名、汉字、谚文）
+CJK_RANGE = "぀-ヿ㐀-䶿一-鿿가-힯"
+
+# 以sqlalchemy.DDL执行，%(table)s 替换为目标表名
+SEARCH_VECTOR_DDL = f"""
+CREATE OR REPLACE FUNCTION task_search_segment(body text) RETURNS text AS $$
+DECLARE
+    lowered text := lower(coalesce(body, ''));
+    result text := regexp_replace(
+        regexp_replace(lowered, '[{CJK_RANGE}]+', ' ', 'g'),
+        '[^[:alnum:]]+', ' ', 'g'
+    );
+    run text;
+BEGIN
+    FOR run IN
+        SELECT m[1] FROM regexp_matches(lowered, '([{CJK_RANGE}]+)', 'g') AS m
+    LOOP
+        FOR i IN 1 .. char_length(run) - 1 LOOP
+            result := result || ' ' || substr(run, i, 2);
+        END LOOP;
+        result := result || ' ' || substr(run, char_length(run), 1);
+    END LOOP;
+    RETURN result;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION tasks_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', task_search_segment(NEW.title)), 'A') ||
+        setweight(to_tsvector('simple', task_search_segment(
+            array_to_string(NEW.tags, ' '))), 'B') ||
+        setweight(to_tsvector('simple', task_search_segment(NEW.description)), 'C');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tasks_search_vector_trigger ON %(table)s;
+CREATE TRIGGER tasks_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, tags ON %(table)s
+    FOR EACH ROW EXECUTE FUNCTION tasks_search_vector_update();
+"""
+
+# 为已有数据回填search_vector（触发器仅在写入时生效）
+SEARCH_VECTOR_BACKFILL = "UPDATE %(table)s SET title = title WHERE search_vector IS NULL"
+
+
+__all__ = ["CJK_RANGE", "SEARCH_VECTOR_BACKFILL", "SEARCH_VECTOR_DDL"]
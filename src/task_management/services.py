@@ -14,6 +14,7 @@ from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any, Tuple
 from uuid import UUID
 import asyncio
+import logging
 
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func, text
@@ -39,6 +40,10 @@ from backend.services.notification_service import (
     NotificationService as BaseNotificationService,
 )
 from backend.core.cache import CacheManager
+from src.services.dashboard_rollups import DashboardRollupService, TaskFacts
+from src.services.notification_inbox import NotificationInbox
+
+logger = logging.getLogger(__name__)
 
 
 class TaskService:
@@ -61,11 +66,13 @@ class TaskService:
         cache_manager: CacheManager,
         notification_service: "NotificationService",
         activity_service: "ActivityService",
+        rollups: Optional[DashboardRollupService] = None,
     ):
         self.db = db
         self.cache = cache_manager
         self.notification_service = notification_service
         self.activity_service = activity_service
+        self.rollups = rollups
 
     async def create_task(
         self, task_data: Dict[str, Any], creator_id: str, notify_assignee: bool = True
@@ -111,6 +118,7 @@ class TaskService:
         self.db.add(task)
         await self.db.commit()
         await self.db.refresh(task)
+        await self._record_rollup_change(None, task)
 
         # 5. 记录活动
         await self.activity_service.log_task_activity(
@@ -156,6 +164,7 @@ class TaskService:
         await self._check_task_edit_permission(task, user_id)
 
         # 3. 记录变更
+        before = TaskFacts.from_task(task)
         changes = []
         for field, new_value in update_data.items():
             if hasattr(task, field):
@@ -185,6 +194,7 @@ class TaskService:
         # 6. 保存变更
         await self.db.commit()
         await self.db.refresh(task)
+        await self._record_rollup_change(before, task)
 
         # 7. 记录活动
         for change in changes:
@@ -229,6 +239,7 @@ class TaskService:
             )
 
         old_status = task.status
+        before = TaskFacts.from_task(task)
 
         # 更新状态相关字段
         task.status = new_status
@@ -241,6 +252,7 @@ class TaskService:
             task.progress_percentage = 100
 
         await self.db.commit()
+        await self._record_rollup_change(before, task)
 
         # 记录活动
         await self.activity_service.log_task_activity(
@@ -276,6 +288,7 @@ class TaskService:
         await self._check_assignment_permission(task, assigner_id, assignee_id)
 
         old_assignee_id = task.assignee_id
+        before = TaskFacts.from_task(task)
 
         # 更新分配信息
         task.assignee_id = assignee_id
@@ -283,6 +296,7 @@ class TaskService:
         task.assigned_by = assigner_id
 
         await self.db.commit()
+        await self._record_rollup_change(before, task)
 
         # 记录活动
         await self.activity_service.log_task_activity(
@@ -478,10 +492,12 @@ class TaskService:
             )
 
         updated_tasks = []
+        snapshots = []
         for task in tasks:
             pass  # Auto-fixed empty block
             # 检查编辑权限
             await self._check_task_edit_permission(task, user_id)
+            snapshots.append(TaskFacts.from_task(task))
 
             # 应用更新
             for field, value in update_data.items():
@@ -492,6 +508,8 @@ class TaskService:
             updated_tasks.append(task)
 
         await self.db.commit()
+        for before, task in zip(snapshots, updated_tasks):
+            await self._record_rollup_change(before, task)
 
         # 批量记录活动
         for task in updated_tasks:
@@ -639,6 +657,17 @@ class TaskService:
 
         return user is not None
 
+    async def _record_rollup_change(
+        self, before: Optional[TaskFacts], task: Optional[Task]
+    ):
+        """更新仪表板汇总（失败不影响任务操作，由定期校准修正）"""
+        if not self.rollups:
+            return
+        try:
+            await self.rollups.record_change(before, task)
+        except Exception as e:
+            logger.warning(f"仪表板汇总更新失败: {e}")
+
     async def _invalidate_task_caches(self, task: Task):
         """清除任务相关缓存"""
         # 清除任务缓存
@@ -788,9 +817,15 @@ class NotificationService:
     管理系统通知的发送和处理
     """
 
-    def __init__(self, db: Session, base_notification_service: BaseNotificationService):
+    def __init__(
+        self,
+        db: Session,
+        base_notification_service: BaseNotificationService,
+        inbox: Optional[NotificationInbox] = None,
+    ):
         self.db = db
         self.base_service = base_notification_service
+        self.inbox = inbox or NotificationInbox(db)
 
     async def send_task_assigned_notification(
         self, task_id: str, assignee_id: str, assigner_id: str
@@ -819,8 +854,8 @@ class NotificationService:
             action_url=f"/tasks/{task_id}",
         )
 
-        self.db.add(notification)
-        await self.db.commit()
+        # 保存通知、更新未读数并推送
+        await self.inbox.deliver([notification])
 
         # 发送实时通知（WebSocket等）
         await self.base_service.send_realtime_notification(
@@ -854,8 +889,8 @@ class NotificationService:
         notification_users.discard(changed_by)
 
         # 发送通知
-        for user_id in notification_users:
-            notification = Notification(
+        await self.inbox.deliver(
+            Notification(
                 user_id=user_id,
                 title="任务状态更新",
                 content=f"任务 {task.title} 状态从 {old_status} 变更为 {new_status}",
@@ -864,10 +899,8 @@ class NotificationService:
                 related_entity_id=task_id,
                 action_url=f"/tasks/{task_id}",
             )
-
-            self.db.add(notification)
-
-        await self.db.commit()
+            for user_id in notification_users
+        )
 
 
 class ActivityService:
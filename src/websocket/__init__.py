@@ -34,6 +34,7 @@ from .server import (
     broadcast_task_update,
     broadcast_user_status,
     send_notification_to_user,
+    push_unread_count,
     get_websocket_stats,
     get_online_users_for_api,
     get_room_info_for_api,
@@ -68,7 +69,7 @@ async def shutdown_websocket_system():
 def is_websocket_available():
     """检查WebSocket是否可用"""
     try:
-        import websockets
+        import websockets  # noqa: F401
 
         return True
     except ImportError:
@@ -105,6 +106,7 @@ __all__ = [
     "broadcast_task_update",
     "broadcast_user_status",
     "send_notification_to_user",
+    "push_unread_count",
     "get_websocket_stats",
     "get_online_users_for_api",
     "get_room_info_for_api",
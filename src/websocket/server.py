@@ -17,6 +17,7 @@ except ImportError:
     print("警告: 未安装websockets库，WebSocket功能将不可用")
     print("请运行: pip install websockets")
     websockets = None
+    WebSocketServerProtocol = Any
 
 from .manager import websocket_manager
 from .handlers import websocket_handlers
@@ -260,19 +261,29 @@ async def broadcast_user_status(
 
 
 async def send_notification_to_user(
-    user_id: str, title: str, message: str, notification_type: str = "info"
+    user_id: str,
+    title: str,
+    message: str,
+    notification_type: str = "info",
+    notification_id: Optional[str] = None,
+    action_url: Optional[str] = None,
+    unread_count: Optional[int] = None,
 ):
-    """从后端API发送通知给特定用户"""
+    """从后端API发送通知给特定用户（unread_count随通知一起推送最新未读数）"""
     try:
         notification_data = {
-            "notification_id": f"api_notif_{asyncio.get_event_loop().time()}",
+            "notification_id": notification_id
+            or f"api_notif_{asyncio.get_event_loop().time()}",
             "title": title,
             "message": message,
             "type": notification_type,
             "target_user_id": user_id,
+            "action_url": action_url,
             "auto_dismiss": True,
             "dismiss_timeout": 5000,
         }
+        if unread_count is not None:
+            notification_data["unread_count"] = unread_count
 
         notify_msg = MessageBuilder.create_message(
             EventType.SYSTEM_NOTIFICATION, notification_data, user_id=user_id
@@ -285,6 +296,23 @@ async def send_notification_to_user(
         logger.error(f"发送通知失败: {e}")
 
 
+async def push_unread_count(user_id: str, unread_count: int):
+    """推送未读通知数变化（用户不在线时直接跳过）"""
+    if user_id not in websocket_manager.connections:
+        return
+
+    try:
+        sync_msg = MessageBuilder.create_message(
+            EventType.DATA_SYNC,
+            {"resource": "notifications", "unread_count": unread_count},
+            user_id=user_id,
+        )
+        await websocket_manager.send_to_user(user_id, sync_msg)
+
+    except Exception as e:
+        logger.error(f"推送未读数失败: {e}")
+
+
 def get_websocket_stats() -> Dict[str, Any]:
     """获取WebSocket服务器统计信息"""
     if not websocket_server.is_running:
@@ -0,0 +1,156 @@
+"""
+EventBus tests
+
+Covers the ring-buffered history and its per-name index, wildcard
+dispatch and the queued (thread/async) handler modes.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+from core.api.events import Event, EventBus
+
+
+@pytest.fixture
+def bus():
+    bus = EventBus(max_history=5)
+    yield bus
+    bus.shutdown()
+
+
+def emit(bus, name, **data):
+    event = Event(name=name, data=data)
+    bus.emit(name, event)
+    return event
+
+
+class TestHistory:
+    """Ring buffer and per-name index"""
+
+    def test_history_keeps_latest_events(self, bus):
+        events = [emit(bus, "state.saved", n=n) for n in range(8)]
+
+        assert bus.get_history() == events[-5:]
+        assert bus.get_history("state.saved", limit=2) == events[-2:]
+
+    def test_index_drops_events_evicted_from_buffer(self, bus):
+        old = [emit(bus, "config.loaded", n=n) for n in range(3)]
+        recent = [emit(bus, "state.saved", n=n) for n in range(5)]
+
+        assert bus.get_history("config.loaded") == []
+        assert "config.loaded" not in bus._history_index
+        assert bus.get_history("state.saved") == recent
+        assert all(event not in bus.get_history() for event in old)
+
+    def test_index_size_is_bounded_by_buffer(self, bus):
+        for n in range(1000):
+            emit(bus, f"agent.event_{n % 50}", n=n)
+
+        indexed = sum(len(events) for events in bus._history_index.values())
+        assert indexed == len(bus.get_history(limit=100)) == 5
+        assert len(bus._history_index) <= 5
+
+    def test_interleaved_names_stay_consistent(self, bus):
+        for n in range(23):
+            emit(bus, "a" if n % 3 else "b", n=n)
+
+        history = bus.get_history()
+        for name in ("a", "b"):
+            expected = [event for event in history if event.name == name]
+            assert bus.get_history(name) == expected
+
+    def test_clear_history(self, bus):
+        emit(bus, "state.saved")
+
+        bus.clear_history()
+
+        assert bus.get_history() == [] and bus.get_history("state.saved") == []
+
+
+class TestHandlers:
+    """Dispatch and delivery modes"""
+
+    def test_wildcard_and_exact_subscribers(self, bus):
+        received = []
+        bus.on("workflow.*", lambda event: received.append(("wild", event.name)))
+        bus.on("workflow.phase_changed", lambda event: received.append(("exact", 1)))
+
+        emit(bus, "workflow.phase_changed")
+        emit(bus, "hook.validation_failed")
+
+        assert sorted(received) == [("exact", 1), ("wild", "workflow.phase_changed")]
+
+    def test_failing_handler_does_not_stop_others(self, bus):
+        received = []
+
+        def broken(event):
+            raise RuntimeError("boom")
+
+        bus.on("state.saved", broken)
+        bus.on("state.saved", received.append)
+
+        event = emit(bus, "state.saved")
+
+        assert received == [event]
+        errors = {s["handler"]: s["errors"] for s in bus.get_subscriber_stats()}
+        assert errors[broken.__qualname__] == 1
+
+    def test_thread_handler_receives_events_in_order(self, bus):
+        received = []
+        done = threading.Event()
+
+        def handler(event):
+            received.append(event.data["n"])
+            if len(received) == 20:
+                done.set()
+
+        bus.on("state.saved", handler, mode="thread")
+        for n in range(20):
+            emit(bus, "state.saved", n=n)
+
+        assert done.wait(5)
+        assert received == list(range(20))
+
+    def test_full_queue_drops_oldest(self, bus):
+        release = threading.Event()
+        received = []
+
+        def handler(event):
+            release.wait(5)
+            received.append(event.data["n"])
+
+        bus.on("state.saved", handler, mode="thread", max_queue=2)
+        for n in range(6):
+            emit(bus, "state.saved", n=n)
+        release.set()
+        bus.shutdown()
+
+        (stats,) = bus.get_subscriber_stats()
+        assert stats["dropped"] > 0
+        assert received[-2:] == [4, 5]
+
+    @pytest.mark.asyncio
+    async def test_async_handler_runs_on_loop(self, bus):
+        received = asyncio.Queue()
+
+        async def handler(event):
+            await received.put(event.data["n"])
+
+        bus.on("state.saved", handler, mode="async")
+        emit(bus, "state.saved", n=1)
+        emit(bus, "state.saved", n=2)
+
+        assert await asyncio.wait_for(received.get(), 2) == 1
+        assert await asyncio.wait_for(received.get(), 2) == 2
+
+    def test_unknown_mode_is_rejected(self, bus):
+        with pytest.raises(ValueError):
+            bus.on("state.saved", print, mode="process")
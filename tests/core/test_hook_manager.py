@@ -0,0 +1,219 @@
+"""
+HookManager tests
+
+Covers concurrent execution of hooks of one type, JSON context delivery,
+warm Python worker processes (reuse, crash and timeout recovery) and the
+per-hook latency statistics.
+"""
+
+import io
+import json
+import os
+import stat
+import sys
+import textwrap
+import threading
+
+import pytest
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+from core.hooks.manager import HookManager, HookWorker
+from core.hooks.worker import serve
+
+HOOK_MODULE = textwrap.dedent(
+    """
+    import os
+    import time
+
+    calls = 0
+
+
+    def run(context):
+        global calls
+        calls += 1
+        if context.get("crash"):
+            os._exit(3)
+        if context.get("sleep"):
+            time.sleep(context["sleep"])
+        if context.get("fail"):
+            raise RuntimeError("hook failed")
+        print("noise on stdout")
+        return True, f"{os.getpid()}:{calls}"
+    """
+)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = HookManager(hooks_dir=str(tmp_path / "missing"), max_concurrent=4)
+    yield manager
+    manager.shutdown()
+
+
+@pytest.fixture
+def hook_path(tmp_path):
+    path = tmp_path / "hook.py"
+    path.write_text(HOOK_MODULE)
+    return str(path)
+
+
+@pytest.fixture
+def worker(hook_path):
+    worker = HookWorker(hook_path)
+    yield worker
+    worker.stop()
+
+
+def call(worker, timeout=10, **context):
+    return worker.call(json.dumps(context), timeout)
+
+
+def make_script(tmp_path, name, body):
+    path = tmp_path / name
+    path.write_text("#!" + sys.executable + "\n" + textwrap.dedent(body))
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+class TestExecuteHook:
+    """Dispatch of one hook type"""
+
+    def test_hooks_of_one_type_run_concurrently(self, manager):
+        barrier = threading.Barrier(3, timeout=5)
+        for n in range(3):
+            manager.register_callable(
+                "PreToolUse", lambda context: barrier.wait() is not None, name=f"h{n}"
+            )
+
+        assert manager.execute_hook("PreToolUse", {"tool": "Edit"})
+
+    def test_one_failure_fails_the_type_but_others_run(self, manager):
+        seen = []
+        manager.register_callable("PreToolUse", seen.append, name="ok")
+        manager.register_callable("PreToolUse", lambda context: False, name="veto")
+        manager.register_callable("PreToolUse", seen.append, name="ok2")
+
+        assert not manager.execute_hook("PreToolUse", {"n": 1})
+        assert seen == [{"n": 1}, {"n": 1}]
+
+    def test_unknown_type_succeeds(self, manager):
+        assert manager.execute_hook("PostPrompt", {})
+
+    def test_script_receives_json_context(self, manager, tmp_path):
+        script = make_script(
+            tmp_path,
+            "check.py",
+            """
+            import json, sys
+            context = json.load(sys.stdin)
+            sys.exit(0 if context["files"] == ["a.py"] else 1)
+            """,
+        )
+        manager.register_hook("PreToolUse", script)
+
+        assert manager.execute_hook("PreToolUse", {"files": ["a.py"]})
+        assert not manager.execute_hook("PreToolUse", {"files": []})
+
+    def test_script_timeout_is_a_failure(self, manager, tmp_path):
+        script = make_script(tmp_path, "slow.py", "import time\ntime.sleep(5)\n")
+        manager.register_hook("PreToolUse", script, timeout=0.2)
+
+        assert not manager.execute_hook("PreToolUse", {})
+
+        (stats,) = manager.list_hooks("PreToolUse", include_stats=True)["PreToolUse"]
+        assert stats["latency"]["failures"] == 1
+
+    def test_latency_statistics(self, manager):
+        manager.register_callable("PostToolUse", lambda context: None, name="quick")
+        for _ in range(5):
+            manager.execute_hook("PostToolUse", {})
+
+        assert manager.list_hooks("PostToolUse") == {"PostToolUse": ["quick"]}
+        (stats,) = manager.list_hooks(include_stats=True)["PostToolUse"]
+        latency = stats["latency"]
+        assert stats["kind"] == "callable"
+        assert latency["count"] == 5 and latency["failures"] == 0
+        assert sum(latency["buckets"].values()) == 5
+        assert latency["p50_ms"] is not None
+
+
+class TestPythonHooks:
+    """Python hook modules"""
+
+    def test_inprocess_mode(self, manager, hook_path):
+        manager.register_python_hook("PreToolUse", hook_path, mode="inprocess")
+
+        assert manager.execute_hook("PreToolUse", {})
+        assert not manager.execute_hook("PreToolUse", {"fail": True})
+
+    def test_worker_mode_through_manager(self, manager, hook_path):
+        manager.register_python_hook("PreToolUse", hook_path, timeout=10)
+
+        assert manager.execute_hook("PreToolUse", {})
+        assert not manager.execute_hook("PreToolUse", {"fail": True})
+
+        (stats,) = manager.list_hooks(include_stats=True)["PreToolUse"]
+        assert stats["kind"] == "worker" and stats["latency"]["failures"] == 1
+
+    def test_unknown_mode_is_rejected(self, manager, hook_path):
+        with pytest.raises(ValueError):
+            manager.register_python_hook("PreToolUse", hook_path, mode="thread")
+
+
+class TestHookWorker:
+    """Warm worker process"""
+
+    def test_worker_is_reused_between_calls(self, worker):
+        ok1, first = call(worker)
+        ok2, second = call(worker)
+
+        assert ok1 and ok2
+        assert first.split(":")[0] == second.split(":")[0]
+        assert second.endswith(":2")
+
+    def test_hook_exception_keeps_worker_alive(self, worker):
+        call(worker)
+        pid = worker.process.pid
+
+        ok, message = call(worker, fail=True)
+
+        assert not ok and message == "RuntimeError: hook failed"
+        assert worker.process.pid == pid
+
+    def test_crash_is_reported_and_worker_restarts(self, worker):
+        call(worker)
+        pid = worker.process.pid
+
+        assert call(worker, crash=True) == (False, "Hook worker exited")
+        assert worker.process is None
+
+        ok, message = call(worker)
+        assert ok and message.endswith(":1")
+        assert worker.process.pid != pid
+
+    def test_timeout_kills_worker_and_next_call_recovers(self, worker):
+        ok, message = call(worker, timeout=0.3, sleep=5)
+
+        assert not ok and "no reply within" in message
+        assert worker.process is None
+
+        ok, message = call(worker)
+        assert ok and message.endswith(":1")
+
+
+class TestServe:
+    """Worker line protocol"""
+
+    def test_invalid_lines_are_answered_not_fatal(self, hook_path, monkeypatch):
+        monkeypatch.setattr(sys, "stdout", sys.stdout)
+        stdin = io.StringIO('{"a": 1}\nnot json\n\n{"fail": true}\n')
+        stdout = io.StringIO()
+
+        serve(hook_path, stdin=stdin, stdout=stdout)
+
+        replies = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        assert [reply["ok"] for reply in replies] == [True, False, False]
+        assert replies[1]["message"].startswith("Invalid context")
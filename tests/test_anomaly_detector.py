@@ -0,0 +1,175 @@
+"""
+在线异常检测测试
+验证AnomalyDetector逐点更新、批量回填与逐点结果一致，以及状态持久化
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from monitoring.monitoring_integration import (
+    AnomalyDetector,
+    _cusum,
+    _linear_recurrence,
+)
+
+
+def noisy_series(n, seed=7):
+    """带噪声的平稳序列，中间插入尖峰、水平偏移和持续上升"""
+    rng = np.random.default_rng(seed)
+    values = 100 + rng.normal(0, 2, n)
+    values[n // 5] += 40
+    values[n // 3 : n // 2] += 8
+    values[2 * n // 3 :] *= 2.5
+    return values
+
+
+def run_pointwise(detector, name, values, timestamps):
+    anomalies = []
+    for value, timestamp in zip(values, timestamps):
+        anomalies.extend(detector.update(name, float(value), float(timestamp)))
+    return anomalies
+
+
+def summarize(anomalies):
+    return [(a["type"], a["index"], a.get("direction")) for a in anomalies]
+
+
+class TestRecurrences:
+    """向量化递推与逐项计算一致"""
+
+    def test_linear_recurrence(self):
+        b = np.random.default_rng(1).normal(size=3000)
+        expected, y = [], 4.0
+        for item in b:
+            y = 0.95 * y + item
+            expected.append(y)
+
+        assert np.allclose(_linear_recurrence(b, 0.95, 4.0), expected)
+
+    def test_cusum(self):
+        y = np.random.default_rng(2).normal(size=500)
+        expected, s = [], 1.5
+        for item in y:
+            s = max(0.0, s + item)
+            expected.append(s)
+
+        assert np.allclose(_cusum(y, 1.5), expected)
+
+
+class TestUpdate:
+    """逐点检测"""
+
+    def test_warmup_reports_nothing(self):
+        detector = AnomalyDetector(min_samples=10)
+
+        anomalies = run_pointwise(detector, "cpu", [1, 100, 1, 100, 1], range(5))
+
+        assert anomalies == []
+        assert detector.series["cpu"].count == 5
+
+    def test_spike_is_statistical_anomaly(self):
+        detector = AnomalyDetector()
+        values = noisy_series(100)
+
+        anomalies = run_pointwise(detector, "cpu", values[:30], range(30))
+
+        spikes = [a for a in anomalies if a["type"] == "statistical"]
+        assert [a["index"] for a in spikes] == [20]
+        assert spikes[0]["severity"] == "high"
+
+    def test_level_shift_and_trend_are_reported_once(self):
+        detector = AnomalyDetector()
+        values = np.concatenate((np.full(50, 10.0), np.full(50, 30.0)))
+        values += np.random.default_rng(3).normal(0, 0.5, 100)
+
+        anomalies = run_pointwise(detector, "latency", values, range(100))
+
+        types = [a["type"] for a in anomalies]
+        assert types.count("trend_change") == 1
+        assert "level_shift" in types
+        shift = next(a for a in anomalies if a["type"] == "level_shift")
+        assert shift["direction"] == "increase"
+        assert shift["index"] >= 50
+        assert detector.last_timestamp("latency") == 99
+        assert detector.last_timestamp("unknown") == 0.0
+
+
+class TestBackfill:
+    """批量回填与逐点处理结果一致"""
+
+    @pytest.mark.parametrize("n", [5, 200, 3000])
+    def test_matches_pointwise(self, n):
+        values = noisy_series(n)
+        timestamps = np.arange(n, dtype=float) + 1_700_000_000
+        pointwise = AnomalyDetector(alpha=0.01)
+        batched = AnomalyDetector(alpha=0.01)
+
+        expected = run_pointwise(pointwise, "cpu", values, timestamps)
+        actual = batched.backfill("cpu", values, timestamps)
+
+        assert summarize(actual) == summarize(expected)
+        assert n < 10 or actual
+        for got, want in zip(actual, expected):
+            assert got["timestamp"] == want["timestamp"]
+            assert got.get("value") == pytest.approx(want.get("value"))
+        assert batched.series["cpu"].to_list() == pytest.approx(
+            pointwise.series["cpu"].to_list()
+        )
+        assert batched.stats == pointwise.stats
+
+    def test_backfill_continues_existing_state(self):
+        values = noisy_series(400)
+        pointwise = AnomalyDetector()
+        batched = AnomalyDetector()
+        run_pointwise(batched, "cpu", values[:50], range(50))
+
+        expected = run_pointwise(pointwise, "cpu", values, range(400))
+        actual = batched.backfill("cpu", values[50:], range(50, 400))
+
+        assert summarize(actual) == [
+            item for item in summarize(expected) if item[1] >= 50
+        ]
+
+    def test_process_switches_to_batch(self):
+        detector = AnomalyDetector(batch_threshold=64)
+        detector.backfill = lambda *args: ["batched"]
+
+        assert detector.process("cpu", [1.0] * 64) == ["batched"]
+        assert detector.process("cpu", [1.0] * 3) == []
+        assert detector.series["cpu"].count == 3
+
+
+class TestStatePersistence:
+    """状态保存与恢复"""
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "anomaly_state.json")
+        detector = AnomalyDetector()
+        run_pointwise(detector, "cpu", noisy_series(80), range(80))
+        detector.save_state(path)
+
+        restored = AnomalyDetector()
+        assert restored.load_state(path) == 1
+        assert restored.series["cpu"].to_list() == detector.series["cpu"].to_list()
+        assert isinstance(restored.series["cpu"].count, int)
+
+        tail = noisy_series(120)[80:]
+        assert summarize(run_pointwise(restored, "cpu", tail, range(80, 120))) == (
+            summarize(run_pointwise(detector, "cpu", tail, range(80, 120)))
+        )
+
+    def test_missing_or_mismatched_file_is_ignored(self, tmp_path):
+        path = tmp_path / "anomaly_state.json"
+        detector = AnomalyDetector()
+
+        assert detector.load_state(str(path)) == 0
+        path.write_text('{"fields": ["count"], "series": {}}')
+        assert detector.load_state(str(path)) == 0
+        path.write_text("not json")
+        assert detector.load_state(str(path)) == 0
+        assert detector.series == {}
@@ -0,0 +1,230 @@
+"""
+仪表板汇总增量维护测试
+验证路由层TaskService在创建、更新、删除任务时同步更新汇总表，
+校准先锁定汇总行再统计任务表
+"""
+
+import pytest
+import pytest_asyncio
+import sys
+import os
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+from uuid import UUID, uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+from src.services.dashboard_rollups import DashboardRollupService
+from src.services.task_service import (
+    TaskCreateRequest,
+    TaskService,
+    TaskServiceConfig,
+    TaskUpdateRequest,
+)
+from src.task_management.models import (
+    Task,
+    TaskCountRollup,
+    TaskDailyRollup,
+    TaskStatus,
+)
+
+PROJECT_ID = UUID("6f1c2b9a-3d4e-4f5a-8b7c-9d0e1f2a3b4c")
+
+
+@compiles(JSONB, "sqlite")
+@compiles(ARRAY, "sqlite")
+@compiles(TSVECTOR, "sqlite")
+def _compile_postgres_types_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+class FakeTaskRepository:
+    """内存任务仓储，只实现TaskService写路径用到的方法"""
+
+    def __init__(self):
+        self.tasks = {}
+
+    async def count_user_tasks(self, user_id):
+        return len(self.tasks)
+
+    async def create(self, data):
+        task = SimpleNamespace(
+            **data,
+            created_at=datetime.utcnow(),
+            completed_at=None,
+            actual_hours=0,
+            is_deleted=False,
+        )
+        self.tasks[task.id] = task
+        return task
+
+    async def get_by_id(self, task_id):
+        return self.tasks.get(task_id)
+
+    async def update(self, task_id, data):
+        task = self.tasks[task_id]
+        for field, value in data.items():
+            setattr(task, field, getattr(value, "value", value))
+        if task.status == TaskStatus.DONE.value and task.completed_at is None:
+            task.completed_at = datetime.utcnow()
+        return task
+
+    async def get_task_dependencies(self, task_id):
+        return {"dependencies": [], "dependents": []}
+
+    async def soft_delete(self, task_id):
+        self.tasks[task_id].is_deleted = True
+        return True
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(TaskDailyRollup.__table__.create)
+        await conn.run_sync(TaskCountRollup.__table__.create)
+        await conn.run_sync(Task.__table__.create)
+    async with AsyncSession(engine) as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+def service(db):
+    config = TaskServiceConfig(
+        enable_activity_logging=False, enable_notifications=False
+    )
+    service = TaskService(
+        db,
+        FakeTaskRepository(),
+        cache_manager=None,
+        config=config,
+        rollups=DashboardRollupService(db),
+    )
+    with patch.multiple(
+        TaskService,
+        _validate_task_creation=AsyncMock(),
+        _check_task_edit_permission=AsyncMock(return_value=True),
+        _check_task_delete_permission=AsyncMock(return_value=True),
+        _validate_status_transition=AsyncMock(),
+        _handle_status_change=AsyncMock(),
+        _invalidate_caches=AsyncMock(),
+        _build_task_response=AsyncMock(side_effect=lambda task: task),
+    ):
+        yield service
+
+
+async def _counts(db, user_id):
+    table = TaskCountRollup.__table__
+    rows = await db.execute(select(table).where(table.c.user_id == user_id))
+    return {(row.dimension, row.bucket): row.count for row in rows if row.count}
+
+
+async def _daily(db, user_id):
+    table = TaskDailyRollup.__table__
+    rows = await db.execute(select(table).where(table.c.user_id == user_id))
+    return [(row.created_count, row.completed_count) for row in rows]
+
+
+class TestTaskServiceRollups:
+    """任务写操作驱动汇总表变化"""
+
+    @pytest.mark.asyncio
+    async def test_create_update_delete_change_rollups(self, service, db):
+        user_id = uuid4()
+
+        request = TaskCreateRequest(title="写周报", project_id=str(PROJECT_ID))
+        task = await service.create_task(request, str(user_id))
+        assert await _counts(db, user_id) == {
+            ("status", "todo"): 1,
+            ("priority", "medium"): 1,
+        }
+        assert await _daily(db, user_id) == [(1, 0)]
+
+        await service.update_task(
+            task.id, TaskUpdateRequest(status=TaskStatus.DONE), str(user_id)
+        )
+        assert await _counts(db, user_id) == {
+            ("status", "done"): 1,
+            ("priority", "medium"): 1,
+        }
+        assert await _daily(db, user_id) == [(1, 1)]
+
+        await service.delete_task(task.id, str(user_id))
+        assert await _counts(db, user_id) == {}
+        assert await _daily(db, user_id) == [(0, 0)]
+
+
+class TestReconcile:
+    """从任务表校准汇总"""
+
+    async def add_tasks(self, db, user_id, *statuses):
+        for status in statuses:
+            await db.execute(
+                Task.__table__.insert().values(
+                    id=uuid4(),
+                    title="校准",
+                    status=status,
+                    priority="medium",
+                    created_by=user_id,
+                    project_id=PROJECT_ID,
+                    tags=None,
+                    created_at=datetime(2024, 3, 1, 9),
+                    is_deleted=False,
+                )
+            )
+        await db.commit()
+
+    @pytest.mark.asyncio
+    async def test_reconcile_fixes_drift(self, db):
+        user_id = uuid4()
+        await self.add_tasks(db, user_id, "todo", "in_progress")
+        await db.execute(
+            TaskCountRollup.__table__.insert().values(
+                user_id=user_id,
+                project_id=PROJECT_ID,
+                dimension="status",
+                bucket="todo",
+                count=5,
+            )
+        )
+        await db.commit()
+
+        fixed = await DashboardRollupService(db).reconcile(str(user_id))
+
+        assert fixed["count_rows"] == 3
+        assert await _counts(db, user_id) == {
+            ("status", "todo"): 1,
+            ("status", "in_progress"): 1,
+            ("priority", "medium"): 2,
+        }
+        assert await _daily(db, user_id) == [(2, 0)]
+        assert await DashboardRollupService(db).reconcile(str(user_id)) == {
+            "daily_rows": 0,
+            "count_rows": 0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_rollups_are_locked_before_tasks_are_read(self, db, monkeypatch):
+        statements = []
+        execute = db.execute
+
+        async def recording_execute(statement, *args, **kwargs):
+            statements.append(str(statement.compile(dialect=postgresql.dialect())))
+            return await execute(statement, *args, **kwargs)
+
+        monkeypatch.setattr(db, "execute", recording_execute)
+        await DashboardRollupService(db).reconcile()
+
+        daily_sql, count_sql, task_sql = statements[:3]
+        assert "FROM task_daily_rollups" in daily_sql
+        assert "FROM task_count_rollups" in count_sql
+        assert daily_sql.endswith("FOR UPDATE") and count_sql.endswith("FOR UPDATE")
+        assert "FROM tasks" in task_sql
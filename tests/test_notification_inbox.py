@@ -0,0 +1,134 @@
+"""
+未读通知计数测试
+验证NotificationInbox的计数增减与通知表保持一致，计数行缺失时不会出现负数
+"""
+
+import pytest
+import pytest_asyncio
+import sys
+import os
+from uuid import UUID, uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+
+from src.services.notification_inbox import NotificationInbox
+from src.task_management.models import Notification, NotificationUnreadCounter
+
+USER_ID = UUID("7a2b3c4d-5e6f-4a8b-9c0d-e1f2a3b4c5d6")
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Notification.__table__.create)
+        await conn.run_sync(NotificationUnreadCounter.__table__.create)
+    async with AsyncSession(engine) as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+def inbox(db):
+    return NotificationInbox(db, push=False)
+
+
+async def add_notifications(db, *read_flags):
+    ids = []
+    for is_read in read_flags:
+        notification_id = uuid4()
+        await db.execute(
+            Notification.__table__.insert().values(
+                id=notification_id,
+                user_id=USER_ID,
+                title="任务已分配",
+                content="你有一个新任务",
+                type="task_assigned",
+                is_read=is_read,
+            )
+        )
+        ids.append(notification_id)
+    await db.commit()
+    return ids
+
+
+async def stored_count(db):
+    return (
+        await db.execute(
+            select(NotificationUnreadCounter.__table__.c.unread_count).where(
+                NotificationUnreadCounter.__table__.c.user_id == USER_ID
+            )
+        )
+    ).scalar_one_or_none()
+
+
+class TestUnreadCounter:
+    """计数增减"""
+
+    @pytest.mark.asyncio
+    async def test_missing_row_is_seeded_from_notifications(self, inbox, db):
+        first, _, _ = await add_notifications(db, False, False, False)
+
+        await inbox.mark_as_read(first, USER_ID)
+
+        assert await stored_count(db) == 2
+
+    @pytest.mark.asyncio
+    async def test_delete_with_missing_row_is_not_negative(self, inbox, db):
+        (only,) = await add_notifications(db, False)
+
+        await inbox.delete_notification(only, USER_ID)
+
+        assert await stored_count(db) == 0
+
+    @pytest.mark.asyncio
+    async def test_existing_row_is_adjusted(self, inbox, db):
+        first, second = await add_notifications(db, False, False)
+        assert await inbox.get_unread_count(USER_ID) == 2
+
+        await inbox.mark_as_read(first, USER_ID)
+        await inbox.mark_as_read(first, USER_ID)  # 重复请求不重复计数
+        assert await stored_count(db) == 1
+
+        await inbox.mark_as_unread(first, USER_ID)
+        assert await stored_count(db) == 2
+
+        assert await inbox.mark_all_as_read(USER_ID) == 2
+        assert await stored_count(db) == 0
+
+    @pytest.mark.asyncio
+    async def test_drifted_row_is_clamped_at_zero(self, inbox, db):
+        (only,) = await add_notifications(db, False)
+        await db.execute(
+            NotificationUnreadCounter.__table__.insert().values(
+                user_id=USER_ID, unread_count=0
+            )
+        )
+        await db.commit()
+
+        await inbox.mark_as_read(only, USER_ID)
+
+        assert await stored_count(db) == 0
+
+    @pytest.mark.asyncio
+    async def test_reconcile_fixes_drift(self, inbox, db):
+        await add_notifications(db, False, False, True)
+        await db.execute(
+            NotificationUnreadCounter.__table__.insert().values(
+                user_id=USER_ID, unread_count=9
+            )
+        )
+        await db.commit()
+
+        assert await inbox.reconcile() == {USER_ID: 2}
+        assert await inbox.get_unread_count(USER_ID) == 2
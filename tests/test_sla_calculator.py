@@ -0,0 +1,103 @@
+"""
+SLI/SLO计算测试
+验证SLACalculator的增量读取、窗口燃烧率和多窗口燃烧率告警
+"""
+
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.core.metrics_collector import MetricsCollector
+from monitoring.monitoring_integration import SLACalculator, SLODefinition
+
+ERROR_RATE_SLO = {
+    "name": "api_errors",
+    "target": "99%",
+    "window": {"rolling": "1d"},
+    "indicator": {
+        "type": "error_rate",
+        "spec": {
+            "numerator": 'http_requests_total{status=~"5.."}',
+            "denominator": "http_requests_total",
+        },
+    },
+}
+
+
+@pytest.fixture
+def collector():
+    return MetricsCollector("test")
+
+
+@pytest.fixture
+def calculator(collector):
+    calculator = SLACalculator(slo_file=None)
+    calculator.slos = [SLODefinition.from_config(ERROR_RATE_SLO)]
+    collector.increment_counter("http_requests_total", 0, {"status": "200"})
+    calculator.poll(collector, now=30)  # 第0分钟只记录基线
+    return calculator
+
+
+def tick(calculator, collector, minute, ok, bad):
+    """在第minute分钟记录ok个成功请求和bad个5xx请求"""
+    collector.increment_counter("http_requests_total", ok, {"status": "200"})
+    if bad:
+        collector.increment_counter("http_requests_total", bad, {"status": "500"})
+    calculator.poll(collector, now=minute * 60 + 30)
+
+
+class TestWindows:
+    """增量读取与窗口统计"""
+
+    def test_burn_rate_from_deltas(self, calculator, collector):
+        for minute in range(1, 4):
+            tick(calculator, collector, minute, 330, 3)
+        tracker = calculator.trackers["api_errors"]
+
+        assert tracker.window(60) == (990.0, 999.0)
+        assert tracker.burn_rate(60) == pytest.approx((9 / 999) / 0.01)
+
+    def test_counter_reset_counts_current_value(self, calculator, collector):
+        tick(calculator, collector, 1, 100, 0)
+        key = collector._make_key("http_requests_total", {"status": "200"})
+        collector.counters[key] = 40  # 进程重启后计数器从0重新累计
+
+        calculator.poll(collector, now=2 * 60 + 30)
+
+        assert calculator.trackers["api_errors"].window(60) == (140.0, 140.0)
+
+    def test_pause_longer_than_longest_window_resets(self, calculator, collector):
+        tick(calculator, collector, 1, 100, 50)
+        tick(calculator, collector, 5000, 100, 0)
+
+        tracker = calculator.trackers["api_errors"]
+        assert tracker.window(4320) == (100.0, 100.0)
+        assert tracker.covered_minutes() == 0
+
+
+class TestBurnRateAlerts:
+    """多窗口燃烧率告警"""
+
+    def test_first_bad_minute_does_not_page(self, calculator, collector):
+        tick(calculator, collector, 1, 50, 50)
+
+        assert calculator.trackers["api_errors"].burn_rate(60) >= 14.4
+        assert calculator.evaluate_alerts() == []
+
+    def test_sustained_burn_fires_once_and_clears(self, calculator, collector):
+        fired = []
+        for minute in range(1, 7):
+            tick(calculator, collector, minute, 50, 50)
+            fired.extend(calculator.evaluate_alerts())
+
+        assert [(a["long_window"], a["short_window"]) for a in fired] == [(60, 5)]
+        assert fired[0]["severity"] == "critical"
+
+        for minute in range(7, 13):
+            tick(calculator, collector, minute, 100, 0)
+            assert calculator.evaluate_alerts() == []
+
+        assert calculator.trackers["api_errors"].firing == set()
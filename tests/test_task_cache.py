@@ -0,0 +1,200 @@
+"""
+任务缓存标签失效测试
+验证CachedTaskRepository按依赖标签精确失效，不再使用KEYS扫描
+"""
+
+import pytest
+import sys
+import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.task_management.repositories import (
+    CacheTagIndex,
+    CachedTaskRepository,
+    TaskRepository,
+)
+
+
+class FakePipeline:
+    """记录命令并在execute时批量执行"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.commands.append((name, args))
+            return self
+
+        return queue
+
+    async def execute(self):
+        self.redis.round_trips += 1
+        return [getattr(self.redis, f"_{name}")(*args) for name, args in self.commands]
+
+
+class FakeRedis:
+    """最小化的异步Redis替身，标签失效脚本按其语义在一次往返内执行"""
+
+    def __init__(self):
+        self.data = {}
+        self.sets = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, script):
+        async def invalidate_tags(keys=(), args=()):
+            self.round_trips += 1
+            members = set()
+            for key in keys:
+                members |= self.sets.get(key, set())
+            self._delete(*members)
+            self._delete(*keys)
+            return len(members)
+
+        return invalidate_tags
+
+    async def keys(self, pattern):
+        raise AssertionError("KEYS must not be used for invalidation")
+
+    async def get(self, key):
+        self.round_trips += 1
+        return self.data.get(key)
+
+    def _setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def _sadd(self, key, member):
+        self.sets.setdefault(key, set()).add(member)
+
+    def _expire(self, key, ttl):
+        return True
+
+    def _delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+            self.sets.pop(key, None)
+
+
+def make_task(task_id, project_id="p1", assignee_id="u1", created_by="u2"):
+    return SimpleNamespace(
+        id=task_id,
+        project_id=project_id,
+        assignee_id=assignee_id,
+        created_by=created_by,
+    )
+
+
+@pytest.fixture
+def redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def repository(redis):
+    repo = CachedTaskRepository.__new__(CachedTaskRepository)
+    repo.redis = redis
+    repo.tags = CacheTagIndex(redis)
+    repo.cache_ttl = {"task": 300, "search": 60, "user_tasks": 120}
+    return repo
+
+
+class TestCacheTagIndex:
+    """标签索引测试"""
+
+    @pytest.mark.asyncio
+    async def test_invalidate_deletes_only_dependent_keys(self, redis):
+        index = CacheTagIndex(redis)
+        await index.set("a", 60, "1", [index.tag_key("task", "t1")])
+        await index.set("b", 60, "2", [index.tag_key("task", "t2")])
+
+        deleted = await index.invalidate([index.tag_key("task", "t1")])
+
+        assert deleted == 1
+        assert "a" not in redis.data
+        assert redis.data["b"] == "2"
+
+    @pytest.mark.asyncio
+    async def test_invalidate_uses_one_round_trip(self, redis):
+        index = CacheTagIndex(redis)
+        for i in range(50):
+            await index.set(f"k{i}", 60, "v", [index.tag_key("user", "u1")])
+        redis.round_trips = 0
+
+        await index.invalidate([index.tag_key("user", "u1")])
+
+        assert redis.round_trips == 1
+        assert not redis.data
+
+    @pytest.mark.asyncio
+    async def test_invalidate_script_on_redis(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        index = CacheTagIndex(client)
+        task_tag, user_tag = index.tag_key("task", "t1"), index.tag_key("user", "u1")
+        for i in range(1200):
+            await index.set(f"k{i}", 60, "v", [task_tag, user_tag])
+        await index.set("other", 60, "v", [index.tag_key("task", "t2")])
+
+        deleted = await index.invalidate([task_tag, user_tag])
+
+        assert deleted == 1200
+        assert await client.keys("k*") == []
+        assert not await client.exists(task_tag, user_tag)
+        assert await client.get("other") == "v"
+
+
+class TestCachedTaskRepositoryInvalidation:
+    """任务更新时的缓存失效范围测试"""
+
+    @pytest.mark.asyncio
+    async def test_unrelated_project_search_cache_survives(self, repository, redis):
+        tags = repository.tags
+        await tags.set("search:p1:x", 60, "[]", [tags.tag_key("search", "p1")])
+        await tags.set("search:p2:x", 60, "[]", [tags.tag_key("search", "p2")])
+        await tags.set("search:all:x", 60, "[]", [tags.tag_key("search", "all")])
+        repository.get_by_id = AsyncMock(return_value=make_task("t1", "p1"))
+
+        await repository._invalidate_task_caches("t1")
+
+        assert "search:p1:x" not in redis.data
+        assert "search:all:x" not in redis.data
+        assert "search:p2:x" in redis.data
+
+    @pytest.mark.asyncio
+    async def test_reassignment_invalidates_new_assignee(self, repository, redis):
+        tags = repository.tags
+        await tags.set("user_tasks:u9:x", 60, "[]", [tags.tag_key("user", "u9")])
+        repository.get_by_id = AsyncMock(return_value=make_task("t1"))
+
+        await repository._invalidate_task_caches("t1", {"assignee_id": "u9"})
+
+        assert "user_tasks:u9:x" not in redis.data
+
+    @pytest.mark.asyncio
+    async def test_create_invalidates_user_and_project_lists(self, repository, redis):
+        tags = repository.tags
+        await tags.set("user_tasks:u1:x", 60, "[]", [tags.tag_key("user", "u1")])
+        await tags.set("search:p1:x", 60, "[]", [tags.tag_key("search", "p1")])
+        await tags.set("search:p2:x", 60, "[]", [tags.tag_key("search", "p2")])
+        created = make_task("t1", "p1", assignee_id="u1")
+
+        base_create = AsyncMock(return_value=created)
+        with patch.object(TaskRepository, "create", base_create):
+            assert await repository.create({"title": "new"}) is created
+
+        assert "user_tasks:u1:x" not in redis.data
+        assert "search:p1:x" not in redis.data
+        assert "search:p2:x" in redis.data
+
+    def test_digest_is_stable(self):
+        first = CachedTaskRepository._digest({"b": 1, "a": [1, 2]})
+        second = CachedTaskRepository._digest({"a": [1, 2], "b": 1})
+        assert first == second
@@ -0,0 +1,175 @@
+"""
+任务游标分页测试
+验证TaskQueryBuilder.paginate_keyset不修改构建器自身的查询，可重复调用；
+TaskRepository.search_tasks_keyset按请求的sort_order排序并拒绝方向不符的游标
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import true
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.pagination import CursorError
+from src.repositories.task_repository import (
+    TaskQueryBuilder,
+    TaskRepository,
+    TaskStatus,
+    get_keyset_sort,
+)
+
+
+class FakeQuery:
+    """不可变的查询替身，记录筛选、排序条件与执行次数"""
+
+    def __init__(self, rows, filters=(), orders=(), calls=None):
+        self.rows = rows
+        self.filters = tuple(filters)
+        self.orders = tuple(orders)
+        self.calls = calls if calls is not None else {"count": 0, "all": 0}
+
+    def filter(self, *criteria):
+        return FakeQuery(self.rows, self.filters + criteria, self.orders, self.calls)
+
+    def order_by(self, *clauses):
+        self.calls["order_by"] = clauses
+        return FakeQuery(self.rows, self.filters, clauses, self.calls)
+
+    def limit(self, n):
+        return FakeQuery(self.rows[:n], self.filters, self.orders, self.calls)
+
+    async def count(self):
+        self.calls["count"] += 1
+        return len(self.rows)
+
+    async def scalar(self):
+        self.calls["count"] += 1
+        return len(self.rows)
+
+    async def all(self):
+        self.calls["all"] += 1
+        return self.rows
+
+
+def make_rows(n):
+    start = datetime(2024, 1, 1)
+    return [
+        SimpleNamespace(
+            id=uuid4(),
+            updated_at=start - timedelta(minutes=i),
+            due_date=start + timedelta(days=i),
+        )
+        for i in range(n)
+    ]
+
+
+def order_sql(calls):
+    return [str(clause) for clause in calls["order_by"]]
+
+
+@pytest.fixture
+def rows():
+    return make_rows(5)
+
+
+@pytest.fixture
+def builder(rows, monkeypatch):
+    monkeypatch.setattr(
+        TaskQueryBuilder, "_build_user_access_filter", lambda self, user_id: true()
+    )
+    db = SimpleNamespace(query=lambda model: FakeQuery(rows))
+    return TaskQueryBuilder(db, "user-1").filter_by_status(TaskStatus.TODO)
+
+
+@pytest.fixture
+def repository(rows, monkeypatch):
+    query = FakeQuery(rows)
+    repository = TaskRepository(SimpleNamespace())
+    monkeypatch.setattr(
+        repository, "_build_search_query", lambda user_id, filters=None: query
+    )
+    return repository
+
+
+class TestPaginateKeyset:
+    """查询构建器游标分页"""
+
+    @pytest.mark.asyncio
+    async def test_does_not_mutate_builder_query(self, builder):
+        original = builder.query
+
+        first = await builder.paginate_keyset(page_size=2)
+        second = await builder.paginate_keyset(page_size=2, cursor=first["next_cursor"])
+
+        assert builder.query is original
+        assert len(original.filters) == 1
+        assert first["has_next"] and second["has_next"]
+
+    @pytest.mark.asyncio
+    async def test_total_is_skipped_by_default(self, builder):
+        page = await builder.paginate_keyset(page_size=2)
+
+        assert page["total"] is None
+        assert builder.query.calls["count"] == 0
+
+        page = await builder.paginate_keyset(page_size=2, include_total=True)
+        assert page["total"] == 5
+
+
+class TestKeysetSortOrder:
+    """排序方向"""
+
+    def test_default_directions_are_kept(self):
+        columns = get_keyset_sort("due_date")
+
+        assert [column.descending for column in columns] == [False, False]
+
+    @pytest.mark.parametrize("sort_order", ["desc", "DESC"])
+    def test_sort_order_applies_to_all_columns(self, sort_order):
+        columns = get_keyset_sort("due_date", sort_order)
+
+        assert [column.descending for column in columns] == [True, True]
+        assert columns[0].nullable
+
+    def test_invalid_sort_order_is_rejected(self):
+        with pytest.raises(ValueError):
+            get_keyset_sort("due_date", "sideways")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("sort_order", ["asc", "desc"])
+    async def test_search_orders_by_requested_direction(self, repository, sort_order):
+        page = await repository.search_tasks_keyset(
+            "user-1", sort_by="due_date", sort_order=sort_order, page_size=2
+        )
+        clauses = order_sql(repository._build_search_query("user-1").calls)
+
+        assert page["has_next"]
+        assert all(sort_order.upper() in clause for clause in clauses)
+
+    @pytest.mark.asyncio
+    async def test_cursor_from_other_direction_is_rejected(self, repository):
+        page = await repository.search_tasks_keyset(
+            "user-1", sort_by="due_date", sort_order="asc", page_size=2
+        )
+
+        with pytest.raises(CursorError):
+            await repository.search_tasks_keyset(
+                "user-1",
+                sort_by="due_date",
+                sort_order="desc",
+                cursor=page["next_cursor"],
+            )
+
+        next_page = await repository.search_tasks_keyset(
+            "user-1",
+            sort_by="due_date",
+            sort_order="asc",
+            cursor=page["next_cursor"],
+            page_size=2,
+        )
+        assert next_page["tasks"]
@@ -0,0 +1,120 @@
+"""
+任务全文搜索测试
+验证分词、查询解析、高亮和本地倒排索引，以及PostgreSQL分词函数与segment规则一致
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.repositories.task_search import (
+    SearchQuery,
+    TaskSearchIndex,
+    highlight,
+    segment,
+)
+from src.task_management.search_schema import SEARCH_VECTOR_DDL
+
+
+class TestSegment:
+    """分词规则"""
+
+    def test_latin_words_are_lowercased_and_split_on_punctuation(self):
+        tokens = segment("Fix login-page_bug, v2.1!")
+
+        assert tokens == ["fix", "login", "page", "bug", "v2", "1"]
+
+    def test_cjk_runs_become_bigrams_with_last_char(self):
+        assert segment("开发API接口") == ["api", "开发", "发", "接口", "口"]
+
+    def test_empty(self):
+        assert segment(None) == []
+        assert segment("  --  ") == []
+
+    def test_postgres_function_uses_same_separator_rule(self):
+        # segment把所有非字母数字字符视为分隔符，PL/pgSQL端需同样替换为空格
+        assert "'[^[:alnum:]]+', ' ', 'g'" in SEARCH_VECTOR_DDL
+
+
+class TestSearchQuery:
+    """查询解析"""
+
+    def test_last_word_is_prefix(self):
+        query = SearchQuery.parse("login pag")
+
+        assert [(t.tokens, t.prefix) for t in query.terms] == [
+            (("login",), False),
+            (("pag",), True),
+        ]
+        assert query.to_tsquery() == "login & pag:*"
+
+    def test_explicit_prefix_and_exact_last_word(self):
+        query = SearchQuery.parse("log* page", prefix_last=False)
+
+        assert query.to_tsquery() == "log:* & page"
+
+    def test_cjk_word_drops_trailing_single_char(self):
+        query = SearchQuery.parse("开发接口", prefix_last=False)
+
+        assert query.terms[0].tokens == ("开发", "发接", "接口")
+
+    def test_single_cjk_char_matches_as_prefix(self):
+        query = SearchQuery.parse("开", prefix_last=False)
+
+        assert query.to_tsquery() == "开:*"
+
+    def test_punctuation_only_query_is_empty(self):
+        assert not SearchQuery.parse(" -- ** ")
+
+
+class TestHighlight:
+    def test_marks_matches(self):
+        query = SearchQuery.parse("login", prefix_last=False)
+
+        assert highlight("Fix Login page", query) == "Fix <mark>Login</mark> page"
+
+    def test_prefix_match_and_snippet(self):
+        query = SearchQuery.parse("pag")
+        text = "x" * 50 + " page"
+
+        result = highlight(text, query, max_length=20)
+
+        assert result.startswith("…")
+        assert "<mark>pag</mark>e" in result
+
+
+class TestTaskSearchIndex:
+    """本地倒排索引"""
+
+    @pytest.fixture
+    def index(self):
+        index = TaskSearchIndex()
+        index.add("t1", "登录页面", "修复样式问题", ["前端"])
+        index.add("t2", "接口文档", "登录接口说明", ["后端"])
+        index.add("t3", "Release notes", "login-page fixes", ["docs"])
+        return index
+
+    def test_title_match_ranks_first(self, index):
+        results = [task_id for task_id, _ in index.search(SearchQuery.parse("登录"))]
+
+        assert results == ["t1", "t2"]
+
+    def test_all_terms_must_match(self, index):
+        results = list(index.search(SearchQuery.parse("login page", prefix_last=False)))
+
+        assert [task_id for task_id, _ in results] == ["t3"]
+
+    def test_prefix_search(self, index):
+        results = [task_id for task_id, _ in index.search(SearchQuery.parse("rel"))]
+
+        assert results == ["t3"]
+
+    def test_update_and_remove(self, index):
+        index.add("t1", "设计稿")
+        index.remove("t2")
+
+        assert list(index.search(SearchQuery.parse("登录"))) == []
+        assert [t for t, _ in index.search(SearchQuery.parse("设计"))] == ["t1"]
+        assert len(index) == 2
@@ -0,0 +1,231 @@
+"""
+Dashboard HTTP server tests
+
+Runs the threaded server on an ephemeral port and covers response
+validators (ETag / Last-Modified, 304 on unchanged data), gzip content
+negotiation and the server-sent-event project stream, including clients
+that disconnect.
+"""
+
+import gzip
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        "tools",
+    ),
+)
+
+import dashboard
+from dashboard import DashboardHandler, Payload, ProjectStream
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def projects(monkeypatch):
+    """Mutable project data served by /api/projects and the stream"""
+    state = {"projects": [{"name": "demo", "task_name": "t" * 2000}], "summary": {}}
+    monkeypatch.setattr(dashboard, "compute_projects", lambda: json.loads(json.dumps(state)))
+    monkeypatch.setattr(dashboard, "_json_payloads", {})
+    dashboard.project_cache.clear()
+    yield state
+    dashboard.project_cache.clear()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(DashboardHandler, "log_message", lambda self, *args: None)
+    stream = ProjectStream(interval=0.05)
+    monkeypatch.setattr(dashboard, "project_stream", stream)
+    monkeypatch.setattr(dashboard, "SSE_KEEPALIVE_SECONDS", 0.1)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DashboardHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    # Stream handlers outlive the server; let them unsubscribe before the
+    # next test installs its own stream
+    assert wait_for(lambda: stream.clients == 0)
+
+
+def get(server, path, **headers):
+    conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+    conn.request("GET", path, headers=headers)
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+
+class TestPayload:
+    """Pre-encoded bodies"""
+
+    def test_unchanged_json_reuses_previous_payload(self):
+        first = Payload.from_json({"a": 1})
+
+        assert Payload.from_json({"a": 1}, first) is first
+        changed = Payload.from_json({"a": 2}, first)
+        assert changed is not first and changed.etag != first.etag
+
+    def test_gzip_copy_is_built_once(self):
+        payload = Payload(b"x" * 4096, "text/plain")
+
+        assert gzip.decompress(payload.gzipped) == payload.body
+        assert payload.gzipped is payload.gzipped
+
+
+class TestConditionalGet:
+    """ETag and Last-Modified validators"""
+
+    def test_matching_etag_returns_304(self, server):
+        response, _ = get(server, "/capabilities")
+        etag = response.getheader("ETag")
+
+        cached, body = get(server, "/capabilities", **{"If-None-Match": etag})
+
+        assert cached.status == 304 and body == b""
+        assert cached.getheader("ETag") == etag
+
+    def test_weak_and_listed_etags_match(self, server):
+        response, _ = get(server, "/")
+        etag = response.getheader("ETag")
+
+        cached, _ = get(server, "/", **{"If-None-Match": f'"other", W/{etag}'})
+
+        assert cached.status == 304
+
+    def test_stale_etag_gets_new_body(self, server, projects):
+        response, _ = get(server, "/api/projects")
+        etag = response.getheader("ETag")
+
+        projects["summary"] = {"total_projects": 1}
+        dashboard.project_cache.clear()
+        fresh, body = get(server, "/api/projects", **{"If-None-Match": etag})
+
+        assert fresh.status == 200 and fresh.getheader("ETag") != etag
+        assert json.loads(body)["summary"] == {"total_projects": 1}
+
+    def test_unchanged_data_keeps_etag_across_recompute(self, server, projects):
+        response, _ = get(server, "/api/projects")
+        dashboard.project_cache.clear()
+
+        cached, _ = get(server, "/api/projects", **{"If-None-Match": response.getheader("ETag")})
+
+        assert cached.status == 304
+
+    def test_if_modified_since(self, server):
+        later = formatdate(time.time() + 60, usegmt=True)
+
+        cached, _ = get(server, "/projects", **{"If-Modified-Since": later})
+        garbage, _ = get(server, "/projects", **{"If-Modified-Since": "not a date"})
+
+        assert cached.status == 304
+        assert garbage.status == 200
+
+    def test_unknown_path_is_404(self, server):
+        response, _ = get(server, "/nope")
+
+        assert response.status == 404
+
+
+class TestGzip:
+    """Content negotiation"""
+
+    def test_large_body_is_gzipped_when_accepted(self, server, projects):
+        response, body = get(server, "/api/projects", **{"Accept-Encoding": "gzip"})
+
+        assert response.getheader("Content-Encoding") == "gzip"
+        assert int(response.getheader("Content-Length")) == len(body)
+        assert json.loads(gzip.decompress(body))["projects"][0]["name"] == "demo"
+
+    def test_identity_without_accept_encoding(self, server, projects):
+        response, body = get(server, "/api/projects")
+
+        assert response.getheader("Content-Encoding") is None
+        assert response.getheader("Vary") == "Accept-Encoding"
+        assert json.loads(body)["projects"][0]["name"] == "demo"
+
+    def test_small_body_is_not_compressed(self, server):
+        response, body = get(server, "/api/health", **{"Accept-Encoding": "gzip"})
+
+        assert len(body) < dashboard.GZIP_MIN_BYTES
+        assert response.getheader("Content-Encoding") is None
+        assert json.loads(body)["status"] == "healthy"
+
+
+class TestProjectStream:
+    """Server-sent events"""
+
+    def read_event(self, response):
+        lines = []
+        while True:
+            line = response.fp.readline().decode()
+            if line == "\n" and lines:
+                return lines
+            if line.strip():
+                lines.append(line.strip())
+
+    def open_stream(self, server):
+        conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+        conn.request("GET", "/api/projects/stream")
+        return conn, conn.getresponse()
+
+    def test_pushes_initial_state_and_changes(self, server, projects):
+        conn, response = self.open_stream(server)
+        assert response.getheader("Content-Type") == "text/event-stream"
+
+        first = self.read_event(response)
+        assert first[:2] == ["id: 1", "event: projects"]
+        assert json.loads(first[2][len("data: "):])["projects"][0]["name"] == "demo"
+
+        projects["summary"] = {"total_projects": 1}
+        event = self.read_event(response)
+        while event == [": keepalive"]:
+            event = self.read_event(response)
+
+        assert event[0] == "id: 2"
+        assert json.loads(event[2][len("data: "):])["summary"] == {"total_projects": 1}
+        conn.close()
+
+    def test_idle_stream_sends_keepalives(self, server, projects):
+        conn, response = self.open_stream(server)
+        self.read_event(response)
+
+        assert self.read_event(response) == [": keepalive"]
+        conn.close()
+
+    def test_disconnect_unsubscribes_and_stops_poller(self, server, projects):
+        stream = dashboard.project_stream
+        conn, response = self.open_stream(server)
+        self.read_event(response)
+        assert stream.clients == 1
+
+        response.close()
+        conn.close()
+
+        assert wait_for(lambda: stream.clients == 0)
+        assert wait_for(lambda: stream._thread is None)
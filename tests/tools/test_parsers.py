@@ -0,0 +1,245 @@
+"""
+Dashboard telemetry parser tests
+
+Covers the reverse-seek tail reader, incremental folding of appended
+events (partial lines, truncation and rotation, window eviction) and
+the ProjectMonitor summary built from it.
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        "tools",
+    ),
+)
+
+from data_models import EventType, ProjectStatus
+from parsers import EventAggregator, ProjectMonitor, tail_lines
+
+
+def event_line(event_type, **fields):
+    fields.setdefault("timestamp", datetime.now().isoformat())
+    return json.dumps({"event_type": event_type, **fields}) + "\n"
+
+
+@pytest.fixture
+def events_file(tmp_path):
+    path = tmp_path / ".temp" / "ce_events.jsonl"
+    path.parent.mkdir()
+    path.write_text("")
+    return path
+
+
+@pytest.fixture
+def monitor(tmp_path, events_file):
+    return ProjectMonitor(tmp_path)
+
+
+def append(path, *lines):
+    with open(path, "a") as f:
+        f.write("".join(lines))
+
+
+class TestTailLines:
+    """Reverse-seek tail reader"""
+
+    @pytest.fixture
+    def log(self, tmp_path):
+        path = tmp_path / "log.jsonl"
+        path.write_bytes(b"".join(b"line-%03d\n" % n for n in range(100)))
+        return path
+
+    @pytest.mark.parametrize("block_size", [1, 7, 9, 64, 8192])
+    def test_returns_last_lines_for_any_block_size(self, log, block_size):
+        lines, offset = tail_lines(log, 5, block_size=block_size)
+
+        assert lines == [b"line-%03d" % n for n in range(95, 100)]
+        assert offset == log.stat().st_size
+
+    def test_limit_larger_than_file(self, log):
+        lines, _ = tail_lines(log, 500, block_size=16)
+
+        assert len(lines) == 100 and lines[0] == b"line-000"
+
+    def test_partial_trailing_line_is_left_for_later(self, log):
+        size = log.stat().st_size
+        append(log, "line-1")
+
+        lines, offset = tail_lines(log, 2, block_size=10)
+
+        assert lines == [b"line-098", b"line-099"]
+        assert offset == size
+
+    def test_empty_file_and_zero_limit(self, tmp_path, log):
+        empty = tmp_path / "empty.jsonl"
+        empty.write_bytes(b"")
+
+        assert tail_lines(empty, 10) == ([], 0)
+        assert tail_lines(log, 0)[0] == []
+
+
+class TestEventAggregator:
+    """Incremental event folding"""
+
+    @pytest.fixture
+    def aggregator(self, monitor, events_file):
+        return EventAggregator(events_file, monitor._parse_event, window=5)
+
+    def test_only_appended_events_are_read(self, aggregator, events_file):
+        append(events_file, event_line("task_start", task_name="a"))
+        assert aggregator.update() == 1
+
+        append(events_file, event_line("error"), event_line("phase_end", phase_id="Phase1"))
+        assert aggregator.update() == 2
+        assert aggregator.update() == 0
+        assert aggregator.error_count == 1
+        assert dict(aggregator.phase_ends) == {"Phase1": 1}
+
+    def test_partial_line_waits_for_newline(self, aggregator, events_file):
+        line = event_line("task_start", task_name="a")
+        append(events_file, line[:10])
+        assert aggregator.update() == 0
+
+        append(events_file, line[10:])
+        assert aggregator.update() == 1
+        assert aggregator.latest_task[1].task_name == "a"
+
+    def test_malformed_lines_are_skipped(self, aggregator, events_file):
+        append(events_file, "{not json\n", "\n", event_line("error"))
+
+        assert aggregator.update() == 1
+
+    def test_truncation_restarts_from_tail(self, aggregator, events_file):
+        append(events_file, *(event_line("error") for _ in range(4)))
+        aggregator.update()
+
+        events_file.write_text(event_line("task_start", task_name="fresh"))
+
+        assert aggregator.update() == 1
+        assert aggregator.error_count == 0
+        assert aggregator.latest_task[1].task_name == "fresh"
+
+    def test_rotation_is_detected_by_inode(self, aggregator, events_file, tmp_path):
+        append(events_file, *(event_line("error") for _ in range(3)))
+        aggregator.update()
+
+        rotated = tmp_path / "new.jsonl"
+        rotated.write_text(
+            "".join(event_line("task_start", task_name=f"t{n}") for n in range(8))
+        )
+        os.replace(rotated, events_file)
+
+        assert aggregator.update() == 5
+        assert aggregator.error_count == 0
+        assert [e.task_name for e in aggregator.recent_events(2)] == ["t6", "t7"]
+
+    def test_missing_file_resets_state(self, aggregator, events_file):
+        append(events_file, event_line("error"))
+        aggregator.update()
+
+        events_file.unlink()
+
+        assert aggregator.update() == 0
+        assert not aggregator.window and aggregator.error_count == 0
+
+    def test_eviction_keeps_counters_in_sync(self, aggregator, events_file):
+        append(
+            events_file,
+            event_line("task_start", task_name="old"),
+            event_line("phase_start", phase_id="Phase1"),
+            event_line("error"),
+            event_line("phase_end", phase_id="Phase1"),
+            event_line("agent_call"),
+        )
+        aggregator.update()
+        assert aggregator.error_count == 1 and aggregator.latest_task
+
+        append(events_file, *(event_line("agent_call") for _ in range(4)))
+        aggregator.update()
+
+        assert len(aggregator.window) == 5
+        assert aggregator.latest_task is None and aggregator.latest_phase is None
+        assert aggregator.error_count == 0 and not aggregator.phase_ends
+
+    def test_latest_start_survives_eviction_of_older_one(self, aggregator, events_file):
+        append(
+            events_file,
+            event_line("task_start", task_name="first"),
+            *(event_line("agent_call") for _ in range(2)),
+            event_line("task_start", task_name="second"),
+        )
+        aggregator.update()
+        append(events_file, *(event_line("agent_call") for _ in range(2)))
+        aggregator.update()
+
+        assert aggregator.latest_task[1].task_name == "second"
+        types = [e.event_type for e in aggregator.recent_events(10)]
+        assert types.count(EventType.TASK_START) == 1
+
+
+class TestProjectMonitor:
+    """Project status summary"""
+
+    def test_no_events_is_idle(self, monitor):
+        result = monitor.get_project_status()
+
+        assert result.success and result.warnings == ["No recent events"]
+        assert result.data.status == ProjectStatus.IDLE
+
+    def test_summary_reflects_new_events(self, monitor, events_file):
+        append(
+            events_file,
+            event_line("task_start", task_name="build"),
+            event_line("phase_start", phase_id="Phase2", phase_name="Implementation"),
+        )
+
+        project = monitor.get_project_status().data
+
+        assert project.status == ProjectStatus.ACTIVE
+        assert project.task_name == "build" and project.current_phase == "Phase2"
+        assert project.progress_percentage == 29
+
+        append(events_file, event_line("error"))
+        project = monitor.get_project_status().data
+
+        assert project.status == ProjectStatus.ERROR
+        assert project.error_count == 1 and project.total_events == 3
+
+    def test_unchanged_file_reuses_summary(self, monitor, events_file):
+        append(events_file, event_line("task_start", task_name="build"))
+
+        first = monitor.get_project_status().data
+
+        assert monitor.get_project_status().data is first
+
+    def test_unreadable_file_is_an_error(self, monitor, events_file):
+        events_file.unlink()
+        events_file.mkdir()
+
+        result = monitor.get_project_status()
+
+        assert not result.success
+        assert result.error_message.startswith("Error reading events")
+
+    def test_statuses_are_polled_per_project(self, tmp_path):
+        paths = []
+        for name in ("alpha", "beta"):
+            path = tmp_path / name
+            (path / ".temp").mkdir(parents=True)
+            (path / ".temp" / "ce_events.jsonl").write_text(
+                event_line("task_start", task_name=name)
+            )
+            paths.append(path)
+
+        results = ProjectMonitor.get_project_statuses(paths)
+
+        assert [r.data.task_name for r in results] == ["alpha", "beta"]
+        assert ProjectMonitor.for_path(paths[0]) is ProjectMonitor.for_path(paths[0])
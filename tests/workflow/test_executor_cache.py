@@ -0,0 +1,209 @@
+"""
+Workflow执行器缓存与调度测试
+验证FileManifest文件摘要、Gate名称索引和GateScheduler依赖调度
+"""
+
+import importlib.util
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("rich")
+pytest.importorskip("orjson")
+
+EXECUTOR_PATH = (
+    Path(__file__).resolve().parents[2] / ".workflow" / "executor" / "executor.py"
+)
+
+
+def _load_executor():
+    spec = importlib.util.spec_from_file_location("workflow_executor", EXECUTOR_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+executor = _load_executor()
+FileManifest = executor.FileManifest
+GateScheduler = executor.GateScheduler
+PhaseValidator = executor.PhaseValidator
+index_gates = executor.index_gates
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return FileManifest(tmp_path / "manifest.json")
+
+
+class TestFileManifest:
+    """文件摘要：只哈希普通文件，stat未变化时复用"""
+
+    def test_regular_file_digest_is_reused(self, manifest, tmp_path):
+        source = tmp_path / "a.py"
+        source.write_text("print('a')\n")
+
+        first = manifest.digest(source)
+        second = manifest.digest(source)
+
+        assert first == second
+        assert first not in (FileManifest.MISSING, FileManifest.DIRECTORY)
+        assert manifest.rehashed == 1
+
+    def test_changed_file_is_rehashed(self, manifest, tmp_path):
+        source = tmp_path / "a.py"
+        source.write_text("v1\n")
+        first = manifest.digest(source)
+
+        source.write_text("version 2\n")
+        os.utime(source, ns=(1, 1))
+
+        assert manifest.digest(source) != first
+        assert manifest.rehashed == 2
+
+    def test_directory_returns_sentinel(self, manifest, tmp_path):
+        assert manifest.digest(tmp_path) == FileManifest.DIRECTORY
+        assert manifest.digest(Path("")) == FileManifest.DIRECTORY
+
+    def test_missing_path_returns_sentinel_and_drops_entry(self, manifest, tmp_path):
+        source = tmp_path / "gone.py"
+        source.write_text("x\n")
+        manifest.digest(source)
+
+        source.unlink()
+
+        assert manifest.digest(source) == FileManifest.MISSING
+        assert manifest._relative(source) not in manifest.entries
+
+    def test_fingerprint_accepts_directories(self, tmp_path):
+        cache = executor.CacheManager(cache_dir=tmp_path / "cache")
+        (tmp_path / "a.py").write_text("a\n")
+
+        files = [tmp_path / "a.py", tmp_path, Path("")]
+        assert cache.fingerprint(files) == cache.fingerprint(files)
+
+    def test_save_and_reload(self, manifest, tmp_path):
+        source = tmp_path / "a.py"
+        source.write_text("a\n")
+        digest = manifest.digest(source)
+        manifest.save()
+
+        reloaded = FileManifest(manifest.manifest_file)
+        assert reloaded.digest(source) == digest
+        assert reloaded.rehashed == 0
+
+
+class TestIndexGates:
+    """Gate名称索引"""
+
+    def test_unnamed_gates_get_positional_names(self):
+        gates = index_gates([{"name": "lint"}, {"type": "file_exists"}])
+
+        assert list(gates) == ["lint", "gate-1"]
+
+    def test_duplicate_names_are_rejected(self):
+        with pytest.raises(ValueError, match="lint"):
+            index_gates([{"name": "lint"}, {"name": "tests"}, {"name": "lint"}])
+
+    def test_generated_name_collision_is_rejected(self):
+        with pytest.raises(ValueError, match="gate-1"):
+            index_gates([{"name": "gate-1"}, {"type": "file_exists"}])
+
+    def test_validate_phase_fails_on_duplicate_names(self, monkeypatch):
+        validator = PhaseValidator.__new__(PhaseValidator)
+        validator.gates = {
+            "phases": {"P1": {"gates": [{"name": "lint"}, {"name": "lint"}]}}
+        }
+        checked = []
+        monkeypatch.setattr(validator, "_check_gate", lambda *a: checked.append(a))
+
+        result = validator.validate_phase("P1", use_cache=False)
+
+        assert not result.passed
+        assert result.failures == ["Gate名称重复: lint"]
+        assert checked == []
+
+
+class TestGateScheduler:
+    """Gate按needs依赖调度"""
+
+    def test_runs_dependencies_first(self):
+        order = []
+        lock = threading.Lock()
+
+        def check(gate, context):
+            with lock:
+                order.append(gate["name"])
+            return True
+
+        gates = {
+            "lint": {"name": "lint"},
+            "test": {"name": "test", "needs": ["lint"]},
+            "deploy": {"name": "deploy", "needs": ["test"]},
+        }
+        results, durations, skipped = GateScheduler(check).run(gates, {})
+
+        assert order == ["lint", "test", "deploy"]
+        assert results == {"lint": True, "test": True, "deploy": True}
+        assert set(durations) == set(gates)
+        assert skipped == {}
+
+    def test_failed_dependency_skips_dependents(self):
+        gates = {
+            "lint": {"name": "lint"},
+            "test": {"name": "test", "needs": ["lint"]},
+        }
+        results, _, skipped = GateScheduler(lambda g, c: False).run(gates, {})
+
+        assert results == {"lint": False}
+        assert skipped == {"test": "依赖的Gate未通过"}
+
+    def test_resolved_gates_are_not_rerun(self):
+        calls = []
+        gates = {
+            "lint": {"name": "lint"},
+            "test": {"name": "test", "needs": ["lint"]},
+        }
+
+        def check(gate, context):
+            calls.append(gate["name"])
+            return True
+
+        results, durations, _ = GateScheduler(check).run(gates, {"lint": True})
+
+        assert calls == ["test"]
+        assert results == {"lint": True, "test": True}
+        assert set(durations) == {"test"}
+
+    def test_missing_and_cyclic_needs_are_skipped(self):
+        gates = {
+            "a": {"name": "a", "needs": ["b"]},
+            "b": {"name": "b", "needs": ["a"]},
+            "c": {"name": "c", "needs": ["nope"]},
+        }
+        results, _, skipped = GateScheduler(lambda g, c: True).run(gates, {})
+
+        assert results == {}
+        assert skipped["a"] == skipped["b"] == "循环依赖"
+        assert skipped["c"].startswith("依赖的Gate不存在")
+
+    def test_fail_fast_stops_new_gates(self):
+        gates = {
+            "first": {"name": "first"},
+            "second": {"name": "second"},
+        }
+        scheduler = GateScheduler(lambda g, c: False, max_workers=1, fail_fast=True)
+
+        results, _, skipped = scheduler.run(gates, {})
+
+        assert results == {"first": False}
+        assert skipped == {"second": "fail-fast已停止"}
+
+    def test_exception_counts_as_failure(self):
+        def check(gate, context):
+            raise RuntimeError("boom")
+
+        results, _, _ = GateScheduler(check).run({"lint": {"name": "lint"}}, {})
+
+        assert results == {"lint": False}
@@ -0,0 +1,208 @@
+"""
+Workflow文件监听器测试
+验证PhaseAwareWatcher的监听线程在空闲后仍能收到事件，
+事件按静默期合并为批次处理，阶段前缀索引按配置顺序匹配
+"""
+
+import importlib.util
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("inotify.adapters")
+pytest.importorskip("rich")
+pytest.importorskip("yaml")
+pytest.importorskip("orjson")
+
+WATCHER_PATH = (
+    Path(__file__).resolve().parents[2] / ".workflow" / "executor" / "watcher.py"
+)
+
+
+def _load_watcher():
+    spec = importlib.util.spec_from_file_location("workflow_watcher", WATCHER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+watcher_module = _load_watcher()
+PhaseAwareWatcher = watcher_module.PhaseAwareWatcher
+PhasePathIndex = watcher_module.PhasePathIndex
+BASE_DIR = watcher_module.BASE_DIR
+
+WHITELIST = {
+    "P1": ["docs/PLAN.md", "docs/requirements/**"],
+    "P2": ["docs/*.md"],
+    "P3": ["src/**/*.py"],
+    "P4": ["tests/**", "src/legacy/*"],
+}
+
+
+@pytest.fixture
+def watcher(tmp_path, monkeypatch):
+    monkeypatch.setattr(watcher_module, "EVENT_LOG", tmp_path / "events.jsonl")
+    watcher = PhaseAwareWatcher()
+    watcher.current_phase = "P3"
+    watcher.running = True
+    yield watcher
+    watcher.running = False
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def stop_batch_loop(watcher, thread):
+    with watcher._batch_cond:
+        watcher.running = False
+        watcher._batch_cond.notify_all()
+    thread.join(timeout=3)
+    assert not thread.is_alive()
+
+
+class TestMonitorPath:
+    """监听线程"""
+
+    def test_event_after_idle_is_delivered(self, watcher, tmp_path, monkeypatch):
+        received = []
+        monkeypatch.setattr(
+            watcher, "_enqueue_event", lambda path, kind: received.append(path)
+        )
+        thread = threading.Thread(
+            target=watcher._monitor_path, args=(tmp_path, "docs"), daemon=True
+        )
+        thread.start()
+
+        time.sleep(1.5)
+        (tmp_path / "late.md").write_text("edited after idle\n")
+
+        assert wait_for(lambda: tmp_path / "late.md" in received)
+        assert thread.is_alive()
+
+        watcher.running = False
+        thread.join(timeout=3)
+        assert not thread.is_alive()
+
+
+class TestPhasePathIndex:
+    """阶段前缀索引"""
+
+    @pytest.fixture
+    def index(self):
+        return PhasePathIndex(WHITELIST)
+
+    @pytest.mark.parametrize(
+        "path, phase",
+        [
+            ("docs/PLAN.md", "P1"),
+            ("docs/requirements/a/b.md", "P1"),
+            ("docs/DESIGN.md", "P2"),
+            ("src/app.py", "P3"),
+            ("src/pkg/deep/mod.py", "P3"),
+            ("tests/unit/test_app.py", "P4"),
+        ],
+    )
+    def test_lookup(self, index, path, phase):
+        assert index.lookup(path) == phase
+
+    def test_single_star_does_not_cross_directories(self, index):
+        assert index.lookup("docs/guide/intro.md") is None
+        assert index.lookup("src/pkg/data.json") is None
+
+    def test_earlier_configured_phase_wins(self, index):
+        assert index.lookup("src/legacy/old.py") == "P3"
+        assert index.lookup("src/legacy/notes.txt") == "P4"
+
+    def test_empty_whitelist(self):
+        assert PhasePathIndex({}).lookup("src/app.py") is None
+        assert PhasePathIndex(None).lookup("src/app.py") is None
+
+
+class TestBatching:
+    """事件批处理"""
+
+    def test_repeated_events_keep_latest_per_path(self, watcher):
+        path = BASE_DIR / "src" / "app.py"
+
+        watcher._enqueue_event(path, "CREATE")
+        watcher._enqueue_event(path, "MODIFY")
+
+        assert watcher._pending[path][0] == "MODIFY"
+        assert watcher.stats["events_debounced"] == 1
+
+    def test_burst_is_processed_as_one_batch(self, watcher, monkeypatch):
+        batches = []
+        monkeypatch.setattr(watcher, "_process_batch", batches.append)
+        watcher.quiet_period = 0.2
+        thread = threading.Thread(target=watcher._batch_loop, daemon=True)
+        thread.start()
+
+        for n in range(20):
+            watcher._enqueue_event(BASE_DIR / "src" / f"m{n % 5}.py", "MODIFY")
+
+        assert wait_for(lambda: batches)
+        stop_batch_loop(watcher, thread)
+        assert len(batches) == 1 and len(batches[0]) == 5
+
+    def test_continuous_events_flush_after_max_delay(self, watcher, monkeypatch):
+        batches = []
+        monkeypatch.setattr(watcher, "_process_batch", batches.append)
+        watcher.quiet_period = 0.5
+        watcher.max_batch_delay = 0.2
+        thread = threading.Thread(target=watcher._batch_loop, daemon=True)
+        thread.start()
+
+        deadline = time.monotonic() + 1.0
+        n = 0
+        while time.monotonic() < deadline and not batches:
+            watcher._enqueue_event(BASE_DIR / "src" / f"m{n}.py", "MODIFY")
+            n += 1
+            time.sleep(0.02)
+
+        stop_batch_loop(watcher, thread)
+        assert batches, "批次在持续写入期间从未被处理"
+
+    def test_batch_is_filtered_logged_and_validated_once(self, watcher, monkeypatch):
+        requested = []
+        monkeypatch.setattr(watcher, "_request_validation", requested.append)
+        now = time.time()
+        batch = {
+            BASE_DIR / "src" / "a.py": ("MODIFY", now),
+            BASE_DIR / "src" / "b.py": ("CREATE", now),
+            BASE_DIR / "src" / "__pycache__" / "a.pyc": ("CREATE", now),
+            BASE_DIR / "tests" / "test_a.py": ("MODIFY", now),
+            Path("/elsewhere/a.py"): ("MODIFY", now),
+        }
+
+        watcher._process_batch(batch)
+
+        logged = watcher_module.EVENT_LOG.read_text().splitlines()
+        assert len(logged) == 3
+        assert {event.phase for event in watcher.event_queue} == {"P3", "P4"}
+        assert requested == ["P3"]
+
+    def test_batch_without_current_phase_skips_validation(
+        self, watcher, monkeypatch
+    ):
+        requested = []
+        monkeypatch.setattr(watcher, "_request_validation", requested.append)
+
+        watcher._process_batch({BASE_DIR / "tests" / "t.py": ("MODIFY", time.time())})
+
+        assert requested == []
+        assert watcher.stats["events_processed"] == 1
+
+    def test_pending_validation_requests_are_coalesced(self, watcher):
+        watcher._request_validation("P3")
+        watcher._request_validation("P3")
+
+        assert watcher._validation_pending == {"P3"}
+        assert watcher.stats["validations_coalesced"] == 1
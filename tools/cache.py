@@ -7,6 +7,7 @@ Version: 7.2.0
 Performance: <5ms cache hit, invalidation based on file mtime + TTL
 """
 
+import threading
 import time
 from pathlib import Path
 from typing import Any, Optional, Callable
@@ -25,6 +26,8 @@ class SimpleCache:
     def __init__(self, ttl_seconds: int = 60):
         self.ttl_seconds = ttl_seconds
         self._cache: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._key_locks: dict[str, threading.Lock] = {}
 
     def get_or_compute(
         self,
@@ -35,6 +38,9 @@ class SimpleCache:
         """
         Get cached value or compute and cache it.
 
+        Thread-safe: concurrent misses on the same key compute the value once
+        while other threads wait for it; other keys are not blocked.
+
         Args:
             key: Cache key
             compute_fn: Function to compute value if not cached
@@ -43,46 +49,59 @@ class SimpleCache:
         Returns:
             Cached or freshly computed value
         """
-        now = time.time()
-
-        # Check if key exists in cache
-        if key in self._cache:
-            cached_item = self._cache[key]
-
-            # Check TTL expiration
-            if now - cached_item['timestamp'] < self.ttl_seconds:
-                # Check file modification if provided
-                if file_path:
-                    try:
-                        current_mtime = file_path.stat().st_mtime
-                        if current_mtime == cached_item.get('file_mtime'):
-                            # Cache hit!
-                            return cached_item['value']
-                    except (OSError, FileNotFoundError):
-                        # File doesn't exist, invalidate cache
-                        pass
-                else:
-                    # No file check needed, cache hit!
-                    return cached_item['value']
-
-        # Cache miss or expired - compute new value
-        value = compute_fn()
-
-        # Store in cache
-        cache_entry = {
-            'value': value,
-            'timestamp': now
-        }
+        hit, value = self._lookup(key, file_path)
+        if hit:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have computed it while we waited
+            hit, value = self._lookup(key, file_path)
+            if hit:
+                return value
+
+            now = time.time()
+            value = compute_fn()
+
+            # Store in cache
+            cache_entry = {
+                'value': value,
+                'timestamp': now
+            }
 
+            if file_path:
+                try:
+                    cache_entry['file_mtime'] = file_path.stat().st_mtime
+                except (OSError, FileNotFoundError):
+                    cache_entry['file_mtime'] = 0
+
+            self._cache[key] = cache_entry
+
+            return value
+
+    def _lookup(self, key: str, file_path: Optional[Path]) -> tuple:
+        """Return (hit, value) for a fresh cache entry"""
+        cached_item = self._cache.get(key)
+        if cached_item is None:
+            return False, None
+
+        # Check TTL expiration
+        if time.time() - cached_item['timestamp'] >= self.ttl_seconds:
+            return False, None
+
+        # Check file modification if provided
         if file_path:
             try:
-                cache_entry['file_mtime'] = file_path.stat().st_mtime
+                if file_path.stat().st_mtime != cached_item.get('file_mtime'):
+                    return False, None
             except (OSError, FileNotFoundError):
-                cache_entry['file_mtime'] = 0
-
-        self._cache[key] = cache_entry
+                # File doesn't exist, invalidate cache
+                return False, None
 
-        return value
+        # Cache hit!
+        return True, cached_item['value']
 
     def clear(self, key: Optional[str] = None):
         """Clear cache (specific key or all)"""
@@ -2,49 +2,204 @@
 """
 CE Dashboard v2 - Multi-Page Full Version
 完整多页面Dashboard：主页 + CE能力详情 + 项目状态
+
+Served by a threaded HTTP server: pages are pre-rendered once, JSON and HTML
+responses carry ETag/Last-Modified validators (unchanged data returns 304)
+and are gzip-compressed, and /api/projects/stream pushes project updates as
+server-sent events instead of clients polling.
 """
 
+import gzip
+import hashlib
 import json
 import sys
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
 
 # Add tools to path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from parsers import CapabilityParser, LearningSystemParser, FeatureParser, ProjectMonitor
-from cache import capability_cache, learning_cache, project_cache
+from cache import SimpleCache, capability_cache, learning_cache, project_cache
 
 PROJECT_ROOT = Path(__file__).parent.parent
 PORT = 7777
 
-class DashboardHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        path = self.path
+GZIP_MIN_BYTES = 1024          # Smaller bodies are not worth compressing
+SSE_POLL_SECONDS = 1.0         # Project status poll interval while clients are connected
+SSE_KEEPALIVE_SECONDS = 15.0   # Comment line sent when nothing changed
 
-        # API endpoints
-        if path == '/api/health':
-            self.serve_health()
-        elif path == '/api/capabilities':
-            self.serve_capabilities()
-        elif path == '/api/learning':
-            self.serve_learning()
-        elif path == '/api/projects':
-            self.serve_projects()
 
-        # Pages
-        elif path == '/' or path == '/index':
-            self.serve_home()
-        elif path == '/capabilities':
-            self.serve_capabilities_page()
-        elif path == '/projects':
-            self.serve_projects_page()
-        else:
-            self.send_error(404)
+# ============================================================================
+# PAYLOADS
+# ============================================================================
+
+class Payload:
+    """
+    Pre-encoded response body with cache validators.
+
+    The gzip copy is produced on first use and shared by all later responses.
+    """
+
+    def __init__(self, body: bytes, content_type: str, last_modified: Optional[float] = None):
+        self.body = body
+        self.content_type = content_type
+        self.etag = '"%s"' % hashlib.sha1(body).hexdigest()[:20]
+        self.last_modified = int(last_modified if last_modified is not None else time.time())
+        self._gzipped: Optional[bytes] = None
+
+    @property
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+    @classmethod
+    def from_json(cls, data, previous: Optional['Payload'] = None) -> 'Payload':
+        """Encode data as JSON, reusing `previous` (and its validators) if the body is unchanged"""
+        body = json.dumps(data, default=str, ensure_ascii=False).encode('utf-8')
+        if previous is not None and previous.body == body:
+            return previous
+        return cls(body, 'application/json')
+
+
+_json_payloads: Dict[str, Payload] = {}
+
+
+def json_payload(key: str, cache: SimpleCache, compute: Callable[[], dict]) -> Payload:
+    """Compute an API response through `cache` and keep its ETag stable while data is unchanged"""
+    def build():
+        payload = Payload.from_json(compute(), _json_payloads.get(key))
+        _json_payloads[key] = payload
+        return payload
+
+    return cache.get_or_compute(key, build)
+
+
+# ============================================================================
+# DATA
+# ============================================================================
+
+def compute_capabilities() -> dict:
+    try:
+        cap_parser = CapabilityParser(PROJECT_ROOT / "docs" / "CAPABILITY_MATRIX.md")
+        cap_result = cap_parser.parse()
+
+        feat_parser = FeatureParser(PROJECT_ROOT / "tools" / "web" / "dashboard.html")
+        feat_result = feat_parser.parse()
+
+        return {
+            'core_stats': cap_result.data['core_stats'].__dict__ if cap_result.success else {},
+            'capabilities': [c.__dict__ for c in cap_result.data.get('capabilities', [])] if cap_result.success else [],
+            'features': [f.__dict__ for f in feat_result.data] if feat_result.success else []
+        }
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def compute_learning() -> dict:
+    try:
+        parser = LearningSystemParser(PROJECT_ROOT)
+        dec_result = parser.parse_decisions()
+        mem_result = parser.parse_memory_cache()
+
+        decisions = dec_result.data if dec_result.success else []
+        memory = mem_result.data if mem_result.success else None
+
+        return {
+            'decisions': [d.__dict__ for d in decisions[-10:]],
+            'statistics': {
+                'total_decisions': len(decisions),
+                'memory_cache_size': memory.cache_size_bytes if memory else 0
+            }
+        }
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def compute_projects() -> dict:
+    try:
+        monitor = ProjectMonitor.for_path(PROJECT_ROOT)
+        status_result = monitor.get_project_status()
+
+        project = status_result.data if status_result.success else None
+
+        return {
+            'projects': [project.__dict__] if project else [],
+            'summary': {'total_projects': 1 if project else 0}
+        }
+    except Exception as e:
+        return {'error': str(e), 'projects': [], 'summary': {'total_projects': 0}}
+
+
+# ============================================================================
+# PROJECT STREAM (SSE)
+# ============================================================================
+
+class ProjectStream:
+    """
+    Shared project-status poller for server-sent-event clients.
+
+    One background thread polls while at least one client is connected and
+    wakes all clients only when the project payload actually changes.
+    """
+
+    def __init__(self, interval: float = SSE_POLL_SECONDS):
+        self.interval = interval
+        self.payload: Optional[Payload] = None
+        self.version = 0
+        self.clients = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self):
+        with self._cond:
+            self.clients += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="project-stream", daemon=True)
+                self._thread.start()
+
+    def unsubscribe(self):
+        with self._cond:
+            self.clients -= 1
 
-    def serve_home(self):
-        """主页：总览 + 导航"""
-        html = """<!DOCTYPE html>
+    def wait(self, version: int, timeout: float) -> Tuple[int, Optional[Payload]]:
+        """Block until the payload version differs from `version` or the timeout expires"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version, timeout)
+            return self.version, self.payload
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self.clients <= 0:
+                    self._thread = None
+                    return
+
+            payload = Payload.from_json(compute_projects(), self.payload)
+            if payload is not self.payload:
+                with self._cond:
+                    self.payload = payload
+                    self.version += 1
+                    self._cond.notify_all()
+
+            time.sleep(self.interval)
+
+
+project_stream = ProjectStream()
+
+
+# ============================================================================
+# PAGES
+# ============================================================================
+
+# 主页：总览 + 导航
+HOME_HTML = """<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
@@ -247,11 +402,9 @@ class DashboardHandler(BaseHTTPRequestHandler):
     </script>
 </body>
 </html>"""
-        self.send_html(html)
 
-    def serve_capabilities_page(self):
-        """CE能力详情页"""
-        html = """<!DOCTYPE html>
+# CE能力详情页
+CAPABILITIES_HTML = """<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
@@ -393,11 +546,9 @@ class DashboardHandler(BaseHTTPRequestHandler):
     </script>
 </body>
 </html>"""
-        self.send_html(html)
 
-    def serve_projects_page(self):
-        """项目开发状态页"""
-        html = """<!DOCTYPE html>
+# 项目开发状态页
+PROJECTS_HTML = """<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
@@ -526,46 +677,93 @@ class DashboardHandler(BaseHTTPRequestHandler):
             </div>
 
             <div class="refresh-info">
-                🔄 自动刷新: 5秒 | 最后更新: <span id="last-update"></span>
+                🔄 实时推送 | 最后更新: <span id="last-update"></span>
             </div>
         </div>
     </div>
 
     <script>
+        function render(data) {
+            document.getElementById('loading').style.display = 'none';
+            document.getElementById('content').style.display = 'block';
+
+            if (data.projects && data.projects[0]) {
+                const p = data.projects[0];
+                document.getElementById('project-name').textContent = p.name || 'Claude Enhancer';
+                document.getElementById('branch').textContent = p.current_branch || 'main';
+                document.getElementById('phase').textContent = p.current_phase || 'Phase7';
+                document.getElementById('status').textContent = p.status || 'active';
+                document.getElementById('agents').textContent = (p.agents_used || []).join(', ') || '0';
+                document.getElementById('completed').textContent = (p.completed_phases || []).length || '7';
+
+                const progress = p.progress_percentage || 100;
+                document.getElementById('progress').style.width = progress + '%';
+                document.getElementById('progress').textContent = Math.round(progress) + '%';
+            }
+
+            document.getElementById('last-update').textContent = new Date().toLocaleTimeString();
+        }
+
         function loadData() {
             fetch('/api/projects')
                 .then(r => r.json())
-                .then(data => {
-                    document.getElementById('loading').style.display = 'none';
-                    document.getElementById('content').style.display = 'block';
-
-                    if (data.projects && data.projects[0]) {
-                        const p = data.projects[0];
-                        document.getElementById('project-name').textContent = p.name || 'Claude Enhancer';
-                        document.getElementById('branch').textContent = p.current_branch || 'main';
-                        document.getElementById('phase').textContent = p.current_phase || 'Phase7';
-                        document.getElementById('status').textContent = p.status || 'active';
-                        document.getElementById('agents').textContent = (p.agents_used || []).join(', ') || '0';
-                        document.getElementById('completed').textContent = (p.completed_phases || []).length || '7';
-
-                        const progress = p.progress_percentage || 100;
-                        document.getElementById('progress').style.width = progress + '%';
-                        document.getElementById('progress').textContent = Math.round(progress) + '%';
-                    }
-
-                    document.getElementById('last-update').textContent = new Date().toLocaleTimeString();
-                })
+                .then(render)
                 .catch(err => {
                     document.getElementById('loading').textContent = 'Error: ' + err;
                 });
         }
 
         loadData();
-        setInterval(loadData, 5000); // Refresh every 5s
+        if (window.EventSource) {
+            // Server pushes project updates; EventSource reconnects on its own
+            const stream = new EventSource('/api/projects/stream');
+            stream.addEventListener('projects', e => render(JSON.parse(e.data)));
+        } else {
+            setInterval(loadData, 5000); // Refresh every 5s
+        }
     </script>
 </body>
 </html>"""
-        self.send_html(html)
+
+_PAGES_MTIME = Path(__file__).stat().st_mtime
+PAGES: Dict[str, Payload] = {
+    path: Payload(html.encode('utf-8'), 'text/html; charset=utf-8', _PAGES_MTIME)
+    for path, html in (
+        ('/', HOME_HTML),
+        ('/index', HOME_HTML),
+        ('/capabilities', CAPABILITIES_HTML),
+        ('/projects', PROJECTS_HTML),
+    )
+}
+
+
+# ============================================================================
+# HTTP HANDLER
+# ============================================================================
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive for auto-refreshing clients
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+
+        # API endpoints
+        if path == '/api/health':
+            self.serve_health()
+        elif path == '/api/capabilities':
+            self.serve_capabilities()
+        elif path == '/api/learning':
+            self.serve_learning()
+        elif path == '/api/projects':
+            self.serve_projects()
+        elif path == '/api/projects/stream':
+            self.serve_projects_stream()
+
+        # Pages
+        elif path in PAGES:
+            self.send_payload(PAGES[path])
+        else:
+            self.send_error(404)
 
     def serve_health(self):
         """API: Health check"""
@@ -573,80 +771,95 @@ class DashboardHandler(BaseHTTPRequestHandler):
 
     def serve_capabilities(self):
         """API: Capabilities data"""
-        def compute():
-            try:
-                cap_parser = CapabilityParser(PROJECT_ROOT / "docs" / "CAPABILITY_MATRIX.md")
-                cap_result = cap_parser.parse()
-
-                feat_parser = FeatureParser(PROJECT_ROOT / "tools" / "web" / "dashboard.html")
-                feat_result = feat_parser.parse()
-
-                return {
-                    'core_stats': cap_result.data['core_stats'].__dict__ if cap_result.success else {},
-                    'capabilities': [c.__dict__ for c in cap_result.data.get('capabilities', [])] if cap_result.success else [],
-                    'features': [f.__dict__ for f in feat_result.data] if feat_result.success else []
-                }
-            except Exception as e:
-                return {'error': str(e)}
-
-        data = capability_cache.get_or_compute('cap_all', compute)
-        self.send_json(data)
+        self.send_payload(json_payload('cap_all', capability_cache, compute_capabilities))
 
     def serve_learning(self):
         """API: Learning system data"""
-        def compute():
-            try:
-                parser = LearningSystemParser(PROJECT_ROOT)
-                dec_result = parser.parse_decisions()
-                mem_result = parser.parse_memory_cache()
-
-                decisions = dec_result.data if dec_result.success else []
-                memory = mem_result.data if mem_result.success else None
-
-                return {
-                    'decisions': [d.__dict__ for d in decisions[-10:]],
-                    'statistics': {
-                        'total_decisions': len(decisions),
-                        'memory_cache_size': memory.cache_size_bytes if memory else 0
-                    }
-                }
-            except Exception as e:
-                return {'error': str(e)}
-
-        data = learning_cache.get_or_compute('learning_all', compute)
-        self.send_json(data)
+        self.send_payload(json_payload('learning_all', learning_cache, compute_learning))
 
     def serve_projects(self):
         """API: Projects data"""
-        def compute():
-            try:
-                monitor = ProjectMonitor(PROJECT_ROOT)
-                status_result = monitor.get_project_status()
-
-                project = status_result.data if status_result.success else None
-
-                return {
-                    'projects': [project.__dict__] if project else [],
-                    'summary': {'total_projects': 1 if project else 0}
-                }
-            except Exception as e:
-                return {'error': str(e), 'projects': [], 'summary': {'total_projects': 0}}
-
-        data = project_cache.get_or_compute('projects_all', compute)
-        self.send_json(data)
+        self.send_payload(json_payload('projects_all', project_cache, compute_projects))
 
-    def send_json(self, data):
+    def serve_projects_stream(self):
+        """API: Projects data pushed as server-sent events"""
         self.send_response(200)
-        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.end_headers()
-        self.wfile.write(json.dumps(data, default=str, ensure_ascii=False).encode('utf-8'))
+        self.close_connection = True
+
+        project_stream.subscribe()
+        version = 0
+        try:
+            while True:
+                new_version, payload = project_stream.wait(version, SSE_KEEPALIVE_SECONDS)
+                if new_version != version and payload is not None:
+                    version = new_version
+                    self.wfile.write(b'id: %d\nevent: projects\ndata: %s\n\n' % (version, payload.body))
+                else:
+                    self.wfile.write(b': keepalive\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client went away
+        finally:
+            project_stream.unsubscribe()
+
+    def send_json(self, data):
+        self.send_payload(Payload.from_json(data))
+
+    def send_payload(self, payload: Payload):
+        """Send a payload, honoring conditional GET and gzip content negotiation"""
+        validators = [
+            ('ETag', payload.etag),
+            ('Last-Modified', formatdate(payload.last_modified, usegmt=True)),
+            ('Cache-Control', 'no-cache'),
+            ('Vary', 'Accept-Encoding'),
+        ]
+        if payload.content_type == 'application/json':
+            validators.append(('Access-Control-Allow-Origin', '*'))
+
+        if self._not_modified(payload):
+            self.send_response(304)
+            for name, value in validators:
+                self.send_header(name, value)
+            self.end_headers()
+            return
+
+        body = payload.body
+        gzipped = (
+            len(body) >= GZIP_MIN_BYTES
+            and 'gzip' in self.headers.get('Accept-Encoding', '')
+        )
+        if gzipped:
+            body = payload.gzipped
 
-    def send_html(self, html):
         self.send_response(200)
-        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Type', payload.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        for name, value in validators:
+            self.send_header(name, value)
         self.end_headers()
-        self.wfile.write(html.encode('utf-8'))
+        self.wfile.write(body)
+
+    def _not_modified(self, payload: Payload) -> bool:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 7232)
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or payload.etag in tags or f'W/{payload.etag}' in tags
+
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return parsedate_to_datetime(if_modified_since).timestamp() >= payload.last_modified
+            except (TypeError, ValueError):
+                return False
+        return False
 
     def log_message(self, format, *args):
         print(f"[{self.address_string()}] {format % args}")
@@ -663,7 +876,8 @@ if __name__ == '__main__':
     print("=" * 60)
 
     try:
-        server = HTTPServer(('0.0.0.0', PORT), DashboardHandler)
+        server = ThreadingHTTPServer(('0.0.0.0', PORT), DashboardHandler)
+        server.daemon_threads = True  # Open SSE streams must not block shutdown
         print("✅ Server started successfully!")
         server.serve_forever()
     except KeyboardInterrupt:
@@ -12,7 +12,12 @@ Performance Targets: <100ms per parser
 """
 
 import re
+import os
 import json
+import itertools
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
@@ -558,11 +563,161 @@ class FeatureParser:
 # PROJECT MONITOR
 # ============================================================================
 
+def tail_lines(file_path: Path, limit: int, block_size: int = 8192) -> Tuple[List[bytes], int]:
+    """
+    Read the last `limit` complete lines of a file by seeking backwards in blocks.
+
+    Only newline-terminated lines are returned; a partially written trailing
+    line is left for the next read. Cost depends on `limit`, not file size.
+
+    Returns:
+        (lines, offset) where offset is the byte position just past the last
+        returned line
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        blocks: List[bytes] = []
+        newlines = 0
+
+        # One extra newline guarantees the first kept line is complete
+        while position > 0 and newlines <= limit:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size)
+            blocks.append(block)
+            newlines += block.count(b'\n')
+
+    data = b''.join(reversed(blocks))
+    complete = data.rfind(b'\n') + 1
+    lines = data[:complete].split(b'\n')[:-1]
+    if position > 0:
+        lines = lines[1:]  # First line started before the block we read
+
+    return lines[-limit:] if limit > 0 else [], position + complete
+
+
+class EventAggregator:
+    """
+    Incrementally fold appended telemetry events into a sliding window.
+
+    Remembers the byte offset of the last consumed line, so each update only
+    reads and parses newly appended events. Counters for the window (errors,
+    completed phases, latest task/phase start) are adjusted as events enter
+    and leave it instead of being recomputed. A truncated or replaced file is
+    detected by size/inode and re-bootstrapped from its tail.
+
+    Performance: O(new events) per update, independent of file size
+    """
+
+    def __init__(self, events_file: Path, parse_event, window: int = 100):
+        self.events_file = events_file
+        self.parse_event = parse_event
+        self.window_size = window
+        self.lock = threading.Lock()
+        self._reset(inode=None)
+
+    def _reset(self, inode: Optional[int]):
+        self.inode = inode
+        self.offset = 0
+        self.seq = 0  # Number of events folded so far
+        self.window: deque = deque()  # (seq, Event)
+        self.latest_task: Optional[Tuple[int, Event]] = None
+        self.latest_phase: Optional[Tuple[int, Event]] = None
+        self.error_count = 0
+        self.phase_ends: Counter = Counter()
+
+    def update(self) -> int:
+        """
+        Fold events appended since the last update.
+
+        Returns:
+            Number of newly folded events
+        """
+        with self.lock:
+            try:
+                stat = os.stat(self.events_file)
+            except FileNotFoundError:
+                self._reset(inode=None)
+                return 0
+
+            if stat.st_ino != self.inode or stat.st_size < self.offset:
+                # First read, rotation or truncation: start from the tail
+                self._reset(inode=stat.st_ino)
+                lines, self.offset = tail_lines(self.events_file, self.window_size)
+                return self._fold_lines(lines)
+
+            if stat.st_size == self.offset:
+                return 0
+
+            with open(self.events_file, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read(stat.st_size - self.offset)
+
+            complete = data.rfind(b'\n') + 1
+            self.offset += complete
+            return self._fold_lines(data[:complete].split(b'\n')[:-1])
+
+    def _fold_lines(self, lines: List[bytes]) -> int:
+        folded = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                event = self.parse_event(json.loads(line))
+            except ValueError:
+                continue  # Skip malformed lines
+            if event:
+                self._fold(event)
+                folded += 1
+        return folded
+
+    def _fold(self, event: Event):
+        self.seq += 1
+        entry = (self.seq, event)
+        self.window.append(entry)
+
+        if event.event_type == EventType.TASK_START:
+            self.latest_task = entry
+        elif event.event_type == EventType.PHASE_START:
+            self.latest_phase = entry
+        elif event.event_type == EventType.ERROR:
+            self.error_count += 1
+        elif event.event_type == EventType.PHASE_END:
+            self.phase_ends[event.phase_id] += 1
+
+        if len(self.window) > self.window_size:
+            self._evict(self.window.popleft())
+
+    def _evict(self, entry: Tuple[int, Event]):
+        event = entry[1]
+        # The latest start leaving the window means no later one is in it
+        if self.latest_task is entry:
+            self.latest_task = None
+        elif self.latest_phase is entry:
+            self.latest_phase = None
+        elif event.event_type == EventType.ERROR:
+            self.error_count -= 1
+        elif event.event_type == EventType.PHASE_END:
+            self.phase_ends[event.phase_id] -= 1
+            if self.phase_ends[event.phase_id] <= 0:
+                del self.phase_ends[event.phase_id]
+
+    def recent_events(self, count: int = 10) -> List[Event]:
+        """Return the last `count` events in the window"""
+        start = max(len(self.window) - count, 0)
+        return [event for _, event in itertools.islice(self.window, start, None)]
+
+
 class ProjectMonitor:
     """
     Monitor multiple CE projects by reading telemetry events.
 
-    Performance: ~20ms per 1000 events, <50ms for 10 projects in parallel
+    Status is maintained incrementally by an EventAggregator; use for_path()
+    to share one monitor (and its state) per project across polls.
+
+    Performance: O(new events) per poll, projects polled in parallel
     """
 
     PHASE_PROGRESS_MAP = {
@@ -580,9 +735,43 @@ class ProjectMonitor:
         'Phase7': 'Closure'
     }
 
+    EVENT_WINDOW = 100
+    ACTIVE_THRESHOLD_SECONDS = 300  # 5 min
+
+    _monitors: Dict[str, 'ProjectMonitor'] = {}
+    _monitors_lock = threading.Lock()
+
     def __init__(self, project_path: Path):
         self.project_path = Path(project_path)
         self.events_file = self.project_path / ".temp" / "ce_events.jsonl"
+        self.aggregator = EventAggregator(self.events_file, self._parse_event, self.EVENT_WINDOW)
+        self._cached_project: Optional[Project] = None
+        self._cache_key: Optional[Tuple] = None
+
+    @classmethod
+    def for_path(cls, project_path: Path) -> 'ProjectMonitor':
+        """Return the shared monitor for a project, keeping incremental state across polls"""
+        key = str(Path(project_path).resolve())
+        with cls._monitors_lock:
+            monitor = cls._monitors.get(key)
+            if monitor is None:
+                monitor = cls._monitors[key] = cls(project_path)
+            return monitor
+
+    @classmethod
+    def get_project_statuses(cls, project_paths: List[Path], max_workers: int = 8) -> List[ParsingResult]:
+        """
+        Poll several projects in parallel.
+
+        Returns:
+            One ParsingResult per project, in the order given
+        """
+        monitors = [cls.for_path(path) for path in project_paths]
+        if len(monitors) <= 1:
+            return [monitor.get_project_status() for monitor in monitors]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(monitors))) as pool:
+            return list(pool.map(lambda monitor: monitor.get_project_status(), monitors))
 
     def read_events(self, limit: int = 100) -> ParsingResult:
         """Read recent telemetry events from JSONL file"""
@@ -596,20 +785,18 @@ class ProjectMonitor:
         try:
             events = []
 
-            # Read last N lines efficiently (reversed file reading)
-            with open(self.events_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                for line in lines[-limit:]:
-                    if not line.strip():
-                        continue
-
-                    try:
-                        event_data = json.loads(line)
-                        event = self._parse_event(event_data)
-                        if event:
-                            events.append(event)
-                    except json.JSONDecodeError:
-                        continue  # Skip malformed lines
+            # Read last N lines by seeking backwards from the end of the file
+            lines, _ = tail_lines(self.events_file, limit)
+            for line in lines:
+                if not line.strip():
+                    continue
+
+                try:
+                    event = self._parse_event(json.loads(line))
+                    if event:
+                        events.append(event)
+                except ValueError:
+                    continue  # Skip malformed lines
 
             return ParsingResult(success=True, data=events)
 
@@ -646,14 +833,16 @@ class ProjectMonitor:
             return None
 
     def get_project_status(self) -> ParsingResult:
-        """Get current project status from events"""
-        events_result = self.read_events(limit=100)
-        if not events_result.success:
-            return events_result
-
-        events: List[Event] = events_result.data
+        """Get current project status, folding in events appended since the last poll"""
+        try:
+            self.aggregator.update()
+        except Exception as e:
+            return ParsingResult(
+                success=False,
+                error_message=f"Error reading events: {str(e)}"
+            )
 
-        if not events:
+        if not self.aggregator.window:
             return ParsingResult(
                 success=True,
                 data=self._create_idle_project(),
@@ -661,7 +850,7 @@ class ProjectMonitor:
             )
 
         try:
-            project = self._analyze_events(events)
+            project = self._summarize()
             return ParsingResult(success=True, data=project)
 
         except Exception as e:
@@ -670,59 +859,57 @@ class ProjectMonitor:
                 error_message=f"Error analyzing project: {str(e)}"
             )
 
-    def _analyze_events(self, events: List[Event]) -> Project:
-        """Analyze events to determine project status"""
-        # Find most recent task_start event
-        task_starts = [e for e in events if e.event_type == EventType.TASK_START]
-        if not task_starts:
-            return self._create_idle_project()
-
-        latest_task = task_starts[-1]
-
-        # Find current phase
-        phase_starts = [e for e in events if e.event_type == EventType.PHASE_START]
-        current_phase = phase_starts[-1].phase_id if phase_starts else None
-        current_phase_name = phase_starts[-1].phase_name if phase_starts else None
-
-        # Calculate progress
-        progress = self.PHASE_PROGRESS_MAP.get(current_phase, 0) if current_phase else 0
-
-        # Calculate duration
-        start_time = latest_task.datetime_obj
-        last_event_time = events[-1].datetime_obj
-        duration_seconds = 0
-        if start_time and last_event_time:
-            duration_seconds = int((last_event_time - start_time).total_seconds())
-
-        # Determine status
-        last_event_age = (datetime.now() - last_event_time).total_seconds() if last_event_time else 999999
-        status = ProjectStatus.ACTIVE if last_event_age < 300 else ProjectStatus.IDLE  # 5 min threshold
-
-        # Count errors
-        error_count = sum(1 for e in events if e.event_type == EventType.ERROR)
-        if error_count > 0:
-            status = ProjectStatus.ERROR
-
-        # Completed phases
-        phase_ends = [e.phase_id for e in events if e.event_type == EventType.PHASE_END]
-
-        return Project(
-            name=self.project_path.name,
-            path=str(self.project_path),
-            branch=self._get_current_branch(),
-            status=status,
-            current_phase=current_phase,
-            current_phase_name=current_phase_name,
-            task_name=latest_task.task_name,
-            progress_percentage=progress,
-            duration_seconds=duration_seconds,
-            start_time=latest_task.timestamp,
-            last_event_time=events[-1].timestamp,
-            phases_completed=list(set(phase_ends)),
-            total_events=len(events),
-            error_count=error_count,
-            recent_events=events[-10:]  # Last 10 events
-        )
+    def _summarize(self) -> Project:
+        """Build the Project summary from the aggregator's running state"""
+        aggregator = self.aggregator
+        with aggregator.lock:
+            if aggregator.latest_task is None:
+                return self._create_idle_project()
+
+            last_event = aggregator.window[-1][1]
+            last_event_time = last_event.datetime_obj
+
+            # Determine status
+            last_event_age = (datetime.now() - last_event_time).total_seconds() if last_event_time else 999999
+            status = ProjectStatus.ACTIVE if last_event_age < self.ACTIVE_THRESHOLD_SECONDS else ProjectStatus.IDLE
+            if aggregator.error_count > 0:
+                status = ProjectStatus.ERROR
+
+            branch = self._get_current_branch()
+            cache_key = (aggregator.inode, aggregator.seq, status, branch)
+            if cache_key == self._cache_key:
+                return self._cached_project
+
+            latest_task = aggregator.latest_task[1]
+            latest_phase = aggregator.latest_phase[1] if aggregator.latest_phase else None
+            current_phase = latest_phase.phase_id if latest_phase else None
+
+            # Calculate duration
+            start_time = latest_task.datetime_obj
+            duration_seconds = 0
+            if start_time and last_event_time:
+                duration_seconds = int((last_event_time - start_time).total_seconds())
+
+            project = Project(
+                name=self.project_path.name,
+                path=str(self.project_path),
+                branch=branch,
+                status=status,
+                current_phase=current_phase,
+                current_phase_name=latest_phase.phase_name if latest_phase else None,
+                task_name=latest_task.task_name,
+                progress_percentage=self.PHASE_PROGRESS_MAP.get(current_phase, 0) if current_phase else 0,
+                duration_seconds=duration_seconds,
+                start_time=latest_task.timestamp,
+                last_event_time=last_event.timestamp,
+                phases_completed=list(aggregator.phase_ends),
+                total_events=len(aggregator.window),
+                error_count=aggregator.error_count,
+                recent_events=aggregator.recent_events(10)
+            )
+
+            self._cached_project, self._cache_key = project, cache_key
+            return project
 
     def _create_idle_project(self) -> Project:
         """Create an idle project object"""